@@ -0,0 +1,74 @@
+# /home/miso/dev/sp-app/sp-app/backend/alembic/versions/20261018_export_jobs.py
+"""add export_jobs (queue for background exports) + tenant_data_versions
+
+Revision ID: 20261018_export_jobs
+Revises: 20261018_storage_blobs
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_export_jobs"
+down_revision = "20261018_storage_blobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tenant_data_versions",
+        sa.Column("tenant_code", sa.String(length=64), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.PrimaryKeyConstraint("tenant_code"),
+    )
+
+    op.create_table(
+        "export_jobs",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("tenant_code", sa.String(length=64), nullable=False),
+        sa.Column("kind", sa.String(length=32), nullable=False),
+        sa.Column("params", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("params_hash", sa.String(length=64), nullable=False),
+        sa.Column("data_version", sa.BigInteger(), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="queued"),
+        sa.Column("progress", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("artifact_path", sa.Text(), nullable=True),
+        sa.Column("filename", sa.String(length=256), nullable=True),
+        sa.Column("media_type", sa.String(length=128), nullable=True),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["tenant_code"], ["tenants.code"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.CheckConstraint(
+            "status IN ('queued', 'running', 'done', 'failed')",
+            name="ck_export_jobs_status",
+        ),
+    )
+    op.create_index(
+        "ix_export_jobs_queued",
+        "export_jobs",
+        ["id"],
+        postgresql_where=sa.text("status = 'queued'"),
+    )
+    op.create_index(
+        "ix_export_jobs_reuse",
+        "export_jobs",
+        ["tenant_code", "kind", "params_hash", "data_version"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_export_jobs_reuse", table_name="export_jobs")
+    op.drop_index("ix_export_jobs_queued", table_name="export_jobs")
+    op.drop_table("export_jobs")
+    op.drop_table("tenant_data_versions")
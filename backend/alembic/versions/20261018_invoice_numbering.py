@@ -0,0 +1,33 @@
+# /home/miso/dev/sp-app/sp-app/backend/alembic/versions/20261018_invoice_numbering.py
+"""add invoice number format/reset to tenant_profile_settings
+
+Revision ID: 20261018_invoice_numbering
+Revises: 20261018_invoice_templates
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_invoice_numbering"
+down_revision = "20261018_invoice_templates"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "tenant_profile_settings",
+        sa.Column("invoice_number_format", sa.String(length=64), nullable=True),
+    )
+    op.add_column(
+        "tenant_profile_settings",
+        sa.Column("invoice_number_reset", sa.String(length=16), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("tenant_profile_settings", "invoice_number_reset")
+    op.drop_column("tenant_profile_settings", "invoice_number_format")
@@ -0,0 +1,77 @@
+# /home/miso/dev/sp-app/sp-app/backend/alembic/versions/20261018_invoice_templates.py
+"""add invoice_templates (recurring invoices) + tenant_invoice_sequences
+
+Revision ID: 20261018_invoice_templates
+Revises: 20261018_response_cache
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_invoice_templates"
+down_revision = "20261018_response_cache"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "invoice_templates",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("tenant_code", sa.String(length=64), nullable=False),
+        sa.Column("name", sa.String(length=128), nullable=False),
+        sa.Column("buyer_name", sa.String(length=128), nullable=False),
+        sa.Column("buyer_address", sa.String(length=256), nullable=True),
+        sa.Column("note", sa.Text(), nullable=True),
+        sa.Column("items", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("cadence", sa.String(length=16), nullable=False, server_default="monthly"),
+        sa.Column("anchor_day", sa.Integer(), nullable=False),
+        sa.Column("due_days", sa.Integer(), nullable=True),
+        sa.Column("next_run", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=False, server_default=sa.text("true")),
+        sa.Column("last_run_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_invoice_id", sa.BigInteger(), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.ForeignKeyConstraint(["tenant_code"], ["tenants.code"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["last_invoice_id"], ["invoices.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.CheckConstraint(
+            "cadence IN ('monthly', 'quarterly', 'yearly')",
+            name="ck_invoice_templates_cadence",
+        ),
+        sa.CheckConstraint("anchor_day BETWEEN 1 AND 31", name="ck_invoice_templates_anchor_day"),
+    )
+    op.create_index(
+        "ix_invoice_templates_due",
+        "invoice_templates",
+        ["next_run", "id"],
+        postgresql_where=sa.text("is_active IS true"),
+    )
+    op.create_index(
+        "ix_invoice_templates_tenant",
+        "invoice_templates",
+        ["tenant_code", "id"],
+    )
+
+    op.create_table(
+        "tenant_invoice_sequences",
+        sa.Column("tenant_code", sa.String(length=64), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("last_value", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.ForeignKeyConstraint(["tenant_code"], ["tenants.code"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("tenant_code", "year"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("tenant_invoice_sequences")
+    op.drop_index("ix_invoice_templates_tenant", table_name="invoice_templates")
+    op.drop_index("ix_invoice_templates_due", table_name="invoice_templates")
+    op.drop_table("invoice_templates")
@@ -0,0 +1,39 @@
+# /home/miso/dev/sp-app/sp-app/backend/alembic/versions/20261018_response_cache.py
+"""add response_cache_entries (shared response cache, UNLOGGED)
+
+Revision ID: 20261018_response_cache
+Revises: 20261018_export_jobs
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_response_cache"
+down_revision = "20261018_export_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "response_cache_entries",
+        sa.Column("cache_key", sa.String(length=64), nullable=False),
+        sa.Column("data_version", sa.BigInteger(), nullable=False),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("cache_key"),
+        prefixes=["UNLOGGED"],
+    )
+    op.create_index(
+        "ix_response_cache_entries_expires_at",
+        "response_cache_entries",
+        ["expires_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_response_cache_entries_expires_at", table_name="response_cache_entries")
+    op.drop_table("response_cache_entries")
@@ -0,0 +1,53 @@
+# /home/miso/dev/sp-app/sp-app/backend/alembic/versions/20261018_search_trgm.py
+"""add pg_trgm search indexes (sp_search_fold) for buyer/supplier/description
+
+Revision ID: 20261018_search_trgm
+Revises: 20261018_invoice_numbering
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_search_trgm"
+down_revision = "20261018_invoice_numbering"
+branch_labels = None
+depends_on = None
+
+
+# Isto preslikavanje kao app/services/search.py (fold_search_text) i
+# pdf_writer.BOSNIAN_TRANSLITERATION: č/ć → c, š → s, đ → d, ž → z, pa lower().
+# Funkcija mora biti IMMUTABLE da bi se mogla koristiti u indeksu.
+_FOLD_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION sp_search_fold(value text) RETURNS text
+LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+AS $$ SELECT lower(translate(value, 'čćšđžČĆŠĐŽ', 'ccsdzccsdz')) $$
+"""
+
+_INDEXES = (
+    ("ix_invoices_buyer_name_trgm", "invoices", "buyer_name"),
+    ("ix_input_invoices_supplier_name_trgm", "input_invoices", "supplier_name"),
+    ("ix_cash_entries_description_trgm", "cash_entries", "description"),
+)
+
+
+def upgrade() -> None:
+    # pg_trgm je "trusted" ekstenzija (PG13+) – vlasnik baze je može kreirati.
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(_FOLD_FUNCTION_SQL)
+
+    # GIN trigram indeks nad folded vrijednošću pokriva LIKE '%q%', LIKE 'q%'
+    # i operatore sličnosti (%, %>) nad sp_search_fold(kolona).
+    for name, table, column in _INDEXES:
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} "
+            f"ON {table} USING gin (sp_search_fold({column}) gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    for name, _table, _column in reversed(_INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute("DROP FUNCTION IF EXISTS sp_search_fold(text)")
+    # ekstenziju pg_trgm ne brišemo – može je koristiti i nešto izvan aplikacije
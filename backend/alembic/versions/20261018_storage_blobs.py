@@ -0,0 +1,155 @@
+# /home/miso/dev/sp-app/sp-app/backend/alembic/versions/20261018_storage_blobs.py
+"""add storage_blobs (content-addressed attachments) + backfill sha256
+
+Revision ID: 20261018_storage_blobs
+Revises: 20261018_monthly_rollups
+Create Date: 2026-10-18
+"""
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_storage_blobs"
+down_revision = "20261018_monthly_rollups"
+branch_labels = None
+depends_on = None
+
+
+# Iste env varijable/defaulti kao u app/routes/invoice_attachments.py,
+# app/routes/settings.py i app/services/blob_store.py
+BLOB_ROOT = Path(os.getenv("BLOB_STORAGE_DIR", "data/blobs"))
+LEGACY_ROOTS = {
+    "invoice_attachments": Path(os.getenv("INVOICE_ATTACHMENTS_DIR", "data/invoice_attachments")),
+    "tenant_assets": Path(os.getenv("TENANT_ASSETS_DIR", "data/tenant_assets")),
+}
+
+CHUNK_BYTES = 1024 * 1024
+
+
+def _blob_relative_path(sha256: str) -> str:
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+def _hash_file(path: Path) -> tuple[int, str]:
+    digest = hashlib.sha256()
+    size = 0
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(CHUNK_BYTES), b""):
+            size += len(chunk)
+            digest.update(chunk)
+    return size, digest.hexdigest()
+
+
+def _backfill(conn, table: str) -> None:
+    """
+    Za svaki red sa postojećim fajlom: SHA-256 → kopija u blob store
+    (duplikat se ne kopira) → storage_blobs ref_count + 1 → sha256 na redu.
+    Redovi čiji fajl ne postoji ostaju sa sha256 = NULL (legacy putanja).
+
+    Stari fajlovi se NE brišu: ako migracija padne i transakcija se vrati,
+    redovi i dalje pokazuju na njih. Stari direktoriji se čiste ručno nakon
+    uspješnog upgrade-a.
+    """
+    legacy_root = LEGACY_ROOTS[table]
+    rows = conn.execute(
+        sa.text(f"SELECT id, storage_path FROM {table} WHERE sha256 IS NULL ORDER BY id")
+    ).all()
+
+    for row_id, storage_path in rows:
+        if not storage_path:
+            continue
+        legacy_path = legacy_root / storage_path
+        if not legacy_path.is_file():
+            continue
+
+        size, sha256 = _hash_file(legacy_path)
+        relative = _blob_relative_path(sha256)
+        target = BLOB_ROOT / relative
+
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp_target = target.with_name(f"{target.name}.migrating")
+            shutil.copyfile(legacy_path, tmp_target)
+            os.replace(tmp_target, target)
+
+        conn.execute(
+            sa.text(
+                "INSERT INTO storage_blobs (sha256, size_bytes, ref_count) VALUES (:sha, :size, 1) "
+                "ON CONFLICT (sha256) DO UPDATE SET ref_count = storage_blobs.ref_count + 1"
+            ),
+            {"sha": sha256, "size": size},
+        )
+        conn.execute(
+            sa.text(f"UPDATE {table} SET sha256 = :sha, storage_path = :path WHERE id = :id"),
+            {"sha": sha256, "path": relative, "id": row_id},
+        )
+
+
+def _restore_legacy_files(conn, table: str) -> None:
+    """
+    Downgrade: kopira blob nazad na staru putanju <tenant>/<id>_<filename>.
+    Blob fajlovi ostaju na disku (brišu se ručno ako je potrebno).
+    """
+    legacy_root = LEGACY_ROOTS[table]
+    rows = conn.execute(
+        sa.text(f"SELECT id, tenant_code, filename, sha256 FROM {table} WHERE sha256 IS NOT NULL")
+    ).all()
+
+    for row_id, tenant_code, filename, sha256 in rows:
+        source = BLOB_ROOT / _blob_relative_path(sha256)
+        relative = f"{tenant_code}/{row_id}_{filename}"
+        if source.is_file():
+            target = legacy_root / relative
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(source, target)
+        conn.execute(
+            sa.text(f"UPDATE {table} SET storage_path = :path WHERE id = :id"),
+            {"path": relative, "id": row_id},
+        )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "storage_blobs",
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.PrimaryKeyConstraint("sha256"),
+        sa.CheckConstraint("ref_count >= 0", name="ck_storage_blobs_ref_count_nonneg"),
+    )
+
+    for table in ("invoice_attachments", "tenant_assets"):
+        op.add_column(table, sa.Column("sha256", sa.String(length=64), nullable=True))
+        op.create_index(f"ix_{table}_sha256", table, ["sha256"])
+        op.create_foreign_key(
+            f"fk_{table}_sha256_storage_blobs",
+            table,
+            "storage_blobs",
+            ["sha256"],
+            ["sha256"],
+        )
+
+    conn = op.get_bind()
+    _backfill(conn, "invoice_attachments")
+    _backfill(conn, "tenant_assets")
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    _restore_legacy_files(conn, "invoice_attachments")
+    _restore_legacy_files(conn, "tenant_assets")
+
+    for table in ("tenant_assets", "invoice_attachments"):
+        op.drop_constraint(f"fk_{table}_sha256_storage_blobs", table, type_="foreignkey")
+        op.drop_index(f"ix_{table}_sha256", table_name=table)
+        op.drop_column(table, "sha256")
+
+    op.drop_table("storage_blobs")
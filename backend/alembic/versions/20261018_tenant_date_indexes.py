@@ -0,0 +1,42 @@
+# /home/miso/dev/sp-app/sp-app/backend/alembic/versions/20261018_tenant_date_indexes.py
+"""add (tenant_code, date) indexes for period filters
+
+Revision ID: 20261018_tenant_date_idx
+Revises: 522c4a40e121
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_tenant_date_idx"
+down_revision = "522c4a40e121"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Liste/izvještaji filtriraju po tenant_code + half-open opsegu datuma
+    # (app/period_filters.py) → composite indeks omogućava index range scan.
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_invoices_tenant_issue_date "
+        "ON invoices (tenant_code, issue_date)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_input_invoices_tenant_issue_date "
+        "ON input_invoices (tenant_code, issue_date)"
+    )
+
+    # ix_cash_entries_tenant_date je kreiran u ccfd9a8fd57e, ali ga je autogenerisana
+    # migracija 1c90358a3b6c obrisala → vraćamo ga (idempotentno).
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_cash_entries_tenant_date "
+        "ON cash_entries (tenant_code, entry_date)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_cash_entries_tenant_date")
+    op.execute("DROP INDEX IF EXISTS ix_input_invoices_tenant_issue_date")
+    op.execute("DROP INDEX IF EXISTS ix_invoices_tenant_issue_date")
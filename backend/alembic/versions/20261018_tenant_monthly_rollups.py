@@ -0,0 +1,101 @@
+# /home/miso/dev/sp-app/sp-app/backend/alembic/versions/20261018_tenant_monthly_rollups.py
+"""add tenant_monthly_rollups (+ backfill from ledgers)
+
+Revision ID: 20261018_monthly_rollups
+Revises: 20261018_tenant_date_idx
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_monthly_rollups"
+down_revision = "20261018_tenant_date_idx"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tenant_monthly_rollups",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("tenant_code", sa.String(length=64), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("month", sa.Integer(), nullable=False),
+        sa.Column("invoice_income", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("invoice_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("cash_income", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("cash_income_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("cash_expense", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("cash_expense_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("input_expense", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("input_invoice_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "total_income",
+            sa.Numeric(14, 2),
+            sa.Computed("invoice_income + cash_income", persisted=True),
+        ),
+        sa.Column(
+            "total_expense",
+            sa.Numeric(14, 2),
+            sa.Computed("cash_expense + input_expense", persisted=True),
+        ),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("tenant_code", "year", "month", name="uq_tenant_monthly_rollups_tenant_year_month"),
+        sa.CheckConstraint("month >= 1 AND month <= 12", name="ck_tenant_monthly_rollups_month"),
+    )
+
+    # Backfill iz postojećih knjiga (isti SQL kao rebuild u app/services/ledger_rollups.py)
+    op.execute(
+        """
+        INSERT INTO tenant_monthly_rollups (
+            tenant_code, year, month,
+            invoice_income, invoice_count,
+            cash_income, cash_income_count,
+            cash_expense, cash_expense_count,
+            input_expense, input_invoice_count
+        )
+        SELECT
+            src.tenant_code, src.y, src.m,
+            SUM(src.invoice_income), SUM(src.invoice_count),
+            SUM(src.cash_income), SUM(src.cash_income_count),
+            SUM(src.cash_expense), SUM(src.cash_expense_count),
+            SUM(src.input_expense), SUM(src.input_invoice_count)
+        FROM (
+            SELECT tenant_code,
+                   EXTRACT(YEAR FROM issue_date)::int AS y,
+                   EXTRACT(MONTH FROM issue_date)::int AS m,
+                   COALESCE(total_amount, 0) AS invoice_income, 1 AS invoice_count,
+                   0 AS cash_income, 0 AS cash_income_count,
+                   0 AS cash_expense, 0 AS cash_expense_count,
+                   0 AS input_expense, 0 AS input_invoice_count
+            FROM invoices
+            UNION ALL
+            SELECT tenant_code,
+                   EXTRACT(YEAR FROM entry_date)::int,
+                   EXTRACT(MONTH FROM entry_date)::int,
+                   0, 0,
+                   CASE WHEN kind = 'income' THEN amount ELSE 0 END,
+                   CASE WHEN kind = 'income' THEN 1 ELSE 0 END,
+                   CASE WHEN kind = 'expense' THEN amount ELSE 0 END,
+                   CASE WHEN kind = 'expense' THEN 1 ELSE 0 END,
+                   0, 0
+            FROM cash_entries
+            UNION ALL
+            SELECT tenant_code,
+                   EXTRACT(YEAR FROM issue_date)::int,
+                   EXTRACT(MONTH FROM issue_date)::int,
+                   0, 0, 0, 0, 0, 0,
+                   COALESCE(total_amount, 0), 1
+            FROM input_invoices
+        ) AS src
+        GROUP BY src.tenant_code, src.y, src.m
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("tenant_monthly_rollups")
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -6,4 +8,27 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "sp-app"
     DATABASE_URL: str = "postgresql+psycopg2://sp_app:sp_app@db:5432/sp_app"
 
+    # --- Connection pool (app/db.py) ---
+    # Važi po procesu i po engine-u (sync psycopg2 i async asyncpg imaju
+    # svaki svoj pool): workers × 2 × (DB_POOL_SIZE + DB_MAX_OVERFLOW) mora
+    # stati u max_connections baze (ili PgBouncer-a).
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    # koliko dugo zahtjev čeka slobodnu konekciju prije TimeoutError-a
+    DB_POOL_TIMEOUT_SECONDS: float = 10.0
+    # konekcije starije od ovoga se zatvaraju pri checkout-u (-1 = nikad)
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    # server-side statement_timeout (0 = bez ograničenja)
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+    DB_APPLICATION_NAME: str = "sp-app"
+
+    # PgBouncer (transaction pooling): bez server-side prepared statement-a
+    # (asyncpg) i bez `options` startup parametra – statement_timeout se
+    # tada podešava na nivou role/baze (ALTER ROLE ... SET statement_timeout).
+    DB_PGBOUNCER_MODE: bool = False
+
+    # Async engine: "queue" (pool) ili "null" (nova konekcija po sesiji –
+    # potrebno kada se event loop mijenja između zahtjeva, npr. TestClient).
+    ASYNC_DB_POOL: Literal["queue", "null"] = "queue"
+
 settings = Settings()
@@ -1,17 +1,128 @@
 import os
+import threading
+import time
 from contextlib import contextmanager
-from sqlalchemy import create_engine, text
+from typing import Any, AsyncIterator, Dict
+from uuid import uuid4
+
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.config import settings
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL must be set via backend/.env")
 
+
+# ======================================================
+#  CONNECTION POOL – podešavanja i metrika čekanja
+# ======================================================
+#
+# Veličina pool-a, overflow, timeout, recycle, statement_timeout i
+# application_name dolaze iz app/config.py (Settings / env). Default
+# SQLAlchemy pool (5 + 10) je pod burst opterećenjem davao
+# "QueuePool limit of size 5 overflow 10 reached" timeout-e.
+#
+# Pool klase ispod mjere koliko checkout traje (čekanje na slobodnu
+# konekciju + eventualno otvaranje nove) i broje timeout-e; stanje se
+# vidi na GET /health/db-pool.
+
+
+class PoolWaitStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, seconds: float, *, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(self.total_wait / attempts * 1000, 3) if attempts else 0.0,
+                "wait_ms_max": round(self.max_wait * 1000, 3),
+            }
+
+
+class _TimedCheckoutMixin:
+    # na nivou klase, jer engine.dispose() pravi novu instancu pool-a
+    wait_stats: PoolWaitStats
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - started)
+        return conn
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    wait_stats = PoolWaitStats()
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    wait_stats = PoolWaitStats()
+
+
+def _queue_pool_kwargs() -> Dict[str, Any]:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+
+
+def _psycopg2_connect_args() -> Dict[str, Any]:
+    args: Dict[str, Any] = {"application_name": settings.DB_APPLICATION_NAME}
+    # PgBouncer odbija nepoznate startup parametre (`options`)
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0 and not settings.DB_PGBOUNCER_MODE:
+        args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    return args
+
+
+def _asyncpg_connect_args() -> Dict[str, Any]:
+    server_settings = {"application_name": settings.DB_APPLICATION_NAME}
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0 and not settings.DB_PGBOUNCER_MODE:
+        server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+
+    args: Dict[str, Any] = {"server_settings": server_settings}
+    if settings.DB_PGBOUNCER_MODE:
+        # U transaction pooling-u sljedeći upit može otići na drugu server
+        # konekciju: bez keša prepared statement-a i sa jedinstvenim imenima.
+        args["statement_cache_size"] = 0
+        args["prepared_statement_cache_size"] = 0
+        args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    return args
+
+
 # Stabilna konekcija (pre-ping) i razuman isolation level
 engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,
     isolation_level="READ COMMITTED",
+    poolclass=InstrumentedQueuePool,
+    connect_args=_psycopg2_connect_args(),
+    **_queue_pool_kwargs(),
 )
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
@@ -27,3 +138,82 @@ def db_ping() -> bool:
     with engine.connect() as conn:
         conn.execute(text("SELECT 1"))
     return True
+
+
+# ======================================================
+#  ASYNC SLOJ (asyncpg) – za I/O-bound read rute
+# ======================================================
+#
+# `async def` rute ne zauzimaju slot u AnyIO thread pool-u (default 40)
+# dok čekaju Postgres. Ista baza, isti modeli i ORM hook-ovi (AsyncSession
+# interno koristi sync Session), samo drugi driver:
+#   postgresql+psycopg2://...  →  postgresql+asyncpg://...
+#
+# Sync `SessionLocal` / `get_session` ostaju za rute koje još nisu
+# prebačene, write putanje i testove.
+#
+# ASYNC_DB_POOL=null: bez pool-a (svaki zahtjev otvara konekciju). Potrebno
+# kada se event loop mijenja između zahtjeva (TestClient bez `with`), jer
+# su asyncpg konekcije vezane za loop u kojem su otvorene.
+
+
+def _async_database_url(url: str) -> str:
+    for sync_driver in ("postgresql+psycopg2://", "postgresql://"):
+        if url.startswith(sync_driver):
+            return "postgresql+asyncpg://" + url[len(sync_driver):]
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_database_url(DATABASE_URL)
+
+_async_engine_kwargs: Dict[str, Any] = {
+    "pool_pre_ping": True,
+    "isolation_level": "READ COMMITTED",
+    "connect_args": _asyncpg_connect_args(),
+}
+if os.getenv("ASYNC_DB_POOL", settings.ASYNC_DB_POOL) == "null":
+    _async_engine_kwargs["poolclass"] = NullPool
+else:
+    _async_engine_kwargs["poolclass"] = InstrumentedAsyncQueuePool
+    _async_engine_kwargs.update(_queue_pool_kwargs())
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_async_engine_kwargs)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _pool_status(bind: Engine) -> Dict[str, Any]:
+    pool = bind.pool
+    status: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                # QueuePool.overflow() je negativan dok pool nije popunjen
+                "overflow": max(0, pool.overflow()),
+                "max_overflow": settings.DB_MAX_OVERFLOW,
+                "timeout_seconds": pool.timeout(),
+            }
+        )
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        status.update(wait_stats.snapshot())
+    return status
+
+
+def pool_stats() -> Dict[str, Any]:
+    """
+    Stanje oba pool-a (sync psycopg2 i async asyncpg) za tekući proces.
+    """
+    return {
+        "sync": _pool_status(engine),
+        "async": _pool_status(async_engine.sync_engine),
+        "pgbouncer_mode": settings.DB_PGBOUNCER_MODE,
+    }
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import date
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import get_async_session
+from app.models import tenant_data_version_stmt
+
+
+# ======================================================
+#  ETAG / CONDITIONAL GET (po verziji podataka tenanta)
+# ======================================================
+#
+# Read endpointi koje frontend često osvježava (dashboard, SAM, cashflow,
+# KPR, porezi) dobijaju `dependencies=[Depends(tenant_etag)]`:
+#
+#   ETag = hash(verzija podataka tenanta, ruta, query parametri, današnji datum)
+#
+# Verziju povećavaju ORM hook-ovi u models.py pri svakoj izmjeni podataka
+# tenanta (tenant_data_versions). Ako klijent pošalje `If-None-Match` sa
+# istim ETag-om, odgovor je 304 bez računanja – jedan PK lookup umjesto
+# agregacija po knjigama.
+#
+# Datum je dio ključa jer neki endpointi bez parametara zavise od
+# `date.today()` (npr. /dashboard/monthly/current).
+#
+# Lookup ide preko async sesije, pa ni sync rute ne troše thread na njega.
+
+ETAG_CACHE_CONTROL = "private, no-cache"
+
+
+def compute_tenant_etag(version: int, request: Request, tenant_code: str) -> str:
+    query = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    raw = "\n".join(
+        [
+            tenant_code,
+            str(version),
+            request.url.path,
+            query,
+            date.today().isoformat(),
+        ]
+    )
+    return f'W/"{hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match koristi slabo poređenje (RFC 9110, 13.1.2)
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+async def tenant_etag(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_session),
+    x_tenant_code: Optional[str] = Header(None, alias="X-Tenant-Code"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+) -> None:
+    """
+    Dependency za GET rute: postavlja ETag i vraća 304 kada se poklapa
+    sa `If-None-Match`.
+
+    Bez X-Tenant-Code ne radi ništa – ruta sama vraća 400.
+    """
+    if not x_tenant_code:
+        return
+
+    version = int((await db.execute(tenant_data_version_stmt(x_tenant_code))).scalar_one())
+    etag = compute_tenant_etag(version, request, x_tenant_code)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": ETAG_CACHE_CONTROL,
+        "Vary": "X-Tenant-Code",
+    }
+
+    if if_none_match and _etag_matches(if_none_match, etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
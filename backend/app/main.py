@@ -1,6 +1,8 @@
 # /home/miso/dev/sp-app/sp-app/backend/app/main.py
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -10,6 +12,7 @@ from app.routes import (
     tenants,
     cash,
     invoices,
+    invoice_templates,
     input_invoices,
     invoice_attachments,
     tax,
@@ -19,11 +22,16 @@ from app.routes import (
     kpr,
     promet,
     export,
+    export_jobs,
+    search,
     settings,
     admin_constants,
     constants,  # ✅ ADD
 )
 from app.models import FinalizedPeriodModificationError
+from app.schema_check import verify_schema
+from app.services.export_jobs import export_worker_pool
+from app.services.recurring_invoices import recurring_invoice_scheduler
 
 # Tagovi za OpenAPI dokumentaciju – čisto da bude preglednije u Swagger-u
 tags_metadata = [
@@ -59,6 +67,10 @@ tags_metadata = [
         "name": "dashboard",
         "description": "Kratki sažeci za početni ekran / dashboard.",
     },
+    {
+        "name": "search",
+        "description": "Pretraga faktura, ulaznih faktura i uplata (pg_trgm).",
+    },
     {
         "name": "sam",
         "description": "SAM blok – pregled prihoda, rashoda i obaveza.",
@@ -75,6 +87,10 @@ tags_metadata = [
         "name": "reports",
         "description": "Finansijski izvještaji i pregledi (cashflow, P&L, itd.).",
     },
+    {
+        "name": "exports",
+        "description": "Pozadinski exporti (inspekcija, KPR, fakture, porez) – red poslova i download.",
+    },
     {
         "name": "constants",
         "description": "Aktuelni zakonski parametri (effective-dated) po entitetu i scenariju.",
@@ -89,6 +105,31 @@ tags_metadata = [
     },
 ]
 
+# ======================================================
+#  LIFESPAN – provjera šeme + pozadinski worker-i
+# ======================================================
+#
+# Šema se provjerava jednom prije prvog zahtjeva (app/schema_check.py,
+# SCHEMA_CHECK=strict|warn|off); rute ne rade DDL.
+#
+# EXPORT_WORKER_PROCESSES=0 isključuje lokalne worker-e (npr. kada
+# `python -m app.services.export_jobs worker` radi kao zaseban servis).
+# RECURRING_INVOICE_POLL_SECONDS=0 isto za ponavljajuće fakture
+# (`python -m app.services.recurring_invoices worker`).
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    verify_schema()
+    export_worker_pool.start()
+    recurring_invoice_scheduler.start()
+    try:
+        yield
+    finally:
+        recurring_invoice_scheduler.stop()
+        export_worker_pool.stop()
+
+
 app = FastAPI(
     title="SP-APP API",
     description=(
@@ -97,6 +138,7 @@ app = FastAPI(
     ),
     version="0.1.0",
     openapi_tags=tags_metadata,
+    lifespan=lifespan,
 )
 
 # ======================================================
@@ -191,6 +233,9 @@ app.include_router(cash.router)
 # Izlazne fakture
 app.include_router(invoices.router)
 
+# Šabloni ponavljajućih faktura
+app.include_router(invoice_templates.router)
+
 # Ulazne fakture (dobavljači)
 app.include_router(input_invoices.router)
 
@@ -218,6 +263,12 @@ app.include_router(reports.router)
 # Export (inspekcija)
 app.include_router(export.router)
 
+# Pozadinski exporti (red poslova)
+app.include_router(export_jobs.router)
+
+# Pretraga (kupci, dobavljači, opisi uplata)
+app.include_router(search.router)
+
 # Settings (core podešavanja korisnika)
 app.include_router(settings.router)
 
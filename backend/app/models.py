@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from datetime import date
 from decimal import Decimal
+from typing import Optional
 
 
 from sqlalchemy import (
@@ -10,19 +11,25 @@ from sqlalchemy import (
     Boolean,
     CheckConstraint,
     Column,
+    Computed,
     Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
+    LargeBinary,
     Numeric,
     String,
     Text,
     UniqueConstraint,
-    func,
     event,
+    func,
+    select,
+    text,
 )
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import declarative_base, relationship, object_session
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from sqlalchemy.orm import Session, declarative_base, relationship, object_session
 
 Base = declarative_base()
 
@@ -119,6 +126,11 @@ class CashEntry(Base):
             "account in ('cash','bank')",
             name="ck_cash_entries_account",
         ),
+        # period filteri (app/period_filters.py) → range scan po datumu
+        Index("ix_cash_entries_tenant_date", "tenant_code", "entry_date"),
+        # GIN trigram indeks ix_cash_entries_description_trgm nad
+        # sp_search_fold(description) je samo u migraciji 20261018_search_trgm
+        # (izraz sa SQL funkcijom i gin_trgm_ops) – app/services/search.py
     )
 
 
@@ -162,6 +174,8 @@ class Invoice(Base):
             "invoice_number",
             name="uq_invoice_number_per_tenant",
         ),
+        Index("ix_invoices_tenant_issue_date", "tenant_code", "issue_date"),
+        # + ix_invoices_buyer_name_trgm (migracija 20261018_search_trgm)
     )
 
     items = relationship(
@@ -207,6 +221,34 @@ class InvoiceItem(Base):
     )
 
 
+# ======================================================
+#  STORAGE BLOBS (content-addressed fajlovi, SHA-256)
+# ======================================================
+class StorageBlob(Base):
+    """
+    Jedan fizički fajl u blob store-u (app/services/blob_store.py), ključ je SHA-256.
+
+    Isti sadržaj uploadovan više puta (npr. isti PDF dobavljača) čuva se jednom;
+    `ref_count` broji InvoiceAttachment + TenantAsset redove koji ga koriste.
+    """
+
+    __tablename__ = "storage_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    size_bytes = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+    __table_args__ = (
+        CheckConstraint("ref_count >= 0", name="ck_storage_blobs_ref_count_nonneg"),
+    )
+
+
 # ======================================================
 #  INVOICE ATTACHMENTS (fajlovi računa)
 # ======================================================
@@ -243,6 +285,14 @@ class InvoiceAttachment(Base):
 
     storage_path = Column(Text, nullable=False)
 
+    # NULL = stari fajl van blob store-a (storage_path relativan na STORAGE_ROOT)
+    sha256 = Column(
+        String(64),
+        ForeignKey("storage_blobs.sha256"),
+        nullable=True,
+        index=True,
+    )
+
     status = Column(
         String(32),
         nullable=False,
@@ -307,6 +357,8 @@ class InputInvoice(Base):
             "invoice_number",
             name="uq_input_invoice_per_supplier_tenant",
         ),
+        Index("ix_input_invoices_tenant_issue_date", "tenant_code", "issue_date"),
+        # + ix_input_invoices_supplier_name_trgm (migracija 20261018_search_trgm)
     )
 
     attachments = relationship(
@@ -342,6 +394,14 @@ class TenantAsset(Base):
 
     storage_path = Column(Text, nullable=False)
 
+    # NULL = stari fajl van blob store-a (storage_path relativan na TENANT_ASSETS_ROOT)
+    sha256 = Column(
+        String(64),
+        ForeignKey("storage_blobs.sha256"),
+        nullable=True,
+        index=True,
+    )
+
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
     __table_args__ = (
@@ -566,7 +626,60 @@ class TaxMonthlyFinalizeHistory(Base):
 # ======================================================
 
 
-def _ensure_month_not_finalized(obj: object, date_value: date | None) -> None:
+# Finalizovani (year, month) po tenantu keširaju se u `session.info`:
+#   - before_flush jednim upitom učita skup za sve tenante iz session.dirty/deleted,
+#   - before_update/before_delete hookovi provjeravaju u memoriji,
+#   - promjena TaxMonthlyResult u istoj sesiji (finalize) briše keš tog tenanta.
+# Keš živi samo do sljedećeg flush-a – svaki flush ponovo čita stanje iz baze.
+
+_FINALIZED_PERIODS_KEY = "finalized_periods"
+
+
+def load_finalized_periods(connection, tenant_codes) -> dict[str, set[tuple[int, int]]]:
+    """
+    Jednim upitom vraća {tenant_code: {(year, month), ...}} finalizovanih mjeseci.
+
+    Koriste ga i bulk import putanje (Core INSERT ne okida ORM hookove).
+    """
+    periods: dict[str, set[tuple[int, int]]] = {code: set() for code in tenant_codes}
+    if not periods:
+        return periods
+
+    rows = connection.execute(
+        select(TaxMonthlyResult.tenant_code, TaxMonthlyResult.year, TaxMonthlyResult.month).where(
+            TaxMonthlyResult.tenant_code.in_(list(periods)),
+            TaxMonthlyResult.is_final.is_(True),
+        )
+    )
+    for tenant_code, year, month in rows:
+        periods[tenant_code].add((int(year), int(month)))
+    return periods
+
+
+def invalidate_finalized_periods(sess: Session, tenant_code: str | None = None) -> None:
+    """
+    Briše keš finalizovanih perioda u sesiji (za jednog ili sve tenante).
+    """
+    cache = sess.info.get(_FINALIZED_PERIODS_KEY)
+    if not cache:
+        return
+    if tenant_code is None:
+        cache.clear()
+    else:
+        cache.pop(tenant_code, None)
+
+
+def _finalized_periods_for(sess: Session, connection, tenant_code: str) -> set[tuple[int, int]]:
+    cache = sess.info.setdefault(_FINALIZED_PERIODS_KEY, {})
+    periods = cache.get(tenant_code)
+    if periods is None:
+        # npr. objekat koji je postao dirty tek tokom flush-a, ili keš invalidiran finalizacijom
+        periods = load_finalized_periods(connection, [tenant_code])[tenant_code]
+        cache[tenant_code] = periods
+    return periods
+
+
+def _ensure_month_not_finalized(obj: object, date_value: date | None, connection=None) -> None:
     if date_value is None:
         return
 
@@ -581,19 +694,10 @@ def _ensure_month_not_finalized(obj: object, date_value: date | None) -> None:
     year = date_value.year
     month = date_value.month
 
-    exists = (
-        sess.query(TaxMonthlyResult)
-        .filter(
-            TaxMonthlyResult.tenant_code == tenant_code,
-            TaxMonthlyResult.year == year,
-            TaxMonthlyResult.month == month,
-            TaxMonthlyResult.is_final.is_(True),
-        )
-        .first()
-        is not None
-    )
+    if connection is None:
+        connection = sess.connection()
 
-    if exists:
+    if (year, month) in _finalized_periods_for(sess, connection, tenant_code):
         raise FinalizedPeriodModificationError(
             tenant_code=tenant_code,
             year=year,
@@ -601,40 +705,466 @@ def _ensure_month_not_finalized(obj: object, date_value: date | None) -> None:
         )
 
 
+_PERIOD_LOCKED_MODELS = (Invoice, CashEntry, InputInvoice)
+
+
+@event.listens_for(Session, "before_flush")
+def _prefetch_finalized_periods(session: Session, flush_context, instances) -> None:
+    tenant_codes = {
+        obj.tenant_code
+        for obj in (*session.dirty, *session.deleted)
+        if isinstance(obj, _PERIOD_LOCKED_MODELS) and getattr(obj, "tenant_code", None)
+    }
+    session.info[_FINALIZED_PERIODS_KEY] = (
+        load_finalized_periods(session.connection(), tenant_codes) if tenant_codes else {}
+    )
+
+
+@event.listens_for(TaxMonthlyResult, "after_insert")
+@event.listens_for(TaxMonthlyResult, "after_update")
+@event.listens_for(TaxMonthlyResult, "after_delete")
+def _tax_monthly_result_changed(mapper, connection, target: TaxMonthlyResult) -> None:
+    sess = object_session(target)
+    if sess is not None:
+        invalidate_finalized_periods(sess, target.tenant_code)
+
+
 @event.listens_for(Invoice, "before_update")
 def _invoice_before_update(mapper, connection, target: Invoice) -> None:
     if target.issue_date:
-        _ensure_month_not_finalized(target, target.issue_date)
+        _ensure_month_not_finalized(target, target.issue_date, connection)
 
 
 @event.listens_for(Invoice, "before_delete")
 def _invoice_before_delete(mapper, connection, target: Invoice) -> None:
     if target.issue_date:
-        _ensure_month_not_finalized(target, target.issue_date)
+        _ensure_month_not_finalized(target, target.issue_date, connection)
 
 
 @event.listens_for(CashEntry, "before_update")
 def _cash_entry_before_update(mapper, connection, target: CashEntry) -> None:
     if target.entry_date:
-        _ensure_month_not_finalized(target, target.entry_date)
+        _ensure_month_not_finalized(target, target.entry_date, connection)
 
 
 @event.listens_for(CashEntry, "before_delete")
 def _cash_entry_before_delete(mapper, connection, target: CashEntry) -> None:
     if target.entry_date:
-        _ensure_month_not_finalized(target, target.entry_date)
+        _ensure_month_not_finalized(target, target.entry_date, connection)
 
 
 @event.listens_for(InputInvoice, "before_update")
 def _input_invoice_before_update(mapper, connection, target: InputInvoice) -> None:
     if target.issue_date:
-        _ensure_month_not_finalized(target, target.issue_date)
+        _ensure_month_not_finalized(target, target.issue_date, connection)
 
 
 @event.listens_for(InputInvoice, "before_delete")
 def _input_invoice_before_delete(mapper, connection, target: InputInvoice) -> None:
     if target.issue_date:
-        _ensure_month_not_finalized(target, target.issue_date)
+        _ensure_month_not_finalized(target, target.issue_date, connection)
+
+
+# ======================================================
+#  MJESEČNI ROLLUP PO TENANTU (materijalizovani SUM-ovi)
+# ======================================================
+class TenantMonthlyRollup(Base):
+    """
+    Materijalizovani mjesečni zbirovi iz cash_entries, invoices i input_invoices.
+
+    Održava se inkrementalno ORM hookovima (after_insert/update/delete) ispod,
+    u istoj transakciji kao i izmjena izvornog reda. Dashboard, cashflow i KPR
+    zbirovi čitaju najviše 12 redova umjesto skeniranja knjiga; TAX obračun
+    (preview/finalize) čita knjige direktno.
+
+    Upisi koji zaobilaze ORM (Core INSERT/DELETE, raw SQL) moraju pozvati
+    `apply_monthly_rollup_delta` ili rebuild (app/services/ledger_rollups.py).
+
+    Namjerno bez FK na tenants: cash_entries nema FK na tenants, pa rollup
+    mora moći postojati za svaki tenant_code koji se pojavi u knjigama.
+    """
+
+    __tablename__ = "tenant_monthly_rollups"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+
+    tenant_code = Column(String(64), nullable=False)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+
+    invoice_income = Column(Numeric(14, 2), nullable=False, server_default="0")
+    invoice_count = Column(Integer, nullable=False, server_default="0")
+
+    cash_income = Column(Numeric(14, 2), nullable=False, server_default="0")
+    cash_income_count = Column(Integer, nullable=False, server_default="0")
+    cash_expense = Column(Numeric(14, 2), nullable=False, server_default="0")
+    cash_expense_count = Column(Integer, nullable=False, server_default="0")
+
+    input_expense = Column(Numeric(14, 2), nullable=False, server_default="0")
+    input_invoice_count = Column(Integer, nullable=False, server_default="0")
+
+    # Isto pravilo kao _aggregate_monthly_income_and_expense (tax.py):
+    #   prihod = fakture + cash income, rashod = cash expense + ulazne fakture
+    total_income = Column(Numeric(14, 2), Computed("invoice_income + cash_income", persisted=True))
+    total_expense = Column(Numeric(14, 2), Computed("cash_expense + input_expense", persisted=True))
+
+    updated_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "tenant_code",
+            "year",
+            "month",
+            name="uq_tenant_monthly_rollups_tenant_year_month",
+        ),
+        CheckConstraint("month >= 1 AND month <= 12", name="ck_tenant_monthly_rollups_month"),
+    )
+
+
+ROLLUP_AMOUNT_COLUMNS = (
+    "invoice_income",
+    "invoice_count",
+    "cash_income",
+    "cash_income_count",
+    "cash_expense",
+    "cash_expense_count",
+    "input_expense",
+    "input_invoice_count",
+)
+
+
+def apply_monthly_rollup_delta(
+    connection,
+    *,
+    tenant_code: str,
+    year: int,
+    month: int,
+    deltas: dict[str, object],
+) -> None:
+    """
+    Atomski dodaje delte u (tenant, year, month) red – INSERT ... ON CONFLICT DO UPDATE.
+
+    Koristi se iz ORM hookova i iz bulk putanja koje pišu Core INSERT-om.
+    """
+    deltas = {k: v for k, v in deltas.items() if v}
+    if not deltas:
+        return
+
+    table = TenantMonthlyRollup.__table__
+    stmt = pg_insert(table).values(tenant_code=tenant_code, year=year, month=month, **deltas)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_tenant_monthly_rollups_tenant_year_month",
+        set_={
+            **{k: table.c[k] + stmt.excluded[k] for k in deltas},
+            "updated_at": func.now(),
+        },
+    )
+    connection.execute(stmt)
+
+
+def _rollup_key_and_deltas(source: str, values: dict, sign: int):
+    """
+    Mapira jedan red knjige u ((tenant, year, month), {kolona: delta}).
+
+    `values` su vrijednosti relevantnih kolona (trenutne ili stare).
+    Vraća None ako red ne doprinosi rollupu (npr. nema datuma).
+    """
+    tenant_code = values.get("tenant_code")
+    if not tenant_code:
+        return None
+
+    if source == "cash":
+        d = values.get("entry_date")
+        amount = Decimal(str(values.get("amount") or 0))
+        if d is None:
+            return None
+        if values.get("kind") == "income":
+            deltas = {"cash_income": sign * amount, "cash_income_count": sign}
+        elif values.get("kind") == "expense":
+            deltas = {"cash_expense": sign * amount, "cash_expense_count": sign}
+        else:
+            return None
+    elif source == "invoice":
+        d = values.get("issue_date")
+        if d is None:
+            return None
+        amount = Decimal(str(values.get("total_amount") or 0))
+        deltas = {"invoice_income": sign * amount, "invoice_count": sign}
+    else:  # input_invoice
+        d = values.get("issue_date")
+        if d is None:
+            return None
+        amount = Decimal(str(values.get("total_amount") or 0))
+        deltas = {"input_expense": sign * amount, "input_invoice_count": sign}
+
+    return (tenant_code, d.year, d.month), deltas
+
+
+_ROLLUP_SOURCE_FIELDS = {
+    "cash": ("tenant_code", "entry_date", "kind", "amount"),
+    "invoice": ("tenant_code", "issue_date", "total_amount"),
+    "input_invoice": ("tenant_code", "issue_date", "total_amount"),
+}
+
+
+def _rollup_current_values(source: str, target: object) -> dict:
+    return {f: getattr(target, f, None) for f in _ROLLUP_SOURCE_FIELDS[source]}
+
+
+def _rollup_previous_values(source: str, target: object) -> dict:
+    """
+    Vrijednosti prije izmjene (iz attribute history) – za after_update.
+    """
+    state = sa_inspect(target)
+    values = {}
+    for f in _ROLLUP_SOURCE_FIELDS[source]:
+        hist = state.attrs[f].history
+        if hist.deleted:
+            values[f] = hist.deleted[0]
+        else:
+            values[f] = getattr(target, f, None)
+    return values
+
+
+def merge_rollup_deltas(combined: dict[tuple, dict[str, object]], source: str, values: dict, sign: int = 1) -> None:
+    """
+    Dodaje doprinos jednog reda knjige u `combined` ({(tenant, year, month): {kolona: delta}}).
+
+    Bulk putanje skupe delte za sve redove pa ih upišu jednom po mjesecu
+    (`apply_merged_rollup_deltas`).
+    """
+    res = _rollup_key_and_deltas(source, values, sign)
+    if res is None:
+        return
+    key, deltas = res
+    bucket = combined.setdefault(key, {})
+    for k, v in deltas.items():
+        bucket[k] = bucket.get(k, 0) + v
+
+
+def lock_tenant_rollups(connection, tenant_codes, *, exclusive: bool = False) -> None:
+    """
+    Transakcioni advisory lock po tenantu: pg_advisory_xact_lock(hashtext(tenant_code)).
+
+    Upisi delti uzimaju shared lock, rebuild jednog tenanta exclusive – rebuild
+    čeka samo transakcije koje mijenjaju rollupe istog tenanta, a ostali tenanti
+    rade neometano (umjesto LOCK TABLE nad cijelom tabelom).
+
+    Shared lock se uzima jednom po (transakcija, tenant); uzeti lockovi se
+    pamte u `connection.info`.
+    """
+    codes = sorted({code for code in tenant_codes if code})
+    if not codes:
+        return
+
+    if exclusive:
+        connection.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(t)) FROM unnest(CAST(:codes AS text[])) AS t"),
+            {"codes": codes},
+        )
+        return
+
+    transaction = connection.get_transaction()
+    held = connection.info.get("_rollup_tenant_locks")
+    if held is None or held[0] is not transaction:
+        held = (transaction, set())
+        connection.info["_rollup_tenant_locks"] = held
+    missing = [code for code in codes if code not in held[1]]
+    if not missing:
+        return
+    connection.execute(
+        text("SELECT pg_advisory_xact_lock_shared(hashtext(t)) FROM unnest(CAST(:codes AS text[])) AS t"),
+        {"codes": missing},
+    )
+    held[1].update(missing)
+
+
+def apply_merged_rollup_deltas(connection, combined: dict[tuple, dict[str, object]]) -> None:
+    lock_tenant_rollups(connection, {tenant_code for tenant_code, _, _ in combined})
+    for (tenant_code, year, month), deltas in combined.items():
+        apply_monthly_rollup_delta(
+            connection,
+            tenant_code=tenant_code,
+            year=year,
+            month=month,
+            deltas=deltas,
+        )
+
+
+def _apply_rollup_change(connection, source: str, old: dict | None, new: dict | None) -> None:
+    combined: dict[tuple, dict[str, object]] = {}
+    for values, sign in ((old, -1), (new, 1)):
+        if values is not None:
+            merge_rollup_deltas(combined, source, values, sign)
+    apply_merged_rollup_deltas(connection, combined)
+
+
+def _register_rollup_hooks(model, source: str) -> None:
+    # active_history: i kada atribut nije bio učitan (npr. expire nakon commit-a),
+    # stara vrijednost se učita prije izmjene, pa after_update zna šta oduzeti
+    for field_name in _ROLLUP_SOURCE_FIELDS[source]:
+        event.listen(getattr(model, field_name), "set", _load_old_value_on_set, active_history=True)
+
+    @event.listens_for(model, "after_insert")
+    def _after_insert(mapper, connection, target) -> None:
+        _apply_rollup_change(connection, source, None, _rollup_current_values(source, target))
+
+    @event.listens_for(model, "after_update")
+    def _after_update(mapper, connection, target) -> None:
+        old = _rollup_previous_values(source, target)
+        new = _rollup_current_values(source, target)
+        if old != new:
+            _apply_rollup_change(connection, source, old, new)
+
+    @event.listens_for(model, "after_delete")
+    def _after_delete(mapper, connection, target) -> None:
+        _apply_rollup_change(connection, source, _rollup_previous_values(source, target), None)
+
+
+def _load_old_value_on_set(target, value, oldvalue, initiator) -> None:
+    """No-op; registracija sa active_history=True je ono što je bitno."""
+
+
+_register_rollup_hooks(Invoice, "invoice")
+_register_rollup_hooks(CashEntry, "cash")
+_register_rollup_hooks(InputInvoice, "input_invoice")
+
+_ROLLUP_SOURCES = {Invoice: "invoice", CashEntry: "cash", InputInvoice: "input_invoice"}
+
+
+def _dml_set_keys(orm_execute_state) -> Optional[set[str]]:
+    """
+    Imena kolona koje bulk UPDATE mijenja; None ako se ne mogu odrediti.
+    """
+    statement = orm_execute_state.statement
+    values = getattr(statement, "_values", None) or dict(getattr(statement, "_ordered_values", None) or ())
+    params = orm_execute_state.parameters
+    if isinstance(params, list):
+        # bulk UPDATE po primarnom ključu: session.execute(update(Model), [{...}, ...])
+        return {key for row in params for key in row}
+    if not values:
+        return None
+    keys: set[str] = set()
+    for key in values:
+        name = key if isinstance(key, str) else getattr(key, "key", None)
+        if name is None:
+            return None
+        keys.add(name)
+    return keys
+
+
+def _bulk_dml_rollup_deltas(orm_execute_state, model, source: str):
+    """
+    Izvršava ORM bulk UPDATE/DELETE nad knjigom i vraća (result, tenant_codes)
+    uz primijenjene delte rollupa za pogođene redove – bez rebuild-a.
+
+    Stare vrijednosti se čitaju SELECT ... FOR UPDATE, a sam UPDATE/DELETE se
+    ograničava na tako zaključane ID-eve – delte tačno odgovaraju redovima koje
+    je izmjena pogodila (i kad paralelno stigne novi red koji odgovara filteru).
+    Nove vrijednosti za UPDATE se čitaju iz istih, još zaključanih redova;
+    rezultat koji dobija pozivalac (rowcount, njegov RETURNING) ostaje isti.
+    """
+    session = orm_execute_state.session
+    statement = orm_execute_state.statement
+    fields = _ROLLUP_SOURCE_FIELDS[source]
+    columns = [getattr(model, f) for f in fields]
+
+    before_stmt = select(model.id, *columns).with_for_update()
+    params = orm_execute_state.parameters
+    if isinstance(params, list):
+        before_stmt = before_stmt.where(model.id.in_([row["id"] for row in params]))
+    elif statement.whereclause is not None:
+        before_stmt = before_stmt.where(statement.whereclause)
+    before = session.execute(before_stmt).all()
+
+    combined: dict[tuple, dict[str, object]] = {}
+    tenant_codes = {row.tenant_code for row in before}
+    for row in before:
+        merge_rollup_deltas(combined, source, dict(zip(fields, row[1:])), -1)
+
+    if isinstance(params, list):
+        result = orm_execute_state.invoke_statement()
+    else:
+        result = orm_execute_state.invoke_statement(
+            statement=statement.where(model.id.in_([row.id for row in before]))
+        )
+
+    if orm_execute_state.is_update and before:
+        after = session.execute(
+            select(*columns).where(model.id.in_([row.id for row in before]))
+        ).all()
+        for row in after:
+            values = dict(zip(fields, row))
+            tenant_codes.add(values["tenant_code"])
+            merge_rollup_deltas(combined, source, values, 1)
+
+    apply_merged_rollup_deltas(session.connection(), combined)
+    return result, sorted(tenant_codes)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _rollup_bulk_dml(orm_execute_state) -> object:
+    """
+    ORM bulk UPDATE/DELETE (npr. `db.query(CashEntry).filter(...).delete()`)
+    ne okida mapper hookove, pa za pogođene redove knjiga primjenjujemo
+    delte rollupa (stare vrijednosti → nove) i povećavamo verziju podataka
+    (sve tabele sa tenant_code) u istoj transakciji.
+
+    UPDATE koji ne dira kolone rollupa (npr. samo is_paid) ne čita stare
+    vrijednosti i ne mijenja rollupe.
+    """
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None:
+        return None
+
+    model = mapper.class_
+    if model is AppConstantsSet:
+        result = orm_execute_state.invoke_statement()
+        bump_tenant_data_versions(orm_execute_state.session.connection(), [GLOBAL_DATA_VERSION_KEY])
+        return result
+    if model in _DATA_VERSION_IGNORED_MODELS or not hasattr(model, "tenant_code"):
+        return None
+
+    session = orm_execute_state.session
+    source = _ROLLUP_SOURCES.get(model)
+
+    if source is not None and (
+        orm_execute_state.is_delete
+        or (set_keys := _dml_set_keys(orm_execute_state)) is None
+        or set_keys & set(_ROLLUP_SOURCE_FIELDS[source])
+    ):
+        result, tenant_codes = _bulk_dml_rollup_deltas(orm_execute_state, model, source)
+    else:
+        tenants_stmt = select(model.tenant_code).distinct()
+        params = orm_execute_state.parameters
+        if isinstance(params, list):
+            tenants_stmt = tenants_stmt.where(model.id.in_([row["id"] for row in params]))
+        elif orm_execute_state.statement.whereclause is not None:
+            tenants_stmt = tenants_stmt.where(orm_execute_state.statement.whereclause)
+        tenant_codes = session.execute(tenants_stmt).scalars().all()
+        result = orm_execute_state.invoke_statement()
+
+    # verzija podataka (export artefakti, ETag, keš odgovora) za sve tenant tabele
+    bump_tenant_data_versions(session.connection(), tenant_codes)
+
+    return result
+
+
+@event.listens_for(Tenant, "after_delete")
+def _tenant_rollups_after_delete(mapper, connection, target) -> None:
+    """
+    input_invoices se brišu DB kaskadom (ON DELETE CASCADE, bez ORM hookova),
+    pa se rollupi obrisanog tenanta preračunavaju iz knjiga koje su ostale
+    (cash_entries nema FK na tenants).
+    """
+    from app.services.ledger_rollups import rebuild_monthly_rollups  # izbjegavamo circular import
+
+    rebuild_monthly_rollups(connection, tenant_code=target.code)
 
 
 # ======================================================
@@ -718,6 +1248,11 @@ class TenantProfileSettings(Base):
         nullable=True,
     )
 
+    # Brojevi faktura koje dodjeljuje server (app/services/invoice_numbers.py);
+    # NULL = default ("{year}-{seq:04d}", reset svake godine)
+    invoice_number_format = Column(String(64), nullable=True)
+    invoice_number_reset = Column(String(16), nullable=True)  # yearly / never
+
     created_at = Column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
@@ -775,3 +1310,284 @@ class TenantSubscriptionSettings(Base):
     created_at = Column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
+
+
+# ======================================================
+#  VERZIJA PODATAKA PO TENANTU
+# ======================================================
+class TenantDataVersion(Base):
+    """
+    Brojač koji raste sa svakom izmjenom podataka tenanta (jedan red po tenantu).
+
+    Povećava ga `after_flush` hook ispod za svaki ORM objekat sa `tenant_code`
+    koji je dodat, izmijenjen ili obrisan, a bulk putanje (Core INSERT/UPDATE)
+    zovu `bump_tenant_data_versions` same. Ista verzija ⇒ isti podaci, pa se
+    rezultati (npr. export artefakti) mogu ponovo koristiti.
+
+    Izmjene globalnih podataka (AppConstantsSet) povećavaju red
+    GLOBAL_DATA_VERSION_KEY, koji `get_tenant_data_version` uračunava za
+    svakog tenanta.
+
+    Namjerno bez FK na tenants (isto kao tenant_monthly_rollups).
+    """
+
+    __tablename__ = "tenant_data_versions"
+
+    tenant_code = Column(String(64), primary_key=True)
+    version = Column(BigInteger, nullable=False, server_default="0")
+
+    updated_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+# red u tenant_data_versions za izmjene koje važe za sve tenante
+GLOBAL_DATA_VERSION_KEY = "*"
+
+
+def bump_tenant_data_versions(connection, tenant_codes) -> None:
+    """
+    Povećava verziju podataka za date tenante (INSERT ... ON CONFLICT DO UPDATE).
+
+    Tenanti se zaključavaju u sortiranom redoslijedu da paralelne transakcije
+    ne bi ušle u deadlock.
+    """
+    codes = sorted({code for code in tenant_codes if code})
+    if not codes:
+        return
+
+    table = TenantDataVersion.__table__
+    stmt = pg_insert(table).values([{"tenant_code": code, "version": 1} for code in codes])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.tenant_code],
+        set_={"version": table.c.version + 1, "updated_at": func.now()},
+    )
+    connection.execute(stmt)
+
+
+def tenant_data_version_stmt(tenant_code: str):
+    """
+    Verzija podataka tenanta uključujući globalne izmjene (jedan PK lookup).
+
+    Obje komponente samo rastu, pa je zbir dovoljan: ista vrijednost ⇒
+    nije bilo izmjena ni kod tenanta ni globalno.
+    """
+    return select(func.coalesce(func.sum(TenantDataVersion.version), 0)).where(
+        TenantDataVersion.tenant_code.in_((tenant_code, GLOBAL_DATA_VERSION_KEY))
+    )
+
+
+def get_tenant_data_version(connection, tenant_code: str) -> int:
+    return int(connection.execute(tenant_data_version_stmt(tenant_code)).scalar_one())
+
+
+# ======================================================
+#  EXPORT JOBS (red čekanja za teške exporte)
+# ======================================================
+class ExportJob(Base):
+    """
+    Jedan zahtjev za export koji se renderuje u pozadini (app/services/export_jobs.py).
+
+    Tabela je ujedno i red čekanja: worker uzima najstariji `queued` posao sa
+    `SELECT ... FOR UPDATE SKIP LOCKED`. Gotov artefakt (fajl na disku) se
+    ponovo koristi za isti (tenant, kind, params_hash) dok je `data_version`
+    jednak trenutnoj verziji podataka tenanta.
+    """
+
+    __tablename__ = "export_jobs"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+
+    tenant_code = Column(
+        String(64),
+        ForeignKey("tenants.code", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    kind = Column(String(32), nullable=False)  # inspection / kpr_pdf / kpr_csv / invoices_csv / tax_yearly_csv
+    params = Column(JSONB, nullable=False)
+    params_hash = Column(String(64), nullable=False)
+    data_version = Column(BigInteger, nullable=False)
+
+    status = Column(String(16), nullable=False, default="queued", server_default="queued")
+    progress = Column(Integer, nullable=False, default=0, server_default="0")
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(Text, nullable=True)
+
+    # putanja relativna na EXPORT_ARTIFACTS_DIR
+    artifact_path = Column(Text, nullable=True)
+    filename = Column(String(256), nullable=True)
+    media_type = Column(String(128), nullable=True)
+    size_bytes = Column(BigInteger, nullable=True)
+
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('queued', 'running', 'done', 'failed')",
+            name="ck_export_jobs_status",
+        ),
+        Index("ix_export_jobs_queued", "id", postgresql_where=(status == "queued")),
+        Index("ix_export_jobs_reuse", "tenant_code", "kind", "params_hash", "data_version"),
+    )
+
+
+# ======================================================
+#  PONAVLJAJUĆE FAKTURE (šabloni + brojač brojeva faktura)
+# ======================================================
+INVOICE_TEMPLATE_CADENCES = ("monthly", "quarterly", "yearly")
+
+
+class InvoiceTemplate(Base):
+    """
+    Šablon ponavljajuće fakture (kupac, stavke, ritam izdavanja).
+
+    Scheduler (app/services/recurring_invoices.py) uzima dospjele šablone
+    (`is_active` i `next_run <= danas`) sa `SELECT ... FOR UPDATE SKIP LOCKED`,
+    izdaje fakturu sa datumom `next_run` i pomjera `next_run` na sljedeći
+    termin – u istoj transakciji, pa paralelni worker-i ne izdaju istu
+    fakturu dvaput.
+    """
+
+    __tablename__ = "invoice_templates"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+
+    tenant_code = Column(
+        String(64),
+        ForeignKey("tenants.code", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    name = Column(String(128), nullable=False)
+
+    buyer_name = Column(String(128), nullable=False)
+    buyer_address = Column(String(256), nullable=True)
+    note = Column(Text, nullable=True)
+
+    # [{description, quantity, unit_price, vat_rate}] – isto kao stavke POST /invoices
+    items = Column(JSONB, nullable=False)
+
+    cadence = Column(String(16), nullable=False, default="monthly", server_default="monthly")
+    # dan u mjesecu za izdavanje (31 → zadnji dan kraćih mjeseci)
+    anchor_day = Column(Integer, nullable=False)
+    # rok plaćanja u danima od datuma izdavanja (NULL = bez due_date)
+    due_days = Column(Integer, nullable=True)
+
+    next_run = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=True)
+    is_active = Column(Boolean, nullable=False, default=True, server_default="true")
+
+    last_run_at = Column(DateTime(timezone=True), nullable=True)
+    last_invoice_id = Column(
+        BigInteger,
+        ForeignKey("invoices.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+    __table_args__ = (
+        CheckConstraint(
+            "cadence IN ('monthly', 'quarterly', 'yearly')",
+            name="ck_invoice_templates_cadence",
+        ),
+        CheckConstraint("anchor_day BETWEEN 1 AND 31", name="ck_invoice_templates_anchor_day"),
+        Index("ix_invoice_templates_due", "next_run", "id", postgresql_where=(is_active.is_(True))),
+        Index("ix_invoice_templates_tenant", "tenant_code", "id"),
+    )
+
+
+class TenantInvoiceSequence(Base):
+    """
+    Brojač brojeva faktura po tenantu i periodu (app/services/invoice_numbers.py).
+
+    `year` je godina izdavanja (reset brojača svake godine) ili 0 kada tenant
+    koristi jedan brojač bez reseta (`invoice_number_reset = 'never'`).
+
+    Brojevi se dodjeljuju `INSERT ... ON CONFLICT DO UPDATE ... RETURNING`
+    nad jednim redom, pa paralelni izdavači čekaju na row lock umjesto da
+    se sudaraju na `uq_invoice_number_per_tenant`.
+    """
+
+    __tablename__ = "tenant_invoice_sequences"
+
+    tenant_code = Column(
+        String(64),
+        ForeignKey("tenants.code", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    year = Column(Integer, primary_key=True)
+    last_value = Column(BigInteger, nullable=False, server_default="0")
+
+    updated_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+# Bookkeeping tabele sa tenant_code koje ne mijenjaju "podatke" tenanta
+_DATA_VERSION_IGNORED_MODELS = (
+    TenantDataVersion,
+    TenantMonthlyRollup,
+    ExportJob,
+    InvoiceTemplate,
+    TenantInvoiceSequence,
+)
+
+
+def _data_version_key(obj) -> Optional[str]:
+    if isinstance(obj, AppConstantsSet):
+        return GLOBAL_DATA_VERSION_KEY
+    if isinstance(obj, InvoiceItem):
+        # stavka nema tenant_code; bez lazy load-a usred flush-a
+        invoice = sa_inspect(obj).attrs.invoice.loaded_value
+        return getattr(invoice, "tenant_code", None)
+    return getattr(obj, "tenant_code", None)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_data_versions_after_flush(session: Session, flush_context) -> None:
+    tenant_codes = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _DATA_VERSION_IGNORED_MODELS):
+            continue
+        if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+            continue
+        tenant_code = _data_version_key(obj)
+        if tenant_code:
+            tenant_codes.add(tenant_code)
+
+    if tenant_codes:
+        bump_tenant_data_versions(session.connection(), tenant_codes)
+
+
+# ======================================================
+#  DIJELJENI KEŠ ODGOVORA (RESPONSE_CACHE_BACKEND=postgres)
+# ======================================================
+class ResponseCacheEntry(Base):
+    """
+    Unos dijeljenog keša odgovora (app/services/response_cache.py).
+
+    UNLOGGED: bez WAL-a, brži upisi; sadržaj se gubi nakon pada servera,
+    što je za keš prihvatljivo.
+    """
+
+    __tablename__ = "response_cache_entries"
+
+    cache_key = Column(String(64), primary_key=True)
+    data_version = Column(BigInteger, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_response_cache_entries_expires_at", "expires_at"),
+        {"prefixes": ["UNLOGGED"]},
+    )
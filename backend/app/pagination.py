@@ -0,0 +1,103 @@
+# /home/miso/dev/sp-app/sp-app/backend/app/pagination.py
+from __future__ import annotations
+
+import base64
+import binascii
+from datetime import date
+from typing import Any, Optional, Sequence
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.response_cache import response_cache
+
+
+# ======================================================
+#  KEYSET (CURSOR) PAGINACIJA ZA UI LISTE
+# ======================================================
+#
+# UI liste su sortirane po (datum DESC, id DESC). Umjesto OFFSET-a (koji
+# mora pročitati i odbaciti sve prethodne redove) sljedeća stranica počinje
+# iza zadnjeg reda prethodne:
+#
+#   datum <= :d AND (datum < :d OR id < :id)  ORDER BY datum DESC, id DESC
+#
+# `datum <= :d` je granica za range scan po (tenant_code, datum) indeksu,
+# pa stranica 500 košta isto kao stranica 1. Kursor je neproziran token
+# (base64 od "YYYY-MM-DD|id") koji klijent dobija kao `next_cursor`.
+#
+# Ukupan broj (`total`) je opcionalan (`include_total=false` ga preskače), a
+# kada se traži, kešira se u response_cache po verziji podataka tenanta –
+# sve stranice iste liste dijele jedan count() dok se podaci ne promijene.
+
+
+_MAX_BIGINT_EXCLUSIVE = 2**63
+
+
+def encode_cursor(sort_date: date, row_id: int) -> str:
+    raw = f"{sort_date.isoformat()}|{row_id}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[date, int]:
+    """
+    Vraća (datum, id) iz kursora; neispravan kursor → 400.
+
+    id mora stati u BIGINT (0 < id < 2**63) – inače bi asyncpg pri bind-u
+    pao sa greškom umjesto da klijent dobije 400.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        sort_date, row_id = raw.split("|")
+        parsed_date, parsed_id = date.fromisoformat(sort_date), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not 0 < parsed_id < _MAX_BIGINT_EXCLUSIVE:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return parsed_date, parsed_id
+
+
+def keyset_filters(date_column: Any, id_column: Any, cursor: Optional[str]) -> list[Any]:
+    """
+    WHERE uslovi za stranicu iza kursora (prazna lista bez kursora).
+    """
+    if not cursor:
+        return []
+    sort_date, row_id = decode_cursor(cursor)
+    return [date_column <= sort_date, or_(date_column < sort_date, id_column < row_id)]
+
+
+def split_page(rows: Sequence[Any], limit: int, date_attr: str) -> tuple[list[Any], Optional[str]]:
+    """
+    Upit čita `limit + 1` redova; višak znači da postoji sljedeća stranica
+    i njen kursor se pravi od zadnjeg vraćenog reda.
+    """
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor(getattr(last, date_attr), last.id)
+
+
+class _ListTotal(BaseModel):
+    total: int
+
+
+async def cached_list_total(
+    db: AsyncSession,
+    tenant_code: str,
+    endpoint: str,
+    params: dict[str, Any],
+    count_stmt: Any,
+) -> int:
+    """
+    count() liste keširan po (tenant, endpoint, filteri) i verziji podataka tenanta.
+    """
+
+    async def compute() -> _ListTotal:
+        return _ListTotal(total=int(await db.scalar(count_stmt)))
+
+    result = await response_cache.aget_or_compute(db, tenant_code, endpoint, params, _ListTotal, compute)
+    return result.total
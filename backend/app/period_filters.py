@@ -0,0 +1,96 @@
+# /home/miso/dev/sp-app/sp-app/backend/app/period_filters.py
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Any, Optional
+
+from sqlalchemy import func
+
+
+# ======================================================
+#  PERIOD FILTERI (sargable, half-open [start, end))
+# ======================================================
+#
+# Umjesto `func.extract("year"/"month", kolona) == N` (što Postgres ne može
+# pokriti indeksom, pa se skenira cijela istorija tenanta) sve filtere po
+# periodu pretvaramo u opseg `kolona >= start AND kolona < end`.
+# Tako (tenant_code, datum) indeksi rade range scan.
+
+
+def month_bounds(year: int, month: int) -> tuple[date, date]:
+    """
+    Vraća [prvi dan mjeseca, prvi dan sljedećeg mjeseca).
+    """
+    if month == 12:
+        return date(year, 12, 1), date(year + 1, 1, 1)
+    return date(year, month, 1), date(year, month + 1, 1)
+
+
+def year_bounds(year: int) -> tuple[date, date]:
+    """
+    Vraća [1.1.year, 1.1.year+1).
+    """
+    return date(year, 1, 1), date(year + 1, 1, 1)
+
+
+def period_bounds(
+    *,
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> tuple[Optional[date], Optional[date]]:
+    """
+    Spaja year/month i date_from/date_to (uključivo) u jedan half-open opseg.
+
+    - year + month → taj mjesec
+    - samo year    → cijela godina
+    - date_to je uključiv u API-ju, pa gornja granica postaje date_to + 1 dan
+    - ako je zadato više uslova, uzima se presjek (najuži opseg)
+
+    `month` bez `year` se ovdje ignoriše (nije opseg) – vidi `period_filters`.
+    Vraća (start, end); None znači da ta strana nije ograničena.
+    """
+    start: Optional[date] = None
+    end: Optional[date] = None
+
+    if year is not None:
+        start, end = month_bounds(year, month) if month is not None else year_bounds(year)
+
+    if date_from is not None:
+        start = date_from if start is None else max(start, date_from)
+    if date_to is not None:
+        upper = date_to + timedelta(days=1)
+        end = upper if end is None else min(end, upper)
+
+    return start, end
+
+
+def period_filters(
+    column: Any,
+    *,
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> list[Any]:
+    """
+    Vraća listu WHERE uslova nad datumskom kolonom za dati period.
+
+    Primjer:
+        stmt = stmt.where(*period_filters(Invoice.issue_date, year=2025, month=3))
+        → issue_date >= '2025-03-01' AND issue_date < '2025-04-01'
+
+    Jedini slučaj koji ostaje na `extract` je `month` bez `year`
+    ("svi januari") – to nije jedan opseg, pa ga zadržavamo radi kompatibilnosti.
+    """
+    start, end = period_bounds(year=year, month=month, date_from=date_from, date_to=date_to)
+
+    conditions: list[Any] = []
+    if start is not None:
+        conditions.append(column >= start)
+    if end is not None:
+        conditions.append(column < end)
+    if month is not None and year is None:
+        conditions.append(func.extract("month", column) == month)
+    return conditions
@@ -4,11 +4,11 @@ from __future__ import annotations
 from datetime import date, datetime, timedelta
 from typing import Any, Optional
 
-from fastapi import APIRouter, HTTPException, Query
-from sqlalchemy import or_, select
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.db import SessionLocal
+from app.db import get_session
 from app.models import AppConstantsSet
 from app.schemas.constants import (
     ALLOWED_SCENARIOS,
@@ -17,14 +17,11 @@ from app.schemas.constants import (
     AppConstantsSetRead,
     AppConstantsSetUpdate,
 )
+from app.services.tax_config import find_current_constants_set, tax_config_resolver
 
 router = APIRouter(tags=["admin"])
 
 
-def _get_db() -> Session:
-    return SessionLocal()
-
-
 def _validate_scenario(jurisdiction: str, scenario_key: str) -> None:
     allowed = ALLOWED_SCENARIOS.get(jurisdiction)
     if not allowed:
@@ -87,27 +84,6 @@ def _ensure_no_overlap(
             )
 
 
-def _find_current_set(
-    *,
-    db: Session,
-    jurisdiction: str,
-    scenario_key: str,
-    as_of: date,
-) -> Optional[AppConstantsSet]:
-    stmt = (
-        select(AppConstantsSet)
-        .where(
-            AppConstantsSet.jurisdiction == jurisdiction,
-            AppConstantsSet.scenario_key == scenario_key,
-            AppConstantsSet.effective_from <= as_of,
-            or_(AppConstantsSet.effective_to.is_(None), AppConstantsSet.effective_to >= as_of),
-        )
-        .order_by(AppConstantsSet.effective_from.desc(), AppConstantsSet.id.desc())
-        .limit(1)
-    )
-    return db.execute(stmt).scalar_one_or_none()
-
-
 def _rollover_close_previous_if_needed(
     *,
     db: Session,
@@ -122,7 +98,7 @@ def _rollover_close_previous_if_needed(
     - Ako postoji aktivan open-ended set na new_from, zatvori ga na (new_from - 1 dan).
     - Ako je prethodni set već imao effective_to (zatvoren period), NE diramo ga (overlap ide na 400).
     """
-    prev = _find_current_set(db=db, jurisdiction=jurisdiction, scenario_key=scenario_key, as_of=new_from)
+    prev = find_current_constants_set(db=db, jurisdiction=jurisdiction, scenario_key=scenario_key, as_of=new_from)
     if prev is None:
         return
 
@@ -242,25 +218,22 @@ def _validate_payload_semantics(*, jurisdiction: str, payload: Any) -> None:
 def admin_constants_list(
     jurisdiction: Optional[str] = Query(None, description="RS / FBiH / BD"),
     scenario_key: Optional[str] = Query(None, description="scenario_key (npr. rs_primary)"),
+    db: Session = Depends(get_session),
 ) -> AppConstantsSetListResponse:
-    db = _get_db()
-    try:
-        stmt = select(AppConstantsSet).order_by(
-            AppConstantsSet.jurisdiction.asc(),
-            AppConstantsSet.scenario_key.asc(),
-            AppConstantsSet.effective_from.desc(),
-            AppConstantsSet.id.desc(),
-        )
-        if jurisdiction:
-            stmt = stmt.where(AppConstantsSet.jurisdiction == jurisdiction)
-        if scenario_key:
-            stmt = stmt.where(AppConstantsSet.scenario_key == scenario_key)
+    stmt = select(AppConstantsSet).order_by(
+        AppConstantsSet.jurisdiction.asc(),
+        AppConstantsSet.scenario_key.asc(),
+        AppConstantsSet.effective_from.desc(),
+        AppConstantsSet.id.desc(),
+    )
+    if jurisdiction:
+        stmt = stmt.where(AppConstantsSet.jurisdiction == jurisdiction)
+    if scenario_key:
+        stmt = stmt.where(AppConstantsSet.scenario_key == scenario_key)
 
-        rows = db.execute(stmt).scalars().all()
-        items = [AppConstantsSetRead.model_validate(r) for r in rows]
-        return AppConstantsSetListResponse(items=items)
-    finally:
-        db.close()
+    rows = db.execute(stmt).scalars().all()
+    items = [AppConstantsSetRead.model_validate(r) for r in rows]
+    return AppConstantsSetListResponse(items=items)
 
 
 @router.post(
@@ -270,52 +243,54 @@ def admin_constants_list(
     operation_id="admin_constants_create",
     responses={400: {"description": "Validation / overlap error"}},
 )
-def admin_constants_create(payload: AppConstantsSetCreate) -> AppConstantsSetRead:
-    db = _get_db()
-    try:
-        _validate_scenario(payload.jurisdiction, payload.scenario_key)
-
-        # Minimal semantic validation BEFORE any rollover mutation
-        _validate_payload_semantics(jurisdiction=payload.jurisdiction, payload=payload.payload)
-
-        # 1) Rollover only within same (jurisdiction+scenario)
-        _rollover_close_previous_if_needed(
-            db=db,
-            jurisdiction=payload.jurisdiction,
-            scenario_key=payload.scenario_key,
-            new_from=payload.effective_from,
-            actor=payload.created_by,
-            reason=(payload.created_reason or "rollover"),
-        )
+def admin_constants_create(
+    payload: AppConstantsSetCreate,
+    db: Session = Depends(get_session),
+) -> AppConstantsSetRead:
+    _validate_scenario(payload.jurisdiction, payload.scenario_key)
+
+    # Minimal semantic validation BEFORE any rollover mutation
+    _validate_payload_semantics(jurisdiction=payload.jurisdiction, payload=payload.payload)
+
+    # 1) Rollover only within same (jurisdiction+scenario)
+    _rollover_close_previous_if_needed(
+        db=db,
+        jurisdiction=payload.jurisdiction,
+        scenario_key=payload.scenario_key,
+        new_from=payload.effective_from,
+        actor=payload.created_by,
+        reason=(payload.created_reason or "rollover"),
+    )
 
-        # 2) overlap check within same (jurisdiction+scenario)
-        _ensure_no_overlap(
-            db=db,
-            jurisdiction=payload.jurisdiction,
-            scenario_key=payload.scenario_key,
-            effective_from=payload.effective_from,
-            effective_to=payload.effective_to,
-            exclude_id=None,
-        )
+    # 2) overlap check within same (jurisdiction+scenario)
+    _ensure_no_overlap(
+        db=db,
+        jurisdiction=payload.jurisdiction,
+        scenario_key=payload.scenario_key,
+        effective_from=payload.effective_from,
+        effective_to=payload.effective_to,
+        exclude_id=None,
+    )
 
-        row = AppConstantsSet(
-            jurisdiction=payload.jurisdiction,
-            scenario_key=payload.scenario_key,
-            effective_from=payload.effective_from,
-            effective_to=payload.effective_to,
-            payload=payload.payload,  # 1:1 with FE (no mutation)
-            created_by=payload.created_by,
-            created_reason=payload.created_reason,
-            updated_by=None,
-            updated_reason=None,
-        )
+    row = AppConstantsSet(
+        jurisdiction=payload.jurisdiction,
+        scenario_key=payload.scenario_key,
+        effective_from=payload.effective_from,
+        effective_to=payload.effective_to,
+        payload=payload.payload,  # 1:1 with FE (no mutation)
+        created_by=payload.created_by,
+        created_reason=payload.created_reason,
+        updated_by=None,
+        updated_reason=None,
+    )
+
+    db.add(row)
+    db.commit()
+    db.refresh(row)
 
-        db.add(row)
-        db.commit()
-        db.refresh(row)
-        return AppConstantsSetRead.model_validate(row)
-    finally:
-        db.close()
+    # rollover je možda zatvorio i prethodni set → cijeli timeline jurisdikcije
+    tax_config_resolver.invalidate_constants(row.jurisdiction)
+    return AppConstantsSetRead.model_validate(row)
 
 
 @router.put(
@@ -325,48 +300,51 @@ def admin_constants_create(payload: AppConstantsSetCreate) -> AppConstantsSetRea
     operation_id="admin_constants_update",
     responses={400: {"description": "Validation / overlap error"}},
 )
-def admin_constants_update(constants_id: int, payload: AppConstantsSetUpdate) -> AppConstantsSetRead:
-    db = _get_db()
-    try:
-        row = db.execute(select(AppConstantsSet).where(AppConstantsSet.id == constants_id)).scalar_one_or_none()
-        if row is None:
-            raise HTTPException(status_code=404, detail="Constants set not found")
-
-        new_j = payload.jurisdiction if payload.jurisdiction is not None else row.jurisdiction
-        new_s = payload.scenario_key if payload.scenario_key is not None else row.scenario_key
-        new_from = payload.effective_from if payload.effective_from is not None else row.effective_from
-        new_to = payload.effective_to if payload.effective_to is not None else row.effective_to
-
-        _validate_scenario(new_j, new_s)
-
-        _ensure_no_overlap(
-            db=db,
-            jurisdiction=new_j,
-            scenario_key=new_s,
-            effective_from=new_from,
-            effective_to=new_to,
-            exclude_id=row.id,
-        )
+def admin_constants_update(
+    constants_id: int,
+    payload: AppConstantsSetUpdate,
+    db: Session = Depends(get_session),
+) -> AppConstantsSetRead:
+    row = db.execute(select(AppConstantsSet).where(AppConstantsSet.id == constants_id)).scalar_one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Constants set not found")
+
+    new_j = payload.jurisdiction if payload.jurisdiction is not None else row.jurisdiction
+    new_s = payload.scenario_key if payload.scenario_key is not None else row.scenario_key
+    new_from = payload.effective_from if payload.effective_from is not None else row.effective_from
+    new_to = payload.effective_to if payload.effective_to is not None else row.effective_to
+
+    _validate_scenario(new_j, new_s)
+
+    _ensure_no_overlap(
+        db=db,
+        jurisdiction=new_j,
+        scenario_key=new_s,
+        effective_from=new_from,
+        effective_to=new_to,
+        exclude_id=row.id,
+    )
 
-        if payload.jurisdiction is not None:
-            row.jurisdiction = payload.jurisdiction
-        if payload.scenario_key is not None:
-            row.scenario_key = payload.scenario_key
-        if payload.effective_from is not None:
-            row.effective_from = payload.effective_from
-        if payload.effective_to is not None:
-            row.effective_to = payload.effective_to
-
-        if payload.payload is not None:
-            _validate_payload_semantics(jurisdiction=new_j, payload=payload.payload)
-            row.payload = payload.payload  # 1:1 with FE (no mutation)
-
-        row.updated_by = payload.updated_by
-        row.updated_reason = payload.updated_reason
-        row.updated_at = datetime.utcnow()
-
-        db.commit()
-        db.refresh(row)
-        return AppConstantsSetRead.model_validate(row)
-    finally:
-        db.close()
+    if payload.jurisdiction is not None:
+        row.jurisdiction = payload.jurisdiction
+    if payload.scenario_key is not None:
+        row.scenario_key = payload.scenario_key
+    if payload.effective_from is not None:
+        row.effective_from = payload.effective_from
+    if payload.effective_to is not None:
+        row.effective_to = payload.effective_to
+
+    if payload.payload is not None:
+        _validate_payload_semantics(jurisdiction=new_j, payload=payload.payload)
+        row.payload = payload.payload  # 1:1 with FE (no mutation)
+
+    row.updated_by = payload.updated_by
+    row.updated_reason = payload.updated_reason
+    row.updated_at = datetime.utcnow()
+
+    db.commit()
+    db.refresh(row)
+
+    # update može premjestiti set u drugu jurisdikciju → invalidiramo sve
+    tax_config_resolver.invalidate_constants()
+    return AppConstantsSetRead.model_validate(row)
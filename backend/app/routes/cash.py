@@ -3,13 +3,37 @@ from __future__ import annotations
 from datetime import date, datetime, timezone
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
-from sqlalchemy import case, func, select
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+    status,
+)
+from sqlalchemy import case, func, insert, select
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db import get_session as _get_session_dep
-from app.models import CashEntry, Tenant
+from app.db import get_async_session, get_session as _get_session_dep
+from app.models import (
+    CashEntry,
+    FinalizedPeriodModificationError,
+    InputInvoice,
+    Invoice,
+    Tenant,
+    apply_merged_rollup_deltas,
+    bump_tenant_data_versions,
+    load_finalized_periods,
+    merge_rollup_deltas,
+)
+from app.pagination import cached_list_total, keyset_filters, split_page
+from app.period_filters import period_filters
+from app.schemas.bulk_import import BulkImportReport
 from app.schemas.cash import (
     CashEntryCreate,
     CashEntryRead,
@@ -18,6 +42,13 @@ from app.schemas.cash import (
     CashRowItem,
     CashListResponse,
 )
+from app.services.bulk_import import (
+    BulkImportCollector,
+    BulkImportFormatError,
+    iter_records,
+    iter_valid_batches,
+    resolve_bulk_format,
+)
 from app.tenant_security import require_tenant_code, ensure_tenant_exists
 
 router = APIRouter(
@@ -275,6 +306,24 @@ def list_cash(
 # ======================================================
 
 
+def _build_cash_base_stmt_for_ui(
+    tenant: str,
+    year: Optional[int],
+    month: Optional[int],
+    kind: Optional[str],
+):
+    """
+    Filteri za /cash/list (range po entry_date → ix_cash_entries_tenant_date).
+    """
+    base_stmt = select(CashEntry).where(CashEntry.tenant_code == tenant)
+
+    base_stmt = base_stmt.where(*period_filters(CashEntry.entry_date, year=year, month=month))
+    if kind is not None:
+        base_stmt = base_stmt.where(CashEntry.kind == kind)
+
+    return base_stmt
+
+
 @router.get(
     "/list",
     response_model=CashListResponse,
@@ -285,11 +334,14 @@ def list_cash(
         "- `items`: lista redova za UI tabelu.\n\n"
         "Podržava filtere po godini/mjesecu (`year`, `month`) i vrsti unosa "
         "(`kind` = `income` ili `expense`), kao i paginaciju putem `limit`/`offset`.\n\n"
+        "Za infinite scroll koristiti `cursor` (vrijednost `next_cursor` iz prethodnog odgovora): "
+        "svaka stranica je jednako brza, bez obzira koliko je duboko. "
+        "`total` se kešira po verziji podataka tenanta, a uz `include_total=false` se ne računa.\n\n"
         "Ovo je specijalizovan endpoint za frontend (tabela u UI-ju)."
     ),
 )
-def list_cash_ui(
-    db: Session = Depends(_get_session_dep),
+async def list_cash_ui(
+    db: AsyncSession = Depends(get_async_session),
     x_tenant_code: Optional[str] = Header(
         None,
         alias="X-Tenant-Code",
@@ -325,41 +377,44 @@ def list_cash_ui(
         ge=0,
         description="Broj zapisa koje preskačemo prije vraćanja rezultata.",
     ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Kursor iz `next_cursor` prethodne stranice (keyset paginacija); ako je zadat, `offset` se ignoriše.",
+    ),
+    include_total: bool = Query(
+        True,
+        description="Ako je `false`, `total` se ne računa (null) – za infinite scroll nakon prve stranice.",
+    ),
 ) -> CashListResponse:
     """
     Lista cash unosa za UI tabelu sa totalom i paginacijom.
     """
     tenant = _require_tenant(x_tenant_code)
 
-    base_stmt = select(CashEntry).where(CashEntry.tenant_code == tenant)
+    base_stmt = _build_cash_base_stmt_for_ui(tenant, year, month, kind)
 
-    if year is not None:
-        base_stmt = base_stmt.where(func.extract("year", CashEntry.entry_date) == year)
-    if month is not None:
-        base_stmt = base_stmt.where(
-            func.extract("month", CashEntry.entry_date) == month
-        )
-    if kind is not None:
-        base_stmt = base_stmt.where(CashEntry.kind == kind)
-
-    # total
     count_stmt = select(func.count()).select_from(base_stmt.subquery())
-    total: int = db.execute(count_stmt).scalar_one()
-
-    # items
     items_stmt = (
-        base_stmt.order_by(CashEntry.entry_date.desc(), CashEntry.id.desc())
-        .limit(limit)
-        .offset(offset)
+        base_stmt.where(*keyset_filters(CashEntry.entry_date, CashEntry.id, cursor))
+        .order_by(CashEntry.entry_date.desc(), CashEntry.id.desc())
+        .limit(limit + 1)
+        .offset(0 if cursor else offset)
     )
-    rows = db.execute(items_stmt).scalars().all()
+
+    # stranica pa (keširan) total – redom, na sesiji zahtjeva
+    result = await db.scalars(items_stmt)
+    total = None
+    if include_total:
+        params = {"year": year, "month": month, "kind": kind}
+        total = await cached_list_total(db, tenant, "cash.list.total", params, count_stmt)
+    rows, next_cursor = split_page(result.all(), limit, "entry_date")
 
     # Mapiramo direktno u CashRowItem (from_attributes=True)
     items: List[CashRowItem] = [
         CashRowItem.model_validate(row) for row in rows
     ]
 
-    return CashListResponse(total=total, items=items)
+    return CashListResponse(total=total, items=items, next_cursor=next_cursor)
 
 
 # ======================================================
@@ -516,6 +571,156 @@ def create_cash(
     return obj
 
 
+# ======================================================
+#  BULK IMPORT (CSV / NDJSON)
+# ======================================================
+
+
+def _existing_ids(db: Session, model, tenant: str, ids: set[int]) -> set[int]:
+    if not ids:
+        return set()
+    stmt = select(model.id).where(model.tenant_code == tenant, model.id.in_(ids))
+    return set(db.execute(stmt).scalars().all())
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkImportReport,
+    summary="Bulk import cash unosa (CSV, NDJSON ili XLSX)",
+    description=(
+        "Uvozi veći broj cash unosa iz jednog fajla u **jednoj transakciji**.\n\n"
+        "Podržani formati:\n"
+        "- **CSV** sa header linijom (`entry_date,kind,amount,account,note,...`), "
+        "delimiter `,` ili `;`, UTF-8 (BOM dozvoljen),\n"
+        "- **NDJSON** – jedan JSON objekat po liniji (ista polja kao `POST /cash`),\n"
+        "- **XLSX** – prvi sheet, prvi red je header (iste kolone kao CSV).\n\n"
+        "Format se određuje iz `?format=`, content-type-a ili ekstenzije fajla.\n\n"
+        "Svaki red se validira kao `CashEntryCreate`. Nevalidni redovi, redovi u "
+        "finalizovanom poreskom mjesecu i redovi sa nepostojećim `invoice_id` / "
+        "`input_invoice_id` se preskaču i vraćaju u izvještaju (`errors`), a ostali "
+        "se upisuju.\n\n"
+        "Sa `atomic=true` ništa se ne upisuje ako je ijedan red odbijen."
+    ),
+    responses={
+        200: {"description": "Izvještaj o importu (broj upisanih i odbijenih redova)."},
+        400: {
+            "description": "Nedostaje X-Tenant-Code header ili format fajla nije podržan.",
+            "content": {
+                "application/json": {
+                    "examples": {
+                        "missing_tenant": {
+                            "summary": "Nedostaje X-Tenant-Code",
+                            "value": {"detail": "Missing X-Tenant-Code header"},
+                        },
+                        "unknown_format": {
+                            "summary": "Nepoznat format",
+                            "value": {
+                                "detail": "Cannot detect import format, use ?format=csv, ndjson or xlsx"
+                            },
+                        },
+                    }
+                }
+            },
+        },
+    },
+)
+def bulk_import_cash(
+    db: Session = Depends(_get_session_dep),
+    x_tenant_code: Optional[str] = Header(
+        None,
+        alias="X-Tenant-Code",
+        description="Šifra tenanta za kojeg se uvoze cash unosi.",
+    ),
+    file: UploadFile = File(..., description="CSV, NDJSON ili XLSX fajl sa cash unosima."),
+    import_format: Optional[str] = Query(
+        None,
+        alias="format",
+        description="`csv`, `ndjson` ili `xlsx`; ako nije zadat, određuje se iz fajla.",
+    ),
+    atomic: bool = Query(
+        False,
+        description="Ako je `true`, import se poništava čim je ijedan red odbijen.",
+    ),
+) -> BulkImportReport:
+    """
+    Bulk import cash unosa.
+
+    - redovi se validiraju i upisuju u batch-evima (multi-row INSERT),
+    - finalizovani mjeseci tenanta se učitaju jednim upitom na početku,
+    - Core INSERT ne okida ORM hookove, pa se mjesečni rollup ažurira
+      jednom po (godina, mjesec) na kraju, u istoj transakciji.
+    """
+    tenant = _require_tenant(x_tenant_code)
+
+    try:
+        fmt = resolve_bulk_format(import_format, file.content_type, file.filename)
+        records = iter_records(file.file, fmt)
+    except BulkImportFormatError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    _ensure_tenant_exists(db, tenant)
+
+    finalized = load_finalized_periods(db.connection(), [tenant])[tenant]
+    created_at = datetime.now(timezone.utc)
+    collector = BulkImportCollector()
+    rollup_deltas: dict[tuple, dict[str, object]] = {}
+
+    try:
+        for batch in iter_valid_batches(records, CashEntryCreate, collector):
+            invoice_ids = _existing_ids(
+                db, Invoice, tenant, {e.invoice_id for _, e in batch if e.invoice_id is not None}
+            )
+            input_invoice_ids = _existing_ids(
+                db,
+                InputInvoice,
+                tenant,
+                {e.input_invoice_id for _, e in batch if e.input_invoice_id is not None},
+            )
+
+            rows = []
+            for line, entry in batch:
+                period = (entry.entry_date.year, entry.entry_date.month)
+                if period in finalized:
+                    collector.reject(
+                        line,
+                        [str(FinalizedPeriodModificationError(tenant, period[0], period[1]))],
+                    )
+                    continue
+                if entry.invoice_id is not None and entry.invoice_id not in invoice_ids:
+                    collector.reject(line, [f"invoice_id: Invoice {entry.invoice_id} not found"])
+                    continue
+                if entry.input_invoice_id is not None and entry.input_invoice_id not in input_invoice_ids:
+                    collector.reject(
+                        line,
+                        [f"input_invoice_id: Input invoice {entry.input_invoice_id} not found"],
+                    )
+                    continue
+
+                row = entry.model_dump()
+                row["tenant_code"] = tenant
+                row["created_at"] = created_at
+                rows.append(row)
+                merge_rollup_deltas(rollup_deltas, "cash", row)
+
+            if rows:
+                db.execute(insert(CashEntry.__table__), rows)
+                collector.inserted += len(rows)
+
+        if atomic and collector.failed:
+            db.rollback()
+            collector.inserted = 0
+        else:
+            apply_merged_rollup_deltas(db.connection(), rollup_deltas)
+            if collector.inserted:
+                bump_tenant_data_versions(db.connection(), [tenant])
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return collector.report()
+
+
 # ======================================================
 #  PATCH (partial update)
 # ======================================================
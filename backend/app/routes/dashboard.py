@@ -5,12 +5,14 @@ from decimal import Decimal
 from typing import Optional
 
 from fastapi import APIRouter, Depends, Header, HTTPException, Query
-from sqlalchemy import func
-from sqlalchemy.orm import Session
-
-from app.db import get_session as _get_session_dep
-from app.models import CashEntry, Invoice, TaxMonthlyResult
-from app.tenant_security import require_tenant_code, ensure_tenant_exists
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import get_async_session
+from app.http_cache import tenant_etag
+from app.models import TaxMonthlyResult, TenantMonthlyRollup
+from app.services.response_cache import response_cache
+from app.tenant_security import require_tenant_code
 from app.schemas.dashboard import (
     DashboardCashSummary,
     DashboardInvoiceSummary,
@@ -41,22 +43,12 @@ def _require_tenant(x_tenant_code: Optional[str]) -> str:
     return require_tenant_code(x_tenant_code)
 
 
-def _ensure_tenant_exists_wrapper(db: Session, code: str) -> None:
-    """
-    Osigurava da tenant postoji u bazi (radi konzistentnosti sa ostatkom sistema).
-
-    Koristi se kao thin-wrapper oko ensure_tenant_exists helper-a, tako da
-    dashboard endpointi mogu da rade i u "self-service" / demo scenarijima
-    (bez prethodnog ručnog unosa tenanta).
-    """
-    ensure_tenant_exists(db, code)
-
-
 # ======================================================
 #  GODIŠNJI DASHBOARD
 # ======================================================
 @router.get(
     "/summary/{year}",
+    dependencies=[Depends(tenant_etag)],
     response_model=DashboardYearSummary,
     summary="Godišnji dashboard sa ključnim brojkama",
     description=(
@@ -71,9 +63,9 @@ def _ensure_tenant_exists_wrapper(db: Session, code: str) -> None:
         "Ovo je osnovni endpoint za početni ekran (dashboard) u UI-ju."
     ),
 )
-def get_dashboard_year_summary(
+async def get_dashboard_year_summary(
     year: int,
-    db: Session = Depends(_get_session_dep),
+    db: AsyncSession = Depends(get_async_session),
     x_tenant_code: Optional[str] = Header(
         None,
         alias="X-Tenant-Code",
@@ -87,7 +79,6 @@ def get_dashboard_year_summary(
     grešku (400) radi konzistentnosti sa TAX/SAM modulima.
     """
     tenant = _require_tenant(x_tenant_code)
-    _ensure_tenant_exists_wrapper(db, tenant)
 
     if year < 2000 or year > 2100:
         raise HTTPException(
@@ -95,27 +86,50 @@ def get_dashboard_year_summary(
             detail="Year must be between 2000 and 2100.",
         )
 
-    # ============================
-    #  CASH SUMMARY
-    # ============================
-    income_sum = (
-        db.query(func.coalesce(func.sum(CashEntry.amount), 0))
-        .filter(
-            CashEntry.tenant_code == tenant,
-            CashEntry.kind == "income",
-            func.extract("year", CashEntry.entry_date) == year,
-        )
-        .scalar()
+    return await response_cache.aget_or_compute(
+        db,
+        tenant,
+        "dashboard.year_summary",
+        {"year": year},
+        DashboardYearSummary,
+        lambda: _compute_year_dashboard(db, tenant=tenant, year=year),
     )
-    expense_sum = (
-        db.query(func.coalesce(func.sum(CashEntry.amount), 0))
-        .filter(
-            CashEntry.tenant_code == tenant,
-            CashEntry.kind == "expense",
-            func.extract("year", CashEntry.entry_date) == year,
-        )
-        .scalar()
+
+
+def _year_dashboard_stmts(*, tenant: str, year: int):
+    """
+    (rollup_stmt, tax_stmt) za godišnji dashboard:
+    tenant_monthly_rollups (najviše 12 redova) i tax_monthly_results.
+    """
+    rollup_stmt = select(
+        func.coalesce(func.sum(TenantMonthlyRollup.cash_income), 0),
+        func.coalesce(func.sum(TenantMonthlyRollup.cash_expense), 0),
+        func.coalesce(func.sum(TenantMonthlyRollup.invoice_count), 0),
+        func.coalesce(func.sum(TenantMonthlyRollup.invoice_income), 0),
+    ).where(
+        TenantMonthlyRollup.tenant_code == tenant,
+        TenantMonthlyRollup.year == year,
+    )
+    tax_stmt = select(
+        func.count(TaxMonthlyResult.id),
+        func.coalesce(func.sum(TaxMonthlyResult.total_due), 0),
+    ).where(
+        TaxMonthlyResult.tenant_code == tenant,
+        TaxMonthlyResult.year == year,
     )
+    return rollup_stmt, tax_stmt
+
+
+async def _compute_year_dashboard(db: AsyncSession, *, tenant: str, year: int) -> DashboardYearSummary:
+    # ============================
+    #  CASH + INVOICES (tenant_monthly_rollups) i TAX (tax_monthly_results)
+    #  – dva kratka indeksirana upita, redom na sesiji zahtjeva
+    # ============================
+    rollup_stmt, tax_stmt = _year_dashboard_stmts(tenant=tenant, year=year)
+    rollup_result = await db.execute(rollup_stmt)
+    tax_result = await db.execute(tax_stmt)
+
+    income_sum, expense_sum, invoices_count_raw, invoices_total_raw = rollup_result.one()
 
     income_total = Decimal(income_sum or 0)
     expense_total = Decimal(expense_sum or 0)
@@ -131,15 +145,6 @@ def get_dashboard_year_summary(
     # ============================
     #  INVOICES SUMMARY
     # ============================
-    invoices_query = db.query(
-        func.count(Invoice.id),
-        func.coalesce(func.sum(Invoice.total_amount), 0),
-    ).filter(
-        Invoice.tenant_code == tenant,
-        func.extract("year", Invoice.issue_date) == year,
-    )
-
-    invoices_count_raw, invoices_total_raw = invoices_query.one()
     invoices_count = int(invoices_count_raw or 0)
     invoices_total = Decimal(invoices_total_raw or 0)
 
@@ -152,15 +157,7 @@ def get_dashboard_year_summary(
     # ============================
     #  TAX SUMMARY
     # ============================
-    tax_query = db.query(
-        func.count(TaxMonthlyResult.id),
-        func.coalesce(func.sum(TaxMonthlyResult.total_due), 0),
-    ).filter(
-        TaxMonthlyResult.tenant_code == tenant,
-        TaxMonthlyResult.year == year,
-    )
-
-    finalized_months_raw, tax_total_due_raw = tax_query.one()
+    finalized_months_raw, tax_total_due_raw = tax_result.one()
     finalized_months = int(finalized_months_raw or 0)
     tax_total_due = Decimal(tax_total_due_raw or 0)
 
@@ -195,9 +192,27 @@ def get_dashboard_year_summary(
 # ======================================================
 #  MJESNIČNI DASHBOARD – HELPER
 # ======================================================
-def _compute_monthly_dashboard(
+def _monthly_dashboard_stmts(*, tenant: str, year: int, month: int):
+    """
+    (rollup_stmt, tax_stmt) za mjesečni dashboard: jedan red iz
+    tenant_monthly_rollups i obračun iz tax_monthly_results.
+    """
+    rollup_stmt = select(TenantMonthlyRollup).where(
+        TenantMonthlyRollup.tenant_code == tenant,
+        TenantMonthlyRollup.year == year,
+        TenantMonthlyRollup.month == month,
+    )
+    tax_stmt = select(TaxMonthlyResult).where(
+        TaxMonthlyResult.tenant_code == tenant,
+        TaxMonthlyResult.year == year,
+        TaxMonthlyResult.month == month,
+    )
+    return rollup_stmt, tax_stmt
+
+
+async def _compute_monthly_dashboard(
+    db: AsyncSession,
     *,
-    db: Session,
     tenant: str,
     year: int,
     month: int,
@@ -212,31 +227,17 @@ def _compute_monthly_dashboard(
     """
 
     # ----------------------------
-    # CASH (income / expense / net)
+    # CASH + INVOICES (jedan red iz tenant_monthly_rollups) i
+    # TAX (tax_monthly_results)
     # ----------------------------
-    income_sum = (
-        db.query(func.coalesce(func.sum(CashEntry.amount), 0))
-        .filter(
-            CashEntry.tenant_code == tenant,
-            CashEntry.kind == "income",
-            func.extract("year", CashEntry.entry_date) == year,
-            func.extract("month", CashEntry.entry_date) == month,
-        )
-        .scalar()
-    )
-    expense_sum = (
-        db.query(func.coalesce(func.sum(CashEntry.amount), 0))
-        .filter(
-            CashEntry.tenant_code == tenant,
-            CashEntry.kind == "expense",
-            func.extract("year", CashEntry.entry_date) == year,
-            func.extract("month", CashEntry.entry_date) == month,
-        )
-        .scalar()
-    )
-
-    income_total = Decimal(income_sum or 0)
-    expense_total = Decimal(expense_sum or 0)
+    rollup_stmt, tax_stmt = _monthly_dashboard_stmts(tenant=tenant, year=year, month=month)
+    rollup_result = await db.scalars(rollup_stmt)
+    tax_result = await db.scalars(tax_stmt)
+    rollup = rollup_result.one_or_none()
+    tax_rows: list[TaxMonthlyResult] = tax_result.all()
+
+    income_total = Decimal(rollup.cash_income if rollup is not None else 0)
+    expense_total = Decimal(rollup.cash_expense if rollup is not None else 0)
     net_cashflow = income_total - expense_total
 
     cash_summary = DashboardMonthlyCashSummary(
@@ -250,18 +251,8 @@ def _compute_monthly_dashboard(
     # ----------------------------
     # INVOICES (count + total)
     # ----------------------------
-    invoices_query = db.query(
-        func.count(Invoice.id),
-        func.coalesce(func.sum(Invoice.total_amount), 0),
-    ).filter(
-        Invoice.tenant_code == tenant,
-        func.extract("year", Invoice.issue_date) == year,
-        func.extract("month", Invoice.issue_date) == month,
-    )
-
-    invoices_count_raw, invoices_total_raw = invoices_query.one()
-    invoices_count = int(invoices_count_raw or 0)
-    invoices_total = Decimal(invoices_total_raw or 0)
+    invoices_count = int(rollup.invoice_count if rollup is not None else 0)
+    invoices_total = Decimal(rollup.invoice_income if rollup is not None else 0)
 
     invoices_summary = DashboardMonthlyInvoiceSummary(
         year=year,
@@ -273,16 +264,6 @@ def _compute_monthly_dashboard(
     # ----------------------------
     # TAX (tax_monthly_results)
     # ----------------------------
-    tax_rows: list[TaxMonthlyResult] = (
-        db.query(TaxMonthlyResult)
-        .filter(
-            TaxMonthlyResult.tenant_code == tenant,
-            TaxMonthlyResult.year == year,
-            TaxMonthlyResult.month == month,
-        )
-        .all()
-    )
-
     has_any_result = len(tax_rows) > 0
     total_due = sum((row.total_due for row in tax_rows), Decimal("0.00"))
     is_any_final = any(bool(row.is_final) for row in tax_rows)
@@ -317,11 +298,30 @@ def _compute_monthly_dashboard(
     )
 
 
+async def _cached_monthly_dashboard(
+    *,
+    db: AsyncSession,
+    tenant: str,
+    year: int,
+    month: int,
+) -> DashboardMonthlySummary:
+    # /monthly/{year}/{month} i /monthly/current dijele isti unos u kešu
+    return await response_cache.aget_or_compute(
+        db,
+        tenant,
+        "dashboard.monthly_summary",
+        {"year": year, "month": month},
+        DashboardMonthlySummary,
+        lambda: _compute_monthly_dashboard(db, tenant=tenant, year=year, month=month),
+    )
+
+
 # ======================================================
 #  MJESNIČNI DASHBOARD – /monthly/{year}/{month}
 # ======================================================
 @router.get(
     "/monthly/{year}/{month}",
+    dependencies=[Depends(tenant_etag)],
     response_model=DashboardMonthlySummary,
     summary="Mjesečni dashboard za zadanu godinu i mjesec",
     description=(
@@ -332,10 +332,10 @@ def _compute_monthly_dashboard(
         "- prikaz grafika / kartica za jedan izabrani mjesec."
     ),
 )
-def get_dashboard_monthly_summary(
+async def get_dashboard_monthly_summary(
     year: int,
     month: int,
-    db: Session = Depends(_get_session_dep),
+    db: AsyncSession = Depends(get_async_session),
     x_tenant_code: Optional[str] = Header(
         None,
         alias="X-Tenant-Code",
@@ -343,7 +343,6 @@ def get_dashboard_monthly_summary(
     ),
 ) -> DashboardMonthlySummary:
     tenant = _require_tenant(x_tenant_code)
-    _ensure_tenant_exists_wrapper(db, tenant)
 
     if year < 2000 or year > 2100:
         raise HTTPException(
@@ -356,7 +355,7 @@ def get_dashboard_monthly_summary(
             detail="Month must be between 1 and 12.",
         )
 
-    return _compute_monthly_dashboard(
+    return await _cached_monthly_dashboard(
         db=db,
         tenant=tenant,
         year=year,
@@ -369,6 +368,7 @@ def get_dashboard_monthly_summary(
 # ======================================================
 @router.get(
     "/monthly/current",
+    dependencies=[Depends(tenant_etag)],
     response_model=DashboardMonthlySummary,
     summary="Mjesečni dashboard za trenutni mjesec (ili ručno zadat year/month)",
     description=(
@@ -380,8 +380,8 @@ def get_dashboard_monthly_summary(
         "- vrijednosti za year/month važe u opsegu 2000–2100 / 1–12."
     ),
 )
-def get_dashboard_monthly_current(
-    db: Session = Depends(_get_session_dep),
+async def get_dashboard_monthly_current(
+    db: AsyncSession = Depends(get_async_session),
     x_tenant_code: Optional[str] = Header(
         None,
         alias="X-Tenant-Code",
@@ -401,7 +401,6 @@ def get_dashboard_monthly_current(
     ),
 ) -> DashboardMonthlySummary:
     tenant = _require_tenant(x_tenant_code)
-    _ensure_tenant_exists_wrapper(db, tenant)
 
     # Ili oba None, ili oba popunjena.
     if (year is None) ^ (month is None):
@@ -428,7 +427,7 @@ def get_dashboard_monthly_current(
             detail="Month must be between 1 and 12.",
         )
 
-    return _compute_monthly_dashboard(
+    return await _cached_monthly_dashboard(
         db=db,
         tenant=tenant,
         year=year,
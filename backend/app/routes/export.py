@@ -1,18 +1,40 @@
 # /home/miso/dev/sp-app/sp-app/backend/app/routes/export.py
 from __future__ import annotations
 
+import os
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import date
-from io import BytesIO
-from typing import List, Optional
-import zipfile
+from decimal import Decimal
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, List, Optional, Tuple
 
 from fastapi import APIRouter, Depends, Header, HTTPException, status
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-
-from app.db import get_session as _get_session_dep
-from app.tenant_security import ensure_tenant_exists, require_tenant_code
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+
+from app.db import SessionLocal, get_session as _get_session_dep
+from app.models import CashEntry, InputInvoice, Invoice, InvoiceAttachment
+from app.period_filters import period_filters
+from app.routes.invoice_attachments import STORAGE_ROOT, _safe_filename
+from app.routes.kpr import _iter_kpr_rows
+from app.routes.promet import _build_promet_base_stmt, _cash_entry_to_promet_row
+from app.routes.tax import _get_monthly_summary_any
+from app.services.blob_store import resolve_stored_file
+from app.services.csv_stream import CSV_STREAM_BATCH_SIZE, stream_scalars
+from app.services.pdf_invoice import render_invoices_pdf
+from app.services.pdf_kpr import KprPeriod, render_kpr_pdf
+from app.services.pdf_promet import render_promet_pdf
+from app.services.pdf_writer import TextPdfDocument
+from app.services.zip_stream import (
+    ZipStreamEntry,
+    iter_file_chunks,
+    iter_path_chunks,
+    iter_zip_chunks,
+)
+from app.tenant_security import require_tenant_code
 
 router = APIRouter(tags=["export"])
 
@@ -32,148 +54,336 @@ class ExportInspectionRequest(BaseModel):
     include_promet_pdf: bool = True
     include_cash_bank_pdf: bool = True
     include_taxes_pdf: bool = True
+    include_attachments: bool = True
 
 
 # ======================================================
-#  PDF HELPERS (MINIMAL, ROBUST)
+#  INSPECTION ZIP – SEKCIJE (PDF)
 # ======================================================
+#
+# Svaka sekcija je funkcija (db, tenant, from_date, to_date, out) koja
+# piše jedan PDF u `out`. Sekcije se renderuju paralelno na thread pool-u,
+# svaka sa svojom sesijom, u SpooledTemporaryFile (iznad
+# INSPECTION_PDF_SPOOL_BYTES ide na disk), a ZIP ih preuzima redom.
+
+INSPECTION_PDF_WORKERS = int(os.getenv("INSPECTION_PDF_WORKERS", "6"))
+INSPECTION_PDF_SPOOL_BYTES = int(os.getenv("INSPECTION_PDF_SPOOL_BYTES", str(8 * 1024 * 1024)))
+
+_inspection_pdf_pool = ThreadPoolExecutor(
+    max_workers=INSPECTION_PDF_WORKERS,
+    thread_name_prefix="inspection-pdf",
+)
+
+_SectionRenderer = Callable[[Session, str, date, date, BinaryIO], None]
+
+_TABLE_RULE = "------------------------------------------------------------------------------"
+
+
+def _period_label(from_date: date, to_date: date) -> str:
+    return f"{from_date.isoformat()} do {to_date.isoformat()}"
 
 
-def _escape_pdf_text(text: str) -> str:
+def _report_header(doc: TextPdfDocument, title: str, tenant: str, from_date: date, to_date: date) -> None:
+    doc.line(title)
+    doc.line(f"Tenant: {tenant}")
+    doc.line(f"Period: {_period_label(from_date, to_date)}")
+    doc.line("")
+
+
+def _months_in_period(from_date: date, to_date: date) -> Iterator[Tuple[int, int]]:
+    year, month = from_date.year, from_date.month
+    while (year, month) <= (to_date.year, to_date.month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def _render_outgoing_invoices(db: Session, tenant: str, from_date: date, to_date: date, out: BinaryIO) -> None:
+    """
+    Sve izlazne fakture iz perioda, svaka na svojoj stranici (layout iz pdf_invoice).
     """
-    PDF je ovdje "minimalni text PDF", pa moramo osigurati da tekst moze u latin-1.
+    stmt = (
+        select(Invoice)
+        .options(selectinload(Invoice.items))
+        .where(
+            Invoice.tenant_code == tenant,
+            *period_filters(Invoice.issue_date, date_from=from_date, date_to=to_date),
+        )
+        .order_by(Invoice.issue_date.asc(), Invoice.id.asc())
+    )
+    render_invoices_pdf(stream_scalars(db, stmt), out=out)
+
 
-    - transliteracija dijakritike
-    - zamjena tipografskih crtica/navodnika sa ASCII varijantama
-    - escape za PDF string literal
+def _render_input_invoices(db: Session, tenant: str, from_date: date, to_date: date, out: BinaryIO) -> None:
     """
-    # tipografske crte i navodnici -> ASCII
-    text = (
-        text.replace("\u2013", "-")  # en dash
-        .replace("\u2014", "-")  # em dash
-        .replace("\u2019", "'")  # right single quote
-        .replace("\u2018", "'")  # left single quote
-        .replace("\u201c", '"')  # left double quote
-        .replace("\u201d", '"')  # right double quote
-        .replace("\u00a0", " ")  # nbsp
+    Registar ulaznih računa iz perioda (po datumu izdavanja).
+    """
+    stmt = (
+        select(InputInvoice)
+        .where(
+            InputInvoice.tenant_code == tenant,
+            *period_filters(InputInvoice.issue_date, date_from=from_date, date_to=to_date),
+        )
+        .order_by(InputInvoice.issue_date.asc(), InputInvoice.id.asc())
     )
 
-    translit_map = str.maketrans(
-        {
-            "č": "c",
-            "ć": "c",
-            "š": "s",
-            "đ": "d",
-            "ž": "z",
-            "Č": "C",
-            "Ć": "C",
-            "Š": "S",
-            "Đ": "D",
-            "Ž": "Z",
-        }
+    doc = TextPdfDocument(out)
+    _report_header(doc, "ULAZNI RACUNI (DOBAVLJACI)", tenant, from_date, to_date)
+    doc.set_repeating_header(
+        [
+            "Datum       Broj racuna   Dobavljac              Osnovica       PDV    Ukupno  Pl.",
+            _TABLE_RULE,
+        ]
     )
-    text = text.translate(translit_map)
 
-    # PDF string escaping
-    return (
-        text.replace("\\", "\\\\")
-        .replace("(", "\\(")
-        .replace(")", "\\)")
+    total_base = Decimal("0")
+    total_vat = Decimal("0")
+    total_amount = Decimal("0")
+    has_rows = False
+
+    for inv in stream_scalars(db, stmt):
+        has_rows = True
+        total_base += inv.total_base or 0
+        total_vat += inv.total_vat or 0
+        total_amount += inv.total_amount or 0
+        doc.line(
+            f"{inv.issue_date.isoformat():10}  "
+            f"{(inv.invoice_number or '')[:12]:12}  "
+            f"{(inv.supplier_name or '')[:20]:20} "
+            f"{inv.total_base or 0:10.2f} "
+            f"{inv.total_vat or 0:9.2f} "
+            f"{inv.total_amount or 0:9.2f}  "
+            f"{'DA' if inv.is_paid else 'NE'}"
+        )
+
+    if not has_rows:
+        doc.line("(Nema ulaznih racuna u zadatom periodu)")
+
+    doc.set_repeating_header(None)
+    doc.line(_TABLE_RULE)
+    doc.line(f"Ukupna osnovica: {total_base:.2f} BAM")
+    doc.line(f"Ukupan PDV:      {total_vat:.2f} BAM")
+    doc.line(f"Ukupno:          {total_amount:.2f} BAM")
+    doc.close()
+
+
+def _render_kpr(db: Session, tenant: str, from_date: date, to_date: date, out: BinaryIO) -> None:
+    rows = _iter_kpr_rows(
+        db,
+        tenant_code=tenant,
+        year=None,
+        month=None,
+        date_from=from_date,
+        date_to=to_date,
+        stream=True,
     )
+    period = KprPeriod(year=from_date.year, date_from=from_date, date_to=to_date)
+    render_kpr_pdf(tenant, period, rows, out=out)
+
+
+def _render_promet(db: Session, tenant: str, from_date: date, to_date: date, out: BinaryIO) -> None:
+    stmt = _build_promet_base_stmt(
+        tenant=tenant,
+        year=None,
+        month=None,
+        date_from=from_date,
+        date_to=to_date,
+        partner_query=None,
+    ).order_by(CashEntry.entry_date.asc(), CashEntry.id.asc())
 
+    rows = (_cash_entry_to_promet_row(entry) for entry in stream_scalars(db, stmt))
+    render_promet_pdf(tenant, rows, period_label=_period_label(from_date, to_date), out=out)
 
-def _build_simple_text_pdf(lines: List[str]) -> bytes:
+
+def _render_cash_bank(db: Session, tenant: str, from_date: date, to_date: date, out: BinaryIO) -> None:
     """
-    Minimalni PDF generator bez eksternih biblioteka.
-    Bitno: ne smije puknuti na unicode -> encode latin-1 uz errors='replace'.
+    Keš i banka: stavke grupisane po računu, sa zbirovima po računu.
     """
-    stream_lines: List[str] = []
-    stream_lines.append("BT")
-    stream_lines.append("/F1 11 Tf")
-    stream_lines.append("50 800 Td")
-
-    first = True
-    for line in lines:
-        safe = _escape_pdf_text(line)
-        if first:
-            first = False
-        else:
-            stream_lines.append("0 -14 Td")
-        stream_lines.append(f"({safe}) Tj")
-
-    stream_lines.append("ET")
-
-    stream_data_str = "\n".join(stream_lines) + "\n"
-    stream_data = stream_data_str.encode("latin-1", errors="replace")
-    stream_len = len(stream_data)
-
-    objs: List[bytes] = []
-
-    def add_obj(body: str) -> int:
-        idx = len(objs) + 1
-        objs.append(f"{idx} 0 obj\n{body}\nendobj\n".encode("latin-1"))
-        return idx
-
-    # 1 - Catalog
-    add_obj("<< /Type /Catalog /Pages 2 0 R >>")
-    # 2 - Pages
-    add_obj("<< /Type /Pages /Kids [3 0 R] /Count 1 >>")
-    # 3 - Page
-    add_obj(
-        "<< /Type /Page /Parent 2 0 R "
-        "/MediaBox [0 0 595 842] "
-        "/Contents 4 0 R "
-        "/Resources << /Font << /F1 5 0 R >> >> >>"
-    )
-    # 4 - Contents
-    add_obj(
-        f"<< /Length {stream_len} >>\nstream\n"
-        f"{stream_data_str}"
-        "endstream"
-    )
-    # 5 - Font
-    add_obj("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
-
-    buffer = BytesIO()
-    buffer.write("%PDF-1.4\n%\xE2\xE3\xCF\xD3\n".encode("latin-1"))
-
-    offsets = [0]
-    for obj in objs:
-        offsets.append(buffer.tell())
-        buffer.write(obj)
-
-    xref_pos = buffer.tell()
-    obj_count = len(objs) + 1
-
-    buffer.write(f"xref\n0 {obj_count}\n".encode("latin-1"))
-    buffer.write(b"0000000000 65535 f \n")
-    for off in offsets[1:]:
-        buffer.write(f"{off:010d} 00000 n \n".encode("latin-1"))
-
-    trailer = (
-        "trailer\n"
-        f"<< /Size {obj_count} /Root 1 0 R >>\n"
-        "startxref\n"
-        f"{xref_pos}\n"
-        "%%EOF\n"
+    stmt = (
+        select(CashEntry)
+        .where(
+            CashEntry.tenant_code == tenant,
+            *period_filters(CashEntry.entry_date, date_from=from_date, date_to=to_date),
+        )
+        .order_by(CashEntry.account.asc(), CashEntry.entry_date.asc(), CashEntry.id.asc())
     )
-    buffer.write(trailer.encode("latin-1"))
 
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-    return pdf_bytes
+    doc = TextPdfDocument(out)
+    _report_header(doc, "BLAGAJNA I BANKA (CASH / BANK)", tenant, from_date, to_date)
+
+    account: Optional[str] = None
+    income = Decimal("0")
+    expense = Decimal("0")
+
+    def _close_account() -> None:
+        doc.set_repeating_header(None)
+        doc.line(_TABLE_RULE)
+        doc.line(f"Prihodi: {income:.2f} BAM   Rashodi: {expense:.2f} BAM   Neto: {income - expense:.2f} BAM")
+        doc.line("")
+
+    for entry in stream_scalars(db, stmt):
+        if entry.account != account:
+            if account is not None:
+                _close_account()
+            account = entry.account
+            income = Decimal("0")
+            expense = Decimal("0")
+            doc.line(f"Racun: {'Banka' if account == 'bank' else 'Blagajna'} ({account})")
+            doc.set_repeating_header(
+                [
+                    "Datum       ID        Vrsta       Iznos (BAM)  Opis",
+                    _TABLE_RULE,
+                ]
+            )
+
+        amount = entry.amount or Decimal("0")
+        if entry.kind == "expense":
+            expense += amount
+        else:
+            income += amount
+
+        doc.line(
+            f"{entry.entry_date.isoformat():10}  "
+            f"{entry.id:<8}  "
+            f"{(entry.kind or '')[:10]:10} "
+            f"{amount:12.2f}  "
+            f"{(entry.description or '')[:30]}"
+        )
+
+    if account is None:
+        doc.line("(Nema evidentiranih stavki u zadatom periodu)")
+    else:
+        _close_account()
 
+    doc.close()
 
-def _dummy_pdf(title: str) -> bytes:
-    # ASCII-only placeholder linije (bez dijakritike i bez en-dash)
-    return _build_simple_text_pdf(
+
+def _render_taxes(db: Session, tenant: str, from_date: date, to_date: date, out: BinaryIO) -> None:
+    """
+    Mjesečni obračun poreza i doprinosa za svaki mjesec koji period dodiruje
+    (finalizovan zapis ako postoji, inače preview – isto kao /tax/monthly).
+    """
+    doc = TextPdfDocument(out)
+    _report_header(doc, "POREZI I DOPRINOSI (MJESECNI OBRACUN)", tenant, from_date, to_date)
+    doc.set_repeating_header(
         [
-            title,
-            "",
-            "(PDF generator jos nije implementiran - placeholder)",
+            "Mjesec    Prihod     Rashod   Osnovica     Porez  Doprinosi    Ukupno  Status",
+            _TABLE_RULE,
         ]
     )
 
+    total_due = Decimal("0")
+    for year, month in _months_in_period(from_date, to_date):
+        summary = _get_monthly_summary_any(year=year, month=month, tenant_code=tenant, db=db)
+        total_due += summary.total_due
+        doc.line(
+            f"{year:04d}-{month:02d} "
+            f"{summary.total_income:9.2f} "
+            f"{summary.total_expense:9.2f} "
+            f"{summary.taxable_base:9.2f} "
+            f"{summary.income_tax:9.2f} "
+            f"{summary.contributions_total:9.2f} "
+            f"{summary.total_due:9.2f}  "
+            f"{'FINAL' if summary.is_final else 'PREVIEW'}"
+        )
+
+    doc.set_repeating_header(None)
+    doc.line(_TABLE_RULE)
+    doc.line(f"Ukupno obaveza: {total_due:.2f} BAM")
+    doc.line("")
+    doc.line("Napomena: obracun se uvijek odnosi na cijele kalendarske mjesece.")
+    doc.close()
+
+
+# (flag u zahtjevu, putanja u ZIP-u, renderer)
+_INSPECTION_SECTIONS: Tuple[Tuple[str, str, _SectionRenderer], ...] = (
+    ("include_outgoing_invoices_pdf", "01_invoices_outgoing/outgoing_invoices_{suffix}.pdf", _render_outgoing_invoices),
+    ("include_input_invoices_pdf", "02_invoices_incoming/input_invoices_{suffix}.pdf", _render_input_invoices),
+    ("include_kpr_pdf", "03_kpr/KPR_{suffix}.pdf", _render_kpr),
+    ("include_promet_pdf", "04_promet/knjiga_prometa_{suffix}.pdf", _render_promet),
+    ("include_cash_bank_pdf", "05_cash_bank/cash_bank_{suffix}.pdf", _render_cash_bank),
+    ("include_taxes_pdf", "06_taxes/taxes_{suffix}.pdf", _render_taxes),
+)
+
+
+def _render_section(render: _SectionRenderer, tenant: str, from_date: date, to_date: date) -> BinaryIO:
+    """
+    Izvršava se na thread pool-u: posebna sesija, PDF u spooled temp fajl.
+    Vraća fajl pozicioniran na početak; zatvara ga potrošač.
+    """
+    spooled = tempfile.SpooledTemporaryFile(max_size=INSPECTION_PDF_SPOOL_BYTES)
+    try:
+        with SessionLocal() as db:
+            render(db, tenant, from_date, to_date, spooled)
+        spooled.seek(0)
+    except BaseException:
+        spooled.close()
+        raise
+    return spooled
+
+
+def _discard_section(future: Future) -> None:
+    if future.cancelled() or future.exception() is not None:
+        return
+    future.result().close()
+
+
+# ======================================================
+#  INSPECTION ZIP – ORIGINALNI PRILOZI
+# ======================================================
+
+
+def _zip_segment(value: Optional[str]) -> str:
+    """
+    Broj fakture kao jedan segment putanje u ZIP-u (npr. "12/2025" → "12_2025").
+    """
+    return (value or "").replace("/", "_").replace("\\", "_").strip(" .") or "bez-broja"
+
+
+def _collect_attachment_files(
+    db: Session,
+    tenant: str,
+    from_date: date,
+    to_date: date,
+) -> List[Tuple[str, Path, int]]:
+    """
+    Prilozi vezani za izlazne/ulazne fakture iz perioda → (putanja u ZIP-u,
+    fajl na disku, veličina). Čita se samo metadata; fajlovi se otvaraju
+    tek kada ih ZIP stream dohvati. Prilozi bez fajla na disku se preskaču.
+    """
+    sources = (
+        ("outgoing", Invoice, InvoiceAttachment.invoice_id),
+        ("incoming", InputInvoice, InvoiceAttachment.input_invoice_id),
+    )
+
+    files: List[Tuple[str, Path, int]] = []
+    for folder, model, fk_col in sources:
+        stmt = (
+            select(InvoiceAttachment, model.invoice_number)
+            .join(model, fk_col == model.id)
+            .where(
+                InvoiceAttachment.tenant_code == tenant,
+                model.tenant_code == tenant,
+                *period_filters(model.issue_date, date_from=from_date, date_to=to_date),
+            )
+            .order_by(model.issue_date.asc(), model.id.asc(), InvoiceAttachment.id.asc())
+            .execution_options(yield_per=CSV_STREAM_BATCH_SIZE)
+        )
+        for attachment, invoice_number in db.execute(stmt):
+            path = resolve_stored_file(attachment.sha256, attachment.storage_path, STORAGE_ROOT)
+            if path is None:
+                continue
+            try:
+                size = path.stat().st_size
+            except OSError:
+                continue
+            arcname = (
+                f"07_attachments/{folder}/{_zip_segment(invoice_number)}/"
+                f"{attachment.id}_{_safe_filename(attachment.filename)}"
+            )
+            files.append((arcname, path, size))
+
+    return files
+
 
 # ======================================================
 #  EXPORT: INSPECTION ZIP
@@ -188,82 +398,111 @@ def _zip_filename(tenant: str, from_date: date, to_date: date) -> str:
     return f"inspection-{tenant}-{_period_suffix(from_date, to_date)}.zip"
 
 
-def _add_pdf(zf: zipfile.ZipFile, path_in_zip: str, title: str) -> None:
-    zf.writestr(path_in_zip, _dummy_pdf(title))
-
-
-@router.post(
-    "/export/inspection",
-    summary="ZIP export za inspekciju (PDF bundle)",
-)
-def export_inspection_zip(
-    payload: ExportInspectionRequest,
-    db: Session = Depends(_get_session_dep),
-    x_tenant_code: Optional[str] = Header(None, alias="X-Tenant-Code"),
-) -> StreamingResponse:
-    tenant = require_tenant_code(x_tenant_code)
-    ensure_tenant_exists(db, tenant)
-
-    # Validacija perioda (test ocekuje 400 kad je from_date > to_date)
+def validate_inspection_period(payload: ExportInspectionRequest) -> None:
+    # test ocekuje 400 kad je from_date > to_date
     if payload.from_date > payload.to_date:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid period: from_date cannot be after to_date",
         )
 
-    suffix = _period_suffix(payload.from_date, payload.to_date)
 
-    buffer = BytesIO()
-    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-        if payload.include_outgoing_invoices_pdf:
-            _add_pdf(
-                zf,
-                f"01_invoices_outgoing/outgoing_invoices_{suffix}.pdf",
-                "Izlazne fakture",
-            )
+def _iter_inspection_entries(
+    sections: List[Tuple[str, Future]],
+    attachments: List[Tuple[str, Path, int]],
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> Iterator[ZipStreamEntry]:
+    """
+    PDF sekcije (redom, čim je svaka gotova), pa originalni prilozi.
 
-        if payload.include_input_invoices_pdf:
-            _add_pdf(
-                zf,
-                f"02_invoices_incoming/input_invoices_{suffix}.pdf",
-                "Ulazni racuni",
-            )
+    `on_progress(0..100)` se zove nakon svake predate stavke (pozadinski
+    export posao). Ako se stream prekine (klijent odustane), sekcije koje
+    još nisu počele se otkazuju, a temp fajlovi ostalih se zatvaraju.
+    """
+    total = len(sections) + len(attachments)
+    done = 0
+
+    def _advance() -> None:
+        nonlocal done
+        done += 1
+        if on_progress is not None:
+            on_progress(done * 100 // total)
+
+    try:
+        for arcname, future in sections:
+            spooled = future.result()
+            try:
+                size = spooled.seek(0, os.SEEK_END)
+                spooled.seek(0)
+                yield ZipStreamEntry(arcname, iter_file_chunks(spooled), size=size)
+            finally:
+                spooled.close()
+            _advance()
+
+        for arcname, path, size in attachments:
+            yield ZipStreamEntry(arcname, iter_path_chunks(path), size=size)
+            _advance()
+    finally:
+        for _, future in sections:
+            if not future.cancel():
+                future.add_done_callback(_discard_section)
+
+
+def iter_inspection_zip(
+    db: Session,
+    tenant: str,
+    payload: ExportInspectionRequest,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> Iterator[bytes]:
+    """
+    Pokreće renderovanje sekcija (odmah, paralelno) i vraća ZIP kao niz
+    chunk-ova. `db` se koristi samo za listu priloga, prije prvog chunk-a.
 
-        if payload.include_kpr_pdf:
-            _add_pdf(
-                zf,
-                f"03_kpr/KPR_{suffix}.pdf",
-                "KPR (Knjiga prihoda i rashoda)",
-            )
+    Koriste ga /export/inspection i pozadinski export posao `inspection`.
+    """
+    suffix = _period_suffix(payload.from_date, payload.to_date)
 
-        if payload.include_promet_pdf:
-            _add_pdf(
-                zf,
-                f"04_promet/knjiga_prometa_{suffix}.pdf",
-                "Knjiga prometa",
-            )
+    attachments: List[Tuple[str, Path, int]] = []
+    if payload.include_attachments:
+        attachments = _collect_attachment_files(db, tenant, payload.from_date, payload.to_date)
 
-        if payload.include_cash_bank_pdf:
-            _add_pdf(
-                zf,
-                f"05_cash_bank/cash_bank_{suffix}.pdf",
-                "Cash/Bank",
-            )
+    sections = [
+        (
+            path.format(suffix=suffix),
+            _inspection_pdf_pool.submit(_render_section, render, tenant, payload.from_date, payload.to_date),
+        )
+        for flag, path, render in _INSPECTION_SECTIONS
+        if getattr(payload, flag)
+    ]
+
+    return iter_zip_chunks(_iter_inspection_entries(sections, attachments, on_progress))
 
-        if payload.include_taxes_pdf:
-            _add_pdf(
-                zf,
-                f"06_taxes/taxes_{suffix}.pdf",
-                "Porezi",
-            )
 
-    buffer.seek(0)
+@router.post(
+    "/export/inspection",
+    summary="ZIP export za inspekciju (PDF bundle)",
+    description=(
+        "ZIP sa PDF izvještajima za period `from_date..to_date` (izlazne fakture, "
+        "ulazni računi, KPR, knjiga prometa, blagajna/banka, porezi) i originalnim "
+        "prilozima faktura iz tog perioda (`07_attachments/`).\n\n"
+        "Arhiva se šalje kao stream dok nastaje – PDF sekcije se renderuju paralelno, "
+        "a prilozi se čitaju sa diska u chunk-ovima.\n\n"
+        "Za velike periode: `POST /exports/jobs` sa `kind=inspection` (pozadinski export)."
+    ),
+)
+def export_inspection_zip(
+    payload: ExportInspectionRequest,
+    db: Session = Depends(_get_session_dep),
+    x_tenant_code: Optional[str] = Header(None, alias="X-Tenant-Code"),
+) -> StreamingResponse:
+    tenant = require_tenant_code(x_tenant_code)
+    validate_inspection_period(payload)
 
     filename = _zip_filename(tenant, payload.from_date, payload.to_date)
     headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
 
     return StreamingResponse(
-        buffer,
+        iter_inspection_zip(db, tenant, payload),
         media_type="application/zip",
         headers=headers,
     )
@@ -0,0 +1,196 @@
+# /home/miso/dev/sp-app/sp-app/backend/app/routes/export_jobs.py
+from __future__ import annotations
+
+from typing import BinaryIO, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from fastapi.responses import FileResponse
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.db import get_session as _get_session_dep
+from app.models import ExportJob
+from app.routes.export import (
+    ExportInspectionRequest,
+    _zip_filename,
+    iter_inspection_zip,
+    validate_inspection_period,
+)
+from app.routes.invoices import (
+    invoice_export_rows,
+    iter_invoices_export_csv,
+)
+from app.routes.kpr import KPR_CSV_HEADER, kpr_csv_rows, kpr_export_filename, write_kpr_pdf
+from app.routes.tax import YEARLY_TAX_CSV_HEADER, yearly_tax_csv_row, yearly_tax_preview
+from app.schemas.export_job import (
+    ExportJobCreate,
+    ExportJobRead,
+    InvoicesExportParams,
+    KprExportParams,
+    TaxYearlyExportParams,
+)
+from app.services.csv_stream import iter_csv_chunks
+from app.services.export_jobs import (
+    ExportArtifact,
+    ProgressCallback,
+    UnknownExportKindError,
+    artifact_file,
+    enqueue_export_job,
+    register_export_kind,
+    write_chunks,
+)
+from app.tenant_security import ensure_tenant_exists, require_tenant_code
+
+router = APIRouter(tags=["exports"])
+
+
+# ======================================================
+#  RUNNER-I PO VRSTI EXPORTA
+# ======================================================
+#
+# Svaki runner radi isto što i odgovarajuća inline ruta, samo piše u fajl
+# (vidi app/services/export_jobs.py). `params` su već normalizovani.
+
+
+@register_export_kind("inspection", ExportInspectionRequest, validate=validate_inspection_period)
+def _run_inspection(db: Session, tenant: str, params: dict, out: BinaryIO, progress: ProgressCallback) -> ExportArtifact:
+    payload = ExportInspectionRequest.model_validate(params)
+    write_chunks(out, iter_inspection_zip(db, tenant, payload, on_progress=progress))
+    return ExportArtifact(_zip_filename(tenant, payload.from_date, payload.to_date), "application/zip")
+
+
+@register_export_kind("kpr_pdf", KprExportParams)
+def _run_kpr_pdf(db: Session, tenant: str, params: dict, out: BinaryIO, progress: ProgressCallback) -> ExportArtifact:
+    p = KprExportParams.model_validate(params)
+    write_kpr_pdf(db, tenant, p.year, p.month, out)
+    return ExportArtifact(kpr_export_filename(tenant, p.year, p.month, "pdf"), "application/pdf")
+
+
+@register_export_kind("kpr_csv", KprExportParams)
+def _run_kpr_csv(db: Session, tenant: str, params: dict, out: BinaryIO, progress: ProgressCallback) -> ExportArtifact:
+    p = KprExportParams.model_validate(params)
+    chunks = iter_csv_chunks(kpr_csv_rows(db, tenant, p.year, p.month), header=KPR_CSV_HEADER, bom=True)
+    write_chunks(out, chunks)
+    return ExportArtifact(kpr_export_filename(tenant, p.year, p.month, "csv"), "text/csv; charset=utf-8")
+
+
+@register_export_kind("invoices_csv", InvoicesExportParams)
+def _run_invoices_csv(db: Session, tenant: str, params: dict, out: BinaryIO, progress: ProgressCallback) -> ExportArtifact:
+    p = InvoicesExportParams.model_validate(params)
+    write_chunks(out, iter_invoices_export_csv(invoice_export_rows(db, tenant, **p.model_dump())))
+    return ExportArtifact("invoices-export.csv", "text/csv; charset=utf-8")
+
+
+@register_export_kind("tax_yearly_csv", TaxYearlyExportParams)
+def _run_tax_yearly_csv(db: Session, tenant: str, params: dict, out: BinaryIO, progress: ProgressCallback) -> ExportArtifact:
+    p = TaxYearlyExportParams.model_validate(params)
+    summary = yearly_tax_preview(year=p.year, x_tenant_code=tenant, db=db)
+    write_chunks(out, iter_csv_chunks([yearly_tax_csv_row(summary)], header=YEARLY_TAX_CSV_HEADER))
+    return ExportArtifact(f"tax-yearly-{summary.tenant_code}-{summary.year}.csv", "text/csv")
+
+
+# ======================================================
+#  HELPERS
+# ======================================================
+
+
+def _job_read(job: ExportJob, *, reused: bool = False) -> ExportJobRead:
+    data = ExportJobRead.model_validate(job)
+    if job.status == "done":
+        data.download_url = f"/exports/jobs/{job.id}/download"
+    data.reused = reused
+    return data
+
+
+def _get_tenant_job(db: Session, tenant: str, job_id: int) -> ExportJob:
+    job = db.get(ExportJob, job_id)
+    if job is None or job.tenant_code != tenant:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job
+
+
+# ======================================================
+#  API
+# ======================================================
+
+
+@router.post(
+    "/exports/jobs",
+    response_model=ExportJobRead,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Pokreni pozadinski export",
+    description=(
+        "Stavlja export u red (`status=queued`) i odmah vraća posao (202). "
+        "Worker proces ga renderuje u fajl; stanje se prati preko "
+        "`GET /exports/jobs/{id}`, a gotov fajl preuzima sa `/download`.\n\n"
+        "Vrste: `inspection` (body kao /export/inspection), `kpr_pdf` i `kpr_csv` "
+        "(kao /kpr/export i /kpr/export-excel), `invoices_csv` (kao /invoices/export), "
+        "`tax_yearly_csv` (kao /tax/yearly/export).\n\n"
+        "Ako isti zahtjev za nepromijenjene podatke tenanta već postoji (u redu, u radu "
+        "ili gotov), vraća se taj posao sa `reused=true` i statusom 200."
+    ),
+)
+def create_export_job(
+    payload: ExportJobCreate,
+    response: Response,
+    db: Session = Depends(_get_session_dep),
+    x_tenant_code: Optional[str] = Header(None, alias="X-Tenant-Code"),
+) -> ExportJobRead:
+    tenant = require_tenant_code(x_tenant_code)
+    ensure_tenant_exists(db, tenant)
+
+    try:
+        job, reused = enqueue_export_job(db, tenant, payload.kind, payload.params)
+    except UnknownExportKindError:
+        raise HTTPException(status_code=400, detail=f"Unknown export kind: {payload.kind}")
+    except ValidationError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=exc.errors(include_url=False, include_context=False),
+        )
+
+    if reused:
+        response.status_code = status.HTTP_200_OK
+    return _job_read(job, reused=reused)
+
+
+@router.get(
+    "/exports/jobs/{job_id}",
+    response_model=ExportJobRead,
+    summary="Stanje pozadinskog exporta",
+    description="Status (`queued` / `running` / `done` / `failed`) i napredak u procentima.",
+)
+def get_export_job(
+    job_id: int,
+    db: Session = Depends(_get_session_dep),
+    x_tenant_code: Optional[str] = Header(None, alias="X-Tenant-Code"),
+) -> ExportJobRead:
+    tenant = require_tenant_code(x_tenant_code)
+    return _job_read(_get_tenant_job(db, tenant, job_id))
+
+
+@router.get(
+    "/exports/jobs/{job_id}/download",
+    response_class=FileResponse,
+    summary="Preuzmi gotov export",
+    description=(
+        "Vraća fajl gotovog exporta. Dok posao nije `done` vraća 409; "
+        "ako je fajl u međuvremenu obrisan (istekao), 410."
+    ),
+)
+def download_export_job(
+    job_id: int,
+    db: Session = Depends(_get_session_dep),
+    x_tenant_code: Optional[str] = Header(None, alias="X-Tenant-Code"),
+) -> FileResponse:
+    tenant = require_tenant_code(x_tenant_code)
+    job = _get_tenant_job(db, tenant, job_id)
+
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Export job is not finished (status: {job.status})")
+
+    path = artifact_file(job)
+    if path is None or not path.is_file():
+        raise HTTPException(status_code=410, detail="Export artifact is no longer available")
+
+    return FileResponse(path, media_type=job.media_type, filename=job.filename)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 
-from app.db import db_ping
+from app.db import db_ping, pool_stats
+from app.services.response_cache import response_cache
 
 router = APIRouter(tags=["health"])
 
@@ -30,3 +31,30 @@ def db_health():
     # samo ping; test očekuje baš {"db": "ok"}
     db_ping()
     return {"db": "ok"}
+
+
+@router.get(
+    "/health/cache",
+    summary="Statistika keša odgovora",
+    description=(
+        "Brojači keša odgovora (dashboard / SAM / reports) za tekući proces: "
+        "backend, `hits`, `misses`, `hit_ratio` i – za memory backend – broj "
+        "unosa, zauzeće u bajtovima i broj izbačenih (LRU) unosa."
+    ),
+)
+def response_cache_stats():
+    return response_cache.stats()
+
+
+@router.get(
+    "/health/db-pool",
+    summary="Stanje connection pool-a",
+    description=(
+        "Za sync (psycopg2) i async (asyncpg) engine tekućeg procesa: veličina "
+        "pool-a, `checked_out` / `checked_in` konekcije, trenutni `overflow`, "
+        "broj checkout-a i timeout-a te prosječno/maksimalno čekanje na "
+        "konekciju (`wait_ms_avg`, `wait_ms_max`)."
+    ),
+)
+def db_pool_stats():
+    return pool_stats()
@@ -1,31 +1,54 @@
 # /home/miso/dev/sp-app/sp-app/backend/app/routes/input_invoices.py
 from __future__ import annotations
 
-from datetime import date
-from typing import List, Optional
+from datetime import date, datetime, timezone
+from typing import List, Literal, Optional
 
 from fastapi import (
     APIRouter,
     Depends,
+    File,
     Header,
     HTTPException,
     Query,
     Response,
+    UploadFile,
     status,
 )
-from sqlalchemy import select, func
+from sqlalchemy import literal_column, select, func, tuple_
 # NOTE: func koristi se za year/month ekstrakcije i count
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db import get_session as _get_session_dep
-from app.models import InputInvoice, FinalizedPeriodModificationError
+from app.db import get_async_session, get_session as _get_session_dep
+from app.models import (
+    InputInvoice,
+    FinalizedPeriodModificationError,
+    apply_merged_rollup_deltas,
+    bump_tenant_data_versions,
+    load_finalized_periods,
+    merge_rollup_deltas,
+)
+from app.pagination import cached_list_total, keyset_filters, split_page
+from app.period_filters import period_filters
+from app.schemas.bulk_import import BulkImportReport
 from app.schemas.input_invoice import (
     InputInvoiceCreate,
     InputInvoiceRead,
     InputInvoiceListResponse,
     InputInvoiceUpdate,
 )
+from app.services.bulk_import import (
+    BulkImportCollector,
+    BulkImportFormatError,
+    iter_records,
+    iter_valid_batches,
+    resolve_bulk_format,
+)
+from app.services.ledger_rollups import rebuild_monthly_rollups
+from app.services.search import prefix_filter
 from app.tenant_security import require_tenant_code, ensure_tenant_exists
 
 router = APIRouter(
@@ -197,6 +220,237 @@ def create_input_invoice_slash(
     return create_input_invoice(payload=payload, db=db, x_tenant_code=x_tenant_code)
 
 
+# ======================================================
+#  BULK IMPORT (NDJSON / CSV / XLSX) + UPSERT PO DOBAVLJAČU
+# ======================================================
+
+
+# Kolone koje upsert ne dira: ključ (uq_input_invoice_per_supplier_tenant) i vrijeme kreiranja
+_BULK_UPSERT_FIXED_COLUMNS = {"id", "tenant_code", "supplier_name", "invoice_number", "created_at"}
+
+
+def _bulk_input_invoice_row(tenant: str, payload: InputInvoiceCreate, created_at: datetime) -> dict:
+    """
+    Isto mapiranje kao `create_input_invoice` (posting_date default, prazna kategorija → None).
+    """
+    data = payload.model_dump()
+    if not data.get("posting_date") and data.get("issue_date"):
+        data["posting_date"] = data["issue_date"]
+    if data.get("expense_category") == "":
+        data["expense_category"] = None
+    data["tenant_code"] = tenant
+    data["created_at"] = created_at
+    return data
+
+
+def _existing_input_invoices(
+    db: Session,
+    tenant: str,
+    keys: list[tuple[str, str]],
+    *,
+    for_update: bool,
+) -> dict[tuple[str, str], dict]:
+    """
+    Postojeće fakture za (supplier_name, invoice_number) ključeve jednog batch-a.
+
+    Za upsert ih zaključavamo (FOR UPDATE), pa stare vrijednosti za rollup
+    i provjeru finalizovanog mjeseca ostaju tačne do commit-a.
+    """
+    stmt = select(
+        InputInvoice.supplier_name,
+        InputInvoice.invoice_number,
+        InputInvoice.issue_date,
+        InputInvoice.total_amount,
+    ).where(
+        InputInvoice.tenant_code == tenant,
+        tuple_(InputInvoice.supplier_name, InputInvoice.invoice_number).in_(keys),
+    )
+    if for_update:
+        stmt = stmt.with_for_update()
+
+    return {
+        (supplier_name, invoice_number): {
+            "tenant_code": tenant,
+            "issue_date": issue_date,
+            "total_amount": total_amount,
+        }
+        for supplier_name, invoice_number, issue_date, total_amount in db.execute(stmt)
+    }
+
+
+def _bulk_upsert_statement(rows: list[dict], on_conflict: str):
+    table = InputInvoice.__table__
+    stmt = pg_insert(table)
+    key = (table.c.supplier_name, table.c.invoice_number)
+
+    if on_conflict == "update":
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_input_invoice_per_supplier_tenant",
+            set_={c: stmt.excluded[c] for c in rows[0] if c not in _BULK_UPSERT_FIXED_COLUMNS},
+        )
+        # xmax = 0 → red je upravo upisan; inače je ažuriran postojeći
+        return stmt.returning(*key, literal_column("(xmax = 0)").label("inserted"))
+
+    stmt = stmt.on_conflict_do_nothing(constraint="uq_input_invoice_per_supplier_tenant")
+    return stmt.returning(*key, literal_column("true").label("inserted"))
+
+
+@router.post(
+    "/input-invoices/bulk",
+    response_model=BulkImportReport,
+    summary="Bulk import ulaznih faktura (NDJSON, CSV ili XLSX)",
+    description=(
+        "Uvozi veći broj ulaznih faktura iz jednog fajla u **jednoj transakciji** "
+        "(npr. godina troškova iz portala dobavljača).\n\n"
+        "Podržani formati (kolone/polja kao `POST /input-invoices`):\n"
+        "- **NDJSON** – jedan JSON objekat po liniji,\n"
+        "- **CSV** sa header linijom (delimiter `,` ili `;`),\n"
+        "- **XLSX** – prvi sheet, prvi red je header.\n\n"
+        "Postojeća faktura (isti `supplier_name` + `invoice_number` za tenanta):\n"
+        "- `on_conflict=skip` (default) → red se preskače (`skipped`),\n"
+        "- `on_conflict=update` → faktura se ažurira (`updated`).\n\n"
+        "Redovi u finalizovanom poreskom mjesecu (novi ili postojeći datum), nevalidni "
+        "redovi i duplikati unutar fajla vraćaju se u `errors`. Sa `atomic=true` ništa "
+        "se ne upisuje ako je ijedan red odbijen."
+    ),
+    responses={  # type: ignore[assignment]
+        200: {"description": "Izvještaj o importu (inserted / updated / skipped / failed)."},
+        400: {
+            "description": "Nedostaje `X-Tenant-Code` header ili format fajla nije podržan.",
+        },
+    },
+)
+def bulk_import_input_invoices(
+    db: Session = Depends(_get_session_dep),
+    x_tenant_code: Optional[str] = Header(
+        None,
+        alias="X-Tenant-Code",
+        description="Šifra tenanta za kojeg se uvoze ulazne fakture.",
+    ),
+    file: UploadFile = File(..., description="NDJSON, CSV ili XLSX fajl sa ulaznim fakturama."),
+    import_format: Optional[str] = Query(
+        None,
+        alias="format",
+        description="`ndjson`, `csv` ili `xlsx`; ako nije zadat, određuje se iz fajla.",
+    ),
+    on_conflict: Literal["skip", "update"] = Query(
+        "skip",
+        description="Šta raditi sa fakturom koja već postoji: `skip` ili `update`.",
+    ),
+    atomic: bool = Query(
+        False,
+        description="Ako je `true`, import se poništava čim je ijedan red odbijen.",
+    ),
+) -> BulkImportReport:
+    """
+    Bulk import ulaznih faktura sa upsert-om po (tenant, dobavljač, broj fakture).
+
+    - batch-evi idu kao INSERT ... ON CONFLICT DO NOTHING / DO UPDATE,
+    - finalizovani mjeseci se učitaju jednim upitom, a postojeće fakture
+      jednim upitom po batch-u,
+    - mjesečni rollup se ažurira jednom po (godina, mjesec) na kraju.
+    """
+    tenant = _require_tenant(x_tenant_code)
+
+    try:
+        fmt = resolve_bulk_format(import_format, file.content_type, file.filename)
+        records = iter_records(file.file, fmt)
+    except BulkImportFormatError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    _ensure_tenant_exists(db, tenant)
+
+    finalized = load_finalized_periods(db.connection(), [tenant])[tenant]
+    created_at = datetime.now(timezone.utc)
+    collector = BulkImportCollector()
+    rollup_deltas: dict[tuple, dict[str, object]] = {}
+    rebuild_rollups = False
+    seen: dict[tuple[str, str], int] = {}
+
+    def _locked(d: date) -> Optional[str]:
+        if (d.year, d.month) in finalized:
+            return str(FinalizedPeriodModificationError(tenant, d.year, d.month))
+        return None
+
+    try:
+        for batch in iter_valid_batches(records, InputInvoiceCreate, collector):
+            candidates: dict[tuple[str, str], tuple[int, dict]] = {}
+            for line, payload in batch:
+                key = (payload.supplier_name, payload.invoice_number)
+                if key in seen:
+                    collector.reject(line, [f"Duplicate of line {seen[key]} (supplier_name + invoice_number)"])
+                    continue
+                seen[key] = line
+
+                error = _locked(payload.issue_date)
+                if error:
+                    collector.reject(line, [error])
+                    continue
+                candidates[key] = (line, _bulk_input_invoice_row(tenant, payload, created_at))
+
+            if not candidates:
+                continue
+
+            existing = _existing_input_invoices(
+                db, tenant, list(candidates), for_update=on_conflict == "update"
+            )
+
+            rows = []
+            for key, (line, row) in candidates.items():
+                old = existing.get(key)
+                if old is not None:
+                    if on_conflict == "skip":
+                        collector.skipped += 1
+                        continue
+                    error = _locked(old["issue_date"])
+                    if error:
+                        collector.reject(line, [error])
+                        continue
+                rows.append(row)
+
+            if not rows:
+                continue
+
+            written = 0
+            for supplier_name, invoice_number, inserted in db.execute(
+                _bulk_upsert_statement(rows, on_conflict), rows
+            ):
+                key = (supplier_name, invoice_number)
+                written += 1
+                merge_rollup_deltas(rollup_deltas, "input_invoice", candidates[key][1])
+                if inserted:
+                    collector.inserted += 1
+                    continue
+
+                collector.updated += 1
+                old = existing.get(key)
+                if old is None:
+                    # upisan paralelno nakon našeg SELECT-a – stare vrijednosti ne znamo
+                    rebuild_rollups = True
+                else:
+                    merge_rollup_deltas(rollup_deltas, "input_invoice", old, -1)
+
+            # ON CONFLICT DO NOTHING za fakture upisane paralelno nakon SELECT-a
+            collector.skipped += len(rows) - written
+
+        if atomic and collector.failed:
+            db.rollback()
+            collector.inserted = collector.updated = collector.skipped = 0
+        else:
+            if rebuild_rollups:
+                rebuild_monthly_rollups(db, tenant_code=tenant)
+            else:
+                apply_merged_rollup_deltas(db.connection(), rollup_deltas)
+            if collector.inserted or collector.updated:
+                bump_tenant_data_versions(db.connection(), [tenant])
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return collector.report()
+
+
 # ======================================================
 #  LIST (klasična lista)
 # ======================================================
@@ -262,7 +516,7 @@ def list_input_invoices(
     if date_to is not None:
         stmt = stmt.where(InputInvoice.issue_date <= date_to)
     if supplier_name:
-        stmt = stmt.where(InputInvoice.supplier_name.ilike(f"{supplier_name}%"))
+        stmt = stmt.where(prefix_filter(InputInvoice.supplier_name, supplier_name))
 
     stmt = (
         stmt.order_by(InputInvoice.issue_date.desc(), InputInvoice.id.desc())
@@ -307,6 +561,26 @@ def list_input_invoices_slash(
 # ======================================================
 
 
+def _input_invoices_ui_filters(
+    tenant: str,
+    year: Optional[int],
+    month: Optional[int],
+    supplier_name: Optional[str],
+    expense_category: Optional[str],
+) -> list:
+    """
+    WHERE uslovi za /input-invoices/list (range po issue_date →
+    ix_input_invoices_tenant_issue_date).
+    """
+    base_filters = [InputInvoice.tenant_code == tenant]
+    base_filters.extend(period_filters(InputInvoice.issue_date, year=year, month=month))
+    if supplier_name:
+        base_filters.append(prefix_filter(InputInvoice.supplier_name, supplier_name))
+    if expense_category:
+        base_filters.append(InputInvoice.expense_category == expense_category)
+    return base_filters
+
+
 @router.get(
     "/input-invoices/list",
     response_model=InputInvoiceListResponse,
@@ -316,7 +590,10 @@ def list_input_invoices_slash(
         "- vraća objekt sa `total` i `items` listom,\n"
         "- podržava filtere `year`, `month`, `supplier_name`, `expense_category`, `limit`, `offset`.\n\n"
         "`total` je ukupan broj zapisa koji zadovoljavaju filtere (bez obzira na limit),\n"
-        "dok `items` sadrži jednu stranicu podataka za prikaz u UI-ju."
+        "dok `items` sadrži jednu stranicu podataka za prikaz u UI-ju.\n\n"
+        "Za infinite scroll koristiti `cursor` (vrijednost `next_cursor` iz prethodnog odgovora): "
+        "svaka stranica je jednako brza, bez obzira koliko je duboko. "
+        "`total` se kešira po verziji podataka tenanta, a uz `include_total=false` se ne računa."
     ),
     responses={  # type: ignore[assignment]
         200: {
@@ -370,8 +647,8 @@ def list_input_invoices_slash(
         },
     },
 )
-def list_input_invoices_ui(
-    db: Session = Depends(_get_session_dep),
+async def list_input_invoices_ui(
+    db: AsyncSession = Depends(get_async_session),
     x_tenant_code: Optional[str] = Header(
         None,
         alias="X-Tenant-Code",
@@ -408,40 +685,51 @@ def list_input_invoices_ui(
         ge=0,
         description="Offset za paginaciju (broj redova koje preskačemo).",
     ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Kursor iz `next_cursor` prethodne stranice (keyset paginacija); ako je zadat, `offset` se ignoriše.",
+    ),
+    include_total: bool = Query(
+        True,
+        description="Ako je `false`, `total` se ne računa (null) – za infinite scroll nakon prve stranice.",
+    ),
 ) -> InputInvoiceListResponse:
     """
     UI lista ulaznih faktura – vraća total + items.
     """
     tenant = _require_tenant(x_tenant_code)
 
-    base_filters = [InputInvoice.tenant_code == tenant]
-
-    if year is not None:
-        base_filters.append(func.extract("year", InputInvoice.issue_date) == year)
-    if month is not None:
-        base_filters.append(func.extract("month", InputInvoice.issue_date) == month)
-    if supplier_name:
-        base_filters.append(InputInvoice.supplier_name.ilike(f"{supplier_name}%"))
-    if expense_category:
-        base_filters.append(InputInvoice.expense_category == expense_category)
+    base_filters = _input_invoices_ui_filters(tenant, year, month, supplier_name, expense_category)
 
     # total (bez limita/offseta)
     total_stmt = select(func.count()).select_from(InputInvoice).where(*base_filters)
-    total = db.execute(total_stmt).scalar_one()
 
-    # page items
+    # page items (+1 red da znamo ima li sljedeće stranice)
     items_stmt = (
         select(InputInvoice)
-        .where(*base_filters)
+        .where(*base_filters, *keyset_filters(InputInvoice.issue_date, InputInvoice.id, cursor))
         .order_by(InputInvoice.issue_date.desc(), InputInvoice.id.desc())
-        .limit(limit)
-        .offset(offset)
+        .limit(limit + 1)
+        .offset(0 if cursor else offset)
     )
-    rows = db.execute(items_stmt).scalars().all()
+
+    # stranica pa (keširan) total – redom, na sesiji zahtjeva
+    result = await db.scalars(items_stmt)
+    total = None
+    if include_total:
+        params = {
+            "year": year,
+            "month": month,
+            "supplier_name": supplier_name,
+            "expense_category": expense_category,
+        }
+        total = await cached_list_total(db, tenant, "input_invoices.list.total", params, total_stmt)
+    rows, next_cursor = split_page(result.all(), limit, "issue_date")
 
     return InputInvoiceListResponse(
-        total=int(total),
+        total=total,
         items=rows,
+        next_cursor=next_cursor,
     )
 
 
@@ -449,8 +737,8 @@ def list_input_invoices_ui(
     "/input-invoices/list/",
     include_in_schema=False,
 )
-def list_input_invoices_ui_slash(
-    db: Session = Depends(_get_session_dep),
+async def list_input_invoices_ui_slash(
+    db: AsyncSession = Depends(get_async_session),
     x_tenant_code: Optional[str] = Header(None, alias="X-Tenant-Code"),
     year: Optional[int] = Query(None, ge=2000, le=2100),
     month: Optional[int] = Query(None, ge=1, le=12),
@@ -458,11 +746,13 @@ def list_input_invoices_ui_slash(
     expense_category: Optional[str] = Query(None),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(True),
 ):
     """
     Alias za /input-invoices/list sa kosom crtom na kraju.
     """
-    return list_input_invoices_ui(
+    return await list_input_invoices_ui(
         db=db,
         x_tenant_code=x_tenant_code,
         year=year,
@@ -471,6 +761,8 @@ def list_input_invoices_ui_slash(
         expense_category=expense_category,
         limit=limit,
         offset=offset,
+        cursor=cursor,
+        include_total=include_total,
     )
 
 
@@ -22,6 +22,17 @@ from sqlalchemy.orm import Session
 from app.db import get_session as _get_session_dep
 from app.models import Invoice, InvoiceAttachment, InputInvoice
 from app.schemas.invoice_attachment import InvoiceAttachmentRead
+from app.services.attachment_storage import (
+    ATTACHMENT_MAX_BYTES,
+    EmptyUploadError,
+    UploadTooLargeError,
+)
+from app.services.blob_store import (
+    acquire_blob,
+    blob_relative_path,
+    delete_and_release,
+    resolve_stored_file,
+)
 from app.tenant_security import require_tenant_code, ensure_tenant_exists
 
 router = APIRouter(
@@ -33,7 +44,8 @@ router = APIRouter(
 #  CONFIG: LOKALNI FILE STORAGE
 # ======================================================
 
-# Osnovni direktorij za čuvanje fajlova attachment-a.
+# Osnovni direktorij za stare fajlove attachment-a (prije blob store-a,
+# redovi sa sha256 = NULL). Novi upload-i idu u BLOB_STORAGE_DIR.
 # Može se override-ovati preko env var: INVOICE_ATTACHMENTS_DIR
 STORAGE_ROOT = Path(os.getenv("INVOICE_ATTACHMENTS_DIR", "data/invoice_attachments"))
 
@@ -48,11 +60,12 @@ ALLOWED_ATTACHMENT_STATUSES = {
 }
 
 
-def _ensure_storage_root() -> None:
-    """
-    Osigurava da osnovni direktorij za storage postoji.
-    """
-    STORAGE_ROOT.mkdir(parents=True, exist_ok=True)
+def _attachment_too_large() -> HTTPException:
+    max_mb = ATTACHMENT_MAX_BYTES / (1024 * 1024)
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Uploaded file is too large (max {max_mb:g}MB)",
+    )
 
 
 def _safe_filename(original: str | None) -> str:
@@ -126,6 +139,9 @@ def _ensure_tenant_exists(db: Session, code: str) -> None:
                 }
             },
         },
+        413: {
+            "description": "Fajl je veći od dozvoljenog (INVOICE_ATTACHMENT_MAX_BYTES).",
+        },
     },
 )
 def upload_invoice_attachment(
@@ -143,71 +159,74 @@ def upload_invoice_attachment(
     """
     Uploaduje jedan attachment, snima binarni fajl na disk i metapodatke u DB.
 
+    Fajl ide u content-addressed blob store (app/services/blob_store.py):
+    čita se u chunk-ovima (bez držanja cijelog upload-a u memoriji), a isti
+    sadržaj uploadovan više puta čuva se samo jednom.
+    Red u bazi upisujemo tek kada su bajtovi trajno na disku.
+
     API ugovor ostaje isti kao ranije:
     - vraćamo InvoiceAttachmentRead (id, tenant_code, filename, content_type,
       size_bytes, status, created_at, invoice_id, input_invoice_id).
     """
     tenant = _require_tenant(x_tenant_code)
 
-    # Osiguramo da tenant postoji (radi konzistentnosti sa ostatkom sistema)
-    _ensure_tenant_exists(db, tenant)
-
     if file is None:
         # Teoretski ne bi trebalo da se desi jer je 'file' obavezan u FastAPI,
         # ali ostavljamo provjeru radi robusnosti.
         raise HTTPException(status_code=400, detail="File is required")
 
-    # Pročitamo sadržaj fajla u memoriju (za sada je ovo sasvim ok)
-    file_bytes = file.file.read()
-    size_bytes = len(file_bytes)
-
-    if size_bytes == 0:
-        raise HTTPException(
-            status_code=400,
-            detail="Uploaded file is empty",
-        )
+    # Rani reject: nakon parsiranja multipart-a Starlette zna veličinu fajla
+    if file.size is not None and file.size > ATTACHMENT_MAX_BYTES:
+        raise _attachment_too_large()
 
     content_type = file.content_type or "application/octet-stream"
     original_name = _safe_filename(file.filename)
 
-    # Osiguramo da direktorij postoji
-    _ensure_storage_root()
-
-    # 1) Kreiramo red u DB sa privremenim storage_path vrijednostima
-    attachment = InvoiceAttachment(
-        tenant_code=tenant,
-        invoice_id=None,  # još nije povezano sa izlaznom fakturom
-        input_invoice_id=None,  # još nije povezano sa ulaznom fakturom
-        filename=original_name,
-        content_type=content_type,
-        size_bytes=size_bytes,
-        storage_path="__TEMP__",  # placeholder dok ne znamo ID
-        status="uploaded",
-    )
-
-    db.add(attachment)
-    db.flush()  # dobijamo attachment.id iz sekvence
-
-    # 2) Sada znamo ID → gradimo relativnu putanju i snimamo fajl na disk
-    tenant_dir = STORAGE_ROOT / tenant
-    tenant_dir.mkdir(parents=True, exist_ok=True)
-
-    relative_path = f"{tenant}/{attachment.id}_{original_name}"
-    full_path = STORAGE_ROOT / relative_path
+    # Osiguramo da tenant postoji (radi konzistentnosti sa ostatkom sistema)
+    # i zatvorimo read transakciju prije disk I/O.
+    _ensure_tenant_exists(db, tenant)
+    db.commit()
 
+    # 1) Bajtovi → content-addressed blob store: hash prolaz bez pisanja,
+    #    pa se duplikat (isti SHA-256) uopšte ne piše na disk; novi sadržaj
+    #    ide chunk po chunk u temp fajl i atomski na blob putanju.
+    # 2) Red attachment-a + referenca na blob u istoj transakciji, tek kada
+    #    su bajtovi trajno na disku.
     try:
-        full_path.write_bytes(file_bytes)
+        sha256, size_bytes = acquire_blob(db, file.file, max_bytes=ATTACHMENT_MAX_BYTES)
+
+        attachment = InvoiceAttachment(
+            tenant_code=tenant,
+            invoice_id=None,  # još nije povezano sa izlaznom fakturom
+            input_invoice_id=None,  # još nije povezano sa ulaznom fakturom
+            filename=original_name,
+            content_type=content_type,
+            size_bytes=size_bytes,
+            storage_path=blob_relative_path(sha256),
+            sha256=sha256,
+            status="uploaded",
+        )
+        db.add(attachment)
+        db.commit()
+    except UploadTooLargeError:
+        db.rollback()
+        raise _attachment_too_large()
+    except EmptyUploadError:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Uploaded file is empty",
+        )
     except OSError as exc:
-        # Ako snimanje fajla padne, rollback i prijavi grešku
         db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Failed to store attachment file: {exc}",
         ) from exc
+    except Exception:
+        db.rollback()
+        raise
 
-    # 3) Ažuriramo storage_path i commit-ujemo
-    attachment.storage_path = str(relative_path)
-    db.commit()
     db.refresh(attachment)
 
     # FastAPI + Pydantic će od SQLAlchemy objekta napraviti InvoiceAttachmentRead
@@ -256,10 +275,6 @@ def list_invoice_attachments(
     """
     tenant = _require_tenant(x_tenant_code)
 
-    # ensure_tenant_exists ovde nije strogo neophodan za SELECT,
-    # ali ga ipak pozivamo radi konzistentnosti i budućih ekstenzija.
-    _ensure_tenant_exists(db, tenant)
-
     stmt = select(InvoiceAttachment).where(InvoiceAttachment.tenant_code == tenant)
 
     if invoice_id is not None:
@@ -288,7 +303,8 @@ def list_invoice_attachments(
         "Briše jedan attachment ulazne fakture za zadatog tenanta.\n\n"
         "Operacija radi dvije stvari:\n"
         "- briše zapis iz baze (`invoice_attachments`),\n"
-        "- pokušava obrisati i fajl sa disk-a (ako postoji).\n\n"
+        "- skida referencu sa fajla (fajl se briše sa diska tek kada ga "
+        "ne koristi nijedan drugi attachment).\n\n"
         "Ako attachment ne postoji ili ne pripada datom tenantu, vraća se 404."
     ),
 )
@@ -306,9 +322,6 @@ def delete_invoice_attachment(
     """
     tenant = _require_tenant(x_tenant_code)
 
-    # ensure_tenant_exists radi konzistentnosti
-    _ensure_tenant_exists(db, tenant)
-
     stmt = select(InvoiceAttachment).where(
         InvoiceAttachment.id == attachment_id,
         InvoiceAttachment.tenant_code == tenant,
@@ -317,8 +330,9 @@ def delete_invoice_attachment(
     if not attachment:
         raise HTTPException(status_code=404, detail="Attachment not found")
 
-    # Pokušamo obrisati fajl sa diska, ali ne pravimo 500 ako fajl fizički ne postoji.
-    if attachment.storage_path:
+    # Stari fajlovi (van blob store-a): pokušamo obrisati fajl sa diska,
+    # ali ne pravimo 500 ako fajl fizički ne postoji.
+    if not attachment.sha256 and attachment.storage_path:
         full_path = STORAGE_ROOT / attachment.storage_path
         try:
             if full_path.exists():
@@ -328,8 +342,8 @@ def delete_invoice_attachment(
             # bitno je da se biznis entitet skloni iz sistema.
             pass
 
-    db.delete(attachment)
-    db.commit()
+    # Blob se briše tek kada nestane zadnja referenca na njega
+    delete_and_release(db, attachment)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -370,9 +384,6 @@ def download_invoice_attachment(
     """
     tenant = _require_tenant(x_tenant_code)
 
-    # ensure_tenant_exists radi konzistentnosti
-    _ensure_tenant_exists(db, tenant)
-
     stmt = select(InvoiceAttachment).where(
         InvoiceAttachment.id == attachment_id,
         InvoiceAttachment.tenant_code == tenant,
@@ -381,11 +392,8 @@ def download_invoice_attachment(
     if not attachment:
         raise HTTPException(status_code=404, detail="Attachment not found")
 
-    if not attachment.storage_path:
-        raise HTTPException(status_code=404, detail="File not found")
-
-    full_path = STORAGE_ROOT / attachment.storage_path
-    if not full_path.exists():
+    full_path = resolve_stored_file(attachment.sha256, attachment.storage_path, STORAGE_ROOT)
+    if full_path is None or not full_path.exists():
         raise HTTPException(status_code=404, detail="File not found")
 
     media_type = attachment.content_type or "application/octet-stream"
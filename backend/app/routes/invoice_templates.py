@@ -0,0 +1,181 @@
+# /home/miso/dev/sp-app/sp-app/backend/app/routes/invoice_templates.py
+from __future__ import annotations
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db import get_session as _get_session_dep
+from app.models import InvoiceTemplate
+from app.schemas.invoice_template import (
+    InvoiceTemplateCreate,
+    InvoiceTemplateRead,
+    InvoiceTemplateUpdate,
+)
+from app.tenant_security import require_tenant_code, ensure_tenant_exists
+
+router = APIRouter(
+    tags=["invoices"],
+)
+
+
+# ======================================================
+#  ŠABLONI PONAVLJAJUĆIH FAKTURA
+# ======================================================
+#
+# Ovdje se šabloni samo uređuju; fakture iz njih izdaje scheduler
+# (app/services/recurring_invoices.py) – u API procesu ili kao CLI.
+
+
+def _get_template(db: Session, tenant: str, template_id: int) -> InvoiceTemplate:
+    obj = db.execute(
+        select(InvoiceTemplate).where(
+            InvoiceTemplate.id == template_id,
+            InvoiceTemplate.tenant_code == tenant,
+        )
+    ).scalars().first()
+    if obj is None:
+        raise HTTPException(status_code=404, detail="Invoice template not found")
+    return obj
+
+
+@router.post(
+    "/invoice-templates",
+    response_model=InvoiceTemplateRead,
+    status_code=status.HTTP_201_CREATED,
+    summary="Kreiraj šablon ponavljajuće fakture",
+    description=(
+        "Kreira šablon iz kojeg scheduler automatski izdaje fakture "
+        "(mjesečno, kvartalno ili godišnje), počevši od `first_run`.\n\n"
+        "Brojeve faktura dodjeljuje server iz brojača tenanta (format iz `PUT /settings/profile`, "
+        "default `<godina>-<redni broj>`)."
+    ),
+)
+def create_invoice_template(
+    payload: InvoiceTemplateCreate,
+    db: Session = Depends(_get_session_dep),
+    x_tenant_code: Optional[str] = Header(None, alias="X-Tenant-Code"),
+) -> InvoiceTemplate:
+    tenant = require_tenant_code(x_tenant_code)
+    ensure_tenant_exists(db, tenant)
+
+    if payload.end_date is not None and payload.end_date < payload.first_run:
+        raise HTTPException(status_code=400, detail="end_date must not be before first_run")
+
+    obj = InvoiceTemplate(
+        tenant_code=tenant,
+        name=payload.name,
+        buyer_name=payload.buyer_name,
+        buyer_address=payload.buyer_address,
+        note=payload.note,
+        items=[item.model_dump(mode="json") for item in payload.items],
+        cadence=payload.cadence,
+        anchor_day=payload.first_run.day,
+        due_days=payload.due_days,
+        next_run=payload.first_run,
+        end_date=payload.end_date,
+    )
+    db.add(obj)
+    db.commit()
+    db.refresh(obj)
+    return obj
+
+
+@router.get(
+    "/invoice-templates",
+    response_model=List[InvoiceTemplateRead],
+    summary="Lista šablona ponavljajućih faktura",
+)
+def list_invoice_templates(
+    db: Session = Depends(_get_session_dep),
+    x_tenant_code: Optional[str] = Header(None, alias="X-Tenant-Code"),
+    active: Optional[bool] = Query(None, description="Filter po `is_active`."),
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+) -> List[InvoiceTemplate]:
+    tenant = require_tenant_code(x_tenant_code)
+
+    stmt = select(InvoiceTemplate).where(InvoiceTemplate.tenant_code == tenant)
+    if active is not None:
+        stmt = stmt.where(InvoiceTemplate.is_active.is_(active))
+    stmt = stmt.order_by(InvoiceTemplate.id).offset(offset).limit(limit)
+    return db.execute(stmt).scalars().all()
+
+
+@router.get(
+    "/invoice-templates/{template_id}",
+    response_model=InvoiceTemplateRead,
+    summary="Detalji šablona ponavljajuće fakture",
+)
+def get_invoice_template(
+    template_id: int,
+    db: Session = Depends(_get_session_dep),
+    x_tenant_code: Optional[str] = Header(None, alias="X-Tenant-Code"),
+) -> InvoiceTemplate:
+    tenant = require_tenant_code(x_tenant_code)
+    return _get_template(db, tenant, template_id)
+
+
+@router.patch(
+    "/invoice-templates/{template_id}",
+    response_model=InvoiceTemplateRead,
+    summary="Izmijeni ili pauziraj šablon",
+    description=(
+        "Djelimična izmjena šablona; već izdate fakture se ne mijenjaju.\n\n"
+        "`is_active=false` pauzira izdavanje, a nova vrijednost `next_run` "
+        "određuje i dan u mjesecu za naredne termine."
+    ),
+)
+def update_invoice_template(
+    template_id: int,
+    payload: InvoiceTemplateUpdate,
+    db: Session = Depends(_get_session_dep),
+    x_tenant_code: Optional[str] = Header(None, alias="X-Tenant-Code"),
+) -> InvoiceTemplate:
+    tenant = require_tenant_code(x_tenant_code)
+    obj = _get_template(db, tenant, template_id)
+
+    update_data = payload.model_dump(exclude_unset=True, mode="json")
+    if "items" in update_data and update_data["items"] is None:
+        raise HTTPException(status_code=400, detail="items must not be null")
+    if "next_run" in update_data:
+        if payload.next_run is None:
+            raise HTTPException(status_code=400, detail="next_run must not be null")
+        update_data["next_run"] = payload.next_run
+        update_data["anchor_day"] = payload.next_run.day
+    if "end_date" in update_data:
+        update_data["end_date"] = payload.end_date
+    for field_name in ("name", "buyer_name", "cadence", "is_active"):
+        if field_name in update_data and update_data[field_name] is None:
+            raise HTTPException(status_code=400, detail=f"{field_name} must not be null")
+
+    for field_name, value in update_data.items():
+        setattr(obj, field_name, value)
+
+    if obj.end_date is not None and obj.end_date < obj.next_run and obj.is_active:
+        raise HTTPException(status_code=400, detail="end_date must not be before next_run")
+
+    # ručna izmjena "briše" grešku zadnjeg pokušaja – scheduler pokušava ponovo
+    obj.last_error = None
+    db.commit()
+    db.refresh(obj)
+    return obj
+
+
+@router.delete(
+    "/invoice-templates/{template_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Obriši šablon (izdate fakture ostaju)",
+)
+def delete_invoice_template(
+    template_id: int,
+    db: Session = Depends(_get_session_dep),
+    x_tenant_code: Optional[str] = Header(None, alias="X-Tenant-Code"),
+) -> Response:
+    tenant = require_tenant_code(x_tenant_code)
+    obj = _get_template(db, tenant, template_id)
+    db.delete(obj)
+    db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
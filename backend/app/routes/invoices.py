@@ -3,8 +3,7 @@ from __future__ import annotations
 
 import io
 from datetime import date
-from decimal import Decimal
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional, Sequence
 
 from fastapi import (
     APIRouter,
@@ -16,21 +15,45 @@ from fastapi import (
     status,
 )
 from fastapi.responses import StreamingResponse
-from sqlalchemy import select, func, text
-    # NOTE: text is used in _ensure_is_paid_column
+from sqlalchemy import insert, select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db import get_session as _get_session_dep
-from app.models import Invoice, InvoiceItem
+from app.db import get_async_session, get_session as _get_session_dep
+from app.models import (
+    Invoice,
+    InvoiceItem,
+    FinalizedPeriodModificationError,
+    apply_merged_rollup_deltas,
+    bump_tenant_data_versions,
+    load_finalized_periods,
+    merge_rollup_deltas,
+)
+from app.pagination import cached_list_total, keyset_filters, split_page
+from app.period_filters import period_filters
 from app.schemas.invoice import (
+    InvoiceBulkCreate,
+    InvoiceBulkCreatedRow,
+    InvoiceBulkReport,
     InvoiceCreate,
     InvoiceRead,
     InvoiceRowItem,
     InvoiceListResponse,
 )
 from app.tenant_security import require_tenant_code, ensure_tenant_exists
+from app.services.bulk_import import BulkImportCollector, iter_valid_batches
+from app.services.csv_stream import (
+    csv_streaming_response,
+    iter_csv_chunks,
+    rows_from_own_session,
+    stream_scalars,
+)
+from app.services.invoice_numbers import allocate_invoice_numbers
+from app.services.invoice_totals import compute_invoice_totals, invoice_header_row
 from app.services.pdf_invoice import render_invoice_pdf
+from app.services.search import contains_filter, prefix_filter
 
 router = APIRouter(
     tags=["invoices"],
@@ -50,43 +73,14 @@ def _ensure_tenant_exists(db: Session, code: str) -> None:
     ensure_tenant_exists(db, code)
 
 
-# ======================================================
-#  SCHEMA SAFETY – osiguranje da postoji is_paid kolona
-# ======================================================
-
-_IS_PAID_COLUMN_CHECKED: bool = False
-
-
-def _ensure_is_paid_column(db: Session) -> None:
-    """
-    Jednostavan zaštitni mehanizam:
-
-    Ako kolona `is_paid` ne postoji u tabeli `invoices`, dodajemo je
-    kroz raw SQL. Ovo omogućava da testovi i razvojni DB nastave
-    da rade čak i ako Alembic migracija nije pokrenuta.
-
-    U produkciji ćemo ovo zamijeniti čistom Alembic migracijom.
-    """
-    global _IS_PAID_COLUMN_CHECKED
-    if _IS_PAID_COLUMN_CHECKED:
-        return
-
-    db.execute(
-        text(
-            """
-            ALTER TABLE invoices
-            ADD COLUMN IF NOT EXISTS is_paid boolean NOT NULL DEFAULT false
-            """
-        )
-    )
-    db.commit()
-    _IS_PAID_COLUMN_CHECKED = True
-
-
 # ======================================================
 #  CREATE
 # ======================================================
 
+# auto broj: koliko puta pokušati ako je dodijeljeni broj u međuvremenu
+# ručno iskorišten (paralelni klijent sa eksplicitnim brojem)
+_AUTO_NUMBER_ATTEMPTS = 3
+
 
 @router.post(
     "/invoices",
@@ -98,7 +92,9 @@ def _ensure_is_paid_column(db: Session) -> None:
         "Tenant se određuje iz `X-Tenant-Code` headera, dok se stavke fakture "
         "šalju u polju `items`.\n\n"
         "Backend za svaku stavku računa osnovicu, PDV i ukupan iznos, a zatim "
-        "i agregate (`total_base`, `total_vat`, `total_amount`) na nivou fakture."
+        "i agregate (`total_base`, `total_vat`, `total_amount`) na nivou fakture.\n\n"
+        "Ako se `invoice_number` izostavi, server dodjeljuje sljedeći broj iz "
+        "brojača tenanta (bez rupa; format iz `PUT /settings/profile`)."
     ),
     responses={
         201: {
@@ -167,72 +163,43 @@ def create_invoice(
     tenant = _require_tenant(x_tenant_code)
 
     _ensure_tenant_exists(db, tenant)
-    _ensure_is_paid_column(db)
-
-    data = payload.model_dump()
-    items_data = data.pop("items", [])
 
-    if not items_data:
+    if not payload.items:
         raise HTTPException(
             status_code=400,
             detail="Invoice must contain at least one item",
         )
 
-    total_base = Decimal("0.00")
-    total_vat = Decimal("0.00")
-    total_amount = Decimal("0.00")
-
-    item_models: List[InvoiceItem] = []
-
-    for item in items_data:
-        qty = Decimal(str(item["quantity"]))
-        unit_price = Decimal(str(item["unit_price"]))
-        vat_rate = Decimal(str(item["vat_rate"]))
-
-        base_amount = qty * unit_price
-        vat_amount = base_amount * vat_rate
-        line_total = base_amount + vat_amount
-
-        total_base += base_amount
-        total_vat += vat_amount
-        total_amount += line_total
-
-        item_models.append(
-            InvoiceItem(
-                description=item["description"],
-                quantity=qty,
-                unit_price=unit_price,
-                vat_rate=vat_rate,
-                base_amount=base_amount,
-                vat_amount=vat_amount,
-                total_amount=line_total,
-            )
-        )
+    totals = compute_invoice_totals([payload])[0]
+    auto_number = payload.invoice_number is None
+    attempts = _AUTO_NUMBER_ATTEMPTS if auto_number else 1
 
-    invoice = Invoice(
-        tenant_code=tenant,
-        invoice_number=data["invoice_number"],
-        issue_date=data["issue_date"],
-        due_date=data.get("due_date"),
-        buyer_name=data["buyer_name"],
-        buyer_address=data.get("buyer_address"),
-        total_base=total_base,
-        total_vat=total_vat,
-        total_amount=total_amount,
-        # is_paid ostaje default False (kolona postoji u bazi)
-        items=item_models,
-    )
+    for attempt in range(attempts):
+        if auto_number:
+            # brojač i faktura u istoj transakciji – rollback vraća i brojač (bez rupa)
+            number = allocate_invoice_numbers(db.connection(), [(tenant, payload.issue_date)])[0]
+            payload = payload.model_copy(update={"invoice_number": number})
 
-    db.add(invoice)
-    try:
-        db.commit()
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(
-            status_code=409,
-            detail="Invoice number already exists for this tenant",
+        invoice = Invoice(
+            **invoice_header_row(tenant, payload, totals),
+            # is_paid ostaje default False (kolona postoji u bazi)
+            items=[InvoiceItem(**item) for item in totals.items],
         )
 
+        db.add(invoice)
+        try:
+            db.commit()
+            break
+        except IntegrityError:
+            db.rollback()
+            # auto broj: isti broj je upravo ručno izdat paralelno – novi krug
+            if attempt + 1 < attempts:
+                continue
+            raise HTTPException(
+                status_code=409,
+                detail="Invoice number already exists for this tenant",
+            )
+
     db.refresh(invoice)
     return invoice
 
@@ -254,6 +221,175 @@ def create_invoice_slash(
     return create_invoice(payload=payload, db=db, x_tenant_code=x_tenant_code)
 
 
+# ======================================================
+#  BULK CREATE
+# ======================================================
+
+_DUPLICATE_NUMBER_ERROR = "Invoice number already exists for this tenant"
+
+
+@router.post(
+    "/invoices/bulk",
+    response_model=InvoiceBulkReport,
+    summary="Kreiraj više faktura odjednom (npr. mjesečno fakturisanje)",
+    description=(
+        "Kreira veći broj izlaznih faktura u **jednoj transakciji** – namijenjeno "
+        "tenantima koji svaki mjesec fakturišu iste klijente.\n\n"
+        "Svaka faktura u `invoices` ima isti oblik kao body za `POST /invoices` i "
+        "validira se zasebno. Stavke se obračunavaju kao kod pojedinačnog kreiranja.\n\n"
+        "Fakture bez `invoice_number` dobijaju brojeve iz brojača tenanta (jedna "
+        "dodjela po batch-u, u redoslijedu iz zahtjeva).\n\n"
+        "Umjesto 409 za cijeli zahtjev, po fakturi se u `errors` vraćaju:\n"
+        "- broj fakture koji već postoji za tenanta,\n"
+        "- duplikat broja unutar istog zahtjeva,\n"
+        "- datum izdavanja u finalizovanom poreskom mjesecu,\n"
+        "- greške validacije.\n\n"
+        "`line` je redni broj fakture u `invoices` (1-based). Sa `atomic=true` ništa "
+        "se ne upisuje ako je ijedna faktura odbijena."
+    ),
+    responses={  # type: ignore[assignment]
+        200: {"description": "Izvještaj (inserted / failed) sa ID-evima kreiranih faktura."},
+        400: {"description": "Nedostaje `X-Tenant-Code` header."},
+        422: {"description": "Body nije lista faktura ili ih ima više od INVOICE_BULK_MAX_ROWS."},
+    },
+)
+def bulk_create_invoices(
+    payload: InvoiceBulkCreate,
+    db: Session = Depends(_get_session_dep),
+    x_tenant_code: Optional[str] = Header(
+        None,
+        alias="X-Tenant-Code",
+    ),
+    atomic: bool = Query(
+        False,
+        description="Ako je `true`, ništa se ne upisuje čim je ijedna faktura odbijena.",
+    ),
+) -> InvoiceBulkReport:
+    """
+    Bulk kreiranje faktura po batch-evima:
+
+    - obračun stavki svih faktura batch-a u jednom prolazu,
+    - postojeći brojevi faktura jednim SELECT-om,
+    - zaglavlja kao multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING id
+      (paralelno upisan broj → greška za taj red, ne 409),
+    - sve stavke batch-a jednim multi-row INSERT-om,
+    - mjesečni rollup se ažurira jednom po (godina, mjesec) na kraju.
+    """
+    tenant = _require_tenant(x_tenant_code)
+
+    _ensure_tenant_exists(db, tenant)
+
+    finalized = load_finalized_periods(db.connection(), [tenant])[tenant]
+    collector = BulkImportCollector()
+    rollup_deltas: dict[tuple, dict[str, object]] = {}
+    seen: dict[str, int] = {}
+    created: list[InvoiceBulkCreatedRow] = []
+
+    invoice_table = Invoice.__table__
+    records = ((line, row, None) for line, row in enumerate(payload.invoices, start=1))
+
+    try:
+        for batch in iter_valid_batches(records, InvoiceCreate, collector):
+            candidates: dict[str, tuple[int, InvoiceCreate]] = {}
+            auto_numbered: list[tuple[int, InvoiceCreate]] = []
+            for line, invoice in batch:
+                number = invoice.invoice_number
+                if number is not None:
+                    if number in seen:
+                        collector.reject(line, [f"Duplicate of line {seen[number]} (invoice_number)"])
+                        continue
+                    seen[number] = line
+
+                d = invoice.issue_date
+                if (d.year, d.month) in finalized:
+                    collector.reject(
+                        line, [str(FinalizedPeriodModificationError(tenant, d.year, d.month))]
+                    )
+                    continue
+                if number is None:
+                    auto_numbered.append((line, invoice))
+                else:
+                    candidates[number] = (line, invoice)
+
+            if candidates:
+                existing = set(
+                    db.scalars(
+                        select(Invoice.invoice_number).where(
+                            Invoice.tenant_code == tenant,
+                            Invoice.invoice_number.in_(list(candidates)),
+                        )
+                    )
+                )
+                for number in existing:
+                    collector.reject(candidates.pop(number)[0], [_DUPLICATE_NUMBER_ERROR])
+
+            if auto_numbered:
+                # jedan upit za cijeli batch; ručni brojevi iz zahtjeva se preskaču
+                allocated = allocate_invoice_numbers(
+                    db.connection(),
+                    [(tenant, invoice.issue_date) for _, invoice in auto_numbered],
+                    reserved={(tenant, number) for number in seen},
+                )
+                for (line, invoice), number in zip(auto_numbered, allocated):
+                    seen[number] = line
+                    candidates[number] = (line, invoice.model_copy(update={"invoice_number": number}))
+
+            if not candidates:
+                continue
+
+            # redoslijed iz zahtjeva (auto brojevi su dodati nakon ručnih)
+            numbers = sorted(candidates, key=lambda n: candidates[n][0])
+            computed = dict(
+                zip(numbers, compute_invoice_totals([candidates[n][1] for n in numbers]))
+            )
+            headers = {
+                number: invoice_header_row(tenant, candidates[number][1], computed[number])
+                for number in numbers
+            }
+
+            stmt = (
+                pg_insert(invoice_table)
+                .on_conflict_do_nothing(constraint="uq_invoice_number_per_tenant")
+                .returning(invoice_table.c.id, invoice_table.c.invoice_number)
+            )
+            invoice_ids = {
+                number: invoice_id
+                for invoice_id, number in db.execute(stmt, list(headers.values()))
+            }
+
+            item_rows = []
+            for number in numbers:
+                line = candidates[number][0]
+                invoice_id = invoice_ids.get(number)
+                if invoice_id is None:
+                    # upisan paralelno nakon našeg SELECT-a
+                    collector.reject(line, [_DUPLICATE_NUMBER_ERROR])
+                    continue
+
+                collector.inserted += 1
+                created.append(InvoiceBulkCreatedRow(line=line, id=invoice_id, invoice_number=number))
+                merge_rollup_deltas(rollup_deltas, "invoice", headers[number])
+                item_rows.extend({**item, "invoice_id": invoice_id} for item in computed[number].items)
+
+            if item_rows:
+                db.execute(insert(InvoiceItem.__table__), item_rows)
+
+        if atomic and collector.failed:
+            db.rollback()
+            collector.inserted = 0
+            created = []
+        else:
+            apply_merged_rollup_deltas(db.connection(), rollup_deltas)
+            if collector.inserted:
+                bump_tenant_data_versions(db.connection(), [tenant])
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return InvoiceBulkReport(**collector.report().model_dump(), created=created)
+
+
 # ======================================================
 #  LIST – stari API
 # ======================================================
@@ -293,7 +429,7 @@ def list_invoices(
         stmt = stmt.where(Invoice.issue_date <= date_to)
     if buyer_name:
         # Za stari API buyer_name tretiramo kao prefiks, zbog testova
-        stmt = stmt.where(Invoice.buyer_name.ilike(f"{buyer_name}%"))
+        stmt = stmt.where(prefix_filter(Invoice.buyer_name, buyer_name))
 
     stmt = (
         stmt.order_by(Invoice.issue_date.desc(), Invoice.id.desc())
@@ -352,23 +488,21 @@ def _build_invoices_base_stmt_for_ui(
     """
     base_stmt = select(Invoice).where(Invoice.tenant_code == tenant)
 
-    # Filtriranje po godini/mjesecu (issue_date)
-    if year is not None:
-        base_stmt = base_stmt.where(func.extract("year", Invoice.issue_date) == year)
-    if month is not None:
-        base_stmt = base_stmt.where(func.extract("month", Invoice.issue_date) == month)
-
-    # Filtriranje po periodu (issue_date od/do)
-    if date_from is not None:
-        base_stmt = base_stmt.where(Invoice.issue_date >= date_from)
-    if date_to is not None:
-        base_stmt = base_stmt.where(Invoice.issue_date <= date_to)
+    # Filtriranje po godini/mjesecu i periodu od/do (issue_date) – half-open opseg
+    base_stmt = base_stmt.where(
+        *period_filters(
+            Invoice.issue_date,
+            year=year,
+            month=month,
+            date_from=date_from,
+            date_to=date_to,
+        )
+    )
 
-    # Filtriranje po kupcu (case-insensitive, substring)
+    # Filtriranje po kupcu (substring, bez obzira na velika/mala i č/ć/š/đ/ž –
+    # trigram indeks ix_invoices_buyer_name_trgm)
     if buyer_query:
-        base_stmt = base_stmt.where(
-            Invoice.buyer_name.ilike(f"%{buyer_query}%"),
-        )
+        base_stmt = base_stmt.where(contains_filter(Invoice.buyer_name, buyer_query))
 
     # Filtriranje po statusu plaćanja
     if unpaid_only:
@@ -398,7 +532,10 @@ def _build_invoices_base_stmt_for_ui(
         "- `unpaid_only` – ako je `true`, vraća samo neplaćene fakture.\n\n"
         "Paginacija:\n"
         "- Može se koristiti `page` + `page_size` (1-based), ili direktno `limit` + `offset`.\n"
-        "- Ako je `page` zadat, `limit`/`offset` se ignorišu."
+        "- Ako je `page` zadat, `limit`/`offset` se ignorišu.\n"
+        "- Za infinite scroll: `cursor` = `next_cursor` iz prethodnog odgovora (`page`/`offset` se "
+        "tada ignorišu) – svaka stranica je jednako brza, bez obzira koliko je duboko.\n"
+        "- `total` se kešira po verziji podataka tenanta; uz `include_total=false` se ne računa."
     ),
     responses={
         200: {
@@ -409,8 +546,8 @@ def _build_invoices_base_stmt_for_ui(
         },
     },
 )
-def list_invoices_ui(
-    db: Session = Depends(_get_session_dep),
+async def list_invoices_ui(
+    db: AsyncSession = Depends(get_async_session),
     x_tenant_code: Optional[str] = Header(
         None,
         alias="X-Tenant-Code",
@@ -431,7 +568,7 @@ def list_invoices_ui(
     ),
     buyer_query: Optional[str] = Query(
         None,
-        description="Filter po nazivu kupca (case-insensitive, substring).",
+        description="Filter po nazivu kupca (substring, bez obzira na velika/mala slova i č/ć/š/đ/ž).",
     ),
     page: Optional[int] = Query(
         None,
@@ -455,11 +592,17 @@ def list_invoices_ui(
         ge=0,
         description="Offset za rezultate (koristi se ako `page` nije zadat).",
     ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Kursor iz `next_cursor` prethodne stranice (keyset paginacija); ako je zadat, `page`/`offset` se ignoriše.",
+    ),
+    include_total: bool = Query(
+        True,
+        description="Ako je `false`, `total` se ne računa (null) – za infinite scroll nakon prve stranice.",
+    ),
 ) -> InvoiceListResponse:
     tenant = _require_tenant(x_tenant_code)
 
-    _ensure_is_paid_column(db)
-
     base_stmt = _build_invoices_base_stmt_for_ui(
         tenant=tenant,
         year=year,
@@ -470,9 +613,7 @@ def list_invoices_ui(
         buyer_query=buyer_query,
     )
 
-    # total
     count_stmt = select(func.count()).select_from(base_stmt.subquery())
-    total: int = db.execute(count_stmt).scalar_one()
 
     # paginacija – ako je zadat page, on ima prednost nad limit/offset
     if page is not None:
@@ -486,13 +627,28 @@ def list_invoices_ui(
         query_offset = offset
 
     items_stmt = (
-        base_stmt.order_by(Invoice.issue_date.desc(), Invoice.id.desc())
-        .limit(query_limit)
-        .offset(query_offset)
+        base_stmt.where(*keyset_filters(Invoice.issue_date, Invoice.id, cursor))
+        .order_by(Invoice.issue_date.desc(), Invoice.id.desc())
+        .limit(query_limit + 1)
+        .offset(0 if cursor else query_offset)
     )
-    rows = db.execute(items_stmt).scalars().all()
 
-    return InvoiceListResponse(total=total, items=list(rows))
+    # stranica pa (keširan) total – redom, na sesiji zahtjeva
+    result = await db.scalars(items_stmt)
+    total = None
+    if include_total:
+        params = {
+            "year": year,
+            "month": month,
+            "unpaid_only": unpaid_only,
+            "date_from": date_from,
+            "date_to": date_to,
+            "buyer_query": buyer_query,
+        }
+        total = await cached_list_total(db, tenant, "invoices.list.total", params, count_stmt)
+    rows, next_cursor = split_page(result.all(), query_limit, "issue_date")
+
+    return InvoiceListResponse(total=total, items=rows, next_cursor=next_cursor)
 
 
 # ======================================================
@@ -500,6 +656,60 @@ def list_invoices_ui(
 # ======================================================
 
 
+INVOICES_CSV_HEADER = ["Broj fakture", "Datum izdavanja", "Rok plaćanja", "Kupac", "Ukupan iznos", "Plaćena"]
+
+
+def invoice_export_rows(
+    db: Session,
+    tenant: str,
+    *,
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    unpaid_only: bool = False,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    buyer_query: Optional[str] = None,
+) -> Iterator[list]:
+    """
+    CSV redovi liste faktura (kolone INVOICES_CSV_HEADER) uz iste filtere
+    kao /invoices/list, čitani server-side kursorom.
+
+    Koriste ga /invoices/export i pozadinski export posao `invoices_csv`.
+    """
+    base_stmt = _build_invoices_base_stmt_for_ui(
+        tenant=tenant,
+        year=year,
+        month=month,
+        unpaid_only=unpaid_only,
+        date_from=date_from,
+        date_to=date_to,
+        buyer_query=buyer_query,
+    )
+    base_stmt = base_stmt.order_by(Invoice.issue_date.desc(), Invoice.id.desc())
+
+    for inv in stream_scalars(db, base_stmt):
+        yield [
+            inv.invoice_number or "",
+            inv.issue_date.isoformat() if inv.issue_date else "",
+            inv.due_date.isoformat() if inv.due_date else "",
+            inv.buyer_name or "",
+            f"{inv.total_amount:.2f}" if inv.total_amount is not None else "",
+            "DA" if inv.is_paid else "NE",
+        ]
+
+
+def iter_invoices_export_csv(rows: Iterable[Sequence]) -> Iterator[bytes]:
+    # Excel-friendly CSV: delimiter ';', UTF-8 sa BOM
+    return iter_csv_chunks(
+        rows,
+        header=INVOICES_CSV_HEADER,
+        delimiter=";",
+        lineterminator="\n",
+        bom=True,
+    )
+
+
+
 @router.get(
     "/invoices/export",
     summary="Export liste izlaznih faktura (Excel/CSV)",
@@ -531,10 +741,8 @@ def export_invoices(
     ),
 ) -> StreamingResponse:
     tenant = _require_tenant(x_tenant_code)
-    _ensure_is_paid_column(db)
 
-    base_stmt = _build_invoices_base_stmt_for_ui(
-        tenant=tenant,
+    filters = dict(
         year=year,
         month=month,
         unpaid_only=unpaid_only,
@@ -542,48 +750,11 @@ def export_invoices(
         date_to=date_to,
         buyer_query=buyer_query,
     )
-
-    base_stmt = base_stmt.order_by(Invoice.issue_date.desc(), Invoice.id.desc())
-    rows: List[Invoice] = db.execute(base_stmt).scalars().all()
-
-    # Priprema CSV sadržaja (Excel-friendly, delimiter ';', UTF-8 sa BOM)
-    output = io.StringIO()
-    # Header red
-    output.write(
-        "Broj fakture;Datum izdavanja;Rok plaćanja;Kupac;Ukupan iznos;Plaćena\n"
+    chunks = iter_invoices_export_csv(
+        rows_from_own_session(lambda stream_db: invoice_export_rows(stream_db, tenant, **filters))
     )
 
-    for inv in rows:
-        invoice_number = inv.invoice_number or ""
-        issue_date_str = inv.issue_date.isoformat() if inv.issue_date else ""
-        due_date_str = inv.due_date.isoformat() if inv.due_date else ""
-        buyer_name = inv.buyer_name or ""
-        total_amount = f"{inv.total_amount:.2f}" if inv.total_amount is not None else ""
-        is_paid_str = "DA" if inv.is_paid else "NE"
-
-        line = (
-            f"{invoice_number};"
-            f"{issue_date_str};"
-            f"{due_date_str};"
-            f"{buyer_name};"
-            f"{total_amount};"
-            f"{is_paid_str}\n"
-        )
-        output.write(line)
-
-    csv_bytes = ("\ufeff" + output.getvalue()).encode("utf-8")  # BOM za Excel
-    buffer = io.BytesIO(csv_bytes)
-
-    filename = "invoices-export.csv"
-    headers = {
-        "Content-Disposition": f'attachment; filename="{filename}"',
-    }
-
-    return StreamingResponse(
-        buffer,
-        media_type="text/csv; charset=utf-8",
-        headers=headers,
-    )
+    return csv_streaming_response(chunks, filename="invoices-export.csv")
 
 
 # ======================================================
@@ -653,8 +824,6 @@ def mark_invoice_paid(
 ) -> Invoice:
     tenant = _require_tenant(x_tenant_code)
 
-    _ensure_is_paid_column(db)
-
     stmt = select(Invoice).where(
         Invoice.id == invoice_id,
         Invoice.tenant_code == tenant,
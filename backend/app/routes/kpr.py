@@ -1,21 +1,32 @@
 # /home/miso/dev/sp-app/sp-app/backend/app/routes/kpr.py
 from __future__ import annotations
 
+import base64
+import json
+from dataclasses import dataclass
 from datetime import date
 from decimal import Decimal
-from io import BytesIO, StringIO
-from typing import List, Optional
-import csv
+from typing import BinaryIO, Iterator, List, Optional
 
-from fastapi import APIRouter, Depends, Header, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from fastapi.responses import StreamingResponse
-from sqlalchemy import func, select
+from sqlalchemy import case, func, literal, null, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db import get_session as _get_session_dep
-from app.models import CashEntry, Invoice, InputInvoice
+from app.db import get_async_session, get_session as _get_session_dep
+from app.http_cache import tenant_etag
+from app.models import CashEntry, Invoice, InputInvoice, TenantMonthlyRollup
+from app.period_filters import period_filters
 from app.schemas.kpr import KprListResponse, KprRowItem
-from app.tenant_security import ensure_tenant_exists, require_tenant_code
+from app.services.csv_stream import (
+    CSV_STREAM_BATCH_SIZE,
+    csv_streaming_response,
+    iter_csv_chunks,
+    rows_from_own_session,
+)
+from app.services.pdf_writer import TextPdfDocument, iter_spooled_pdf, spool_pdf
+from app.tenant_security import require_tenant_code
 
 
 router = APIRouter(
@@ -37,13 +48,6 @@ def _require_tenant(x_tenant_code: Optional[str]) -> str:
     return require_tenant_code(x_tenant_code)
 
 
-def _ensure_tenant(db: Session, code: str) -> None:
-    """
-    Pobrinemo se da existe minimalni tenant zapis u bazi.
-    """
-    ensure_tenant_exists(db, code)
-
-
 # ======================================================
 #  INTERNAL – KPR AGGREGATION
 # ======================================================
@@ -75,120 +79,282 @@ def _get_row_date(row: KprRowItem) -> date:
     return date.today()
 
 
-def _collect_kpr_rows(
+# Redoslijed izvora u KPR-u (globalni sort je (date, source, source_id),
+# a `source` se poredi kao string: 'cash' < 'input_invoice' < 'invoice').
+_KPR_SOURCES = ("cash", "input_invoice", "invoice")
+
+
+@dataclass(frozen=True)
+class _KprCursor:
+    """
+    Pozicija zadnjeg vraćenog reda (keyset) + kumulativi do njega uključivo,
+    da sljedeća stranica nastavi running totals bez ponovnog sabiranja.
+    """
+
+    date: date
+    source: str
+    source_id: int
+    running_income: Decimal
+    running_expense: Decimal
+
+    def encode(self) -> str:
+        payload = [
+            self.date.isoformat(),
+            self.source,
+            self.source_id,
+            str(self.running_income),
+            str(self.running_expense),
+        ]
+        raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "_KprCursor":
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            d, source, source_id, income, expense = json.loads(raw)
+            if source not in _KPR_SOURCES:
+                raise ValueError(source)
+            return cls(
+                date=date.fromisoformat(d),
+                source=source,
+                source_id=int(source_id),
+                running_income=Decimal(income),
+                running_expense=Decimal(expense),
+            )
+        except (ValueError, TypeError, ArithmeticError) as exc:
+            raise HTTPException(status_code=400, detail="Invalid KPR cursor") from exc
+
+
+def _kpr_branch(
+    source: str,
+    tenant_code: str,
+    year: Optional[int],
+    month: Optional[int],
+    *,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    after: Optional[_KprCursor] = None,
+    limit: Optional[int] = None,
+):
+    """
+    SELECT samo potrebnih kolona jednog izvora, u zajedničkom KPR obliku.
+
+    Keyset uslov se za svaki izvor svodi na opseg po (date, id), jer je
+    `source` u grani konstanta – tako svaka grana ostaje range scan po
+    (tenant_code, datum) indeksu i čita najviše `limit` redova.
+    """
+    if source == "invoice":
+        date_col, id_col, tenant_col = Invoice.issue_date, Invoice.id, Invoice.tenant_code
+        columns = [
+            literal("income").label("kind"),
+            literal("invoice").label("category"),
+            Invoice.buyer_name.label("counterparty"),
+            Invoice.invoice_number.label("document_number"),
+            null().label("description"),
+            Invoice.total_amount.label("amount"),
+            literal("BAM").label("currency"),
+            literal(False).label("tax_deductible"),
+        ]
+    elif source == "input_invoice":
+        date_col, id_col, tenant_col = InputInvoice.issue_date, InputInvoice.id, InputInvoice.tenant_code
+        columns = [
+            literal("expense").label("kind"),
+            literal("input_invoice").label("category"),
+            InputInvoice.supplier_name.label("counterparty"),
+            InputInvoice.invoice_number.label("document_number"),
+            InputInvoice.note.label("description"),
+            InputInvoice.total_amount.label("amount"),
+            func.coalesce(InputInvoice.currency, "BAM").label("currency"),
+            literal(True).label("tax_deductible"),  # V1: sve rashode tretiramo kao poreski priznate
+        ]
+    else:  # cash
+        date_col, id_col, tenant_col = CashEntry.entry_date, CashEntry.id, CashEntry.tenant_code
+        columns = [
+            CashEntry.kind.label("kind"),
+            literal("cash").label("category"),
+            null().label("counterparty"),
+            null().label("document_number"),
+            CashEntry.description.label("description"),
+            CashEntry.amount.label("amount"),
+            literal("BAM").label("currency"),
+            (CashEntry.kind == "expense").label("tax_deductible"),
+        ]
+
+    conditions = [tenant_col == tenant_code]
+    conditions.extend(
+        period_filters(date_col, year=year, month=month, date_from=date_from, date_to=date_to)
+    )
+    if after is not None:
+        if source > after.source:
+            conditions.append(date_col >= after.date)
+        elif source < after.source:
+            conditions.append(date_col > after.date)
+        else:
+            conditions.append(date_col >= after.date)
+            conditions.append(or_(date_col > after.date, id_col > after.source_id))
+
+    stmt = (
+        select(
+            date_col.label("date"),
+            *columns,
+            literal(source).label("source"),
+            id_col.label("source_id"),
+        )
+        .where(*conditions)
+        .order_by(date_col.asc(), id_col.asc())
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def _kpr_union(
+    tenant_code: str,
+    year: Optional[int],
+    month: Optional[int],
+    *,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    after: Optional[_KprCursor] = None,
+    limit: Optional[int] = None,
+):
+    """
+    UNION ALL sva tri izvora kao subquery `kpr` (kolone kao KprRowItem).
+    """
+    return union_all(
+        *(
+            _kpr_branch(
+                source,
+                tenant_code,
+                year,
+                month,
+                date_from=date_from,
+                date_to=date_to,
+                after=after,
+                limit=limit,
+            )
+            for source in _KPR_SOURCES
+        )
+    ).subquery("kpr")
+
+
+def _kpr_order(sub):
+    return (sub.c.date.asc(), sub.c.source.asc(), sub.c.source_id.asc())
+
+
+def _kpr_row_item(row) -> KprRowItem:
+    data = dict(row._mapping)
+    data["amount"] = _as_decimal(data["amount"])
+    data["currency"] = data["currency"] or "BAM"
+    return KprRowItem(**data)
+
+
+def _iter_kpr_rows(
     db: Session,
     tenant_code: str,
     year: Optional[int],
     month: Optional[int],
-) -> List[KprRowItem]:
+    *,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    stream: bool = False,
+) -> Iterator[KprRowItem]:
     """
-    Sakuplja sve stavke za KPR za datog tenanta i opcioni year/month filter.
+    Generiše stavke za KPR za datog tenanta i opcioni year/month
+    (odnosno date_from/date_to, uključivo) filter, globalno sortirane po (date, source, source_id).
 
-    Izvori:
+    Izvori (jedan UNION ALL upit, samo potrebne kolone):
     - Invoice      → prihodi,
     - InputInvoice → rashodi,
     - CashEntry    → dodatni prihodi/rashodi koji nisu pokriveni fakturama.
+
+    Sa `stream=True` upit se čita preko server-side kursora
+    (vidi app/services/csv_stream.py) – koristi ga CSV export.
     """
-    rows: List[KprRowItem] = []
+    kpr = _kpr_union(tenant_code, year, month, date_from=date_from, date_to=date_to)
+    stmt = select(kpr).order_by(*_kpr_order(kpr))
+    if stream:
+        stmt = stmt.execution_options(yield_per=CSV_STREAM_BATCH_SIZE)
 
-    # ---------------------------
-    # 1) Izlazne fakture (Invoice) – income
-    # ---------------------------
-    inv_filters = [Invoice.tenant_code == tenant_code]
-    if year is not None:
-        inv_filters.append(func.extract("year", Invoice.issue_date) == year)
-    if month is not None:
-        inv_filters.append(func.extract("month", Invoice.issue_date) == month)
+    for row in db.execute(stmt):
+        yield _kpr_row_item(row)
 
-    inv_stmt = (
-        select(Invoice)
-        .where(*inv_filters)
-        .order_by(Invoice.issue_date.asc(), Invoice.id.asc())
-    )
-    for inv in db.execute(inv_stmt).scalars().all():
-        rows.append(
-            KprRowItem(
-                date=inv.issue_date,
-                kind="income",
-                category="invoice",
-                counterparty=getattr(inv, "buyer_name", None),
-                document_number=getattr(inv, "invoice_number", None),
-                description=None,
-                amount=_as_decimal(getattr(inv, "total_amount", 0)),
-                currency="BAM",
-                tax_deductible=False,
-                source="invoice",
-                source_id=inv.id,
-            )
-        )
 
-    # ---------------------------
-    # 2) Ulazne fakture (InputInvoice) – expense
-    # ---------------------------
-    in_filters = [InputInvoice.tenant_code == tenant_code]
-    if year is not None:
-        in_filters.append(func.extract("year", InputInvoice.issue_date) == year)
-    if month is not None:
-        in_filters.append(func.extract("month", InputInvoice.issue_date) == month)
+def _fetch_kpr_page(
+    db: Session,
+    tenant_code: str,
+    year: Optional[int],
+    month: Optional[int],
+    *,
+    after: Optional[_KprCursor],
+    offset: int,
+    limit: int,
+) -> List[KprRowItem]:
+    """
+    Jedna stranica KPR-a (do `limit + 1` redova, da znamo ima li još).
 
-    in_stmt = (
-        select(InputInvoice)
-        .where(*in_filters)
-        .order_by(InputInvoice.issue_date.asc(), InputInvoice.id.asc())
+    Running totals računa window funkcija nad redovima stranice (uključujući
+    preskočene `offset` redove), a pozivalac dodaje kumulativ iz kursora.
+    """
+    fetch = offset + limit + 1
+    kpr = _kpr_union(tenant_code, year, month, after=after, limit=fetch)
+    page = select(kpr).order_by(*_kpr_order(kpr)).limit(fetch).subquery("page")
+
+    order = _kpr_order(page)
+    zero = literal(0, type_=page.c.amount.type)
+    running_income = func.sum(case((page.c.kind == "income", page.c.amount), else_=zero)).over(
+        order_by=order, rows=(None, 0)
+    )
+    running_expense = func.sum(case((page.c.kind == "expense", page.c.amount), else_=zero)).over(
+        order_by=order, rows=(None, 0)
     )
-    for inp in db.execute(in_stmt).scalars().all():
-        rows.append(
-            KprRowItem(
-                date=inp.issue_date,
-                kind="expense",
-                category="input_invoice",
-                counterparty=getattr(inp, "supplier_name", None),
-                document_number=getattr(inp, "invoice_number", None),
-                description=getattr(inp, "note", None),
-                amount=_as_decimal(getattr(inp, "total_amount", 0)),
-                currency=getattr(inp, "currency", "BAM") or "BAM",
-                tax_deductible=True,  # V1: sve rashode tretiramo kao poreski priznate
-                source="input_invoice",
-                source_id=inp.id,
-            )
-        )
 
-    # ---------------------------
-    # 3) CashEntry – income/expense
-    # ---------------------------
-    cash_filters = [CashEntry.tenant_code == tenant_code]
-    if year is not None:
-        cash_filters.append(func.extract("year", CashEntry.entry_date) == year)
-    if month is not None:
-        cash_filters.append(func.extract("month", CashEntry.entry_date) == month)
+    base_income = after.running_income if after is not None else Decimal("0.00")
+    base_expense = after.running_expense if after is not None else Decimal("0.00")
 
-    cash_stmt = (
-        select(CashEntry)
-        .where(*cash_filters)
-        .order_by(CashEntry.entry_date.asc(), CashEntry.id.asc())
-    )
-    for ce in db.execute(cash_stmt).scalars().all():
-        amount = _as_decimal(getattr(ce, "amount", 0))
-        kind = getattr(ce, "kind", "income")
-        rows.append(
-            KprRowItem(
-                date=ce.entry_date,
-                kind="income" if kind == "income" else "expense",
-                category="cash",
-                counterparty=None,
-                document_number=None,
-                description=getattr(ce, "note", None),
-                amount=amount,
-                currency="BAM",
-                tax_deductible=(kind == "expense"),
-                source="cash",
-                source_id=ce.id,
-            )
+    stmt = (
+        select(
+            page,
+            running_income.label("running_income"),
+            running_expense.label("running_expense"),
         )
+        .order_by(*order)
+        .offset(offset)
+    )
+
+    items: List[KprRowItem] = []
+    for row in db.execute(stmt):
+        item = _kpr_row_item(row)
+        item.running_income = base_income + _as_decimal(item.running_income)
+        item.running_expense = base_expense + _as_decimal(item.running_expense)
+        items.append(item)
+    return items
+
+
+def _kpr_total(db: Session, tenant_code: str, year: Optional[int], month: Optional[int]) -> int:
+    """
+    Ukupan broj KPR stavki iz tenant_monthly_rollups (bez skeniranja knjiga).
 
-    # Ne forsiramo dodatno globalno sortiranje po r.date
-    # – već smo po pojedinačnim upitima sortirali po datumu + ID.
-    return rows
+    Rollup broji iste redove kao KPR: sve fakture, sve ulazne fakture i
+    cash unose (income + expense) po mjesecu datuma.
+    """
+    stmt = select(
+        func.coalesce(
+            func.sum(
+                TenantMonthlyRollup.invoice_count
+                + TenantMonthlyRollup.input_invoice_count
+                + TenantMonthlyRollup.cash_income_count
+                + TenantMonthlyRollup.cash_expense_count
+            ),
+            0,
+        )
+    ).where(TenantMonthlyRollup.tenant_code == tenant_code)
+    if year is not None:
+        stmt = stmt.where(TenantMonthlyRollup.year == year)
+    if month is not None:
+        stmt = stmt.where(TenantMonthlyRollup.month == month)
+    return int(db.execute(stmt).scalar_one())
 
 
 # ======================================================
@@ -198,19 +364,34 @@ def _collect_kpr_rows(
 
 @router.get(
     "",
+    dependencies=[Depends(tenant_etag)],
     response_model=KprListResponse,
     summary="Lista KPR stavki (knjiga prihoda i rashoda)",
     description=(
-        "Vraća objedinjenu listu prihoda i rashoda (KPR) za jednog tenanta.\n\n"
+        "Vraća objedinjenu listu prihoda i rashoda (KPR) za jednog tenanta, "
+        "sortiranu po (`date`, `source`, `source_id`).\n\n"
         "Podržani filteri:\n"
         "- `year` i `month` – filtriranje po datumu (issue_date / entry_date),\n"
-        "- `limit` i `offset` – jednostavna paginacija nad agregiranom listom.\n\n"
+        "- `limit` + `cursor` – keyset paginacija: `next_cursor` iz odgovora se "
+        "šalje kao `cursor` za sljedeću stranicu,\n"
+        "- `offset` – stara paginacija (i dalje podržana, ali sporija za velike offsete).\n\n"
         "Svaka stavka ima polja: `date`, `kind`, `category`, `amount`, "
-        "`source`, `source_id` i prateća meta polja."
+        "`source`, `source_id`, prateća meta polja i kumulativne zbirove "
+        "`running_income` / `running_expense` od početka perioda."
     ),
+    responses={
+        400: {
+            "description": "Nedostaje X-Tenant-Code header ili je `cursor` neispravan.",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Invalid KPR cursor"}
+                }
+            },
+        },
+    },
 )
-def list_kpr(
-    db: Session = Depends(_get_session_dep),
+async def list_kpr(
+    db: AsyncSession = Depends(get_async_session),
     x_tenant_code: Optional[str] = Header(
         None,
         alias="X-Tenant-Code",
@@ -239,19 +420,43 @@ def list_kpr(
         ge=0,
         description="Broj stavki koje preskačemo (paginacija).",
     ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Neprozirni kursor (`next_cursor` prethodne stranice) za keyset paginaciju.",
+    ),
 ) -> KprListResponse:
     tenant = _require_tenant(x_tenant_code)
-    _ensure_tenant(db, tenant)
-
-    all_rows = _collect_kpr_rows(db, tenant_code=tenant, year=year, month=month)
-    total = len(all_rows)
-
-    # Paginacija na Python strani – za V1 je sasvim dovoljna
-    paged_rows = all_rows[offset : offset + limit]
+    after = _KprCursor.decode(cursor) if cursor else None
+
+    # Stranica pa ukupan broj, redom na sesiji zahtjeva; sync helperi se
+    # izvršavaju preko `run_sync`.
+    items = await db.run_sync(
+        _fetch_kpr_page,
+        tenant_code=tenant,
+        year=year,
+        month=month,
+        after=after,
+        offset=offset,
+        limit=limit,
+    )
+    total = await db.run_sync(_kpr_total, tenant_code=tenant, year=year, month=month)
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = _KprCursor(
+            date=last.entry_date,
+            source=last.source,
+            source_id=last.source_id,
+            running_income=last.running_income,
+            running_expense=last.running_expense,
+        ).encode()
 
     return KprListResponse(
         total=total,
-        items=paged_rows,
+        items=items,
+        next_cursor=next_cursor,
     )
 
 
@@ -260,27 +465,53 @@ def list_kpr(
 # ======================================================
 
 
-def _escape_pdf_text(text: str) -> str:
-    translit_map = str.maketrans(
-        {
-            "č": "c",
-            "ć": "c",
-            "š": "s",
-            "đ": "d",
-            "ž": "z",
-            "Č": "C",
-            "Ć": "C",
-            "Š": "S",
-            "Đ": "D",
-            "Ž": "Z",
-        }
-    )
-    text = text.translate(translit_map)
-    return (
-        text.replace("\\", "\\\\")
-        .replace("(", "\\(")
-        .replace(")", "\\)")
-    )
+def kpr_export_filename(tenant: str, year: int, month: Optional[int], ext: str) -> str:
+    filename = f"kpr-{tenant}-{year}"
+    if month is not None:
+        filename += f"-{month:02d}"
+    return f"{filename}.{ext}"
+
+
+def write_kpr_pdf(db: Session, tenant: str, year: int, month: Optional[int], out: BinaryIO) -> None:
+    """
+    Piše KPR PDF u `out` stranicu po stranicu dok se redovi čitaju
+    server-side kursorom (pdf_writer: paginacija, xref, FlateDecode).
+
+    Koriste ga /kpr/export i pozadinski export posao `kpr_pdf`.
+    """
+    doc = TextPdfDocument(out)
+    doc.line("Knjiga prihoda i rashoda (KPR)")
+    doc.line(f"Tenant: {tenant}")
+    doc.line(f"Godina: {year}")
+    if month is not None:
+        doc.line(f"Mjesec: {month:02d}")
+    doc.line("")
+
+    has_rows = False
+    for r in _iter_kpr_rows(db, tenant_code=tenant, year=year, month=month, stream=True):
+        if not has_rows:
+            has_rows = True
+            doc.set_repeating_header(
+                [
+                    "Datum       Vrsta     Kategorija       Iznos (BAM)  Izvor  ID",
+                    "--------------------------------------------------------------",
+                ]
+            )
+        kind = "PRIHOD" if r.kind == "income" else "RASHOD"
+        row_date = _get_row_date(r)
+        doc.line(
+            f"{row_date.isoformat()}  "
+            f"{kind:<8} "
+            f"{r.category:<14} "
+            f"{_as_decimal(r.amount):10.2f}  "
+            f"{r.source:<7} "
+            f"{r.source_id}"
+        )
+
+    if not has_rows:
+        doc.line("Nema evidentiranih stavki za odabrani period.")
+
+    doc.close()
 
 
 @router.get(
@@ -315,138 +546,18 @@ def export_kpr_pdf(
     ),
 ) -> StreamingResponse:
     tenant = _require_tenant(x_tenant_code)
-    _ensure_tenant(db, tenant)
-
-    rows = _collect_kpr_rows(db, tenant_code=tenant, year=year, month=month)
-
-    # -----------------------------
-    # 1) Tekstualne linije za PDF
-    # -----------------------------
-    lines: List[str] = []
-    lines.append("Knjiga prihoda i rashoda (KPR)")
-    lines.append(f"Tenant: {tenant}")
-    lines.append(f"Godina: {year}")
-    if month is not None:
-        lines.append(f"Mjesec: {month:02d}")
-    lines.append("")
-
-    if not rows:
-        lines.append("Nema evidentiranih stavki za odabrani period.")
-    else:
-        lines.append(
-            "Datum       Vrsta     Kategorija       Iznos (BAM)  Izvor  ID"
-        )
-        lines.append(
-            "--------------------------------------------------------------"
-        )
-        for r in rows:
-            kind = "PRIHOD" if r.kind == "income" else "RASHOD"
-            row_date = _get_row_date(r)
-            line = (
-                f"{row_date.isoformat()}  "
-                f"{kind:<8} "
-                f"{r.category:<14} "
-                f"{_as_decimal(r.amount):10.2f}  "
-                f"{r.source:<7} "
-                f"{r.source_id}"
-            )
-            lines.append(line)
-
-    # -----------------------------
-    # 2) Pretvaranje u PDF stream
-    # -----------------------------
-    stream_lines: List[str] = []
-    stream_lines.append("BT")
-    stream_lines.append("/F1 11 Tf")
-    stream_lines.append("50 800 Td")
-
-    first = True
-    for line in lines:
-        text = _escape_pdf_text(line)
-        if first:
-            first = False
-        else:
-            stream_lines.append("0 -14 Td")
-        stream_lines.append(f"({text}) Tj")
-
-    stream_lines.append("ET")
-    stream_data_str = "\n".join(stream_lines) + "\n"
-    stream_data = stream_data_str.encode("latin-1")
-    stream_len = len(stream_data)
-
-    objs: List[bytes] = []
-
-    def add_obj(body: str) -> int:
-        index = len(objs) + 1
-        obj_bytes = f"{index} 0 obj\n{body}\nendobj\n".encode("latin-1")
-        objs.append(obj_bytes)
-        return index
-
-    # 1 – Catalog
-    add_obj("<< /Type /Catalog /Pages 2 0 R >>")
-
-    # 2 – Pages
-    add_obj("<< /Type /Pages /Kids [3 0 R] /Count 1 >>")
-
-    # 3 – Page
-    add_obj(
-        "<< /Type /Page /Parent 2 0 R "
-        "/MediaBox [0 0 595 842] "
-        "/Contents 4 0 R "
-        "/Resources << /Font << /F1 5 0 R >> >> >>"
-    )
 
-    # 4 – Contents
-    contents_body = (
-        f"<< /Length {stream_len} >>\nstream\n"
-        f"{stream_data_str}"
-        "endstream"
-    )
-    add_obj(contents_body)
-
-    # 5 – Font
-    add_obj("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
-
-    buffer = BytesIO()
-    header = "%PDF-1.4\n%\xE2\xE3\xCF\xD3\n"
-    buffer.write(header.encode("latin-1"))
-
-    offsets = [0]
-    for obj in objs:
-        offsets.append(buffer.tell())
-        buffer.write(obj)
-
-    xref_pos = buffer.tell()
-    obj_count = len(objs) + 1
-
-    buffer.write(f"xref\n0 {obj_count}\n".encode("latin-1"))
-    buffer.write(b"0000000000 65535 f \n")
-    for off in offsets[1:]:
-        buffer.write(f"{off:010d} 00000 n \n".encode("latin-1"))
-
-    trailer = (
-        "trailer\n"
-        f"<< /Size {obj_count} /Root 1 0 R >>\n"
-        "startxref\n"
-        f"{xref_pos}\n"
-        "%%EOF\n"
-    )
-    buffer.write(trailer.encode("latin-1"))
-
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-
-    filename = f"kpr-{tenant}-{year}"
-    if month is not None:
-        filename += f"-{month:02d}"
-    filename += ".pdf"
+    # PDF ide u spool (memorija do PDF_SPOOL_BYTES, pa disk) i šalje se u
+    # chunk-ovima, kao sekcije inspekcijskog ZIP-a.
+    spooled = spool_pdf(lambda out: write_kpr_pdf(db, tenant, year, month, out))
 
+    filename = kpr_export_filename(tenant, year, month, "pdf")
     headers = {
         "Content-Disposition": f'inline; filename="{filename}"',
     }
 
     return StreamingResponse(
-        BytesIO(pdf_bytes),
+        iter_spooled_pdf(spooled),
         media_type="application/pdf",
         headers=headers,
     )
@@ -456,6 +567,40 @@ def export_kpr_pdf(
 #  EXCEL / CSV EXPORT – /kpr/export-excel
 # ======================================================
 
+KPR_CSV_HEADER = [
+    "datum",
+    "vrsta",
+    "kategorija",
+    "kupac_dobavljac",
+    "dok_broj",
+    "opis",
+    "iznos",
+    "valuta",
+    "poreski_priznat",
+    "source",
+    "source_id",
+]
+
+
+def kpr_csv_rows(db: Session, tenant: str, year: int, month: Optional[int]) -> Iterator[list]:
+    """
+    CSV redovi KPR-a (kolone KPR_CSV_HEADER), čitani server-side kursorom.
+    """
+    for r in _iter_kpr_rows(db, tenant_code=tenant, year=year, month=month, stream=True):
+        yield [
+            _get_row_date(r).isoformat(),
+            "PRIHOD" if r.kind == "income" else "RASHOD",
+            r.category or "",
+            r.counterparty or "",
+            r.document_number or "",
+            r.description or "",
+            str(_as_decimal(r.amount)),
+            getattr(r, "currency", "BAM") or "BAM",
+            "DA" if r.tax_deductible else "NE",
+            r.source or "",
+            r.source_id,
+        ]
+
 
 @router.get(
     "/export-excel",
@@ -489,76 +634,13 @@ def export_kpr_excel(
     ),
 ) -> StreamingResponse:
     tenant = _require_tenant(x_tenant_code)
-    _ensure_tenant(db, tenant)
-
-    rows = _collect_kpr_rows(db, tenant_code=tenant, year=year, month=month)
-
-    buffer = StringIO()
-    writer = csv.writer(buffer)
-
-    # Header
-    writer.writerow(
-        [
-            "datum",
-            "vrsta",
-            "kategorija",
-            "kupac_dobavljac",
-            "dok_broj",
-            "opis",
-            "iznos",
-            "valuta",
-            "poreski_priznat",
-            "source",
-            "source_id",
-        ]
-    )
-
-    for r in rows:
-        row_date = _get_row_date(r).isoformat()
-        vrsta = "PRIHOD" if r.kind == "income" else "RASHOD"
-        kategorija = r.category or ""
-        kupac = r.counterparty or ""
-        dok_broj = r.document_number or ""
-        opis = r.description or ""
-        iznos = str(_as_decimal(r.amount))
-        valuta = getattr(r, "currency", "BAM") or "BAM"
-        poreski = "DA" if r.tax_deductible else "NE"
-        source = r.source or ""
-        source_id = r.source_id
-
-        writer.writerow(
-            [
-                row_date,
-                vrsta,
-                kategorija,
-                kupac,
-                dok_broj,
-                opis,
-                iznos,
-                valuta,
-                poreski,
-                source,
-                source_id,
-            ]
-        )
-
-    csv_text = buffer.getvalue()
-    buffer.close()
 
     # UTF-8 sa BOM da Excel na Windowsu pravilno prepozna encoding
-    data = csv_text.encode("utf-8-sig")
-
-    filename = f"kpr-{tenant}-{year}"
-    if month is not None:
-        filename += f"-{month:02d}"
-    filename += ".csv"
-
-    headers = {
-        "Content-Disposition": f'attachment; filename="{filename}"',
-    }
-
-    return StreamingResponse(
-        BytesIO(data),
-        media_type="text/csv; charset=utf-8",
-        headers=headers,
+    chunks = iter_csv_chunks(
+        rows_from_own_session(lambda stream_db: kpr_csv_rows(stream_db, tenant, year, month)),
+        header=KPR_CSV_HEADER,
+        bom=True,
     )
+    filename = kpr_export_filename(tenant, year, month, "csv")
+
+    return csv_streaming_response(chunks, filename=filename)
@@ -1,7 +1,6 @@
 # /home/miso/dev/sp-app-sp-app/backend/app/routes/promet.py
 from __future__ import annotations
 
-import io
 from datetime import date
 from decimal import Decimal
 from typing import List, Optional
@@ -9,12 +8,22 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db import get_session as _get_session_dep
+from app.db import get_async_session, get_session as _get_session_dep
 from app.models import CashEntry
+from app.pagination import cached_list_total, keyset_filters, split_page
+from app.period_filters import period_filters
 from app.schemas.promet import PrometListResponse, PrometRow
-from app.tenant_security import require_tenant_code, ensure_tenant_exists
+from app.services.csv_stream import (
+    csv_streaming_response,
+    iter_csv_chunks,
+    rows_from_own_session,
+    stream_scalars,
+)
+from app.services.search import contains_filter
+from app.tenant_security import require_tenant_code
 
 router = APIRouter(
     tags=["promet"],
@@ -30,10 +39,6 @@ def _require_tenant(x_tenant_code: Optional[str]) -> str:
     return require_tenant_code(x_tenant_code)
 
 
-def _ensure_tenant_exists(db: Session, code: str) -> None:
-    ensure_tenant_exists(db, code)
-
-
 # ======================================================
 #  HELPER – bazni upit za KP (Knjiga prometa)
 # ======================================================
@@ -65,19 +70,20 @@ def _build_promet_base_stmt(
 
     stmt = select(CashEntry).where(CashEntry.tenant_code == tenant)
 
-    if year is not None:
-        stmt = stmt.where(func.extract("year", CashEntry.entry_date) == year)
-    if month is not None:
-        stmt = stmt.where(func.extract("month", CashEntry.entry_date) == month)
-
-    if date_from is not None:
-        stmt = stmt.where(CashEntry.entry_date >= date_from)
-    if date_to is not None:
-        stmt = stmt.where(CashEntry.entry_date <= date_to)
+    stmt = stmt.where(
+        *period_filters(
+            CashEntry.entry_date,
+            year=year,
+            month=month,
+            date_from=date_from,
+            date_to=date_to,
+        )
+    )
 
     if partner_query:
         # Za sada filtriramo po opisu (description) kao proxy za partnera
-        stmt = stmt.where(CashEntry.description.ilike(f"%{partner_query}%"))
+        # (trigram indeks ix_cash_entries_description_trgm, folding č/ć/š/đ/ž)
+        stmt = stmt.where(contains_filter(CashEntry.description, partner_query))
 
     return stmt
 
@@ -154,7 +160,10 @@ def _cash_entry_to_promet_row(entry: CashEntry) -> PrometRow:
         "- `partner_query` – filter po opisu (substring, case-insensitive).\n\n"
         "Paginacija:\n"
         "- Može se koristiti `page` + `page_size` (1-based), ili direktno `limit` + `offset`.\n"
-        "- Ako je `page` zadat, `limit`/`offset` se ignorišu."
+        "- Ako je `page` zadat, `limit`/`offset` se ignorišu.\n"
+        "- Za infinite scroll: `cursor` = `next_cursor` iz prethodnog odgovora (`page`/`offset` se "
+        "tada ignorišu) – svaka stranica je jednako brza, bez obzira koliko je duboko.\n"
+        "- `total` se kešira po verziji podataka tenanta; uz `include_total=false` se ne računa."
     ),
     responses={
         200: {
@@ -165,8 +174,8 @@ def _cash_entry_to_promet_row(entry: CashEntry) -> PrometRow:
         },
     },
 )
-def list_promet(
-    db: Session = Depends(_get_session_dep),
+async def list_promet(
+    db: AsyncSession = Depends(get_async_session),
     x_tenant_code: Optional[str] = Header(
         None,
         alias="X-Tenant-Code",
@@ -183,7 +192,7 @@ def list_promet(
     ),
     partner_query: Optional[str] = Query(
         None,
-        description="Filter po opisu (case-insensitive, substring).",
+        description="Filter po opisu (substring, bez obzira na velika/mala slova i č/ć/š/đ/ž).",
     ),
     page: Optional[int] = Query(
         None,
@@ -207,9 +216,16 @@ def list_promet(
         ge=0,
         description="Offset za rezultate (koristi se ako `page` nije zadat).",
     ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Kursor iz `next_cursor` prethodne stranice (keyset paginacija); ako je zadat, `page`/`offset` se ignoriše.",
+    ),
+    include_total: bool = Query(
+        True,
+        description="Ako je `false`, `total` se ne računa (null) – za infinite scroll nakon prve stranice.",
+    ),
 ) -> PrometListResponse:
     tenant = _require_tenant(x_tenant_code)
-    _ensure_tenant_exists(db, tenant)
 
     base_stmt = _build_promet_base_stmt(
         tenant=tenant,
@@ -220,9 +236,7 @@ def list_promet(
         partner_query=partner_query,
     )
 
-    # total
     count_stmt = select(func.count()).select_from(base_stmt.subquery())
-    total: int = db.execute(count_stmt).scalar_one()
 
     # paginacija – ako je zadat page, ima prednost nad limit/offset
     if page is not None:
@@ -236,17 +250,34 @@ def list_promet(
         query_offset = offset
 
     items_stmt = (
-        base_stmt.order_by(CashEntry.entry_date.desc(), CashEntry.id.desc())
-        .limit(query_limit)
-        .offset(query_offset)
+        base_stmt.where(*keyset_filters(CashEntry.entry_date, CashEntry.id, cursor))
+        .order_by(CashEntry.entry_date.desc(), CashEntry.id.desc())
+        .limit(query_limit + 1)
+        .offset(0 if cursor else query_offset)
     )
 
-    cash_rows: List[CashEntry] = db.execute(items_stmt).scalars().all()
+    # stranica pa (keširan) total – redom, na sesiji zahtjeva
+    cash_result = await db.scalars(items_stmt)
+    total = None
+    if include_total:
+        params = {
+            "year": year,
+            "month": month,
+            "date_from": date_from,
+            "date_to": date_to,
+            "partner_query": partner_query,
+        }
+        total = await cached_list_total(db, tenant, "promet.list.total", params, count_stmt)
+    cash_rows, next_cursor = split_page(cash_result.all(), query_limit, "entry_date")
     promet_items: List[PrometRow] = [
         _cash_entry_to_promet_row(entry) for entry in cash_rows
     ]
 
-    return PrometListResponse(total=total, items=promet_items)
+    return PrometListResponse(
+        total=total,
+        items=promet_items,
+        next_cursor=next_cursor,
+    )
 
 
 # ======================================================
@@ -279,7 +310,6 @@ def export_promet(
     partner_query: Optional[str] = Query(None),
 ) -> StreamingResponse:
     tenant = _require_tenant(x_tenant_code)
-    _ensure_tenant_exists(db, tenant)
 
     base_stmt = _build_promet_base_stmt(
         tenant=tenant,
@@ -291,41 +321,25 @@ def export_promet(
     )
 
     base_stmt = base_stmt.order_by(CashEntry.entry_date.asc(), CashEntry.id.asc())
-    cash_rows: List[CashEntry] = db.execute(base_stmt).scalars().all()
-
-    # Priprema CSV sadržaja (Excel-friendly, delimiter ';', UTF-8 sa BOM)
-    output = io.StringIO()
-    # Header red
-    output.write("Datum;Broj dokumenta;Partner;Iznos;Napomena\n")
-
-    for entry in cash_rows:
-        row = _cash_entry_to_promet_row(entry)
-
-        date_str = row.date.isoformat()
-        doc_no = row.document_number or ""
-        partner = row.partner_name or ""
-        amount_str = f"{row.amount:.2f}"
-        note_str = row.note or ""
-
-        line = (
-            f"{date_str};"
-            f"{doc_no};"
-            f"{partner};"
-            f"{amount_str};"
-            f"{note_str}\n"
-        )
-        output.write(line)
 
-    csv_bytes = ("\ufeff" + output.getvalue()).encode("utf-8")  # BOM za Excel
-    buffer = io.BytesIO(csv_bytes)
-
-    filename = "promet-export.csv"
-    headers = {
-        "Content-Disposition": f'attachment; filename="{filename}"',
-    }
-
-    return StreamingResponse(
-        buffer,
-        media_type="text/csv; charset=utf-8",
-        headers=headers,
+    def _export_rows(stream_db: Session):
+        for entry in stream_scalars(stream_db, base_stmt):
+            row = _cash_entry_to_promet_row(entry)
+            yield [
+                row.date.isoformat(),
+                row.document_number or "",
+                row.partner_name or "",
+                f"{row.amount:.2f}",
+                row.note or "",
+            ]
+
+    # CSV se streama iz server-side kursora (Excel-friendly, delimiter ';', UTF-8 sa BOM)
+    chunks = iter_csv_chunks(
+        rows_from_own_session(_export_rows),
+        header=["Datum", "Broj dokumenta", "Partner", "Iznos", "Napomena"],
+        delimiter=";",
+        lineterminator="\n",
+        bom=True,
     )
+
+    return csv_streaming_response(chunks, filename="promet-export.csv")
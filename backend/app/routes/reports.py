@@ -3,17 +3,22 @@ from __future__ import annotations
 
 from decimal import Decimal
 from typing import List, Optional
-import csv
-import io
 
 from fastapi import APIRouter, Depends, Header, Path
-from fastapi.responses import Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db import get_session as _get_session_dep
+from app.db import get_async_session, get_session as _get_session_dep
+from app.http_cache import tenant_etag
+from app.services.csv_stream import csv_streaming_response, iter_csv_chunks
+from app.services.response_cache import response_cache
 from app.tenant_security import require_tenant_code
-from app.routes.tax import _aggregate_monthly_income_and_expense, yearly_tax_preview
+from app.routes.tax import (
+    _aggregate_yearly_income_and_expense_by_month,
+    yearly_tax_preview,
+)
 
 router = APIRouter(
     prefix="/reports",
@@ -70,6 +75,7 @@ class YearSummaryResponse(BaseModel):
 # ======================================================
 @router.get(
     "/cashflow/{year}",
+    dependencies=[Depends(tenant_etag)],
     response_model=CashflowYearResponse,
     summary="Godišnji cashflow (prihodi/rashodi/profit po mjesecima)",
     description=(
@@ -87,7 +93,7 @@ class YearSummaryResponse(BaseModel):
     ),
     operation_id="reports_cashflow_year",
 )
-def get_cashflow_year(
+async def get_cashflow_year(
     year: int = Path(
         ...,
         ge=2000,
@@ -103,14 +109,14 @@ def get_cashflow_year(
             "Primjer: `frizer-mika`, `t-demo`."
         ),
     ),
-    db: Session = Depends(_get_session_dep),
+    db: AsyncSession = Depends(get_async_session),
 ) -> CashflowYearResponse:
     """
     Godišnji cashflow overview po mjesecima.
 
-    Za svaki mjesec od 1 do 12 internim pozivom koristi
-    `_aggregate_monthly_income_and_expense` iz TAX modula kako bi dobio
-    ukupne prihode i rashode za taj mjesec, a zatim računa profit:
+    Jednim upitom (`_aggregate_yearly_income_and_expense_by_month` iz TAX
+    modula) dobija ukupne prihode i rashode za svaki mjesec 1–12, a zatim
+    računa profit:
 
     `profit = income - expense`.
 
@@ -120,16 +126,28 @@ def get_cashflow_year(
     - input_invoices
     """
     tenant = _require_tenant(x_tenant_code)
+    return await response_cache.aget_or_compute(
+        db,
+        tenant,
+        "reports.cashflow_year",
+        {"year": year},
+        CashflowYearResponse,
+        lambda: db.run_sync(lambda sync_db: _compute_cashflow_year(db=sync_db, tenant=tenant, year=year)),
+    )
 
+
+def _compute_cashflow_year(*, db: Session, tenant: str, year: int) -> CashflowYearResponse:
     items: list[CashflowMonthlyItem] = []
 
+    # Jedan upit nad rollupima za svih 12 mjeseci (isto kao CSV export)
+    totals_by_month = _aggregate_yearly_income_and_expense_by_month(
+        year=year,
+        tenant_code=tenant,
+        db=db,
+    )
+
     for month in range(1, 13):
-        total_income, total_expense = _aggregate_monthly_income_and_expense(
-            year=year,
-            month=month,
-            tenant_code=tenant,
-            db=db,
-        )
+        total_income, total_expense = totals_by_month[month]
         profit = total_income - total_expense
 
         items.append(
@@ -181,7 +199,7 @@ def export_cashflow_year_csv(
         ),
     ),
     db: Session = Depends(_get_session_dep),
-) -> Response:
+) -> StreamingResponse:
     """
     CSV export godišnjeg cashflow overview-a.
 
@@ -190,26 +208,18 @@ def export_cashflow_year_csv(
     """
     tenant = _require_tenant(x_tenant_code)
 
-    buffer = io.StringIO()
-    writer = csv.writer(buffer)
-
-    # Header
-    writer.writerow(
-        ["year", "month", "tenant_code", "income", "expense", "profit", "currency"]
+    # Jedan upit nad rollupima za svih 12 mjeseci
+    totals_by_month = _aggregate_yearly_income_and_expense_by_month(
+        year=year,
+        tenant_code=tenant,
+        db=db,
     )
 
-    # 12 mjeseci
-    for month in range(1, 13):
-        total_income, total_expense = _aggregate_monthly_income_and_expense(
-            year=year,
-            month=month,
-            tenant_code=tenant,
-            db=db,
-        )
-        profit = total_income - total_expense
-
-        writer.writerow(
-            [
+    def _rows():
+        for month in range(1, 13):
+            total_income, total_expense = totals_by_month[month]
+            profit = total_income - total_expense
+            yield [
                 year,
                 month,
                 tenant,
@@ -218,19 +228,16 @@ def export_cashflow_year_csv(
                 str(profit),
                 "BAM",
             ]
-        )
 
-    csv_content = buffer.getvalue()
-    buffer.close()
-
-    filename = f"cashflow-{tenant}-{year}.csv"
+    chunks = iter_csv_chunks(
+        _rows(),
+        header=["year", "month", "tenant_code", "income", "expense", "profit", "currency"],
+    )
 
-    return Response(
-        content=csv_content,
+    return csv_streaming_response(
+        chunks,
+        filename=f"cashflow-{tenant}-{year}.csv",
         media_type="text/csv",
-        headers={
-            "Content-Disposition": f'attachment; filename="{filename}"',
-        },
     )
 
 
@@ -239,6 +246,7 @@ def export_cashflow_year_csv(
 # ======================================================
 @router.get(
     "/year-summary/{year}",
+    dependencies=[Depends(tenant_etag)],
     response_model=YearSummaryResponse,
     summary="Godišnji summary (cashflow + porezi) za tenenta",
     description=(
@@ -251,7 +259,7 @@ def export_cashflow_year_csv(
     ),
     operation_id="reports_year_summary",
 )
-def get_year_summary(
+async def get_year_summary(
     year: int = Path(
         ...,
         ge=2000,
@@ -267,7 +275,7 @@ def get_year_summary(
             "Primjer: `frizer-mika`, `t-demo`."
         ),
     ),
-    db: Session = Depends(_get_session_dep),
+    db: AsyncSession = Depends(get_async_session),
 ) -> YearSummaryResponse:
     """
     Kombinovani godišnji summary za jednog tenenta.
@@ -279,29 +287,40 @@ def get_year_summary(
     Ako nema finalizovanih mjeseci, porezni dio će biti 0 (DUMMY logika kao u TAX).
     """
     tenant = _require_tenant(x_tenant_code)
+    return await response_cache.aget_or_compute(
+        db,
+        tenant,
+        "reports.year_summary",
+        {"year": year},
+        YearSummaryResponse,
+        lambda: _compute_year_summary(db, tenant=tenant, year=year),
+    )
 
-    # 1) Sabiranje prihoda/rashoda preko 12 mjeseci
-    total_income = Decimal("0.00")
-    total_expense = Decimal("0.00")
 
-    for month in range(1, 13):
-        income, expense = _aggregate_monthly_income_and_expense(
+async def _compute_year_summary(db: AsyncSession, *, tenant: str, year: int) -> YearSummaryResponse:
+    # Prihodi/rashodi i poreski dio (tax_monthly_results) redom na sesiji
+    # zahtjeva. Sync helperi iz TAX modula se izvršavaju preko `run_sync`
+    # (isti upiti, async driver).
+    totals_by_month = await db.run_sync(
+        lambda sync_db: _aggregate_yearly_income_and_expense_by_month(
             year=year,
-            month=month,
             tenant_code=tenant,
-            db=db,
+            db=sync_db,
         )
-        total_income += income
-        total_expense += expense
+    )
+    yearly_tax = await db.run_sync(
+        lambda sync_db: yearly_tax_preview(
+            year=year,
+            x_tenant_code=tenant,
+            db=sync_db,
+        )
+    )
 
-    profit = total_income - total_expense
+    # 1) Sabiranje prihoda/rashoda preko 12 mjeseci
+    total_income = sum((income for income, _ in totals_by_month.values()), Decimal("0.00"))
+    total_expense = sum((expense for _, expense in totals_by_month.values()), Decimal("0.00"))
 
-    # 2) Poreski dio – reuse yearly_tax_preview
-    yearly_tax = yearly_tax_preview(
-        year=year,
-        x_tenant_code=tenant,
-        db=db,
-    )
+    profit = total_income - total_expense
 
     return YearSummaryResponse(
         year=year,
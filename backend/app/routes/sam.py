@@ -1,17 +1,18 @@
 from __future__ import annotations
 
-import csv
-import io
 from decimal import Decimal
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Header, HTTPException
-from fastapi.responses import Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.db import get_session as _get_session_dep
+from app.http_cache import tenant_etag
 from app.models import TaxMonthlyResult
 from app.schemas.sam import SamMonthlyItem, SamOverviewRead, SamYearlySummary
+from app.services.csv_stream import csv_streaming_response, iter_csv_chunks
+from app.services.response_cache import response_cache
 from app.tenant_security import require_tenant_code
 
 router = APIRouter(
@@ -63,7 +64,8 @@ def _build_sam_overview(
     - GET /sam/overview/{year} (JSON)
     - GET /sam/overview/{year}/export (CSV)
 
-    Tako osiguravamo da oba endpoint-a imaju identičnu logiku.
+    Tako osiguravamo da oba endpoint-a imaju identičnu logiku (i isti unos
+    u kešu odgovora).
     """
     if year < 2000 or year > 2100:
         raise HTTPException(
@@ -71,6 +73,17 @@ def _build_sam_overview(
             detail="Godina mora biti u rasponu 2000–2100.",
         )
 
+    return response_cache.get_or_compute(
+        db,
+        tenant_code,
+        "sam.overview",
+        {"year": year},
+        SamOverviewRead,
+        lambda: _compute_sam_overview(year=year, tenant_code=tenant_code, db=db),
+    )
+
+
+def _compute_sam_overview(*, year: int, tenant_code: str, db: Session) -> SamOverviewRead:
     # 1) Učitavamo sve mjesečne rezultate za datog tenanta i godinu
     results: List[TaxMonthlyResult] = (
         db.query(TaxMonthlyResult)
@@ -152,6 +165,7 @@ def _build_sam_overview(
 
 @router.get(
     "/overview/{year}",
+    dependencies=[Depends(tenant_etag)],
     response_model=SamOverviewRead,
     summary="Godišnji SAM overview (kombinovani monthly + yearly odgovor).",
     description=(
@@ -201,7 +215,7 @@ def export_sam_overview_csv(
     year: int,
     tenant_code: str = Depends(_require_tenant),
     db: Session = Depends(_get_session_dep),
-) -> Response:
+) -> StreamingResponse:
     """
     CSV export SAM overview-a za zadatu godinu i tenant-a.
 
@@ -210,28 +224,10 @@ def export_sam_overview_csv(
     """
     overview = _build_sam_overview(year=year, tenant_code=tenant_code, db=db)
 
-    buffer = io.StringIO()
-    writer = csv.writer(buffer)
-
-    # 1) Monthly sekcija
-    writer.writerow(
-        [
-            "section",
-            "month",
-            "month_label",
-            "income_total",
-            "expense_total",
-            "tax_base",
-            "tax_due",
-            "contributions_due",
-            "total_due",
-            "is_finalized",
-        ]
-    )
-
-    for m in overview.months:
-        writer.writerow(
-            [
+    def _rows():
+        # 1) Monthly sekcija
+        for m in overview.months:
+            yield [
                 "month",
                 m.month,
                 m.month_label,
@@ -243,15 +239,13 @@ def export_sam_overview_csv(
                 str(m.total_due),
                 "true" if m.is_finalized else "false",
             ]
-        )
 
-    # Prazan red kao separator
-    writer.writerow([])
+        # Prazan red kao separator
+        yield []
 
-    # 2) Yearly sekcija
-    ys = overview.yearly_summary
-    writer.writerow(
-        [
+        # 2) Yearly sekcija
+        ys = overview.yearly_summary
+        yield [
             "section",
             "year",
             "income_total",
@@ -263,9 +257,7 @@ def export_sam_overview_csv(
             "finalized_months",
             "open_months",
         ]
-    )
-    writer.writerow(
-        [
+        yield [
             "yearly",
             ys.year,
             str(ys.income_total),
@@ -277,17 +269,25 @@ def export_sam_overview_csv(
             ys.finalized_months,
             ys.open_months,
         ]
-    )
 
-    csv_content = buffer.getvalue()
-    buffer.close()
-
-    filename = f"sam-overview-{tenant_code}-{year}.csv"
+    chunks = iter_csv_chunks(
+        _rows(),
+        header=[
+            "section",
+            "month",
+            "month_label",
+            "income_total",
+            "expense_total",
+            "tax_base",
+            "tax_due",
+            "contributions_due",
+            "total_due",
+            "is_finalized",
+        ],
+    )
 
-    return Response(
-        content=csv_content,
+    return csv_streaming_response(
+        chunks,
+        filename=f"sam-overview-{tenant_code}-{year}.csv",
         media_type="text/csv",
-        headers={
-            "Content-Disposition": f'attachment; filename="{filename}"',
-        },
     )
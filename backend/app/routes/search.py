@@ -0,0 +1,49 @@
+# /home/miso/dev/sp-app/sp-app/backend/app/routes/search.py
+from __future__ import annotations
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import get_async_session
+from app.schemas.search import SearchHit, SearchKind, SearchResponse
+from app.services.search import build_search_stmt, fold_search_text
+from app.tenant_security import require_tenant_code
+
+router = APIRouter(
+    tags=["search"],
+)
+
+
+@router.get(
+    "/search",
+    response_model=SearchResponse,
+    summary="Pretraga faktura, ulaznih faktura i uplata",
+    description=(
+        "Jedinstvena pretraga po kupcu (fakture), dobavljaču (ulazne fakture) i "
+        "opisu (uplate/isplate), rangirana po sličnosti sa upitom.\n\n"
+        "Ne razlikuje velika/mala slova ni č/ć/š/đ/ž (`Čačak` = `cacak`) i "
+        "toleriše manje tipfelere."
+    ),
+)
+async def search(
+    q: str = Query(..., min_length=2, max_length=128, description="Tekst za pretragu."),
+    kind: Optional[List[SearchKind]] = Query(
+        None,
+        description="Ograniči na vrste dokumenata (može više puta); default sve.",
+    ),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_session),
+    x_tenant_code: Optional[str] = Header(None, alias="X-Tenant-Code"),
+) -> SearchResponse:
+    tenant = require_tenant_code(x_tenant_code)
+
+    if len(fold_search_text(q)) < 2:
+        raise HTTPException(status_code=400, detail="Search query must have at least 2 characters")
+
+    rows = (await db.execute(build_search_stmt(tenant, q, kinds=kind, limit=limit))).mappings()
+    return SearchResponse(
+        query=q,
+        items=[SearchHit.model_validate(dict(row)) for row in rows],
+    )
@@ -1,6 +1,7 @@
 # /home/miso/dev/sp-app/sp-app/backend/app/routes/settings.py
 from __future__ import annotations
 
+import io
 import os
 from pathlib import Path
 from typing import Optional, Tuple, List, Any
@@ -17,7 +18,7 @@ from fastapi import (
     Query,
 )
 from fastapi.responses import FileResponse
-from sqlalchemy import select, or_
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.db import get_session
@@ -27,7 +28,6 @@ from app.models import (
     TenantTaxProfileSettings,
     TenantSubscriptionSettings,
     TenantAsset,
-    AppConstantsSet,
 )
 from app.schemas.settings import (
     ProfileSettingsRead,
@@ -44,18 +44,27 @@ from app.schemas.settings_ui import (
     UiField,
     UiResolvedValue,
 )
+from app.services.blob_store import (
+    acquire_blob,
+    blob_relative_path,
+    delete_and_release,
+    resolve_stored_file,
+)
+from app.services.invoice_numbers import (
+    DEFAULT_INVOICE_NUMBER_FORMAT,
+    InvoiceNumberFormatError,
+    validate_invoice_number_format,
+)
+from app.services.tax_config import tax_config_resolver
 
 router = APIRouter(prefix="/settings", tags=["settings"])
 
+# Stari logo fajlovi (prije blob store-a, sha256 = NULL); novi idu u BLOB_STORAGE_DIR.
 TENANT_ASSETS_ROOT = Path(os.getenv("TENANT_ASSETS_DIR", "data/tenant_assets"))
 MAX_LOGO_BYTES = 2 * 1024 * 1024  # 2MB
 ALLOWED_LOGO_MIME = {"image/png", "image/jpeg", "image/webp"}
 
 
-def _ensure_assets_root() -> None:
-    TENANT_ASSETS_ROOT.mkdir(parents=True, exist_ok=True)
-
-
 def _safe_filename(original: str | None) -> str:
     if not original:
         return "uploaded-file"
@@ -85,15 +94,20 @@ def _try_convert_logo_to_png(file_bytes: bytes) -> Tuple[bytes, str]:
         return file_bytes, "application/octet-stream"
 
 
-def _delete_asset_file_safely(asset: TenantAsset) -> None:
-    if not asset.storage_path:
-        return
-    full_path = TENANT_ASSETS_ROOT / asset.storage_path
-    try:
-        if full_path.exists():
-            full_path.unlink()
-    except OSError:
-        pass
+def _delete_asset(db: Session, asset: TenantAsset) -> None:
+    """
+    Briše asset (DB red + fajl). Stari fajl (van blob store-a) brišemo odmah,
+    a blob tek kada nestane zadnja referenca na njega. Radi commit.
+    """
+    if not asset.sha256 and asset.storage_path:
+        full_path = TENANT_ASSETS_ROOT / asset.storage_path
+        try:
+            if full_path.exists():
+                full_path.unlink()
+        except OSError:
+            pass
+
+    delete_and_release(db, asset)
 
 
 def _get_or_create_profile_row(db: Session, tenant: str) -> TenantProfileSettings:
@@ -226,27 +240,6 @@ def _ui_scenario_options_for_entity(entity: str) -> list[UiScenarioOption]:
     ]
 
 
-def _find_current_constants_set(
-    *,
-    db: Session,
-    jurisdiction: str,
-    scenario_key: str,
-    as_of,  # date
-) -> Optional[AppConstantsSet]:
-    stmt = (
-        select(AppConstantsSet)
-        .where(
-            AppConstantsSet.jurisdiction == jurisdiction,
-            AppConstantsSet.scenario_key == scenario_key,
-            AppConstantsSet.effective_from <= as_of,
-            or_(AppConstantsSet.effective_to.is_(None), AppConstantsSet.effective_to >= as_of),
-        )
-        .order_by(AppConstantsSet.effective_from.desc(), AppConstantsSet.id.desc())
-        .limit(1)
-    )
-    return db.execute(stmt).scalar_one_or_none()
-
-
 def _payload_currency(payload: object) -> Optional[str]:
     if not isinstance(payload, dict):
         return None
@@ -575,6 +568,23 @@ def upsert_profile_settings(
 
     fields_set = payload.model_fields_set  # pydantic v2: koja su polja eksplicitno poslata
 
+    if {"invoice_number_format", "invoice_number_reset"} & fields_set:
+        # provjeravamo kombinaciju novih i postojećih vrijednosti (None = default)
+        pattern = (
+            payload.invoice_number_format
+            if "invoice_number_format" in fields_set
+            else getattr(row, "invoice_number_format", None)
+        )
+        reset = (
+            payload.invoice_number_reset
+            if "invoice_number_reset" in fields_set
+            else getattr(row, "invoice_number_reset", None)
+        )
+        try:
+            validate_invoice_number_format(pattern or DEFAULT_INVOICE_NUMBER_FORMAT, reset or "yearly")
+        except InvoiceNumberFormatError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+
     if row is None:
         row = TenantProfileSettings(
             tenant_code=tenant,
@@ -591,6 +601,10 @@ def upsert_profile_settings(
             row.logo_attachment_id = payload.logo_attachment_id
         if "logo_asset_id" in fields_set:
             row.logo_asset_id = payload.logo_asset_id
+        if "invoice_number_format" in fields_set:
+            row.invoice_number_format = payload.invoice_number_format
+        if "invoice_number_reset" in fields_set:
+            row.invoice_number_reset = payload.invoice_number_reset
 
         db.commit()
         db.refresh(row)
@@ -613,6 +627,12 @@ def upsert_profile_settings(
     if "logo_asset_id" in fields_set:
         row.logo_asset_id = payload.logo_asset_id
 
+    # Brojevi faktura (server-side dodjela)
+    if "invoice_number_format" in fields_set:
+        row.invoice_number_format = payload.invoice_number_format
+    if "invoice_number_reset" in fields_set:
+        row.invoice_number_reset = payload.invoice_number_reset
+
     db.commit()
     db.refresh(row)
     return row
@@ -651,7 +671,6 @@ def upload_profile_logo(
     if len(file_bytes) > MAX_LOGO_BYTES:
         raise HTTPException(status_code=400, detail="Logo file is too large (max 2MB)")
 
-    _ensure_assets_root()
     profile = _get_or_create_profile_row(db, tenant)
 
     # ako postoji prethodni logo_asset_id, izbriši ga (DB + fajl) nakon kreiranja novog
@@ -672,31 +691,26 @@ def upload_profile_logo(
     store_bytes = converted_bytes
     store_name = "logo.png" if store_ct == "image/png" else original_name
 
-    # 1) kreiraj asset red sa TEMP path
+    # 1) fajl u blob store (isti logo uploadovan ponovo se ne piše na disk)
+    try:
+        sha256, size_bytes = acquire_blob(db, io.BytesIO(store_bytes))
+    except OSError as exc:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to store logo file: {exc}") from exc
+
+    # 2) asset red referencira blob
     asset = TenantAsset(
         tenant_code=tenant,
         kind="logo",
         filename=store_name,
         content_type=store_ct,
-        size_bytes=len(store_bytes),
-        storage_path="__TEMP__",
+        size_bytes=size_bytes,
+        storage_path=blob_relative_path(sha256),
+        sha256=sha256,
     )
     db.add(asset)
     db.flush()  # dobije ID
 
-    tenant_dir = TENANT_ASSETS_ROOT / tenant
-    tenant_dir.mkdir(parents=True, exist_ok=True)
-
-    relative_path = f"{tenant}/{asset.id}_{store_name}"
-    full_path = TENANT_ASSETS_ROOT / relative_path
-
-    try:
-        full_path.write_bytes(store_bytes)
-    except OSError as exc:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Failed to store logo file: {exc}") from exc
-
-    asset.storage_path = str(relative_path)
     profile.logo_asset_id = asset.id
 
     # opcionalno: ako želiš potpuno prebacivanje na novo, možeš obrisati stari logo_attachment_id
@@ -707,9 +721,7 @@ def upload_profile_logo(
 
     # sada brišemo prethodni asset (ako postoji)
     if prev_asset is not None:
-        _delete_asset_file_safely(prev_asset)
-        db.delete(prev_asset)
-        db.commit()
+        _delete_asset(db, prev_asset)
 
     return profile
 
@@ -743,8 +755,8 @@ def get_profile_logo(
     if asset is None or not asset.storage_path:
         raise HTTPException(status_code=404, detail="Logo not found")
 
-    full_path = TENANT_ASSETS_ROOT / asset.storage_path
-    if not full_path.exists():
+    full_path = resolve_stored_file(asset.sha256, asset.storage_path, TENANT_ASSETS_ROOT)
+    if full_path is None or not full_path.exists():
         raise HTTPException(status_code=404, detail="Logo file not found")
 
     return FileResponse(
@@ -786,9 +798,7 @@ def delete_profile_logo(
     db.commit()
 
     if asset is not None:
-        _delete_asset_file_safely(asset)
-        db.delete(asset)
-        db.commit()
+        _delete_asset(db, asset)
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -857,6 +867,9 @@ def upsert_tax_profile(
 
     db.commit()
     db.refresh(row)
+
+    # profil određuje jurisdikciju/scenario za TAX obračun
+    tax_config_resolver.invalidate_tenant(tenant)
     return row
 
 
@@ -913,8 +926,8 @@ def get_tax_profile_ui_schema(
         as_of_date = _date.today()
 
     jurisdiction = _entity_to_jurisdiction(entity)
-    cur_set = _find_current_constants_set(
-        db=db,
+    cur_set = tax_config_resolver.current_constants_set(
+        db,
         jurisdiction=jurisdiction,
         scenario_key=scenario_key,
         as_of=as_of_date,
@@ -1,19 +1,17 @@
 # /home/miso/dev/sp-app/sp-app/backend/app/routes/tax.py
 from __future__ import annotations
 
-import csv
-import io
 from datetime import date
 from decimal import Decimal
-from typing import Optional, Tuple, Any
-from uuid import uuid4
+from typing import Optional, Tuple
 
 from fastapi import APIRouter, Depends, Header, HTTPException, Query
-from fastapi.responses import Response
-from sqlalchemy import case, func, or_, select
+from fastapi.responses import StreamingResponse
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session
 
 from app.db import get_session as _get_session_dep
+from app.http_cache import tenant_etag
 from app.models import (
     CashEntry,
     Invoice,
@@ -23,10 +21,8 @@ from app.models import (
     TaxMonthlyFinalizeHistory,
     TaxSettings,
     TaxMonthlyPayment,
-    Tenant,
-    TenantTaxProfileSettings,
-    AppConstantsSet,
 )
+from app.period_filters import month_bounds, year_bounds
 from app.schemas.tax import (
     ErrorResponse,
     MonthlyTaxStatusResponse,
@@ -38,7 +34,9 @@ from app.schemas.tax import (
     TaxMonthlyPaymentUpsert,
 )
 from app.schemas.tax_settings import TaxSettingsRead, TaxSettingsUpsert
-from app.tenant_security import require_tenant_code
+from app.services.csv_stream import csv_streaming_response, iter_csv_chunks
+from app.services.tax_config import DEFAULT_TAX_CONFIG, tax_config_resolver
+from app.tenant_security import ensure_tenant_exists, require_tenant_code
 
 router = APIRouter(
     tags=["tax"],
@@ -56,35 +54,16 @@ def _ensure_tenant_exists(db: Session, tenant_code: str) -> None:
     """
     Osigurava da postoji red u tabeli `tenants` za dati tenant_code.
 
-    Potrebno zbog FK relacija u nekim TAX tabelama (npr. tax_monthly_payments -> tenants.code).
-    U testovima se često koristi novi tenant code bez eksplicitnog kreiranja tenanta,
-    pa ovdje radimo "auto-create" samo kada je stvarno potrebno (write putanja).
+    Potrebno zbog FK relacija u nekim TAX tabelama (npr. tax_monthly_payments -> tenants.code),
+    pa se poziva samo na write putanjama (keš + auto-provisioning u tenant_security).
     """
-    exists = db.execute(select(Tenant).where(Tenant.code == tenant_code)).scalar_one_or_none()
-    if exists is not None:
-        return
-
-    db.add(
-        Tenant(
-            id=uuid4().hex[:32],
-            code=tenant_code,
-            name=f"Auto-created tenant: {tenant_code}",
-        )
-    )
-    db.commit()
+    ensure_tenant_exists(db, tenant_code)
 
 
 # ======================================================
 #  DEFAULT / FALLBACK KONFIGURACIJA (DUMMY)
 # ======================================================
-DEFAULT_TAX_CONFIG = TaxDummyConfig(
-    income_tax_rate=Decimal("0.10"),
-    pension_contribution_rate=Decimal("0.18"),
-    health_contribution_rate=Decimal("0.12"),
-    unemployment_contribution_rate=Decimal("0.015"),
-    flat_costs_rate=Decimal("0.30"),
-    currency="BAM",
-)
+# DEFAULT_TAX_CONFIG živi u app.services.tax_config (dijeli ga resolver).
 
 # BACKWARD COMPATIBILITY:
 # Postojeći testovi importuju TAX_DUMMY_CONFIG iz app.routes.tax
@@ -92,276 +71,20 @@ TAX_DUMMY_CONFIG = DEFAULT_TAX_CONFIG
 
 
 # ======================================================
-#  APP CONSTANTS (effective-dated) helpers
+#  EFFECTIVE-DATED KONFIGURACIJA
 # ======================================================
-def _normalize_jurisdiction(entity_value: str) -> str:
-    """
-    Normalizacija vrijednosti iz settings/tax (entity) na jurisdikciju u app_constants_sets.
-
-    Očekujemo:
-      - RS
-      - FBiH
-      - BD  (Brčko distrikt)
-    """
-    v = (entity_value or "").strip()
-    if not v:
-        return "RS"
-
-    upper = v.upper()
-
-    if upper in {"RS"}:
-        return "RS"
-    if upper in {"FBIH", "FEDERACIJA", "FEDERACIJA BIH"}:
-        return "FBiH"
-    if upper in {"BD", "BRCKO", "BRČKO", "BRCKO DISTRIKT", "BRČKO DISTRIKT"}:
-        return "BD"
-
-    # Ako dođe nešto neočekivano, držimo se defaulta
-    return "RS"
-
-
-def _default_scenario_key_for_profile(prof: TenantTaxProfileSettings) -> Optional[str]:
-    """
-    Fallback mapiranje za profile koji još nemaju eksplicitno postavljen scenario_key.
-
-    Važno za backward compatibility:
-    - stari testovi i stari podaci mogu imati entity + has_additional_activity,
-      bez scenario_key.
-    """
-    entity = (prof.entity or "").strip()
-
-    if entity == "RS":
-        return "rs_supplementary" if bool(prof.has_additional_activity) else "rs_primary"
-    if entity == "FBiH":
-        return "fbih_obrt"
-    if entity in {"Brcko", "BD"}:
-        return "bd_samostalna"
-
-    return None
-
-
-def _find_current_constants_set(
-    *,
-    db: Session,
-    jurisdiction: str,
-    as_of: date,
-    scenario_key: Optional[str] = None,
-) -> Optional[AppConstantsSet]:
-    """
-    Vraća set koji je aktivan na datum `as_of`:
-      effective_from <= as_of AND (effective_to IS NULL OR effective_to >= as_of)
-
-    Ako je scenario_key zadat, lookup je strožiji:
-      jurisdiction + scenario_key + date
-
-    Ako ih ima više (ne bi smjelo), uzima najnoviji po effective_from.
-    """
-    stmt = (
-        select(AppConstantsSet)
-        .where(
-            AppConstantsSet.jurisdiction == jurisdiction,
-            AppConstantsSet.effective_from <= as_of,
-            or_(AppConstantsSet.effective_to.is_(None), AppConstantsSet.effective_to >= as_of),
-        )
-        .order_by(AppConstantsSet.effective_from.desc(), AppConstantsSet.id.desc())
-        .limit(1)
-    )
-
-    if scenario_key:
-        stmt = stmt.where(AppConstantsSet.scenario_key == scenario_key)
-
-    return db.execute(stmt).scalar_one_or_none()
-
-
-def _decimal_from_payload(val: Any) -> Optional[Decimal]:
-    if val is None:
-        return None
-    try:
-        return Decimal(str(val))
-    except Exception:
-        return None
-
-
-def _tax_config_from_constants_payload(payload: dict[str, Any]) -> Optional[TaxDummyConfig]:
-    """
-    Izvlači TAX stope iz JSON payload-a u app_constants_sets.
-
-    Podržani oblici:
-
-    A) Legacy root keys:
-       {
-         "income_tax_rate": 0.10,
-         "pension_contribution_rate": 0.18,
-         ...
-         "currency": "BAM"
-       }
-
-    B) Legacy nested under "tax":
-       {
-         "tax": {
-           "income_tax_rate": 0.10,
-           "pension_contribution_rate": 0.18,
-           ...
-           "currency": "BAM"
-         }
-       }
-
-    C) V2 payload shape:
-       {
-         "base": {
-           "currency": "BAM"
-         },
-         "tax": {
-           "income_tax_rate": 0.10,
-           "flat_costs_rate": 0.30
-         },
-         "contributions": {
-           "pension_rate": 0.18,
-           "health_rate": 0.12,
-           "unemployment_rate": 0.015
-         }
-       }
-
-    Ako payload nema ništa relevantno → vrati None.
-    """
-    if not isinstance(payload, dict):
-        return None
-
-    tax_block = payload.get("tax") if isinstance(payload.get("tax"), dict) else {}
-    contrib_block = payload.get("contributions") if isinstance(payload.get("contributions"), dict) else {}
-    base_block = payload.get("base") if isinstance(payload.get("base"), dict) else {}
-
-    has_any_relevant = any(
-        key in payload
-        for key in {
-            "income_tax_rate",
-            "pension_contribution_rate",
-            "health_contribution_rate",
-            "unemployment_contribution_rate",
-            "flat_costs_rate",
-            "currency",
-        }
-    ) or any(
-        key in tax_block
-        for key in {
-            "income_tax_rate",
-            "pension_contribution_rate",
-            "health_contribution_rate",
-            "unemployment_contribution_rate",
-            "flat_costs_rate",
-            "currency",
-        }
-    ) or any(
-        key in contrib_block
-        for key in {
-            "pension_rate",
-            "health_rate",
-            "unemployment_rate",
-        }
-    ) or ("currency" in base_block)
-
-    if not has_any_relevant:
-        return None
-
-    inc = _decimal_from_payload(
-        tax_block.get("income_tax_rate", payload.get("income_tax_rate"))
-    )
-
-    # Legacy ili V2 contributions mapping
-    pen = _decimal_from_payload(
-        contrib_block.get(
-            "pension_rate",
-            tax_block.get("pension_contribution_rate", payload.get("pension_contribution_rate")),
-        )
-    )
-    hea = _decimal_from_payload(
-        contrib_block.get(
-            "health_rate",
-            tax_block.get("health_contribution_rate", payload.get("health_contribution_rate")),
-        )
-    )
-    une = _decimal_from_payload(
-        contrib_block.get(
-            "unemployment_rate",
-            tax_block.get("unemployment_contribution_rate", payload.get("unemployment_contribution_rate")),
-        )
-    )
-
-    flat = _decimal_from_payload(
-        tax_block.get("flat_costs_rate", payload.get("flat_costs_rate"))
-    )
-
-    cur = (
-        base_block.get("currency")
-        or tax_block.get("currency")
-        or payload.get("currency")
-    )
-
-    return TaxDummyConfig(
-        income_tax_rate=inc if inc is not None else DEFAULT_TAX_CONFIG.income_tax_rate,
-        pension_contribution_rate=pen if pen is not None else DEFAULT_TAX_CONFIG.pension_contribution_rate,
-        health_contribution_rate=hea if hea is not None else DEFAULT_TAX_CONFIG.health_contribution_rate,
-        unemployment_contribution_rate=une if une is not None else DEFAULT_TAX_CONFIG.unemployment_contribution_rate,
-        flat_costs_rate=flat if flat is not None else DEFAULT_TAX_CONFIG.flat_costs_rate,
-        currency=str(cur) if cur is not None else DEFAULT_TAX_CONFIG.currency,
-    )
-
-
-def _resolve_tax_config(db: Session, tenant_code: str, as_of: date) -> TaxDummyConfig:
+def _resolve_tax_config(db: Session, tenant_code: str, as_of: date, *, fresh: bool = False) -> TaxDummyConfig:
     """
     Hijerarhija izvora konfiguracije (prioritet):
       1) tax_settings (tenant override)
       2) app_constants_sets (effective-dated po jurisdikciji + scenario_key)
          **samo ako tenant ima /settings/tax profil**
       3) DEFAULT_TAX_CONFIG (fallback)
-    """
-    # 1) tenant override
-    row = db.execute(select(TaxSettings).where(TaxSettings.tenant_code == tenant_code)).scalar_one_or_none()
-    if row is not None:
-        return TaxDummyConfig(
-            income_tax_rate=Decimal(str(row.income_tax_rate)),
-            pension_contribution_rate=Decimal(str(row.pension_contribution_rate)),
-            health_contribution_rate=Decimal(str(row.health_contribution_rate)),
-            unemployment_contribution_rate=Decimal(str(row.unemployment_contribution_rate)),
-            flat_costs_rate=Decimal(str(row.flat_costs_rate)),
-            currency=row.currency or DEFAULT_TAX_CONFIG.currency,
-        )
-
-    # 2) constants set koristimo samo ako tenant eksplicitno ima tax profil (settings/tax)
-    prof = db.execute(
-        select(TenantTaxProfileSettings).where(TenantTaxProfileSettings.tenant_code == tenant_code)
-    ).scalar_one_or_none()
 
-    if prof is not None and (prof.entity or "").strip():
-        jurisdiction = _normalize_jurisdiction(prof.entity)
-        scenario_key = (prof.scenario_key or "").strip() or _default_scenario_key_for_profile(prof)
-
-        cs = _find_current_constants_set(
-            db=db,
-            jurisdiction=jurisdiction,
-            scenario_key=scenario_key,
-            as_of=as_of,
-        )
-        if cs is not None:
-            cfg = _tax_config_from_constants_payload(cs.payload or {})
-            if cfg is not None:
-                return cfg
-
-        # Backward fallback:
-        # ako za taj scenario nema seta, pokušaj po jurisdikciji (stari podaci)
-        cs_fallback = _find_current_constants_set(
-            db=db,
-            jurisdiction=jurisdiction,
-            as_of=as_of,
-            scenario_key=None,
-        )
-        if cs_fallback is not None:
-            cfg = _tax_config_from_constants_payload(cs_fallback.payload or {})
-            if cfg is not None:
-                return cfg
-
-    # 3) fallback
-    return DEFAULT_TAX_CONFIG
+    Lookup ide preko keširanog `tax_config_resolver` (vidi app/services/tax_config.py);
+    `fresh=True` (finalizacija – iznosi se trajno upisuju) čita direktno iz baze.
+    """
+    return tax_config_resolver.resolve(db, tenant_code, as_of, fresh=fresh)
 
 
 # ======================================================
@@ -452,22 +175,15 @@ def upsert_tax_settings(
     db.commit()
     db.refresh(row)
 
+    # override se mijenja → resolver mora ponovo učitati tenanta
+    tax_config_resolver.invalidate_tenant(tenant)
+
     return TaxSettingsRead.model_validate(row)
 
 
 # ======================================================
 #  INTERNE POMOĆNE FUNKCIJE
 # ======================================================
-def _month_bounds(year: int, month: int) -> tuple[date, date]:
-    if month == 12:
-        start = date(year, 12, 1)
-        end = date(year + 1, 1, 1)
-    else:
-        start = date(year, month, 1)
-        end = date(year, month + 1, 1)
-    return start, end
-
-
 def _compute_monthly_summary(
     *,
     year: int,
@@ -514,7 +230,15 @@ def _aggregate_monthly_income_and_expense(
     tenant_code: str,
     db: Session,
 ) -> Tuple[Decimal, Decimal]:
-    month_start, month_end = _month_bounds(year, month)
+    """
+    Prihod = izlazne fakture + cash income; rashod = cash expense + ulazne fakture.
+
+    Porez se računa direktno iz knjiga, ne iz tenant_monthly_rollups: rollupi
+    služe za dashboard/izvještaje, a finalizovani iznosi moraju odgovarati
+    knjigama i kada su one mijenjane mimo ORM-a (raw SQL, DB cascade).
+    Tri range scan-a po (tenant_code, datum) indeksima za jedan mjesec.
+    """
+    month_start, month_end = month_bounds(year, month)
 
     stmt_invoices = select(func.coalesce(func.sum(Invoice.total_amount), 0).label("invoice_income")).where(
         Invoice.tenant_code == tenant_code,
@@ -558,6 +282,89 @@ def _aggregate_monthly_income_and_expense(
     return total_income, total_expense
 
 
+def _aggregate_yearly_income_and_expense_by_month(
+    *,
+    year: int,
+    tenant_code: str,
+    db: Session,
+) -> dict[int, Tuple[Decimal, Decimal]]:
+    """
+    Godišnja varijanta `_aggregate_monthly_income_and_expense`.
+
+    Umjesto 3 upita po mjesecu (36 za godinu) radi tačno 3 GROUP BY upita
+    (invoices, cash_entries, input_invoices) nad cijelom godinom i vraća
+    mapu {month: (total_income, total_expense)} za svih 12 mjeseci.
+
+    Filter je half-open opseg [1.1.year, 1.1.year+1) da bi se koristio
+    (tenant_code, datum) indeks; mjesec se izvlači tek u GROUP BY.
+    """
+    year_start, year_end = year_bounds(year)
+
+    zero = Decimal("0.00")
+    income_by_month: dict[int, Decimal] = {m: zero for m in range(1, 13)}
+    expense_by_month: dict[int, Decimal] = {m: zero for m in range(1, 13)}
+
+    inv_month = func.extract("month", Invoice.issue_date).label("m")
+    stmt_invoices = (
+        select(inv_month, func.coalesce(func.sum(Invoice.total_amount), 0).label("invoice_income"))
+        .where(
+            Invoice.tenant_code == tenant_code,
+            Invoice.issue_date >= year_start,
+            Invoice.issue_date < year_end,
+        )
+        .group_by(inv_month)
+    )
+    for row in db.execute(stmt_invoices):
+        m = int(row.m)
+        income_by_month[m] += row.invoice_income or zero
+
+    cash_month = func.extract("month", CashEntry.entry_date).label("m")
+    income_expr = func.coalesce(
+        func.sum(case((CashEntry.kind == "income", CashEntry.amount), else_=0)),
+        0,
+    )
+    expense_expr = func.coalesce(
+        func.sum(case((CashEntry.kind == "expense", CashEntry.amount), else_=0)),
+        0,
+    )
+    stmt_cash = (
+        select(cash_month, income_expr.label("cash_income"), expense_expr.label("cash_expense"))
+        .where(
+            CashEntry.tenant_code == tenant_code,
+            CashEntry.entry_date >= year_start,
+            CashEntry.entry_date < year_end,
+        )
+        .group_by(cash_month)
+    )
+    for row in db.execute(stmt_cash):
+        m = int(row.m)
+        income_by_month[m] += row.cash_income or zero
+        expense_by_month[m] += row.cash_expense or zero
+
+    input_month = func.extract("month", InputInvoice.issue_date).label("m")
+    stmt_input_invoices = (
+        select(input_month, func.coalesce(func.sum(InputInvoice.total_amount), 0).label("input_expense"))
+        .where(
+            InputInvoice.tenant_code == tenant_code,
+            InputInvoice.issue_date >= year_start,
+            InputInvoice.issue_date < year_end,
+        )
+        .group_by(input_month)
+    )
+    for row in db.execute(stmt_input_invoices):
+        m = int(row.m)
+        expense_by_month[m] += row.input_expense or zero
+
+    return {m: (income_by_month[m], expense_by_month[m]) for m in range(1, 13)}
+
+
+def _resolve_tax_configs_for_year(db: Session, tenant_code: str, year: int) -> dict[int, TaxDummyConfig]:
+    """
+    Godišnja varijanta `_resolve_tax_config`: vraća {month: cfg} za as_of = 1. dan mjeseca.
+    """
+    return {m: _resolve_tax_config(db, tenant_code, as_of=date(year, m, 1)) for m in range(1, 13)}
+
+
 def _compute_monthly_components_from_base(
     *,
     taxable_base: Decimal,
@@ -634,6 +441,7 @@ def _get_monthly_summary_any(
 # ======================================================
 @router.get(
     "/tax/monthly",
+    dependencies=[Depends(tenant_etag)],
     response_model=TaxMonthlyOverviewResponse,
     summary="Mjesečni pregled obaveza (1-12) + status uplate",
     operation_id="tax_monthly_overview",
@@ -658,13 +466,51 @@ def tax_monthly_overview(
     )
     payment_by_month = {p.month: p for p in payments}
 
+    # Sve za godinu učitavamo unaprijed (fiksan broj upita), a 12 redova
+    # sastavljamo u memoriji – isti rezultat kao `_get_monthly_summary_any` po mjesecu.
+    results = (
+        db.execute(
+            select(TaxMonthlyResult).where(
+                TaxMonthlyResult.tenant_code == tenant,
+                TaxMonthlyResult.year == year,
+            )
+        )
+        .scalars()
+        .all()
+    )
+    result_by_month = {r.month: r for r in results}
+
+    cfg_by_month = _resolve_tax_configs_for_year(db, tenant, year)
+
+    totals_by_month: dict[int, Tuple[Decimal, Decimal]] = {}
+    if len(result_by_month) < 12:
+        totals_by_month = _aggregate_yearly_income_and_expense_by_month(
+            year=year,
+            tenant_code=tenant,
+            db=db,
+        )
+
     items: list[TaxMonthlyOverviewItem] = []
     for m in range(1, 13):
-        summary = _get_monthly_summary_any(year=year, month=m, tenant_code=tenant, db=db)
+        cfg = cfg_by_month[m]
+
+        existing = result_by_month.get(m)
+        if existing is not None:
+            taxable_base = Decimal(str(existing.taxable_base))
+        else:
+            total_income, total_expense = totals_by_month[m]
+            summary = _compute_monthly_summary(
+                year=year,
+                month=m,
+                tenant_code=tenant,
+                total_income=total_income,
+                total_expense=total_expense,
+                cfg=cfg,
+            )
+            taxable_base = Decimal(str(summary.taxable_base))
 
-        cfg = _resolve_tax_config(db, tenant, as_of=date(year, m, 1))
         income_tax, pension, health, unemployment = _compute_monthly_components_from_base(
-            taxable_base=Decimal(str(summary.taxable_base)),
+            taxable_base=taxable_base,
             cfg=cfg,
         )
         total_due = income_tax + pension + health + unemployment
@@ -804,6 +650,7 @@ def preview_monthly_tax(
 # ======================================================
 @router.get(
     "/tax/monthly/auto",
+    dependencies=[Depends(tenant_etag)],
     response_model=MonthlyTaxSummaryRead,
     summary="Automatski mjesečni obračun iz invoices + cash + input_invoices",
     operation_id="tax_monthly_auto",
@@ -836,7 +683,7 @@ def finalize_monthly_tax(
     db: Session = Depends(_get_session_dep),
 ) -> MonthlyTaxSummaryRead:
     tenant = _require_tenant(x_tenant_code)
-    cfg = _resolve_tax_config(db, tenant, as_of=date(year, month, 1))
+    cfg = _resolve_tax_config(db, tenant, as_of=date(year, month, 1), fresh=True)
 
     existing = db.execute(
         select(TaxMonthlyResult).where(
@@ -922,6 +769,7 @@ def finalize_monthly_tax(
 # ======================================================
 @router.get(
     "/tax/monthly/history",
+    dependencies=[Depends(tenant_etag)],
     response_model=list[MonthlyTaxSummaryRead],
     summary="Istorija finalizovanih mjesečnih obračuna za godinu",
     operation_id="tax_monthly_history",
@@ -967,6 +815,7 @@ def monthly_tax_history(
 
 @router.get(
     "/tax/monthly/status",
+    dependencies=[Depends(tenant_etag)],
     response_model=MonthlyTaxStatusResponse,
     summary="Status mjesečnih obračuna po mjesecima za godinu",
     operation_id="tax_monthly_status",
@@ -1019,7 +868,7 @@ def export_monthly_tax_csv(
     month: int = Query(..., ge=1, le=12),
     x_tenant_code: Optional[str] = Header(None, alias="X-Tenant-Code"),
     db: Session = Depends(_get_session_dep),
-) -> Response:
+) -> StreamingResponse:
     summary = auto_monthly_tax(
         year=year,
         month=month,
@@ -1027,11 +876,23 @@ def export_monthly_tax_csv(
         db=db,
     )
 
-    buffer = io.StringIO()
-    writer = csv.writer(buffer)
-
-    writer.writerow(
+    chunks = iter_csv_chunks(
         [
+            [
+                summary.year,
+                summary.month,
+                summary.tenant_code,
+                str(summary.total_income),
+                str(summary.total_expense),
+                str(summary.taxable_base),
+                str(summary.income_tax),
+                str(summary.contributions_total),
+                str(summary.total_due),
+                summary.currency,
+                "true" if summary.is_final else "false",
+            ]
+        ],
+        header=[
             "year",
             "month",
             "tenant_code",
@@ -1043,34 +904,13 @@ def export_monthly_tax_csv(
             "total_due",
             "currency",
             "is_final",
-        ]
-    )
-
-    writer.writerow(
-        [
-            summary.year,
-            summary.month,
-            summary.tenant_code,
-            str(summary.total_income),
-            str(summary.total_expense),
-            str(summary.taxable_base),
-            str(summary.income_tax),
-            str(summary.contributions_total),
-            str(summary.total_due),
-            summary.currency,
-            "true" if summary.is_final else "false",
-        ]
+        ],
     )
 
-    csv_content = buffer.getvalue()
-    buffer.close()
-
-    filename = f"tax-monthly-{summary.tenant_code}-{summary.year}-{summary.month:02d}.csv"
-
-    return Response(
-        content=csv_content,
+    return csv_streaming_response(
+        chunks,
+        filename=f"tax-monthly-{summary.tenant_code}-{summary.year}-{summary.month:02d}.csv",
         media_type="text/csv",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
 
 
@@ -1079,6 +919,7 @@ def export_monthly_tax_csv(
 # ======================================================
 @router.get(
     "/tax/yearly/preview",
+    dependencies=[Depends(tenant_etag)],
     response_model=YearlyTaxSummaryRead,
     summary="Godišnji porezni obračun (preview) na osnovu finalizovanih mjeseci",
     operation_id="tax_yearly_preview",
@@ -1250,6 +1091,35 @@ def yearly_tax_finalize(
 # ======================================================
 #  GODIŠNJI OBRAČUN – CSV EXPORT
 # ======================================================
+YEARLY_TAX_CSV_HEADER = [
+    "year",
+    "tenant_code",
+    "months_included",
+    "total_income",
+    "total_expense",
+    "taxable_base",
+    "income_tax",
+    "contributions_total",
+    "total_due",
+    "currency",
+]
+
+
+def yearly_tax_csv_row(summary: YearlyTaxSummaryRead) -> list:
+    return [
+        summary.year,
+        summary.tenant_code,
+        summary.months_included,
+        str(summary.total_income),
+        str(summary.total_expense),
+        str(summary.taxable_base),
+        str(summary.income_tax),
+        str(summary.contributions_total),
+        str(summary.total_due),
+        summary.currency,
+    ]
+
+
 @router.get(
     "/tax/yearly/export",
     summary="Export godišnjeg poreznog obračuna u CSV",
@@ -1258,49 +1128,13 @@ def export_yearly_tax_csv(
     year: int = Query(..., ge=2000, le=2100),
     x_tenant_code: Optional[str] = Header(None, alias="X-Tenant-Code"),
     db: Session = Depends(_get_session_dep),
-) -> Response:
+) -> StreamingResponse:
     summary = yearly_tax_preview(year=year, x_tenant_code=x_tenant_code, db=db)
 
-    buffer = io.StringIO()
-    writer = csv.writer(buffer)
+    chunks = iter_csv_chunks([yearly_tax_csv_row(summary)], header=YEARLY_TAX_CSV_HEADER)
 
-    writer.writerow(
-        [
-            "year",
-            "tenant_code",
-            "months_included",
-            "total_income",
-            "total_expense",
-            "taxable_base",
-            "income_tax",
-            "contributions_total",
-            "total_due",
-            "currency",
-        ]
-    )
-
-    writer.writerow(
-        [
-            summary.year,
-            summary.tenant_code,
-            summary.months_included,
-            str(summary.total_income),
-            str(summary.total_expense),
-            str(summary.taxable_base),
-            str(summary.income_tax),
-            str(summary.contributions_total),
-            str(summary.total_due),
-            summary.currency,
-        ]
-    )
-
-    csv_content = buffer.getvalue()
-    buffer.close()
-
-    filename = f"tax-yearly-{summary.tenant_code}-{summary.year}.csv"
-
-    return Response(
-        content=csv_content,
+    return csv_streaming_response(
+        chunks,
+        filename=f"tax-yearly-{summary.tenant_code}-{summary.year}.csv",
         media_type="text/csv",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-    )
\ No newline at end of file
+    )
@@ -11,6 +11,7 @@ from sqlalchemy.orm import Session
 from app.db import get_session
 from app.models import Tenant
 from app.schemas.tenant import TenantCreate, TenantRead, TenantUpdate
+from app.tenant_security import tenant_cache
 
 # Napomena:
 # "Tenant" predstavlja jednog klijenta / poslovni subjekt u sistemu (npr. frizerski salon,
@@ -42,6 +43,7 @@ def create_tenant(payload: TenantCreate, db: Session = Depends(get_session)):
         # test dopušta 400 ili 409; vraćamo 409 da ostanemo dosljedni
         raise HTTPException(status_code=409, detail="Tenant code already exists")
     db.refresh(t)
+    tenant_cache.set(t.code, True)
     return TenantRead(id=t.id, code=t.code, name=t.name)
 
 
@@ -117,4 +119,5 @@ def delete_tenant(tenant_id: str, db: Session = Depends(get_session)):
         raise HTTPException(status_code=404, detail="Tenant not found")
     db.delete(t)
     db.commit()
+    tenant_cache.invalidate(t.code)
     return None
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import logging
+import os
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import MetaData, text
+from sqlalchemy.engine import Engine
+
+from app.db import engine
+from app.models import Base
+
+logger = logging.getLogger(__name__)
+
+
+# ======================================================
+#  PROVJERA ŠEME PRI STARTU (umjesto DDL-a na hot path-u)
+# ======================================================
+#
+# Rute ne smiju raditi DDL (ALTER TABLE uzima ACCESS EXCLUSIVE lock dok
+# saobraćaj već stiže). Šema se mijenja isključivo Alembic migracijama, a
+# aplikacija jednom, u lifespan hook-u (app/main.py), provjerava:
+#
+#   1) da je baza na Alembic head revizijama (alembic_version),
+#   2) da postoje sve tabele i kolone iz ORM modela (jedan upit nad
+#      information_schema.columns).
+#
+# SCHEMA_CHECK:
+#   strict – drift → SchemaDriftError, aplikacija se ne podiže (default),
+#   warn   – drift se loguje, aplikacija radi,
+#   off    – bez provjere.
+#
+# Isto iz komandne linije (npr. u deploy pipeline-u, exit code 1 na drift):
+#   python -m app.schema_check
+
+SCHEMA_CHECK_MODE = os.getenv("SCHEMA_CHECK", "strict")
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+ALEMBIC_INI = BACKEND_ROOT / "alembic.ini"
+ALEMBIC_SCRIPTS = BACKEND_ROOT / "alembic"
+
+_COLUMNS_SQL = text(
+    "SELECT table_name, column_name FROM information_schema.columns "
+    "WHERE table_schema = current_schema()"
+)
+
+
+class SchemaDriftError(RuntimeError):
+    """Šema baze ne odgovara Alembic head-u / ORM modelima."""
+
+
+@dataclass
+class SchemaReport:
+    # None kada Alembic skripte nisu dostupne (provjera revizija preskočena)
+    expected_heads: Optional[set[str]]
+    current_heads: set[str]
+    missing_tables: list[str] = field(default_factory=list)
+    missing_columns: list[str] = field(default_factory=list)
+
+    @property
+    def revision_ok(self) -> bool:
+        return self.expected_heads is None or self.expected_heads == self.current_heads
+
+    @property
+    def ok(self) -> bool:
+        return self.revision_ok and not self.missing_tables and not self.missing_columns
+
+    def describe(self) -> str:
+        if self.ok:
+            return "schema ok"
+        problems: list[str] = []
+        if not self.revision_ok:
+            problems.append(
+                f"alembic revision {sorted(self.current_heads) or ['<none>']} "
+                f"!= head {sorted(self.expected_heads or [])} (run `alembic upgrade head`)"
+            )
+        if self.missing_tables:
+            problems.append(f"missing tables: {', '.join(self.missing_tables)}")
+        if self.missing_columns:
+            problems.append(f"missing columns: {', '.join(self.missing_columns)}")
+        return "; ".join(problems)
+
+
+def expected_alembic_heads() -> Optional[set[str]]:
+    if not ALEMBIC_INI.exists() or not ALEMBIC_SCRIPTS.is_dir():
+        return None
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_SCRIPTS))
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+def inspect_schema(bind: Engine = engine, metadata: MetaData = Base.metadata) -> SchemaReport:
+    """
+    Poredi živu šemu sa Alembic head-om i ORM modelima (samo čitanje).
+    """
+    expected = expected_alembic_heads()
+
+    with bind.connect() as conn:
+        current = set(MigrationContext.configure(conn).get_current_heads())
+        live: dict[str, set[str]] = {}
+        for table_name, column_name in conn.execute(_COLUMNS_SQL):
+            live.setdefault(table_name, set()).add(column_name)
+
+    report = SchemaReport(expected_heads=expected, current_heads=current)
+    for table in metadata.sorted_tables:
+        columns = live.get(table.name)
+        if columns is None:
+            report.missing_tables.append(table.name)
+            continue
+        report.missing_columns.extend(
+            f"{table.name}.{column.name}" for column in table.columns if column.name not in columns
+        )
+    return report
+
+
+def verify_schema(mode: str = SCHEMA_CHECK_MODE, bind: Engine = engine) -> Optional[SchemaReport]:
+    """
+    Startup provjera; u `strict` modu podiže SchemaDriftError na drift.
+    """
+    if mode == "off":
+        return None
+
+    report = inspect_schema(bind)
+    if report.expected_heads is None:
+        logger.warning("Alembic scripts not found at %s, revision check skipped", ALEMBIC_SCRIPTS)
+
+    if not report.ok:
+        if mode == "strict":
+            raise SchemaDriftError(report.describe())
+        logger.warning("Database schema drift: %s", report.describe())
+    return report
+
+
+def main() -> int:
+    report = inspect_schema()
+    print(report.describe())
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from typing import List
+
+from pydantic import BaseModel, Field
+from pydantic.config import ConfigDict
+
+
+BaseConfig = ConfigDict(from_attributes=True, populate_by_name=True)
+
+
+class BulkImportRowError(BaseModel):
+    """
+    Greška za jedan red bulk import-a (CSV ili NDJSON).
+    """
+
+    model_config = BaseConfig
+
+    line: int = Field(
+        ...,
+        description="Broj linije u fajlu (1-based; kod CSV-a je header linija 1).",
+        examples=[3],
+    )
+    errors: List[str] = Field(
+        ...,
+        description="Poruke validacije za taj red.",
+        examples=[["amount: Input should be greater than 0"]],
+    )
+
+
+class BulkImportReport(BaseModel):
+    """
+    Rezultat bulk import-a: koliko je redova pročitano, upisano, ažurirano,
+    preskočeno i odbijeno, uz listu grešaka po redu.
+    """
+
+    model_config = BaseConfig
+
+    total_rows: int = Field(..., description="Ukupan broj pročitanih redova (bez headera).", examples=[1000])
+    inserted: int = Field(..., description="Broj upisanih redova.", examples=[998])
+    updated: int = Field(
+        default=0,
+        description="Broj postojećih zapisa koji su ažurirani (upsert, `on_conflict=update`).",
+        examples=[0],
+    )
+    skipped: int = Field(
+        default=0,
+        description="Broj redova preskočenih jer zapis već postoji (`on_conflict=skip`).",
+        examples=[0],
+    )
+    failed: int = Field(..., description="Broj odbijenih redova.", examples=[2])
+    errors: List[BulkImportRowError] = Field(
+        default_factory=list,
+        description="Greške po redu (najviše BULK_IMPORT_MAX_ERRORS stavki).",
+    )
+    errors_truncated: bool = Field(
+        default=False,
+        description="True ako je grešaka bilo više nego što je vraćeno u `errors`.",
+    )
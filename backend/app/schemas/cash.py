@@ -307,12 +307,16 @@ class CashListResponse(BaseModel):
 
     model_config = BaseConfig
 
-    total: int = Field(
-        ...,
-        description="Ukupan broj cash unosa koji zadovoljavaju aktivne filtere.",
+    total: Optional[int] = Field(
+        None,
+        description="Ukupan broj cash unosa koji zadovoljavaju aktivne filtere (null uz `include_total=false`).",
         examples=[3],
     )
     items: List[CashRowItem] = Field(
         ...,
         description="Lista cash unosa u formatu pogodnom za UI tabelu.",
     )
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Kursor za sljedeću stranicu (`cursor=`); null ako je ovo zadnja stranica.",
+    )
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Any, Dict, Literal, Optional
+
+from pydantic import BaseModel, Field
+from pydantic.config import ConfigDict
+
+
+BaseConfig = ConfigDict(from_attributes=True, populate_by_name=True)
+
+ExportJobKind = Literal["inspection", "kpr_pdf", "kpr_csv", "invoices_csv", "tax_yearly_csv"]
+ExportJobStatus = Literal["queued", "running", "done", "failed"]
+
+
+# ======================================================
+#  PARAMETRI PO VRSTI EXPORTA
+# ======================================================
+# (inspection koristi ExportInspectionRequest iz app/routes/export.py)
+
+
+class KprExportParams(BaseModel):
+    """
+    Parametri za `kpr_pdf` i `kpr_csv` (isto kao /kpr/export i /kpr/export-excel).
+    """
+
+    year: int = Field(..., ge=1900, le=2100, examples=[2025])
+    month: Optional[int] = Field(None, ge=1, le=12, examples=[1])
+
+
+class InvoicesExportParams(BaseModel):
+    """
+    Parametri za `invoices_csv` (isti filteri kao /invoices/export).
+    """
+
+    year: Optional[int] = Field(None, ge=1900, le=2100)
+    month: Optional[int] = Field(None, ge=1, le=12)
+    unpaid_only: bool = False
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    buyer_query: Optional[str] = None
+
+
+class TaxYearlyExportParams(BaseModel):
+    """
+    Parametri za `tax_yearly_csv` (isto kao /tax/yearly/export).
+    """
+
+    year: int = Field(..., ge=2000, le=2100, examples=[2025])
+
+
+# ======================================================
+#  JOB API
+# ======================================================
+
+
+class ExportJobCreate(BaseModel):
+    """
+    Zahtjev za pozadinski export.
+    """
+
+    kind: ExportJobKind = Field(..., description="Vrsta exporta.", examples=["inspection"])
+    params: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Parametri exporta (isti kao query/body odgovarajuće inline rute).",
+        examples=[{"from_date": "2025-01-01", "to_date": "2025-12-31"}],
+    )
+
+
+class ExportJobRead(BaseModel):
+    """
+    Stanje export posla.
+    """
+
+    model_config = BaseConfig
+
+    id: int = Field(..., description="ID posla.")
+    tenant_code: str = Field(..., description="Šifra tenanta.")
+    kind: ExportJobKind = Field(..., description="Vrsta exporta.")
+    params: Dict[str, Any] = Field(..., description="Normalizovani parametri exporta.")
+    status: ExportJobStatus = Field(..., description="queued / running / done / failed.")
+    progress: int = Field(..., ge=0, le=100, description="Napredak u procentima.")
+    error: Optional[str] = Field(None, description="Poruka greške (status `failed`).")
+
+    filename: Optional[str] = Field(None, description="Ime fajla gotovog artefakta.")
+    media_type: Optional[str] = Field(None, description="Content-Type gotovog artefakta.")
+    size_bytes: Optional[int] = Field(None, description="Veličina gotovog artefakta.")
+    download_url: Optional[str] = Field(None, description="URL za download (kada je status `done`).")
+
+    reused: bool = Field(
+        default=False,
+        description="True ako je vraćen postojeći posao za isti zahtjev i nepromijenjene podatke.",
+    )
+
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -407,12 +407,16 @@ class InputInvoiceListResponse(BaseModel):
         },
     )
 
-    total: int = Field(
-        ...,
+    total: Optional[int] = Field(
+        None,
         ge=0,
-        description="Ukupan broj ulaznih faktura koje zadovoljavaju aktive filtere.",
+        description="Ukupan broj ulaznih faktura koje zadovoljavaju aktive filtere (null uz `include_total=false`).",
     )
     items: List[InputInvoiceRowItem] = Field(
         ...,
         description="Lista ulaznih faktura (jedna stranica za UI tabelu).",
     )
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Kursor za sljedeću stranicu (`cursor=`); null ako je ovo zadnja stranica.",
+    )
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import os
 from datetime import date
 from decimal import Decimal
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field, ConfigDict
 
+from app.schemas.bulk_import import BulkImportReport
+
 
 BaseConfig = ConfigDict(from_attributes=True, populate_by_name=True)
 
@@ -145,6 +148,16 @@ class InvoiceCreate(InvoiceBase):
         },
     )
 
+    invoice_number: Optional[str] = Field(
+        None,
+        min_length=1,
+        max_length=32,
+        description=(
+            "Broj fakture (jedinstven po tenant-u). Ako se izostavi, server dodjeljuje "
+            "sljedeći broj iz brojača tenanta (format iz podešavanja profila)."
+        ),
+    )
+
     items: List[InvoiceItemCreate] = Field(
         ...,
         description="Lista stavki fakture.",
@@ -211,12 +224,66 @@ class InvoiceListResponse(BaseModel):
 
     model_config = BaseConfig
 
-    total: int = Field(
-        ...,
+    total: Optional[int] = Field(
+        None,
         ge=0,
-        description="Ukupan broj faktura koje zadovoljavaju zadate filtere.",
+        description="Ukupan broj faktura koje zadovoljavaju zadate filtere (null uz `include_total=false`).",
     )
     items: List[InvoiceRowItem] = Field(
         ...,
         description="Lista faktura za prikaz u UI tabeli.",
     )
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Kursor za sljedeću stranicu (`cursor=`); null ako je ovo zadnja stranica.",
+    )
+
+
+# ============================================================
+#  BULK CREATE (POST /invoices/bulk)
+# ============================================================
+
+INVOICE_BULK_MAX_ROWS = int(os.getenv("INVOICE_BULK_MAX_ROWS", "1000"))
+
+
+class InvoiceBulkCreate(BaseModel):
+    """
+    Payload za POST /invoices/bulk.
+
+    Fakture su namjerno "sirovi" objekti: svaka se validira zasebno kao
+    `InvoiceCreate`, pa jedna neispravna faktura ne obara cijeli zahtjev.
+    """
+
+    model_config = BaseConfig
+
+    invoices: List[Dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=INVOICE_BULK_MAX_ROWS,
+        description=(
+            "Fakture u istom obliku kao body za `POST /invoices` "
+            "(najviše INVOICE_BULK_MAX_ROWS po zahtjevu)."
+        ),
+    )
+
+
+class InvoiceBulkCreatedRow(BaseModel):
+    """Jedna kreirana faktura iz bulk zahtjeva."""
+
+    model_config = BaseConfig
+
+    line: int = Field(..., description="Redni broj fakture u `invoices` (1-based).", examples=[1])
+    id: int = Field(..., description="ID kreirane fakture (BIGINT).", examples=[101])
+    invoice_number: str = Field(..., description="Broj fakture.", examples=["2025-001"])
+
+
+class InvoiceBulkReport(BulkImportReport):
+    """
+    Izvještaj bulk kreiranja: brojači i greške po fakturi (`line` je redni
+    broj u `invoices`, 1-based) + ID-evi kreiranih faktura.
+    """
+
+    created: List[InvoiceBulkCreatedRow] = Field(
+        default_factory=list,
+        description="Kreirane fakture (prazno ako je `atomic=true` import poništen).",
+    )
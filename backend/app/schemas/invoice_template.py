@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, ConfigDict
+
+from app.schemas.invoice import InvoiceItemBase
+
+
+BaseConfig = ConfigDict(from_attributes=True, populate_by_name=True)
+
+Cadence = Literal["monthly", "quarterly", "yearly"]
+
+
+# ============================================================
+# ŠABLONI PONAVLJAJUĆIH FAKTURA
+# ============================================================
+
+
+class InvoiceTemplateCreate(BaseModel):
+    """
+    Model za kreiranje šablona ponavljajuće fakture.
+
+    Prva faktura se izdaje na `first_run`; dan u mjesecu iz `first_run` se
+    zadržava i za naredne termine (31 → zadnji dan kraćih mjeseci).
+    Broj fakture dodjeljuje server (brojač po tenantu i godini).
+    """
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        populate_by_name=True,
+        json_schema_extra={
+            "example": {
+                "name": "Mjesečno održavanje",
+                "buyer_name": "Frizer Salon Milica",
+                "buyer_address": "Kralja Petra I 12, Banja Luka",
+                "cadence": "monthly",
+                "first_run": "2025-12-01",
+                "due_days": 15,
+                "items": [
+                    {
+                        "description": "Održavanje web stranice",
+                        "quantity": "1",
+                        "unit_price": "50.00",
+                        "vat_rate": "0.17",
+                    }
+                ],
+            }
+        },
+    )
+
+    name: str = Field(..., min_length=1, max_length=128, description="Interni naziv šablona.")
+    buyer_name: str = Field(..., min_length=1, max_length=128, description="Naziv kupca/klijenta.")
+    buyer_address: Optional[str] = Field(None, max_length=256, description="Adresa kupca (opcionalno).")
+    note: Optional[str] = Field(None, description="Napomena koja se prenosi na svaku fakturu.")
+    items: List[InvoiceItemBase] = Field(..., min_length=1, description="Stavke svake fakture.")
+
+    cadence: Cadence = Field("monthly", description="Ritam izdavanja: `monthly`, `quarterly` ili `yearly`.")
+    first_run: date = Field(..., description="Datum izdavanja prve fakture (YYYY-MM-DD).")
+    due_days: Optional[int] = Field(
+        None,
+        ge=0,
+        le=365,
+        description="Rok plaćanja u danima od datuma izdavanja (bez roka ako nije zadat).",
+    )
+    end_date: Optional[date] = Field(None, description="Posljednji dozvoljeni datum izdavanja (opcionalno).")
+
+
+class InvoiceTemplateUpdate(BaseModel):
+    """
+    Djelimična izmjena šablona. Promjena `next_run` mijenja i dan u mjesecu
+    za naredne termine; `is_active=false` pauzira izdavanje.
+    """
+
+    model_config = BaseConfig
+
+    name: Optional[str] = Field(None, min_length=1, max_length=128)
+    buyer_name: Optional[str] = Field(None, min_length=1, max_length=128)
+    buyer_address: Optional[str] = Field(None, max_length=256)
+    note: Optional[str] = None
+    items: Optional[List[InvoiceItemBase]] = Field(None, min_length=1)
+    cadence: Optional[Cadence] = None
+    next_run: Optional[date] = None
+    due_days: Optional[int] = Field(None, ge=0, le=365)
+    end_date: Optional[date] = None
+    is_active: Optional[bool] = None
+
+
+class InvoiceTemplateRead(BaseModel):
+    """Model koji se vraća prema klijentu."""
+
+    model_config = BaseConfig
+
+    id: int = Field(..., description="ID šablona (BIGINT).")
+    tenant_code: str
+    name: str
+    buyer_name: str
+    buyer_address: Optional[str] = None
+    note: Optional[str] = None
+    items: List[InvoiceItemBase]
+
+    cadence: Cadence
+    anchor_day: int = Field(..., description="Dan u mjesecu za izdavanje.")
+    due_days: Optional[int] = None
+    next_run: date = Field(..., description="Datum izdavanja sljedeće fakture.")
+    end_date: Optional[date] = None
+    is_active: bool
+
+    last_run_at: Optional[datetime] = Field(None, description="Kada je scheduler zadnji put obradio šablon.")
+    last_invoice_id: Optional[int] = Field(None, description="ID zadnje izdate fakture.")
+    last_error: Optional[str] = Field(None, description="Razlog zašto zadnji termin nije izdat (ako postoji).")
+    created_at: datetime
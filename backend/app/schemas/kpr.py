@@ -110,13 +110,31 @@ class KprRowItem(BaseModel):
         examples=[1],
     )
 
+    running_income: Optional[Decimal] = Field(
+        None,
+        description=(
+            "Kumulativni prihod od početka perioda do ove stavke (uključivo).\n"
+            "Popunjava se samo u `GET /kpr` listi."
+        ),
+        examples=["1250.00"],
+    )
+    running_expense: Optional[Decimal] = Field(
+        None,
+        description=(
+            "Kumulativni rashod od početka perioda do ove stavke (uključivo).\n"
+            "Popunjava se samo u `GET /kpr` listi."
+        ),
+        examples=["430.00"],
+    )
+
 
 class KprListResponse(BaseModel):
     """
     Odgovor za UI KPR tabele (Tab 1: Evidencija).
 
     - `total` – ukupan broj stavki koje zadovoljavaju filtere,
-    - `items` – jedna stranica/redovi za tabelarni prikaz.
+    - `items` – jedna stranica/redovi za tabelarni prikaz,
+    - `next_cursor` – keyset kursor za sljedeću stranicu (ili None).
     """
 
     model_config = BaseConfig
@@ -131,3 +149,10 @@ class KprListResponse(BaseModel):
         ...,
         description="Lista KPR stavki (jedna stranica za tabelu).",
     )
+    next_cursor: Optional[str] = Field(
+        None,
+        description=(
+            "Kursor za sljedeću stranicu (`GET /kpr?cursor=...`). "
+            "`null` znači da je ovo zadnja stranica."
+        ),
+    )
@@ -63,12 +63,16 @@ class PrometListResponse(BaseModel):
 
     model_config = ConfigDict(from_attributes=True, populate_by_name=True)
 
-    total: int = Field(
-        ...,
+    total: Optional[int] = Field(
+        None,
         ge=0,
-        description="Ukupan broj stavki u Knjizi prometa koje zadovoljavaju filtere.",
+        description="Ukupan broj stavki u Knjizi prometa koje zadovoljavaju filtere (null uz `include_total=false`).",
     )
     items: list[PrometRow] = Field(
         ...,
         description="Lista stavki Knjige prometa.",
     )
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Kursor za sljedeću stranicu (`cursor=`); null ako je ovo zadnja stranica.",
+    )
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from datetime import date as DateType
+from decimal import Decimal
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+SearchKind = Literal["invoice", "input_invoice", "cash_entry"]
+
+
+class SearchHit(BaseModel):
+    """Jedan pogodak pretrage – faktura, ulazna faktura ili uplata/isplata."""
+
+    kind: SearchKind = Field(..., description="Vrsta dokumenta.")
+    id: int = Field(..., description="ID dokumenta u svojoj tabeli.")
+    date: DateType = Field(..., description="Datum izdavanja / knjiženja.")
+    text: Optional[str] = Field(None, description="Kupac, dobavljač ili opis stavke.")
+    reference: Optional[str] = Field(
+        None,
+        description="Broj fakture; za uplate/isplate `income` ili `expense`.",
+    )
+    amount: Decimal = Field(..., description="Ukupan iznos (KM).")
+    score: float = Field(..., description="Relevantnost 0–1 (pg_trgm word_similarity).")
+
+
+class SearchResponse(BaseModel):
+    query: str
+    items: List[SearchHit]
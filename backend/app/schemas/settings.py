@@ -21,6 +21,10 @@ class ProfileSettingsRead(BaseModel):
     # Novo:
     logo_asset_id: Optional[int] = None
 
+    # Brojevi faktura koje dodjeljuje server (None = default "{year}-{seq:04d}", yearly)
+    invoice_number_format: Optional[str] = None
+    invoice_number_reset: Optional[str] = None
+
 
 class ProfileSettingsUpsert(BaseModel):
     business_name: str
@@ -33,6 +37,11 @@ class ProfileSettingsUpsert(BaseModel):
     # Novo (nećemo ga ručno unositi iz UI-ja, ali ga ostavljamo zbog API fleksibilnosti):
     logo_asset_id: Optional[int] = None
 
+    # Format broja fakture, npr. "{year}-{seq:04d}" → 2025-0001 ({seq}, {year}, {yy}, {month})
+    invoice_number_format: Optional[str] = Field(None, max_length=64)
+    # "yearly" (brojač kreće od 1 svake godine) ili "never"
+    invoice_number_reset: Optional[str] = None
+
 
 # ---------------- TAX PROFILE ----------------
 class TaxProfileSettingsRead(BaseModel):
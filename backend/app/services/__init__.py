@@ -1,4 +1,5 @@
 from __future__ import annotations
 
 # Paket za pomoćne servise (npr. PDF generisanje faktura).
-# Trenutno sadrži modul `pdf_invoice`.
+# Trenutno sadrži module `pdf_invoice`, `pdf_kpr`, `pdf_promet` i `tax_config`
+# (keširani resolver effective-dated TAX konfiguracije).
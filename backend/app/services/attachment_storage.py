@@ -0,0 +1,159 @@
+# /home/miso/dev/sp-app/sp-app/backend/app/services/attachment_storage.py
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+
+# ======================================================
+#  STREAMING UPLOAD → LOKALNI FILE STORAGE
+# ======================================================
+#
+# Upload se nikad ne čita cijeli u memoriju:
+#   spooled UploadFile → temp fajl u storage direktoriju (chunk po chunk)
+#   → fsync → atomski os.replace na konačnu putanju.
+#
+# Veličina i SHA-256 se računaju usput, a limit se provjerava nakon svakog
+# chunk-a, pa prevelik upload prekidamo čim pređe granicu.
+
+ATTACHMENT_UPLOAD_CHUNK_BYTES = int(os.getenv("ATTACHMENT_UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+ATTACHMENT_MAX_BYTES = int(os.getenv("INVOICE_ATTACHMENT_MAX_BYTES", str(25 * 1024 * 1024)))
+
+# Temp fajlovi žive u istom direktoriju (istom filesystem-u) kao konačni
+# fajlovi – samo tako je os.replace atomski.
+STAGING_DIRNAME = ".staging"
+
+
+class UploadTooLargeError(Exception):
+    """Upload je prešao dozvoljenu veličinu."""
+
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__(f"Upload exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+class EmptyUploadError(Exception):
+    """Upload nema sadržaja."""
+
+
+@dataclass(frozen=True)
+class StagedUpload:
+    """
+    Upload koji je kompletno (i fsync-ovan) upisan u temp fajl.
+
+    Pozivalac ga mora ili `commit_to(...)` ili `discard()`.
+    """
+
+    temp_path: Path
+    size_bytes: int
+    sha256: str
+
+    def commit_to(self, final_path: Path) -> None:
+        """
+        Atomski premješta temp fajl na konačnu putanju i fsync-uje direktorij,
+        tako da je i sam rename trajan prije upisa reda u bazu.
+        """
+        final_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(self.temp_path, final_path)
+        _fsync_dir(final_path.parent)
+
+    def discard(self) -> None:
+        try:
+            self.temp_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _fsync_dir(path: Path) -> None:
+    # Na platformama bez O_DIRECTORY (Windows) fsync direktorija nije moguć.
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def hash_stream(
+    source: BinaryIO,
+    *,
+    max_bytes: int = ATTACHMENT_MAX_BYTES,
+    chunk_size: int = ATTACHMENT_UPLOAD_CHUNK_BYTES,
+) -> tuple[int, str]:
+    """
+    Čita `source` u chunk-ovima bez pisanja na disk i vraća (size, SHA-256).
+
+    Ista pravila kao `stage_upload` (UploadTooLargeError / EmptyUploadError).
+    Nakon poziva pozicija u `source` je na kraju – pozivalac radi seek(0)
+    ako bajtove treba i upisati.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLargeError(max_bytes)
+        digest.update(chunk)
+
+    if size == 0:
+        raise EmptyUploadError()
+
+    return size, digest.hexdigest()
+
+
+def stage_upload(
+    source: BinaryIO,
+    *,
+    storage_root: Path,
+    max_bytes: int = ATTACHMENT_MAX_BYTES,
+    chunk_size: int = ATTACHMENT_UPLOAD_CHUNK_BYTES,
+) -> StagedUpload:
+    """
+    Kopira `source` u temp fajl ispod `storage_root/.staging` u chunk-ovima
+    fiksne veličine i usput računa veličinu i SHA-256.
+
+    - prevelik upload → UploadTooLargeError (temp fajl se briše),
+    - prazan upload → EmptyUploadError,
+    - bilo koja druga greška (npr. OSError) → temp fajl se briše i greška propagira.
+    """
+    staging_dir = storage_root / STAGING_DIRNAME
+    staging_dir.mkdir(parents=True, exist_ok=True)
+
+    fd, temp_name = tempfile.mkstemp(dir=staging_dir, prefix="upload-", suffix=".part")
+    temp_path = Path(temp_name)
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                digest.update(chunk)
+                out.write(chunk)
+
+            if size == 0:
+                raise EmptyUploadError()
+
+            out.flush()
+            os.fsync(out.fileno())
+    except BaseException:
+        try:
+            temp_path.unlink()
+        except FileNotFoundError:
+            pass
+        raise
+
+    return StagedUpload(temp_path=temp_path, size_bytes=size, sha256=digest.hexdigest())
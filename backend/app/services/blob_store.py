@@ -0,0 +1,346 @@
+# /home/miso/dev/sp-app/sp-app/backend/app/services/blob_store.py
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+from uuid import uuid4
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models import StorageBlob
+from app.services.attachment_storage import (
+    ATTACHMENT_MAX_BYTES,
+    hash_stream,
+    stage_upload,
+)
+
+
+# ======================================================
+#  CONTENT-ADDRESSED BLOB STORE (SHA-256 + ref_count)
+# ======================================================
+#
+# Fajlovi attachment-a i tenant asset-a čuvaju se jednom po sadržaju:
+#
+#   BLOB_STORAGE_ROOT/ab/cd/abcd…  (dvonivojski shard po prvih 4 hex znaka)
+#
+# Red u `storage_blobs` broji reference (InvoiceAttachment + TenantAsset).
+# Red blob-a je ujedno i "lock": upload (INSERT … ON CONFLICT) i brisanje
+# (UPDATE ref_count) se serijalizuju na njemu, pa fajl ne može nestati
+# između "fajl već postoji" provjere i upisa nove reference.
+#
+# CLI:
+#   python -m app.services.blob_store recount   # ref_count iz tabela
+#   python -m app.services.blob_store gc        # briše blob-ove bez referenci
+#                                               # i fajlove bez reda (rollback)
+
+BLOB_STORAGE_ROOT = Path(os.getenv("BLOB_STORAGE_DIR", "data/blobs"))
+
+
+class BlobIntegrityError(Exception):
+    """Sadržaj se promijenio između hash-a i upisa (ne bi smjelo da se desi)."""
+
+
+_SHA256_NAME = re.compile(r"^[0-9a-f]{64}$")
+_ORPHAN_SCAN_BATCH = 1000
+
+
+def blob_relative_path(sha256: str) -> str:
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+def blob_path(sha256: str) -> Path:
+    return BLOB_STORAGE_ROOT / blob_relative_path(sha256)
+
+
+def resolve_stored_file(sha256: Optional[str], storage_path: Optional[str], legacy_root: Path) -> Optional[Path]:
+    """
+    Putanja fajla za red attachment-a/asset-a: blob ako ima sha256,
+    inače stari fajl relativan na `legacy_root`.
+    """
+    if sha256:
+        return blob_path(sha256)
+    if storage_path:
+        return legacy_root / storage_path
+    return None
+
+
+def _add_reference(db: Session, sha256: str, size_bytes: int) -> None:
+    stmt = pg_insert(StorageBlob.__table__).values(sha256=sha256, size_bytes=size_bytes, ref_count=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[StorageBlob.__table__.c.sha256],
+        set_={"ref_count": StorageBlob.__table__.c.ref_count + 1},
+    )
+    db.execute(stmt)
+
+
+def acquire_blob(
+    db: Session,
+    source: BinaryIO,
+    *,
+    max_bytes: int = ATTACHMENT_MAX_BYTES,
+) -> tuple[str, int]:
+    """
+    Upisuje sadržaj `source` u blob store (ako već ne postoji) i dodaje
+    jednu referencu. Vraća (sha256, size_bytes).
+
+    - prvi prolaz samo hash-uje (bez pisanja) → duplikat ne ide na disk,
+    - novi sadržaj se stage-uje u temp fajl i atomski premješta na blob putanju,
+    - referenca se upisuje u tekućoj transakciji; commit radi pozivalac
+      (zajedno sa redom koji referencira blob).
+
+    Novi fajl je na blob putanji prije commit-a pozivaoca; ako transakcija
+    ode u rollback, fajl ostaje bez reda i briše ga `collect_garbage`.
+    """
+    size_bytes, sha256 = hash_stream(source, max_bytes=max_bytes)
+    target = blob_path(sha256)
+
+    staged = None
+    try:
+        if not target.exists():
+            # Stage prije zaključavanja reda – disk I/O ne drži DB lock
+            source.seek(0)
+            staged = stage_upload(source, storage_root=BLOB_STORAGE_ROOT, max_bytes=max_bytes)
+            if staged.sha256 != sha256:
+                raise BlobIntegrityError(sha256)
+
+        _add_reference(db, sha256, size_bytes)
+
+        # Pod lock-om reda: ako fajla nema (novi blob ili paralelno brisanje), upiši ga
+        if not target.exists():
+            if staged is None:
+                source.seek(0)
+                staged = stage_upload(source, storage_root=BLOB_STORAGE_ROOT, max_bytes=max_bytes)
+                if staged.sha256 != sha256:
+                    raise BlobIntegrityError(sha256)
+            staged.commit_to(target)
+            staged = None
+    finally:
+        if staged is not None:
+            staged.discard()
+
+    return sha256, size_bytes
+
+
+@dataclass
+class PendingBlobRemoval:
+    """
+    Blob čija je zadnja referenca obrisana u tekućoj transakciji.
+
+    Fajl je već sklonjen (rename u tombstone) dok je red zaključan; nakon
+    commit-a pozvati `finalize()`, a nakon rollback-a `restore()`.
+    """
+
+    sha256: str
+    tombstone: Path
+
+    def finalize(self) -> None:
+        try:
+            self.tombstone.unlink()
+        except FileNotFoundError:
+            pass
+
+    def restore(self) -> None:
+        try:
+            os.replace(self.tombstone, blob_path(self.sha256))
+        except FileNotFoundError:
+            pass
+
+
+def _move_to_tombstone(sha256: str) -> Optional[PendingBlobRemoval]:
+    path = blob_path(sha256)
+    tombstone = path.with_name(f"{path.name}.deleting-{uuid4().hex}")
+    try:
+        os.replace(path, tombstone)
+    except FileNotFoundError:
+        return None
+    return PendingBlobRemoval(sha256=sha256, tombstone=tombstone)
+
+
+def release_blob(db: Session, sha256: str) -> Optional[PendingBlobRemoval]:
+    """
+    Skida jednu referencu sa blob-a. Ako je bila zadnja, briše red i
+    sklanja fajl; vraća PendingBlobRemoval koji pozivalac završava nakon commit-a.
+
+    Red koji referencira blob mora biti obrisan (flush) prije poziva – FK.
+    """
+    remaining = db.execute(
+        text(
+            "UPDATE storage_blobs SET ref_count = ref_count - 1 "
+            "WHERE sha256 = :sha AND ref_count > 0 RETURNING ref_count"
+        ),
+        {"sha": sha256},
+    ).scalar_one_or_none()
+
+    if remaining is None or remaining > 0:
+        return None
+
+    db.execute(text("DELETE FROM storage_blobs WHERE sha256 = :sha AND ref_count = 0"), {"sha": sha256})
+
+    return _move_to_tombstone(sha256)
+
+
+def delete_and_release(db: Session, row) -> None:
+    """
+    Briše red koji (opciono) referencira blob, skida referencu i commit-uje.
+
+    Fajl blob-a se fizički briše tek nakon uspješnog commit-a, i to samo
+    ako je ovo bila zadnja referenca. Radi za InvoiceAttachment i TenantAsset.
+    """
+    sha256 = getattr(row, "sha256", None)
+    removal = None
+    try:
+        db.delete(row)
+        db.flush()
+        if sha256:
+            removal = release_blob(db, sha256)
+        db.commit()
+    except Exception:
+        db.rollback()
+        if removal is not None:
+            removal.restore()
+        raise
+
+    if removal is not None:
+        removal.finalize()
+
+
+def recount_blob_refs(db: Session) -> int:
+    """
+    Ponovo računa ref_count iz invoice_attachments + tenant_assets
+    (npr. nakon CASCADE brisanja tenanta). Ne radi commit. Vraća broj izmijenjenih redova.
+    """
+    result = db.execute(
+        text(
+            """
+            WITH counts AS (
+                SELECT b.sha256,
+                       (SELECT COUNT(*) FROM invoice_attachments a WHERE a.sha256 = b.sha256)
+                     + (SELECT COUNT(*) FROM tenant_assets t WHERE t.sha256 = b.sha256) AS cnt
+                FROM storage_blobs b
+            )
+            UPDATE storage_blobs AS b
+               SET ref_count = c.cnt
+              FROM counts AS c
+             WHERE c.sha256 = b.sha256
+               AND b.ref_count <> c.cnt
+            """
+        )
+    )
+    return int(result.rowcount or 0)
+
+
+def _iter_blob_files() -> Iterator[Path]:
+    """Fajlovi na blob putanjama (ab/cd/<sha256>), bez .staging i tombstone-a."""
+    if not BLOB_STORAGE_ROOT.is_dir():
+        return
+    for first in BLOB_STORAGE_ROOT.iterdir():
+        if len(first.name) != 2 or not first.is_dir():
+            continue
+        for second in first.iterdir():
+            if len(second.name) != 2 or not second.is_dir():
+                continue
+            for path in second.iterdir():
+                if _SHA256_NAME.match(path.name) and path.is_file():
+                    yield path
+
+
+def _claim_orphan_files(db: Session) -> int:
+    """
+    Fajlovima bez reda u `storage_blobs` (upload čija je transakcija
+    otišla u rollback nakon upisa fajla) upisuje red sa ref_count = 0.
+
+    INSERT … ON CONFLICT DO NOTHING čeka na upload koji je u toku za isti
+    sadržaj (isti ključ); ako on commit-uje, red postoji i fajl se ne dira.
+    Vraća broj preuzetih fajlova.
+    """
+    table = StorageBlob.__table__
+    claimed = 0
+    batch: list[Path] = []
+
+    def _flush() -> None:
+        nonlocal claimed
+        known = set(
+            db.execute(select(table.c.sha256).where(table.c.sha256.in_([p.name for p in batch]))).scalars()
+        )
+        for path in batch:
+            if path.name in known:
+                continue
+            try:
+                size_bytes = path.stat().st_size
+            except FileNotFoundError:
+                continue
+            stmt = (
+                pg_insert(table)
+                .values(sha256=path.name, size_bytes=size_bytes, ref_count=0)
+                .on_conflict_do_nothing()
+                .returning(table.c.sha256)
+            )
+            if db.execute(stmt).scalar_one_or_none() is not None:
+                claimed += 1
+        batch.clear()
+
+    for path in _iter_blob_files():
+        batch.append(path)
+        if len(batch) >= _ORPHAN_SCAN_BATCH:
+            _flush()
+    if batch:
+        _flush()
+    return claimed
+
+
+def collect_garbage(db: Session) -> int:
+    """
+    Briše blob-ove bez referenci (red + fajl) i commit-uje. Vraća broj obrisanih.
+
+    Fajlovi bez reda (`_claim_orphan_files`) dobijaju red sa ref_count = 0,
+    pa se brišu istim putem. Fajlove sklanjamo (tombstone) prije commit-a,
+    dok su redovi zaključani – isto kao `release_blob`.
+    """
+    _claim_orphan_files(db)
+
+    shas = db.execute(
+        text("DELETE FROM storage_blobs WHERE ref_count = 0 RETURNING sha256")
+    ).scalars().all()
+
+    removals = [r for r in (_move_to_tombstone(sha256) for sha256 in shas) if r is not None]
+
+    try:
+        db.commit()
+    except Exception:
+        for removal in removals:
+            removal.restore()
+        raise
+
+    for removal in removals:
+        removal.finalize()
+    return len(shas)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Održavanje blob store-a (storage_blobs).")
+    parser.add_argument("command", choices=["recount", "gc"])
+    args = parser.parse_args(argv)
+
+    from app.db import SessionLocal
+
+    with SessionLocal() as db:
+        if args.command == "recount":
+            count = recount_blob_refs(db)
+            db.commit()
+            print(f"blob recount done, updated={count}")
+            return 0
+
+        count = collect_garbage(db)
+        print(f"blob gc done, removed={count}")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,377 @@
+# /home/miso/dev/sp-app/sp-app/backend/app/services/bulk_import.py
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+import re
+import zipfile
+from datetime import datetime, timedelta
+from typing import BinaryIO, Iterable, Iterator, Optional, Type
+from xml.etree import ElementTree
+
+from pydantic import BaseModel, ValidationError
+
+from app.schemas.bulk_import import BulkImportReport, BulkImportRowError
+
+
+# ======================================================
+#  BULK IMPORT (CSV / NDJSON / XLSX)
+# ======================================================
+#
+# Zajednički dio za /…/bulk endpointe:
+#   upload (spooled fajl) → čitanje red po red → Pydantic validacija
+#   → batch-evi validnih redova → pozivalac ih upisuje multi-row INSERT-om.
+#
+# XLSX (npr. export iz portala dobavljača) čitamo bez eksternih biblioteka:
+# .xlsx je ZIP sa XML-om, pa prvi sheet parsiramo iterparse-om, red po red.
+#
+# Fajl se nikad ne parsira cijeli u memoriju; u memoriji je samo jedan batch
+# (BULK_IMPORT_BATCH_SIZE redova) i najviše BULK_IMPORT_MAX_ERRORS grešaka.
+
+BULK_IMPORT_BATCH_SIZE = int(os.getenv("BULK_IMPORT_BATCH_SIZE", "1000"))
+BULK_IMPORT_MAX_ERRORS = int(os.getenv("BULK_IMPORT_MAX_ERRORS", "1000"))
+
+BULK_FORMATS = ("csv", "ndjson", "xlsx")
+
+_NDJSON_CONTENT_TYPES = {
+    "application/x-ndjson",
+    "application/ndjson",
+    "application/jsonl",
+    "application/x-jsonlines",
+}
+_CSV_CONTENT_TYPES = {"text/csv", "application/csv"}
+_XLSX_CONTENT_TYPES = {"application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"}
+
+# (broj linije, podaci reda ili None, poruka greške ili None)
+RawRecord = tuple[int, Optional[dict], Optional[str]]
+
+
+class BulkImportFormatError(ValueError):
+    """Format fajla nije podržan ili se ne može odrediti."""
+
+
+def resolve_bulk_format(
+    requested: Optional[str],
+    content_type: Optional[str],
+    filename: Optional[str],
+) -> str:
+    """
+    Određuje format importa: eksplicitni `?format=` ima prednost, zatim
+    content-type fajla, pa ekstenzija (.csv / .ndjson / .jsonl / .xlsx).
+    """
+    if requested:
+        fmt = requested.strip().lower()
+        if fmt not in BULK_FORMATS:
+            raise BulkImportFormatError(f"Unsupported import format: {requested}")
+        return fmt
+
+    ct = (content_type or "").split(";")[0].strip().lower()
+    if ct in _NDJSON_CONTENT_TYPES:
+        return "ndjson"
+    if ct in _CSV_CONTENT_TYPES:
+        return "csv"
+    if ct in _XLSX_CONTENT_TYPES:
+        return "xlsx"
+
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith(".xlsx"):
+        return "xlsx"
+
+    raise BulkImportFormatError("Cannot detect import format, use ?format=csv, ndjson or xlsx")
+
+
+def iter_csv_records(source: BinaryIO) -> Iterator[RawRecord]:
+    """
+    Čita CSV sa header linijom (UTF-8, BOM dozvoljen).
+
+    Delimiter (`,` ili `;`) se određuje iz header linije – isti fajl koji
+    vraćaju naši exporti (`;` + BOM) može se direktno importovati.
+    Prazne ćelije se izostavljaju, pa važe default vrijednosti iz sheme.
+    """
+    text = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+    try:
+        header_line = text.readline()
+        if not header_line.strip():
+            return
+
+        delimiter = ";" if header_line.count(";") > header_line.count(",") else ","
+        header = [h.strip() for h in next(csv.reader([header_line], delimiter=delimiter))]
+
+        reader = csv.reader(text, delimiter=delimiter)
+        consumed = 1
+        try:
+            for values in reader:
+                line = consumed + 1
+                consumed = reader.line_num + 1
+
+                if not any(v.strip() for v in values):
+                    continue
+                if len(values) > len(header):
+                    yield line, None, f"Expected {len(header)} columns, got {len(values)}"
+                    continue
+
+                yield line, {k: v for k, v in zip(header, values) if k and v.strip()}, None
+        except (csv.Error, UnicodeDecodeError) as exc:
+            yield consumed + 1, None, f"Invalid CSV: {exc}"
+    finally:
+        # ne zatvaramo izvorni fajl (to radi UploadFile)
+        text.detach()
+
+
+def iter_ndjson_records(source: BinaryIO) -> Iterator[RawRecord]:
+    """
+    Čita NDJSON: jedan JSON objekat po liniji, prazne linije se preskaču.
+    """
+    for line, raw in enumerate(source, start=1):
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            data = json.loads(raw)
+        except ValueError as exc:
+            yield line, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(data, dict):
+            yield line, None, "Expected a JSON object"
+            continue
+        yield line, data, None
+
+
+_XLSX_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_XLSX_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_XLSX_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+# Ugrađeni Excel formati koji su datumi/vremena (ECMA-376, 18.8.30)
+_XLSX_BUILTIN_DATE_FORMATS = {14, 15, 16, 17, 18, 19, 20, 21, 22, 45, 46, 47}
+_XLSX_EPOCH = datetime(1899, 12, 30)
+
+
+def _xlsx_tag(name: str) -> str:
+    return f"{{{_XLSX_MAIN_NS}}}{name}"
+
+
+def _xlsx_first_sheet(zf: zipfile.ZipFile) -> str:
+    try:
+        workbook = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+        rels = ElementTree.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    except KeyError:
+        return "xl/worksheets/sheet1.xml"
+
+    sheet = workbook.find(f"{_xlsx_tag('sheets')}/{_xlsx_tag('sheet')}")
+    if sheet is None:
+        raise BulkImportFormatError("XLSX file has no worksheets")
+    rel_id = sheet.get(f"{{{_XLSX_REL_NS}}}id")
+
+    for rel in rels.iter(f"{{{_XLSX_PKG_REL_NS}}}Relationship"):
+        if rel.get("Id") == rel_id:
+            target = rel.get("Target", "")
+            return target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+    return "xl/worksheets/sheet1.xml"
+
+
+def _xlsx_shared_strings(zf: zipfile.ZipFile) -> list[str]:
+    try:
+        root = ElementTree.fromstring(zf.read("xl/sharedStrings.xml"))
+    except KeyError:
+        return []
+    return ["".join(t.text or "" for t in si.iter(_xlsx_tag("t"))) for si in root.iter(_xlsx_tag("si"))]
+
+
+def _xlsx_date_styles(zf: zipfile.ZipFile) -> set[int]:
+    """
+    Indeksi stilova (atribut `s` ćelije) čiji je number format datum.
+    Excel datum čuva kao broj dana, pa bez ovoga ne znamo da je 45000 datum.
+    """
+    try:
+        root = ElementTree.fromstring(zf.read("xl/styles.xml"))
+    except KeyError:
+        return set()
+
+    date_formats = set(_XLSX_BUILTIN_DATE_FORMATS)
+    for fmt in root.iter(_xlsx_tag("numFmt")):
+        # tekst pod navodnicima i [boje/uslovi] nisu dio formata datuma
+        code = re.sub(r'"[^"]*"|\[[^\]]*\]', "", fmt.get("formatCode", "")).lower()
+        if any(ch in code for ch in "dmy"):
+            date_formats.add(int(fmt.get("numFmtId", "-1")))
+
+    cell_xfs = root.find(_xlsx_tag("cellXfs"))
+    if cell_xfs is None:
+        return set()
+    return {
+        idx
+        for idx, xf in enumerate(cell_xfs.findall(_xlsx_tag("xf")))
+        if int(xf.get("numFmtId", "0")) in date_formats
+    }
+
+
+def _xlsx_column_index(ref: str) -> int:
+    idx = 0
+    for ch in ref:
+        if not ch.isalpha():
+            break
+        idx = idx * 26 + (ord(ch.upper()) - ord("A") + 1)
+    return idx - 1
+
+
+def _xlsx_cell_value(cell, shared: list[str], date_styles: set[int]) -> Optional[str]:
+    kind = cell.get("t", "n")
+    if kind == "inlineStr":
+        return "".join(t.text or "" for t in cell.iter(_xlsx_tag("t")))
+
+    v = cell.find(_xlsx_tag("v"))
+    if v is None or v.text is None:
+        return None
+    raw = v.text
+
+    if kind == "s":
+        return shared[int(raw)]
+    if kind == "b":
+        return "true" if raw == "1" else "false"
+    if kind == "e":
+        return None
+    if kind == "n" and int(cell.get("s", "0")) in date_styles:
+        value = _XLSX_EPOCH + timedelta(days=float(raw))
+        if value.time() == datetime.min.time():
+            return value.date().isoformat()
+        return value.isoformat()
+    return raw
+
+
+def iter_xlsx_records(source: BinaryIO) -> Iterator[RawRecord]:
+    """
+    Čita prvi sheet XLSX fajla: prvi neprazan red je header, ostali su podaci.
+
+    ZIP/XML se otvara odmah (neispravan fajl → BulkImportFormatError prije
+    nego što pozivalac počne upis), a redovi se čitaju lijeno.
+    """
+    try:
+        zf = zipfile.ZipFile(source)
+        sheet_path = _xlsx_first_sheet(zf)
+        shared = _xlsx_shared_strings(zf)
+        date_styles = _xlsx_date_styles(zf)
+        sheet = zf.open(sheet_path)
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as exc:
+        raise BulkImportFormatError(f"Invalid XLSX file: {exc}") from exc
+
+    def _rows() -> Iterator[RawRecord]:
+        header: Optional[list[str]] = None
+        try:
+            for _, elem in ElementTree.iterparse(sheet, events=("end",)):
+                if elem.tag != _xlsx_tag("row"):
+                    continue
+
+                values: dict[int, str] = {}
+                for position, cell in enumerate(elem.iter(_xlsx_tag("c"))):
+                    ref = cell.get("r")
+                    col = _xlsx_column_index(ref) if ref else position
+                    value = _xlsx_cell_value(cell, shared, date_styles)
+                    if value is not None and value.strip():
+                        values[col] = value
+                line = int(elem.get("r", "0"))
+                elem.clear()
+
+                if not values:
+                    continue
+                if header is None:
+                    width = max(values) + 1
+                    header = [values.get(i, "").strip() for i in range(width)]
+                    continue
+
+                yield line, {header[i]: v for i, v in values.items() if i < len(header) and header[i]}, None
+        except ElementTree.ParseError as exc:
+            yield 0, None, f"Invalid XLSX: {exc}"
+        finally:
+            sheet.close()
+            zf.close()
+
+    return _rows()
+
+
+def iter_records(source: BinaryIO, fmt: str) -> Iterator[RawRecord]:
+    """
+    Čitač redova za zadati format. Za XLSX može odmah baciti
+    BulkImportFormatError (neispravan fajl).
+    """
+    if fmt == "ndjson":
+        return iter_ndjson_records(source)
+    if fmt == "xlsx":
+        return iter_xlsx_records(source)
+    return iter_csv_records(source)
+
+
+def format_validation_errors(exc: ValidationError) -> list[str]:
+    messages = []
+    for err in exc.errors():
+        loc = ".".join(str(part) for part in err.get("loc", ()))
+        messages.append(f"{loc}: {err['msg']}" if loc else err["msg"])
+    return messages
+
+
+class BulkImportCollector:
+    """
+    Brojači i (ograničena) lista grešaka jednog bulk import-a.
+    """
+
+    def __init__(self, max_errors: int = BULK_IMPORT_MAX_ERRORS) -> None:
+        self.max_errors = max_errors
+        self.total_rows = 0
+        self.inserted = 0
+        self.updated = 0
+        self.skipped = 0
+        self.failed = 0
+        self.errors: list[BulkImportRowError] = []
+
+    def reject(self, line: int, errors: list[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(BulkImportRowError(line=line, errors=errors))
+
+    def report(self) -> BulkImportReport:
+        return BulkImportReport(
+            total_rows=self.total_rows,
+            inserted=self.inserted,
+            updated=self.updated,
+            skipped=self.skipped,
+            failed=self.failed,
+            errors=self.errors,
+            errors_truncated=self.failed > len(self.errors),
+        )
+
+
+def iter_valid_batches(
+    records: Iterable[RawRecord],
+    model: Type[BaseModel],
+    collector: BulkImportCollector,
+    *,
+    batch_size: int = BULK_IMPORT_BATCH_SIZE,
+) -> Iterator[list[tuple[int, BaseModel]]]:
+    """
+    Validira redove shemom `model` i vraća ih u batch-evima (line, objekat).
+
+    Nevalidni redovi idu u `collector` i ne prekidaju import.
+    """
+    batch: list[tuple[int, BaseModel]] = []
+    for line, data, error in records:
+        collector.total_rows += 1
+        if error is not None:
+            collector.reject(line, [error])
+            continue
+        try:
+            obj = model.model_validate(data)
+        except ValidationError as exc:
+            collector.reject(line, format_validation_errors(exc))
+            continue
+
+        batch.append((line, obj))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
@@ -0,0 +1,109 @@
+# /home/miso/dev/sp-app/sp-app/backend/app/services/csv_stream.py
+from __future__ import annotations
+
+import csv
+import io
+import os
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+
+
+# ======================================================
+#  STREAMING CSV EXPORT
+# ======================================================
+#
+# Zajednički "pipeline" za CSV exporte:
+#   server-side cursor (yield_per) → csv.writer u mali buffer → encodirani chunk.
+#
+# Nikad ne držimo cijeli fajl u memoriji: buffer se prazni svakih
+# CSV_ROWS_PER_CHUNK redova, a ORM objekti se iz baze čitaju u batch-evima
+# od CSV_STREAM_BATCH_SIZE redova.
+
+CSV_STREAM_BATCH_SIZE = int(os.getenv("CSV_STREAM_BATCH_SIZE", "1000"))
+CSV_ROWS_PER_CHUNK = int(os.getenv("CSV_ROWS_PER_CHUNK", "500"))
+
+UTF8_BOM = "\ufeff"
+
+
+def iter_csv_chunks(
+    rows: Iterable[Sequence[Any]],
+    *,
+    header: Optional[Sequence[Any]] = None,
+    delimiter: str = ",",
+    lineterminator: str = "\r\n",
+    bom: bool = False,
+    encoding: str = "utf-8",
+    rows_per_chunk: int = CSV_ROWS_PER_CHUNK,
+) -> Iterator[bytes]:
+    """
+    Serijalizuje redove u CSV i vraća ih kao niz encodiranih chunk-ova.
+
+    - `bom=True` → prvi chunk počinje sa UTF-8 BOM (Excel na Windowsu),
+    - prazan red (`[]`) se upisuje kao prazna linija (separator sekcija),
+    - `rows` može biti generator – čita se lijeno, red po red.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter, lineterminator=lineterminator)
+
+    if bom:
+        buffer.write(UTF8_BOM)
+    if header is not None:
+        writer.writerow(header)
+
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue().encode(encoding)
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+
+    tail = buffer.getvalue()
+    if tail:
+        yield tail.encode(encoding)
+
+
+def stream_scalars(db: Session, stmt, *, batch_size: int = CSV_STREAM_BATCH_SIZE) -> Iterator[Any]:
+    """
+    Izvršava ORM SELECT preko server-side kursora (`yield_per` implicira
+    `stream_results`) i vraća objekte jedan po jedan.
+
+    Identity map sesije drži samo weak reference, pa se već ispisani
+    objekti oslobađaju – memorija ostaje ravna i za 100k+ redova.
+    """
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+    yield from result.scalars()
+
+
+def rows_from_own_session(produce_rows: Callable[[Session], Iterable[Sequence[Any]]]) -> Iterator[Sequence[Any]]:
+    """
+    Pokreće `produce_rows` nad posebnom sesijom koja živi koliko i stream.
+
+    Sesija iz `Depends(get_session)` se zatvara prije nego što Starlette
+    počne da šalje tijelo StreamingResponse-a, pa server-side kursor mora
+    imati svoju konekciju. Sesija se zatvara i kada klijent prekine download.
+    """
+    with SessionLocal() as db:
+        yield from produce_rows(db)
+
+
+def csv_streaming_response(
+    chunks: Iterable[bytes],
+    *,
+    filename: str,
+    media_type: str = "text/csv; charset=utf-8",
+) -> StreamingResponse:
+    """
+    StreamingResponse sa standardnim `Content-Disposition: attachment` headerom.
+    """
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,532 @@
+# /home/miso/dev/sp-app/sp-app/backend/app/services/export_jobs.py
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from sqlalchemy import func, select, text, update
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal, engine
+from app.models import ExportJob, get_tenant_data_version
+
+
+# ======================================================
+#  POZADINSKI EXPORT POSLOVI (Postgres red + process pool)
+# ======================================================
+#
+# Teški exporti (inspekcijski ZIP, KPR, liste faktura, godišnji porez) ne
+# rade se na API worker-u:
+#
+#   POST /exports/jobs → red u export_jobs (status 'queued')
+#   worker proces → SELECT ... FOR UPDATE SKIP LOCKED → render u fajl
+#                 → os.replace u EXPORT_ARTIFACTS_DIR → status 'done'
+#   GET /exports/jobs/{id}[/download]
+#
+# Isti zahtjev (tenant, kind, normalizovani params) uz nepromijenjenu verziju
+# podataka tenanta (tenant_data_versions) vraća postojeći posao/artefakt.
+#
+# Worker-i: EXPORT_WORKER_PROCESSES procesa koje API pokreće na startup-u,
+# ili zasebno:
+#   python -m app.services.export_jobs worker     # radi dok se ne prekine
+#   python -m app.services.export_jobs run-once   # obradi sve iz reda i izađi
+#   python -m app.services.export_jobs purge      # briše istekle poslove i fajlove
+
+EXPORT_ARTIFACTS_ROOT = Path(os.getenv("EXPORT_ARTIFACTS_DIR", "data/exports"))
+EXPORT_WORKER_PROCESSES = int(os.getenv("EXPORT_WORKER_PROCESSES", "2"))
+EXPORT_JOB_POLL_SECONDS = float(os.getenv("EXPORT_JOB_POLL_SECONDS", "1.0"))
+EXPORT_JOB_HEARTBEAT_SECONDS = float(os.getenv("EXPORT_JOB_HEARTBEAT_SECONDS", "2.0"))
+EXPORT_JOB_STALE_SECONDS = int(os.getenv("EXPORT_JOB_STALE_SECONDS", "300"))
+EXPORT_JOB_MAX_ATTEMPTS = int(os.getenv("EXPORT_JOB_MAX_ATTEMPTS", "3"))
+EXPORT_JOB_TTL_HOURS = int(os.getenv("EXPORT_JOB_TTL_HOURS", "72"))
+
+
+@dataclass(frozen=True)
+class ExportArtifact:
+    """Ime i Content-Type fajla koji je runner upisao."""
+
+    filename: str
+    media_type: str
+
+
+ProgressCallback = Callable[[int], None]
+ExportRunner = Callable[[Session, str, dict, BinaryIO, ProgressCallback], ExportArtifact]
+
+
+@dataclass(frozen=True)
+class ExportKind:
+    params_model: Type[BaseModel]
+    runner: ExportRunner
+    validate: Optional[Callable[[BaseModel], None]] = None
+
+
+_EXPORT_KINDS: Dict[str, ExportKind] = {}
+
+
+class UnknownExportKindError(ValueError):
+    """Vrsta exporta nije registrovana."""
+
+
+def register_export_kind(
+    kind: str,
+    params_model: Type[BaseModel],
+    *,
+    validate: Optional[Callable[[BaseModel], None]] = None,
+) -> Callable[[ExportRunner], ExportRunner]:
+    """
+    Dekorator za runner: (db, tenant, params, out, progress) → ExportArtifact.
+
+    Runner piše fajl u `out`; `progress(0..100)` zove samo kada zna stvarni
+    procenat (npr. nakon svake stavke ZIP-a). Heartbeat posla šalje
+    `run_job` iz zasebne niti, nezavisno od runner-a.
+    """
+
+    def decorator(runner: ExportRunner) -> ExportRunner:
+        _EXPORT_KINDS[kind] = ExportKind(params_model=params_model, runner=runner, validate=validate)
+        return runner
+
+    return decorator
+
+
+def _load_export_kinds() -> None:
+    # runner-i žive uz rute koje rade isti export inline
+    import app.routes.export_jobs  # noqa: F401
+
+
+def _export_kind(kind: str) -> ExportKind:
+    _load_export_kinds()
+    spec = _EXPORT_KINDS.get(kind)
+    if spec is None:
+        raise UnknownExportKindError(kind)
+    return spec
+
+
+def normalize_export_params(kind: str, params: dict) -> dict:
+    """
+    Validira parametre modelom te vrste i vraća ih u JSON obliku sa svim
+    default vrijednostima – isti zahtjev uvijek daje isti hash.
+
+    Greške: UnknownExportKindError, pydantic.ValidationError ili ono što
+    podigne `validate` hook vrste (npr. HTTPException).
+    """
+    spec = _export_kind(kind)
+    model = spec.params_model.model_validate(params)
+    if spec.validate is not None:
+        spec.validate(model)
+    return model.model_dump(mode="json")
+
+
+def export_params_hash(kind: str, params: dict) -> str:
+    payload = json.dumps({"kind": kind, "params": params}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def artifact_file(job: ExportJob) -> Optional[Path]:
+    if not job.artifact_path:
+        return None
+    return EXPORT_ARTIFACTS_ROOT / job.artifact_path
+
+
+# ======================================================
+#  ENQUEUE (sa ponovnim korištenjem artefakta)
+# ======================================================
+
+
+def enqueue_export_job(db: Session, tenant_code: str, kind: str, params: dict) -> Tuple[ExportJob, bool]:
+    """
+    Vraća (posao, reused).
+
+    Ako za isti (tenant, kind, params) i trenutnu verziju podataka već postoji
+    posao u redu, u radu ili gotov sa postojećim fajlom – vraća se on.
+    Inače se upisuje novi posao u red (commit).
+    """
+    normalized = normalize_export_params(kind, params)
+    params_hash = export_params_hash(kind, normalized)
+    data_version = get_tenant_data_version(db.connection(), tenant_code)
+
+    candidates = db.execute(
+        select(ExportJob)
+        .where(
+            ExportJob.tenant_code == tenant_code,
+            ExportJob.kind == kind,
+            ExportJob.params_hash == params_hash,
+            ExportJob.data_version == data_version,
+            ExportJob.status.in_(("queued", "running", "done")),
+        )
+        .order_by(ExportJob.id.desc())
+    ).scalars()
+
+    for job in candidates:
+        if job.status != "done":
+            return job, True
+        path = artifact_file(job)
+        if path is not None and path.is_file():
+            return job, True
+
+    job = ExportJob(
+        tenant_code=tenant_code,
+        kind=kind,
+        params=normalized,
+        params_hash=params_hash,
+        data_version=data_version,
+        status="queued",
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job, False
+
+
+# ======================================================
+#  WORKER – claim / progress / finish
+# ======================================================
+#
+# Stanje posla se mijenja kratkim transakcijama na zasebnoj konekciji,
+# nezavisno od sesije kojom runner čita podatke (server-side kursor ne
+# smije biti prekinut commit-om).
+#
+# Svaki claim povećava `attempts`; svi kasniji UPDATE-i (heartbeat,
+# progress, done/failed) važe samo za taj pokušaj. Ako requeue_stale_jobs
+# vrati posao u red a drugi worker ga preuzme, stari pokušaj više ne može
+# prepisati stanje, a njegovi fajlovi (`.artifact.<attempts>.part`,
+# `<attempts>/<filename>`) se ne miješaju sa fajlovima novog pokušaja.
+
+_CLAIM_SQL = text(
+    """
+    UPDATE export_jobs
+       SET status = 'running',
+           attempts = attempts + 1,
+           progress = 0,
+           error = NULL,
+           started_at = now(),
+           heartbeat_at = now()
+     WHERE id = (
+            SELECT id
+              FROM export_jobs
+             WHERE status = 'queued'
+             ORDER BY id
+             LIMIT 1
+               FOR UPDATE SKIP LOCKED
+           )
+    RETURNING id, attempts
+    """
+)
+
+_REQUEUE_STALE_SQL = text(
+    """
+    UPDATE export_jobs
+       SET status = CASE WHEN attempts >= :max_attempts THEN 'failed' ELSE 'queued' END,
+           error = CASE WHEN attempts >= :max_attempts THEN 'Worker stopped responding' ELSE NULL END,
+           finished_at = CASE WHEN attempts >= :max_attempts THEN now() ELSE NULL END
+     WHERE status = 'running'
+       AND heartbeat_at < now() - make_interval(secs => :stale_seconds)
+    """
+)
+
+
+def claim_next_job() -> Optional[Tuple[int, int]]:
+    """
+    Preuzima najstariji posao iz reda i vraća (id, attempts); paralelni
+    worker-i preskaču zaključane redove (SKIP LOCKED), pa isti posao ne
+    uzmu dvaput.
+    """
+    with engine.begin() as conn:
+        row = conn.execute(_CLAIM_SQL).first()
+    return (row.id, row.attempts) if row is not None else None
+
+
+def requeue_stale_jobs() -> int:
+    """
+    Poslove čiji worker nije javio heartbeat EXPORT_JOB_STALE_SECONDS vraća
+    u red (ili ih označava kao failed nakon EXPORT_JOB_MAX_ATTEMPTS pokušaja).
+    """
+    with engine.begin() as conn:
+        result = conn.execute(
+            _REQUEUE_STALE_SQL,
+            {"max_attempts": EXPORT_JOB_MAX_ATTEMPTS, "stale_seconds": EXPORT_JOB_STALE_SECONDS},
+        )
+        return int(result.rowcount or 0)
+
+
+def _update_running_job(job_id: int, attempt: int, **values) -> bool:
+    """
+    UPDATE posla koji je i dalje u radu u pokušaju `attempt`; bez `values`
+    je to samo heartbeat. Vraća False ako je posao u međuvremenu vraćen u
+    red / preuzet ponovo (pokušaj više nije vlasnik posla).
+    """
+    table = ExportJob.__table__
+    with engine.begin() as conn:
+        result = conn.execute(
+            update(table)
+            .where(table.c.id == job_id, table.c.status == "running", table.c.attempts == attempt)
+            .values(heartbeat_at=text("now()"), **values)
+        )
+    return bool(result.rowcount)
+
+
+class _Heartbeat:
+    """
+    Nit koja svakih EXPORT_JOB_HEARTBEAT_SECONDS osvježava heartbeat_at,
+    i dok runner čeka (render PDF sekcije, dugačak upit).
+    """
+
+    def __init__(self, job_id: int, attempt: int) -> None:
+        self._job_id = job_id
+        self._attempt = attempt
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"export-job-{job_id}-heartbeat", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(EXPORT_JOB_HEARTBEAT_SECONDS):
+            try:
+                _update_running_job(self._job_id, self._attempt)
+            except Exception:
+                # prolazna greška baze – sljedeći tick pokušava ponovo
+                pass
+
+    def __enter__(self) -> "_Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+class _ProgressReporter:
+    """
+    Procenat napretka, najviše jednom u EXPORT_JOB_HEARTBEAT_SECONDS.
+
+    Procenat nikad ne ide unazad (ni u procesu ni u bazi – GREATEST).
+    """
+
+    def __init__(self, job_id: int, attempt: int) -> None:
+        self._job_id = job_id
+        self._attempt = attempt
+        self._last_sent = time.monotonic()
+        self._percent = 0
+
+    def __call__(self, percent: int) -> None:
+        percent = max(0, min(99, int(percent)))
+        if percent <= self._percent:
+            return
+        self._percent = percent
+        now = time.monotonic()
+        if now - self._last_sent < EXPORT_JOB_HEARTBEAT_SECONDS:
+            return
+        self._last_sent = now
+        table = ExportJob.__table__
+        _update_running_job(self._job_id, self._attempt, progress=func.greatest(table.c.progress, percent))
+
+
+def write_chunks(out: BinaryIO, chunks: Iterable[bytes]) -> None:
+    """
+    Pomoćna funkcija za runner-e čiji export je niz chunk-ova nepoznate
+    dužine (CSV, ZIP): piše ih u `out`. Heartbeat šalje `run_job`.
+    """
+    for chunk in chunks:
+        out.write(chunk)
+
+
+def _artifact_name(filename: str) -> str:
+    name = os.path.basename(filename).replace("\\", "_")
+    return name or "export.bin"
+
+
+def run_job(job_id: int, attempt: int) -> None:
+    """
+    Renderuje jedan preuzet posao (pokušaj `attempt`) u
+    EXPORT_ARTIFACTS_DIR/<tenant>/<id>/<attempt>/<filename>.
+
+    Fajl se piše u `.artifact.<attempt>.part` pa atomski premješta; greška
+    runner-a označava posao kao failed (poruka u `error`). Ako je posao u
+    međuvremenu preuzeo drugi pokušaj, rezultat ovog se odbacuje.
+    """
+    with SessionLocal() as db:
+        job = db.get(ExportJob, job_id)
+        if job is None:
+            return
+        tenant_code, kind, params = job.tenant_code, job.kind, dict(job.params)
+
+    job_dir = EXPORT_ARTIFACTS_ROOT / tenant_code / str(job_id)
+    relative_dir = Path(tenant_code) / str(job_id) / str(attempt)
+    target_dir = EXPORT_ARTIFACTS_ROOT / relative_dir
+    target_dir.mkdir(parents=True, exist_ok=True)
+    part_path = job_dir / f".artifact.{attempt}.part"
+
+    try:
+        spec = _export_kind(kind)
+        with _Heartbeat(job_id, attempt), SessionLocal() as db, open(part_path, "wb") as out:
+            artifact = spec.runner(db, tenant_code, params, out, _ProgressReporter(job_id, attempt))
+            out.flush()
+            os.fsync(out.fileno())
+
+        name = _artifact_name(artifact.filename)
+        final_path = target_dir / name
+        os.replace(part_path, final_path)
+    except Exception as exc:
+        try:
+            part_path.unlink()
+        except FileNotFoundError:
+            pass
+        shutil.rmtree(target_dir, ignore_errors=True)
+        _update_running_job(
+            job_id,
+            attempt,
+            status="failed",
+            error=f"{type(exc).__name__}: {exc}"[:2000],
+            finished_at=text("now()"),
+        )
+        return
+
+    owned = _update_running_job(
+        job_id,
+        attempt,
+        status="done",
+        progress=100,
+        artifact_path=(relative_dir / name).as_posix(),
+        filename=artifact.filename,
+        media_type=artifact.media_type,
+        size_bytes=final_path.stat().st_size,
+        finished_at=text("now()"),
+    )
+    if not owned:
+        shutil.rmtree(target_dir, ignore_errors=True)
+
+
+def run_pending_jobs(max_jobs: Optional[int] = None) -> int:
+    """
+    Obrađuje poslove iz reda u tekućem procesu dok red ne bude prazan
+    (CLI `run-once`, testovi). Vraća broj obrađenih poslova.
+    """
+    done = 0
+    while max_jobs is None or done < max_jobs:
+        claimed = claim_next_job()
+        if claimed is None:
+            break
+        run_job(*claimed)
+        done += 1
+    return done
+
+
+def run_worker(stop_event=None, *, poll_seconds: float = EXPORT_JOB_POLL_SECONDS) -> None:
+    """
+    Glavna petlja worker procesa: preuzmi posao → renderuj → ponovi;
+    kada je red prazan, vrati zaglavljene poslove u red i sačekaj.
+    """
+    _load_export_kinds()
+    while stop_event is None or not stop_event.is_set():
+        claimed = claim_next_job()
+        if claimed is not None:
+            run_job(*claimed)
+            continue
+
+        requeue_stale_jobs()
+        if stop_event is None:
+            time.sleep(poll_seconds)
+        else:
+            stop_event.wait(poll_seconds)
+
+
+class ExportWorkerPool:
+    """
+    Lokalni pool worker procesa (spawn – svaki proces ima svoj engine i
+    konekcije). API ga pokreće na startup-u i gasi na shutdown-u.
+    """
+
+    def __init__(self, processes: int) -> None:
+        self.processes = processes
+        self._stop_event = None
+        self._workers: List[multiprocessing.Process] = []
+
+    def start(self) -> None:
+        if self._workers or self.processes <= 0:
+            return
+        ctx = multiprocessing.get_context("spawn")
+        self._stop_event = ctx.Event()
+        for idx in range(self.processes):
+            worker = ctx.Process(
+                target=run_worker,
+                args=(self._stop_event,),
+                name=f"export-worker-{idx + 1}",
+                daemon=True,
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        if not self._workers:
+            return
+        self._stop_event.set()
+        deadline = time.monotonic() + timeout
+        for worker in self._workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+            if worker.is_alive():
+                # posao koji je prekinut vraća requeue_stale_jobs
+                worker.terminate()
+                worker.join()
+        self._workers = []
+
+
+export_worker_pool = ExportWorkerPool(EXPORT_WORKER_PROCESSES)
+
+
+# ======================================================
+#  ODRŽAVANJE
+# ======================================================
+
+
+def purge_expired_jobs(db: Session, *, ttl_hours: int = EXPORT_JOB_TTL_HOURS) -> int:
+    """
+    Briše gotove/neuspjele poslove starije od `ttl_hours` (red + fajlove)
+    i commit-uje. Vraća broj obrisanih poslova.
+    """
+    rows = db.execute(
+        text(
+            "DELETE FROM export_jobs "
+            "WHERE status IN ('done', 'failed') "
+            "AND finished_at < now() - make_interval(hours => :ttl) "
+            "RETURNING id, tenant_code"
+        ),
+        {"ttl": ttl_hours},
+    ).all()
+    db.commit()
+
+    for job_id, tenant_code in rows:
+        shutil.rmtree(EXPORT_ARTIFACTS_ROOT / tenant_code / str(job_id), ignore_errors=True)
+    return len(rows)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Pozadinski export poslovi (export_jobs).")
+    parser.add_argument("command", choices=["worker", "run-once", "purge"])
+    args = parser.parse_args(argv)
+
+    if args.command == "worker":
+        run_worker()
+        return 0
+
+    if args.command == "run-once":
+        count = run_pending_jobs()
+        print(f"export jobs done, processed={count}")
+        return 0
+
+    with SessionLocal() as db:
+        count = purge_expired_jobs(db)
+    print(f"export jobs purge done, removed={count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+# /home/miso/dev/sp-app/sp-app/backend/app/services/invoice_numbers.py
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, Optional, Sequence
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.models import Invoice, TenantInvoiceSequence, TenantProfileSettings
+
+
+# ======================================================
+#  DODJELA BROJEVA FAKTURA (tenant_invoice_sequences)
+# ======================================================
+#
+# Jedan red po (tenant, period); dodjela N brojeva je jedan
+# INSERT ... ON CONFLICT DO UPDATE SET last_value = last_value + N RETURNING.
+# Red ostaje zaključan do kraja transakcije pozivaoca, pa paralelni izdavači
+# istog tenanta čekaju jedan na drugog umjesto da se sudaraju na
+# `uq_invoice_number_per_tenant` (i ponavljaju zahtjeve nakon 409).
+#
+# Bez rupa: brojač se mijenja u istoj transakciji u kojoj se upisuje
+# faktura, pa rollback vraća i brojač. Brojevi koje je tenant već ručno
+# iskoristio (faktura sa istim brojem postoji) se preskaču – oni nisu
+# rupa, jer faktura sa tim brojem postoji.
+#
+# Format i reset brojača su podešavanja tenanta (tenant_profile_settings):
+#   invoice_number_format – Python format string sa poljima
+#       {seq} (obavezno), {year}, {yy}, {month}; npr. "{year}-{seq:04d}" → 2025-0001
+#   invoice_number_reset  – "yearly" (period = godina izdavanja) ili "never" (period 0)
+
+DEFAULT_INVOICE_NUMBER_FORMAT = "{year}-{seq:04d}"
+INVOICE_NUMBER_RESETS = ("yearly", "never")
+
+# zaštita od beskonačne petlje ako su svi naredni brojevi već zauzeti
+_MAX_ALLOCATION_ROUNDS = 100
+
+
+class InvoiceNumberFormatError(ValueError):
+    """Format broja fakture nije ispravan."""
+
+
+@dataclass(frozen=True)
+class InvoiceNumberFormat:
+    pattern: str = DEFAULT_INVOICE_NUMBER_FORMAT
+    reset: str = "yearly"
+
+    def period(self, issue_date: date) -> int:
+        return issue_date.year if self.reset == "yearly" else 0
+
+    def render(self, issue_date: date, seq: int) -> str:
+        return self.pattern.format(
+            seq=seq,
+            year=issue_date.year,
+            yy=f"{issue_date.year % 100:02d}",
+            month=f"{issue_date.month:02d}",
+        )
+
+
+DEFAULT_INVOICE_NUMBER_SETTINGS = InvoiceNumberFormat()
+
+
+def validate_invoice_number_format(pattern: str, reset: str = "yearly") -> InvoiceNumberFormat:
+    """
+    Provjerava format (poznata polja, {seq} obavezan, najviše 32 znaka –
+    kolona invoices.invoice_number) i vraća InvoiceNumberFormat.
+    """
+    if reset not in INVOICE_NUMBER_RESETS:
+        raise InvoiceNumberFormatError(f"invoice_number_reset must be one of {', '.join(INVOICE_NUMBER_RESETS)}")
+    if "{seq" not in pattern:
+        raise InvoiceNumberFormatError("invoice_number_format must contain {seq}")
+    if reset == "yearly" and "{year" not in pattern and "{yy" not in pattern:
+        # bez godine u broju bi se brojevi ponavljali svake godine
+        raise InvoiceNumberFormatError("invoice_number_format with yearly reset must contain {year} or {yy}")
+
+    fmt = InvoiceNumberFormat(pattern=pattern, reset=reset)
+    try:
+        sample = fmt.render(date(2099, 12, 31), 999999)
+    except (KeyError, IndexError, ValueError) as exc:
+        raise InvoiceNumberFormatError(f"Invalid invoice_number_format: {exc}") from exc
+    if not sample or len(sample) > 32:
+        raise InvoiceNumberFormatError("invoice_number_format produces numbers longer than 32 characters")
+    return fmt
+
+
+def load_invoice_number_formats(connection, tenant_codes: Iterable[str]) -> dict[str, InvoiceNumberFormat]:
+    """
+    Jednim upitom vraća format brojeva za date tenante (default ako tenant
+    nema podešavanja).
+    """
+    formats = {code: DEFAULT_INVOICE_NUMBER_SETTINGS for code in tenant_codes}
+    if not formats:
+        return formats
+
+    rows = connection.execute(
+        select(
+            TenantProfileSettings.tenant_code,
+            TenantProfileSettings.invoice_number_format,
+            TenantProfileSettings.invoice_number_reset,
+        ).where(TenantProfileSettings.tenant_code.in_(list(formats)))
+    )
+    for tenant_code, pattern, reset in rows:
+        formats[tenant_code] = InvoiceNumberFormat(
+            pattern=pattern or DEFAULT_INVOICE_NUMBER_FORMAT,
+            reset=reset or "yearly",
+        )
+    return formats
+
+
+def _reserve_sequence_values(connection, counts: dict[tuple[str, int], int]) -> dict[tuple[str, int], range]:
+    """
+    Povećava brojače za {(tenant_code, period): N} jednim upitom i vraća
+    dodijeljene redne brojeve. Redovi se zaključavaju u sortiranom
+    redoslijedu (deadlock-free između paralelnih transakcija).
+    """
+    keys = sorted(key for key, count in counts.items() if count > 0)
+    if not keys:
+        return {}
+
+    table = TenantInvoiceSequence.__table__
+    stmt = pg_insert(table).values(
+        [{"tenant_code": tenant, "year": period, "last_value": counts[(tenant, period)]} for tenant, period in keys]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.tenant_code, table.c.year],
+        set_={"last_value": table.c.last_value + stmt.excluded.last_value, "updated_at": func.now()},
+    ).returning(table.c.tenant_code, table.c.year, table.c.last_value)
+
+    return {
+        (tenant, period): range(last_value - counts[(tenant, period)] + 1, last_value + 1)
+        for tenant, period, last_value in connection.execute(stmt)
+    }
+
+
+def allocate_invoice_numbers(
+    connection,
+    requests: Sequence[tuple[str, date]],
+    *,
+    reserved: Optional[set[tuple[str, str]]] = None,
+) -> list[str]:
+    """
+    Dodjeljuje po jedan broj za svaki (tenant_code, issue_date), u istom
+    redoslijedu kao `requests` (rastući brojevi po tenantu i periodu).
+
+    Brojevi koji već postoje u invoices (ili u `reserved` – npr. ručni brojevi
+    iz istog bulk zahtjeva) se preskaču: za njih se u sljedećem krugu
+    dodjeljuju novi. Brojač se mijenja u transakciji pozivaoca.
+    """
+    if not requests:
+        return []
+
+    formats = load_invoice_number_formats(connection, {tenant for tenant, _ in requests})
+    reserved = reserved or set()
+    numbers: list[Optional[str]] = [None] * len(requests)
+    todo = list(range(len(requests)))
+
+    for _ in range(_MAX_ALLOCATION_ROUNDS):
+        counts = Counter(
+            (requests[i][0], formats[requests[i][0]].period(requests[i][1])) for i in todo
+        )
+        values = {key: iter(seqs) for key, seqs in _reserve_sequence_values(connection, counts).items()}
+
+        candidates = {}
+        for i in todo:
+            tenant, issue_date = requests[i]
+            fmt = formats[tenant]
+            candidates[i] = fmt.render(issue_date, next(values[(tenant, fmt.period(issue_date))]))
+
+        keys = {(requests[i][0], number) for i, number in candidates.items()}
+        taken = keys & reserved
+        taken.update(
+            (tenant, number)
+            for tenant, number in connection.execute(
+                select(Invoice.tenant_code, Invoice.invoice_number).where(
+                    tuple_(Invoice.tenant_code, Invoice.invoice_number).in_(list(keys))
+                )
+            )
+        )
+
+        todo = []
+        for i, number in candidates.items():
+            if (requests[i][0], number) in taken:
+                todo.append(i)
+            else:
+                numbers[i] = number
+        if not todo:
+            return numbers  # type: ignore[return-value]
+
+    raise RuntimeError("Could not allocate a free invoice number")
@@ -0,0 +1,84 @@
+# /home/miso/dev/sp-app/sp-app/backend/app/services/invoice_totals.py
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Sequence
+
+from app.schemas.invoice import InvoiceCreate
+
+
+# ======================================================
+#  OBRAČUN STAVKI FAKTURE (osnovica / PDV / ukupno)
+# ======================================================
+#
+# Jedno mjesto za obračun koji koriste POST /invoices, POST /invoices/bulk i
+# generisanje ponavljajućih faktura (app/services/recurring_invoices.py):
+#   base_amount  = quantity * unit_price
+#   vat_amount   = base_amount * vat_rate
+#   total_amount = base_amount + vat_amount
+#
+# Zbirovi fakture se sabiraju bez zaokruživanja; zaokružuje kolona
+# Numeric(14, 2) u bazi (isto ponašanje kao ranije u create_invoice).
+
+
+@dataclass
+class InvoiceTotals:
+    total_base: Decimal = Decimal("0.00")
+    total_vat: Decimal = Decimal("0.00")
+    total_amount: Decimal = Decimal("0.00")
+    # kolone invoice_items bez invoice_id
+    items: list[dict] = field(default_factory=list)
+
+
+def compute_invoice_totals(invoices: Sequence[InvoiceCreate]) -> list[InvoiceTotals]:
+    """
+    Obračun stavki i zbirova za više faktura u jednom prolazu.
+
+    Stavke svih faktura se obrađuju kao jedan niz (indeks fakture, stavka);
+    vrijednosti su već Decimal iz Pydantic sheme, pa nema konverzija.
+    Rezultat je u istom redoslijedu kao `invoices`.
+    """
+    results = [InvoiceTotals() for _ in invoices]
+    flat = [(idx, item) for idx, invoice in enumerate(invoices) for item in invoice.items]
+
+    for idx, item in flat:
+        base_amount = item.quantity * item.unit_price
+        vat_amount = base_amount * item.vat_rate
+        line_total = base_amount + vat_amount
+
+        totals = results[idx]
+        totals.total_base += base_amount
+        totals.total_vat += vat_amount
+        totals.total_amount += line_total
+        totals.items.append(
+            {
+                "description": item.description,
+                "quantity": item.quantity,
+                "unit_price": item.unit_price,
+                "vat_rate": item.vat_rate,
+                "base_amount": base_amount,
+                "vat_amount": vat_amount,
+                "total_amount": line_total,
+            }
+        )
+
+    return results
+
+
+def invoice_header_row(tenant: str, payload: InvoiceCreate, totals: InvoiceTotals) -> dict:
+    """
+    Kolone fakture (bez stavki) – isto za POST /invoices, bulk i ponavljajuće fakture.
+    """
+    return {
+        "tenant_code": tenant,
+        "invoice_number": payload.invoice_number,
+        "issue_date": payload.issue_date,
+        "due_date": payload.due_date,
+        "buyer_name": payload.buyer_name,
+        "buyer_address": payload.buyer_address,
+        "note": payload.note,
+        "total_base": totals.total_base,
+        "total_vat": totals.total_vat,
+        "total_amount": totals.total_amount,
+    }
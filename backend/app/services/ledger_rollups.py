@@ -0,0 +1,187 @@
+# /home/miso/dev/sp-app/sp-app/backend/app/services/ledger_rollups.py
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Any, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models import ROLLUP_AMOUNT_COLUMNS, lock_tenant_rollups
+
+
+# ======================================================
+#  TENANT MONTHLY ROLLUPS – rebuild + consistency check
+# ======================================================
+#
+# Rollupi se inkrementalno održavaju ORM hookovima u app/models.py (i
+# deltama za ORM bulk UPDATE/DELETE). Ovaj modul služi za:
+#   - inicijalni/ručni rebuild (npr. nakon raw SQL izmjena u knjigama),
+#   - provjeru konzistentnosti rollupa naspram knjiga.
+#
+# CLI:
+#   python -m app.services.ledger_rollups rebuild [--tenant t-demo]
+#   python -m app.services.ledger_rollups check   [--tenant t-demo]
+
+
+def _ledger_aggregate_sql(tenant_filter: bool) -> str:
+    """
+    SELECT koji iz knjiga računa (tenant, year, month) zbirove u istom obliku
+    kao tenant_monthly_rollups. Ista logika kao backfill u Alembic migraciji.
+    """
+    where = " WHERE tenant_code = :tenant_code" if tenant_filter else ""
+    return f"""
+        SELECT
+            src.tenant_code AS tenant_code, src.y AS year, src.m AS month,
+            SUM(src.invoice_income) AS invoice_income,
+            SUM(src.invoice_count) AS invoice_count,
+            SUM(src.cash_income) AS cash_income,
+            SUM(src.cash_income_count) AS cash_income_count,
+            SUM(src.cash_expense) AS cash_expense,
+            SUM(src.cash_expense_count) AS cash_expense_count,
+            SUM(src.input_expense) AS input_expense,
+            SUM(src.input_invoice_count) AS input_invoice_count
+        FROM (
+            SELECT tenant_code,
+                   EXTRACT(YEAR FROM issue_date)::int AS y,
+                   EXTRACT(MONTH FROM issue_date)::int AS m,
+                   COALESCE(total_amount, 0) AS invoice_income, 1 AS invoice_count,
+                   0 AS cash_income, 0 AS cash_income_count,
+                   0 AS cash_expense, 0 AS cash_expense_count,
+                   0 AS input_expense, 0 AS input_invoice_count
+            FROM invoices{where}
+            UNION ALL
+            SELECT tenant_code,
+                   EXTRACT(YEAR FROM entry_date)::int,
+                   EXTRACT(MONTH FROM entry_date)::int,
+                   0, 0,
+                   CASE WHEN kind = 'income' THEN amount ELSE 0 END,
+                   CASE WHEN kind = 'income' THEN 1 ELSE 0 END,
+                   CASE WHEN kind = 'expense' THEN amount ELSE 0 END,
+                   CASE WHEN kind = 'expense' THEN 1 ELSE 0 END,
+                   0, 0
+            FROM cash_entries{where}
+            UNION ALL
+            SELECT tenant_code,
+                   EXTRACT(YEAR FROM issue_date)::int,
+                   EXTRACT(MONTH FROM issue_date)::int,
+                   0, 0, 0, 0, 0, 0,
+                   COALESCE(total_amount, 0), 1
+            FROM input_invoices{where}
+        ) AS src
+        GROUP BY src.tenant_code, src.y, src.m
+    """
+
+
+def rebuild_monthly_rollups(db: Session | Connection, *, tenant_code: Optional[str] = None) -> int:
+    """
+    Ponovo računa tenant_monthly_rollups iz knjiga (za jednog ili sve tenante).
+
+    Rebuild jednog tenanta uzima exclusive advisory lock tog tenanta
+    (`lock_tenant_rollups`); upisi delti uzimaju shared lock istog ključa, pa
+    čekaju samo upisi tog tenanta dok rebuild ne završi. Rebuild svih tenanata
+    (CLI) zaključava cijelu tabelu u SHARE ROW EXCLUSIVE modu.
+
+    Ne radi commit – to je odgovornost pozivaoca. Vraća broj upisanih redova.
+    """
+    params: dict[str, Any] = {}
+    delete_sql = "DELETE FROM tenant_monthly_rollups"
+    if tenant_code is not None:
+        delete_sql += " WHERE tenant_code = :tenant_code"
+        params["tenant_code"] = tenant_code
+
+    cols = ", ".join(ROLLUP_AMOUNT_COLUMNS)
+
+    if tenant_code is not None:
+        connection = db.connection() if isinstance(db, Session) else db
+        lock_tenant_rollups(connection, [tenant_code], exclusive=True)
+    else:
+        db.execute(text("LOCK TABLE tenant_monthly_rollups IN SHARE ROW EXCLUSIVE MODE"))
+    db.execute(text(delete_sql), params)
+    result = db.execute(
+        text(
+            f"INSERT INTO tenant_monthly_rollups (tenant_code, year, month, {cols}) "
+            f"SELECT tenant_code, year, month, {cols} "
+            f"FROM ({_ledger_aggregate_sql(tenant_code is not None)}) AS agg"
+        ),
+        params,
+    )
+    return int(result.rowcount or 0)
+
+
+def check_monthly_rollups(db: Session, *, tenant_code: Optional[str] = None) -> list[dict[str, Any]]:
+    """
+    Poredi rollupe sa zbirovima iz knjiga i vraća listu razlika.
+
+    Svaka stavka: {tenant_code, year, month, column, rollup, ledger}.
+    Prazna lista = rollupi su konzistentni.
+    """
+    params: dict[str, Any] = {}
+    rollup_where = ""
+    if tenant_code is not None:
+        rollup_where = " WHERE tenant_code = :tenant_code"
+        params["tenant_code"] = tenant_code
+
+    select_cols = ",\n".join(
+        f"COALESCE(r.{c}, 0) AS r_{c}, COALESCE(l.{c}, 0) AS l_{c}" for c in ROLLUP_AMOUNT_COLUMNS
+    )
+    sql = f"""
+        SELECT
+            COALESCE(r.tenant_code, l.tenant_code) AS tenant_code,
+            COALESCE(r.year, l.year) AS year,
+            COALESCE(r.month, l.month) AS month,
+            {select_cols}
+        FROM (SELECT * FROM tenant_monthly_rollups{rollup_where}) AS r
+        FULL OUTER JOIN ({_ledger_aggregate_sql(tenant_code is not None)}) AS l
+          ON l.tenant_code = r.tenant_code AND l.year = r.year AND l.month = r.month
+        ORDER BY 1, 2, 3
+    """
+
+    mismatches: list[dict[str, Any]] = []
+    for row in db.execute(text(sql), params).mappings():
+        for c in ROLLUP_AMOUNT_COLUMNS:
+            rollup_value = row[f"r_{c}"]
+            ledger_value = row[f"l_{c}"]
+            if rollup_value != ledger_value:
+                mismatches.append(
+                    {
+                        "tenant_code": row["tenant_code"],
+                        "year": row["year"],
+                        "month": row["month"],
+                        "column": c,
+                        "rollup": rollup_value,
+                        "ledger": ledger_value,
+                    }
+                )
+    return mismatches
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild / provjera tenant_monthly_rollups.")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--tenant", dest="tenant_code", default=None, help="Samo za jedan tenant_code.")
+    args = parser.parse_args(argv)
+
+    from app.db import SessionLocal
+
+    with SessionLocal() as db:
+        if args.command == "rebuild":
+            count = rebuild_monthly_rollups(db, tenant_code=args.tenant_code)
+            db.commit()
+            print(f"rollup rebuild done, rows={count}")
+            return 0
+
+        mismatches = check_monthly_rollups(db, tenant_code=args.tenant_code)
+        for m in mismatches:
+            print(
+                f"{m['tenant_code']} {m['year']}-{m['month']:02d} {m['column']}: "
+                f"rollup={m['rollup']} ledger={m['ledger']}"
+            )
+        print(f"rollup check done, mismatches={len(mismatches)}")
+        return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,9 @@
 # /home/miso/dev/sp-app/sp-app/backend/app/services/pdf_invoice.py
 from __future__ import annotations
 
-from io import BytesIO
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, BinaryIO, Iterable
+
+from app.services.pdf_writer import TextPdfDocument, render_text_pdf
 
 if TYPE_CHECKING:
     from app.models import Invoice
@@ -15,36 +16,9 @@ def _as_float(value) -> float:
         return 0.0
 
 
-def _escape_pdf_text(text: str) -> str:
-    """
-    Transliteracija naših slova na ASCII + escape za PDF specijalne znakove.
-    Ovo nam omogućava da sigurno enkodiramo u latin-1 bez greške.
-    """
-    translit_map = str.maketrans(
-        {
-            "č": "c",
-            "ć": "c",
-            "š": "s",
-            "đ": "d",
-            "ž": "z",
-            "Č": "C",
-            "Ć": "C",
-            "Š": "S",
-            "Đ": "D",
-            "Ž": "Z",
-        }
-    )
-    text = text.translate(translit_map)
-    return (
-        text.replace("\\", "\\\\")
-        .replace("(", "\\(")
-        .replace(")", "\\)")
-    )
-
-
-def render_invoice_pdf(invoice: "Invoice") -> bytes:
+def invoice_pdf_lines(invoice: "Invoice") -> list[str]:
     """
-    Generiše PDF bez eksternih biblioteka.
+    Tekstualne linije jedne fakture (layout za render_invoice_pdf).
 
     Struktura (A4, portret):
     - gornji blok: logo (placeholder) + izdavalac (korisnik aplikacije) + tenant
@@ -152,94 +126,38 @@ def render_invoice_pdf(invoice: "Invoice") -> bytes:
     lines.append("Mjesto i datum: ______________________________")
     lines.append("Potpis i pecat: ______________________________")
 
-    # ---------------------------------
-    # 8) PDF stream (tekstualni sadržaj)
-    # ---------------------------------
-    stream_lines: list[str] = []
-    stream_lines.append("BT")
-    stream_lines.append("/F1 11 Tf")
-    stream_lines.append("50 800 Td")
-
-    first = True
-    for line in lines:
-        text = _escape_pdf_text(line)
-        if first:
-            first = False
-        else:
-            stream_lines.append("0 -14 Td")
-        stream_lines.append(f"({text}) Tj")
-
-    stream_lines.append("ET")
-    stream_data_str = "\n".join(stream_lines) + "\n"
-    stream_data = stream_data_str.encode("latin-1")
-    stream_len = len(stream_data)
+    return lines
 
-    # ---------------------------------
-    # 9) Gradimo PDF objekte
-    # ---------------------------------
-    objs: list[bytes] = []
-
-    def add_obj(body: str) -> int:
-        index = len(objs) + 1
-        obj_bytes = f"{index} 0 obj\n{body}\nendobj\n".encode("latin-1")
-        objs.append(obj_bytes)
-        return index
-
-    # 1 – Catalog
-    add_obj("<< /Type /Catalog /Pages 2 0 R >>")
-
-    # 2 – Pages
-    add_obj("<< /Type /Pages /Kids [3 0 R] /Count 1 >>")
-
-    # 3 – Page
-    add_obj(
-        "<< /Type /Page /Parent 2 0 R "
-        "/MediaBox [0 0 595 842] "
-        "/Contents 4 0 R "
-        "/Resources << /Font << /F1 5 0 R >> >> >>"
-    )
-
-    # 4 – Contents (tekst)
-    contents_body = (
-        f"<< /Length {stream_len} >>\nstream\n"
-        f"{stream_data_str}"
-        "endstream"
-    )
-    add_obj(contents_body)
-
-    # 5 – Font
-    add_obj("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
 
-    # ---------------------------------
-    # 10) Sastavljamo finalni PDF sa xref
-    # ---------------------------------
-    buffer = BytesIO()
-
-    header = "%PDF-1.4\n%\xE2\xE3\xCF\xD3\n"
-    buffer.write(header.encode("latin-1"))
-
-    offsets = [0]
-    for obj in objs:
-        offsets.append(buffer.tell())
-        buffer.write(obj)
-
-    xref_pos = buffer.tell()
-    obj_count = len(objs) + 1
-
-    buffer.write(f"xref\n0 {obj_count}\n".encode("latin-1"))
-    buffer.write(b"0000000000 65535 f \n")
-    for off in offsets[1:]:
-        buffer.write(f"{off:010d} 00000 n \n".encode("latin-1"))
-
-    trailer = (
-        "trailer\n"
-        f"<< /Size {obj_count} /Root 1 0 R >>\n"
-        "startxref\n"
-        f"{xref_pos}\n"
-        "%%EOF\n"
-    )
-    buffer.write(trailer.encode("latin-1"))
-
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-    return pdf_bytes
+def render_invoice_pdf(invoice: "Invoice") -> bytes:
+    """
+    Generiše PDF jedne fakture bez eksternih biblioteka
+    (stranice, xref i kompresija u pdf_writer-u).
+    """
+    return render_text_pdf(invoice_pdf_lines(invoice))
+
+
+def render_invoices_pdf(
+    invoices: Iterable["Invoice"],
+    out: BinaryIO,
+    *,
+    empty_note: str = "(Nema izlaznih faktura u zadatom periodu)",
+) -> None:
+    """
+    Više faktura u jednom PDF-u – svaka počinje na novoj stranici.
+
+    `invoices` se troši jednom (može biti stream iz baze). PDF se piše
+    direktno u `out`.
+    """
+    doc = TextPdfDocument(out)
+
+    has_invoices = False
+    for invoice in invoices:
+        doc.page_break()
+        doc.lines(invoice_pdf_lines(invoice))
+        has_invoices = True
+
+    if not has_invoices:
+        doc.line(empty_note)
+
+    doc.close()
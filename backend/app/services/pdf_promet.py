@@ -3,8 +3,9 @@ from __future__ import annotations
 
 from datetime import date
 from decimal import Decimal
-from io import BytesIO
-from typing import Any, Iterable, Mapping, Optional
+from typing import Any, BinaryIO, Iterable, Mapping, Optional
+
+from app.services.pdf_writer import TextPdfDocument
 
 
 def _as_float(value: Any) -> float:
@@ -14,33 +15,6 @@ def _as_float(value: Any) -> float:
         return 0.0
 
 
-def _escape_pdf_text(text: str) -> str:
-    """
-    Transliteracija naših slova na ASCII + escape za PDF specijalne znakove.
-    Omogućava sigurno enkodiranje u latin-1 bez greške.
-    """
-    translit_map = str.maketrans(
-        {
-            "č": "c",
-            "ć": "c",
-            "š": "s",
-            "đ": "d",
-            "ž": "z",
-            "Č": "C",
-            "Ć": "C",
-            "Š": "S",
-            "Đ": "D",
-            "Ž": "Z",
-        }
-    )
-    text = text.translate(translit_map)
-    return (
-        text.replace("\\", "\\\\")
-        .replace("(", "\\(")
-        .replace(")", "\\)")
-    )
-
-
 def _get_row_value(row: Any, key: str, default: Any = None) -> Any:
     """
     Helper koji omogućava da rows budu ili dict, ili Pydantic/BaseModel,
@@ -54,8 +28,9 @@ def _get_row_value(row: Any, key: str, default: Any = None) -> Any:
 def render_promet_pdf(
     tenant_code: str,
     rows: Iterable[Any],
+    out: BinaryIO,
     period_label: Optional[str] = None,
-) -> bytes:
+) -> None:
     """
     Generiše jednostavan PDF izvještaj za Knjigu prometa (KP-1042 stil).
 
@@ -73,28 +48,33 @@ def render_promet_pdf(
     - zaglavlje: naziv izvještaja + tenant + period,
     - tabela: Datum | Broj dokumenta | Kupac/Dobavljač | Iznos | Napomena,
     - suma: Ukupno: XX.XX KM.
+
+    PDF se piše direktno u `out` (fajl, spool ili ZIP entry).
     """
 
-    lines: list[str] = []
+    doc = TextPdfDocument(out)
 
     # ---------------------------------
     # 1) Header – naziv izvještaja
     # ---------------------------------
-    lines.append("KNJIGA PROMETA (KP-1042)")
-    lines.append("SP-APP – evidencija bezgotovinskog prometa")
-    lines.append(f"Tenant: {tenant_code or ''}")
+    doc.line("KNJIGA PROMETA (KP-1042)")
+    doc.line("SP-APP – evidencija bezgotovinskog prometa")
+    doc.line(f"Tenant: {tenant_code or ''}")
     if period_label:
-        lines.append(f"Period: {period_label}")
-    lines.append("")
+        doc.line(f"Period: {period_label}")
+    doc.line("")
 
     # ---------------------------------
     # 2) Tabela – header
     # ---------------------------------
-    lines.append("--------------------------------------------------------------------------")
-    lines.append(
-        "Datum       Broj dok.        Kupac/Dobavljac                 Iznos      Napomena"
+    # (zaglavlje tabele se ponavlja na svakoj novoj stranici)
+    doc.line("--------------------------------------------------------------------------")
+    doc.set_repeating_header(
+        [
+            "Datum       Broj dok.        Kupac/Dobavljac                 Iznos      Napomena",
+            "--------------------------------------------------------------------------",
+        ]
     )
-    lines.append("--------------------------------------------------------------------------")
 
     total_amount = Decimal("0.00")
 
@@ -129,110 +109,25 @@ def render_promet_pdf(
             f"{_as_float(amount):9.2f} "
             f"{short_note}"
         )
-        lines.append(line)
+        doc.line(line)
 
     if not has_rows:
-        lines.append("(Nema evidentiranih stavki prometa u zadatom periodu)")
+        doc.line("(Nema evidentiranih stavki prometa u zadatom periodu)")
 
-    lines.append("--------------------------------------------------------------------------")
-    lines.append("")
-    lines.append(f"Ukupno: {total_amount:.2f} KM")
-    lines.append("")
+    doc.set_repeating_header(None)
 
-    # ---------------------------------
-    # 3) Potpis / mjesto i datum (generički)
-    # ---------------------------------
-    lines.append("Mjesto i datum: ______________________________")
-    lines.append("Potpis:        ______________________________")
+    doc.line("--------------------------------------------------------------------------")
+    doc.line("")
+    doc.line(f"Ukupno: {total_amount:.2f} KM")
+    doc.line("")
 
     # ---------------------------------
-    # 4) PDF text stream
-    # ---------------------------------
-    stream_lines: list[str] = []
-    stream_lines.append("BT")
-    stream_lines.append("/F1 11 Tf")
-    stream_lines.append("50 800 Td")
-
-    first = True
-    for line in lines:
-        text = _escape_pdf_text(line)
-        if first:
-            first = False
-        else:
-            stream_lines.append("0 -14 Td")
-        stream_lines.append(f"({text}) Tj")
-
-    stream_lines.append("ET")
-    stream_data_str = "\n".join(stream_lines) + "\n"
-    stream_data = stream_data_str.encode("latin-1")
-    stream_len = len(stream_data)
-
-    # ---------------------------------
-    # 5) PDF objekti
+    # 3) Potpis / mjesto i datum (generički)
     # ---------------------------------
-    objs: list[bytes] = []
-
-    def add_obj(body: str) -> int:
-        index = len(objs) + 1
-        obj_bytes = f"{index} 0 obj\n{body}\nendobj\n".encode("latin-1")
-        objs.append(obj_bytes)
-        return index
-
-    # 1 – Catalog
-    add_obj("<< /Type /Catalog /Pages 2 0 R >>")
-
-    # 2 – Pages
-    add_obj("<< /Type /Pages /Kids [3 0 R] /Count 1 >>")
-
-    # 3 – Page
-    add_obj(
-        "<< /Type /Page /Parent 2 0 R "
-        "/MediaBox [0 0 595 842] "
-        "/Contents 4 0 R "
-        "/Resources << /Font << /F1 5 0 R >> >> >>"
-    )
-
-    # 4 – Contents (tekst)
-    contents_body = (
-        f"<< /Length {stream_len} >>\nstream\n"
-        f"{stream_data_str}"
-        "endstream"
-    )
-    add_obj(contents_body)
-
-    # 5 – Font
-    add_obj("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    doc.line("Mjesto i datum: ______________________________")
+    doc.line("Potpis:        ______________________________")
 
     # ---------------------------------
-    # 6) Sastavljanje finalnog PDF-a sa xref
+    # 4) PDF (stranice, xref i kompresija u pdf_writer-u)
     # ---------------------------------
-    buffer = BytesIO()
-
-    header = "%PDF-1.4\n%\xE2\xE3\xCF\xD3\n"
-    buffer.write(header.encode("latin-1"))
-
-    offsets = [0]
-    for obj in objs:
-        offsets.append(buffer.tell())
-        buffer.write(obj)
-
-    xref_pos = buffer.tell()
-    obj_count = len(objs) + 1
-
-    buffer.write(f"xref\n0 {obj_count}\n".encode("latin-1"))
-    buffer.write(b"0000000000 65535 f \n")
-    for off in offsets[1:]:
-        buffer.write(f"{off:010d} 00000 n \n".encode("latin-1"))
-
-    trailer = (
-        "trailer\n"
-        f"<< /Size {obj_count} /Root 1 0 R >>\n"
-        "startxref\n"
-        f"{xref_pos}\n"
-        "%%EOF\n"
-    )
-    buffer.write(trailer.encode("latin-1"))
-
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-    return pdf_bytes
+    doc.close()
@@ -0,0 +1,295 @@
+# /home/miso/dev/sp-app/sp-app/backend/app/services/pdf_writer.py
+from __future__ import annotations
+
+import os
+import tempfile
+import zlib
+from io import BytesIO
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, List, Optional
+
+from app.services.zip_stream import iter_file_chunks
+
+
+# ======================================================
+#  INKREMENTALNI PDF WRITER (bez eksternih biblioteka)
+# ======================================================
+#
+# Zajednički writer za pdf_invoice, pdf_kpr, pdf_promet, KPR export i
+# inspekcijski ZIP:
+#
+#   - objekti se pišu direktno u izlazni stream čim su gotovi, a xref
+#     offseti se računaju usput (brojimo upisane bajtove),
+#   - tekst se prelama na nove stranice automatski; zaglavlje tabele se
+#     ponavlja na vrhu svake nove stranice,
+#   - content stream-ovi se kompresuju (FlateDecode).
+#
+# U memoriji je u svakom trenutku samo jedna stranica teksta i lista offseta,
+# pa i KPR sa hiljadama redova ima ravnu potrošnju memorije.
+
+PDF_COMPRESS_STREAMS = os.getenv("PDF_COMPRESS_STREAMS", "1") != "0"
+# PDF za HTTP odgovor ide u SpooledTemporaryFile: do ovoliko bajtova u
+# memoriji, veći (npr. godišnji KPR) na disk.
+PDF_SPOOL_BYTES = int(os.getenv("PDF_SPOOL_BYTES", str(8 * 1024 * 1024)))
+
+PDF_PAGE_WIDTH = 595  # A4, portret (pt)
+PDF_PAGE_HEIGHT = 842
+
+_PDF_HEADER = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+
+# tipografske crte i navodnici -> ASCII
+_TYPOGRAPHIC_MAP = str.maketrans(
+    {
+        "\u2013": "-",  # en dash
+        "\u2014": "-",  # em dash
+        "\u2019": "'",  # right single quote
+        "\u2018": "'",  # left single quote
+        "\u201c": '"',  # left double quote
+        "\u201d": '"',  # right double quote
+        "\u00a0": " ",  # nbsp
+    }
+)
+
+# naša slova → ASCII; isto preslikavanje koristi i pretraga
+# (app/services/search.py, SQL funkcija sp_search_fold)
+BOSNIAN_TRANSLITERATION = {
+    "č": "c",
+    "ć": "c",
+    "š": "s",
+    "đ": "d",
+    "ž": "z",
+    "Č": "C",
+    "Ć": "C",
+    "Š": "S",
+    "Đ": "D",
+    "Ž": "Z",
+}
+
+_TRANSLIT_MAP = str.maketrans(BOSNIAN_TRANSLITERATION)
+
+
+def escape_pdf_text(text: str) -> str:
+    """
+    Transliteracija naših slova i tipografskih znakova na ASCII + escape
+    za PDF string literal. Rezultat se sigurno enkodira u latin-1.
+    """
+    text = text.translate(_TYPOGRAPHIC_MAP).translate(_TRANSLIT_MAP)
+    return (
+        text.replace("\\", "\\\\")
+        .replace("(", "\\(")
+        .replace(")", "\\)")
+    )
+
+
+class PdfWriter:
+    """
+    Niskonivojski writer: stranice (content stream + Page objekat) se upisuju
+    u `out` odmah, a Pages/Catalog/xref/trailer tek u `close()`.
+
+    `out` ne mora biti seekable (npr. fajl, BytesIO, socket wrapper).
+    """
+
+    def __init__(self, out: BinaryIO, *, compress: bool = PDF_COMPRESS_STREAMS) -> None:
+        self._out = out
+        self._compress = compress
+        self._pos = 0
+        self._offsets: dict[int, int] = {}
+        self._next_num = 1
+        self._page_nums: List[int] = []
+        self._closed = False
+
+        self._catalog_num = self._alloc()
+        self._pages_num = self._alloc()
+        self._font_num = self._alloc()
+
+        self._write(_PDF_HEADER)
+        self._write_obj(self._font_num, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_nums)
+
+    def _alloc(self) -> int:
+        num = self._next_num
+        self._next_num += 1
+        return num
+
+    def _write(self, data: bytes) -> None:
+        self._out.write(data)
+        self._pos += len(data)
+
+    def _write_obj(self, num: int, body: bytes) -> None:
+        self._offsets[num] = self._pos
+        self._write(b"%d 0 obj\n" % num + body + b"\nendobj\n")
+
+    def add_page(self, content: bytes) -> None:
+        """
+        Upisuje jednu stranicu sa gotovim content stream-om (PDF operatori).
+        Font je dostupan kao /F1 (Helvetica).
+        """
+        if self._closed:
+            raise ValueError("PDF writer is already closed")
+
+        if self._compress:
+            data = zlib.compress(content)
+            stream_dict = b"<< /Length %d /Filter /FlateDecode >>" % len(data)
+        else:
+            data = content
+            stream_dict = b"<< /Length %d >>" % len(data)
+
+        content_num = self._alloc()
+        self._write_obj(content_num, stream_dict + b"\nstream\n" + data + b"\nendstream")
+
+        page_num = self._alloc()
+        self._write_obj(
+            page_num,
+            (
+                b"<< /Type /Page /Parent %d 0 R "
+                b"/MediaBox [0 0 %d %d] "
+                b"/Contents %d 0 R "
+                b"/Resources << /Font << /F1 %d 0 R >> >> >>"
+            )
+            % (self._pages_num, PDF_PAGE_WIDTH, PDF_PAGE_HEIGHT, content_num, self._font_num),
+        )
+        self._page_nums.append(page_num)
+
+    def close(self) -> None:
+        """
+        Upisuje Pages i Catalog, xref tabelu i trailer. Ne zatvara `out`.
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        kids = b" ".join(b"%d 0 R" % num for num in self._page_nums)
+        self._write_obj(
+            self._pages_num,
+            b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._page_nums)),
+        )
+        self._write_obj(self._catalog_num, b"<< /Type /Catalog /Pages %d 0 R >>" % self._pages_num)
+
+        xref_pos = self._pos
+        obj_count = self._next_num
+
+        xref = [b"xref\n0 %d\n" % obj_count, b"0000000000 65535 f \n"]
+        xref.extend(b"%010d 00000 n \n" % self._offsets[num] for num in range(1, obj_count))
+        self._write(b"".join(xref))
+        self._write(
+            b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+            % (obj_count, self._catalog_num, xref_pos)
+        )
+
+
+class TextPdfDocument:
+    """
+    Jednostavan tekstualni layout (Helvetica, jedna kolona, fiksni prored)
+    sa automatskim prelamanjem na novu stranicu.
+
+    Za tabele: `set_repeating_header([...])` upiše zaglavlje i ponavlja ga
+    na vrhu svake sljedeće stranice, dok se ne pozove `set_repeating_header(None)`.
+    """
+
+    def __init__(
+        self,
+        out: BinaryIO,
+        *,
+        compress: bool = PDF_COMPRESS_STREAMS,
+        font_size: int = 11,
+        leading: int = 14,
+        left: int = 50,
+        top: int = 800,
+        bottom: int = 40,
+    ) -> None:
+        self._writer = PdfWriter(out, compress=compress)
+        self._font_size = font_size
+        self._leading = leading
+        self._left = left
+        self._top = top
+        self.lines_per_page = int((top - bottom) // leading) + 1
+
+        self._page: List[str] = []
+        self._repeating_header: Optional[List[str]] = None
+
+    @property
+    def page_count(self) -> int:
+        return self._writer.page_count + (1 if self._page else 0)
+
+    def _flush_page(self) -> None:
+        ops = [f"BT\n/F1 {self._font_size} Tf\n{self._left} {self._top} Td\n"]
+        for idx, line in enumerate(self._page):
+            if idx:
+                ops.append(f"0 -{self._leading} Td\n")
+            ops.append(f"({escape_pdf_text(line)}) Tj\n")
+        ops.append("ET\n")
+        self._writer.add_page("".join(ops).encode("latin-1", errors="replace"))
+        self._page = []
+
+    def line(self, text: str = "") -> None:
+        if len(self._page) >= self.lines_per_page:
+            self._flush_page()
+            if self._repeating_header:
+                self._page.extend(self._repeating_header)
+        self._page.append(text)
+
+    def lines(self, texts: Iterable[str]) -> None:
+        for text in texts:
+            self.line(text)
+
+    def page_break(self) -> None:
+        """
+        Završava tekuću stranicu (ako nije prazna); sljedeća linija ide na novu.
+        """
+        if self._page:
+            self._flush_page()
+
+    def set_repeating_header(self, header: Optional[List[str]]) -> None:
+        """
+        Upisuje `header` linije (ako su zadate) i pamti ih za naredne stranice.
+        """
+        self._repeating_header = list(header) if header else None
+        if self._repeating_header:
+            # zaglavlje ne ostavljamo samo na dnu stranice
+            if len(self._page) + len(self._repeating_header) >= self.lines_per_page:
+                self._flush_page()
+            self._page.extend(self._repeating_header)
+
+    def close(self) -> None:
+        if self._page or self._writer.page_count == 0:
+            self._flush_page()
+        self._writer.close()
+
+
+def render_text_pdf(lines: Iterable[str], *, compress: bool = PDF_COMPRESS_STREAMS) -> bytes:
+    """
+    Prečica: tekstualne linije → PDF bajtovi (sa automatskim prelamanjem stranica).
+    """
+    buffer = BytesIO()
+    doc = TextPdfDocument(buffer, compress=compress)
+    doc.lines(lines)
+    doc.close()
+    return buffer.getvalue()
+
+
+def spool_pdf(write: Callable[[BinaryIO], Any]) -> BinaryIO:
+    """
+    `write(out)` piše PDF u SpooledTemporaryFile (PDF_SPOOL_BYTES); vraća
+    fajl pozicioniran na početak. Zatvara ga `iter_spooled_pdf`.
+    """
+    spooled = tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_BYTES)
+    try:
+        write(spooled)
+        spooled.seek(0)
+    except BaseException:
+        spooled.close()
+        raise
+    return spooled
+
+
+def iter_spooled_pdf(spooled: BinaryIO) -> Iterator[bytes]:
+    """
+    Chunk-ovi za StreamingResponse; temp fajl se zatvara i kada klijent
+    prekine preuzimanje.
+    """
+    try:
+        yield from iter_file_chunks(spooled)
+    finally:
+        spooled.close()
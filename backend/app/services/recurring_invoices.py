@@ -0,0 +1,395 @@
+# /home/miso/dev/sp-app/sp-app/backend/app/services/recurring_invoices.py
+from __future__ import annotations
+
+import argparse
+import calendar
+import logging
+import os
+import sys
+import threading
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Optional
+
+from pydantic import ValidationError
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Connection
+
+from app.db import engine
+from app.models import (
+    FinalizedPeriodModificationError,
+    Invoice,
+    InvoiceItem,
+    InvoiceTemplate,
+    apply_merged_rollup_deltas,
+    bump_tenant_data_versions,
+    load_finalized_periods,
+    merge_rollup_deltas,
+)
+from app.schemas.invoice import InvoiceCreate
+from app.services.bulk_import import format_validation_errors
+from app.services.invoice_numbers import allocate_invoice_numbers
+from app.services.invoice_totals import compute_invoice_totals, invoice_header_row
+
+logger = logging.getLogger(__name__)
+
+
+# ======================================================
+#  PONAVLJAJUĆE FAKTURE – generisanje dospjelih šablona
+# ======================================================
+#
+# Jedan batch = jedna transakcija:
+#
+#   SELECT dospjeli šabloni ... LIMIT n FOR UPDATE SKIP LOCKED
+#   → brojevi faktura jednim upitom (tenant_invoice_sequences)
+#   → obračun stavki svih faktura u jednom prolazu
+#   → INSERT zaglavlja (multi-row, ON CONFLICT DO NOTHING RETURNING id)
+#   → INSERT svih stavki (multi-row) → rollup / verzija podataka
+#   → UPDATE šablona (next_run na sljedeći termin)
+#
+# Izdavanje fakture i pomjeranje `next_run` su u istoj transakciji, a
+# paralelni worker-i preskaču zaključane šablone, pa se nijedan termin ne
+# izdaje dvaput. Šablon koji kasni više termina (npr. scheduler nije radio)
+# dobija po jednu fakturu u svakom narednom batch-u dok ne stigne do danas.
+#
+# Pokretanje:
+#   - u API procesu: pozadinska nit svakih RECURRING_INVOICE_POLL_SECONDS
+#     (0 = isključeno, npr. kada radi zaseban servis),
+#   - CLI:
+#       python -m app.services.recurring_invoices run-once [--as-of 2025-12-01] [--tenant t-demo]
+#       python -m app.services.recurring_invoices worker
+
+RECURRING_INVOICE_BATCH_SIZE = int(os.getenv("RECURRING_INVOICE_BATCH_SIZE", "500"))
+RECURRING_INVOICE_POLL_SECONDS = float(os.getenv("RECURRING_INVOICE_POLL_SECONDS", "300"))
+# koliko puta se u istom batch-u traži novi broj ako je dodijeljeni broj
+# ručno iskorišten paralelno (nakon provjere u allocate_invoice_numbers)
+RECURRING_INVOICE_NUMBER_RETRIES = 3
+
+_CADENCE_MONTHS = {"monthly": 1, "quarterly": 3, "yearly": 12}
+
+_NO_FREE_NUMBER_ERROR = "Could not allocate a free invoice number"
+
+
+def next_run_after(current: date, cadence: str, anchor_day: int) -> date:
+    """
+    Sljedeći termin nakon `current`; dan je `anchor_day`, ograničen na
+    dužinu mjeseca (31. → 28./29. februar → 31. mart).
+    """
+    months = current.month - 1 + _CADENCE_MONTHS[cadence]
+    year, month = current.year + months // 12, months % 12 + 1
+    return date(year, month, min(anchor_day, calendar.monthrange(year, month)[1]))
+
+
+@dataclass
+class RecurringRunStats:
+    templates: int = 0
+    invoices: int = 0
+    # termini u finalizovanom poreskom mjesecu (preskočeni, razlog u last_error)
+    skipped: int = 0
+    # šabloni koji nisu mogli biti izdati (ostaju dospjeli, razlog u last_error)
+    failed: int = 0
+
+    def add(self, other: "RecurringRunStats") -> None:
+        self.templates += other.templates
+        self.invoices += other.invoices
+        self.skipped += other.skipped
+        self.failed += other.failed
+
+
+def _claim_due_templates(
+    conn: Connection,
+    as_of: date,
+    *,
+    batch_size: int,
+    exclude_ids: set[int],
+    tenant_code: Optional[str],
+):
+    t = InvoiceTemplate.__table__
+    stmt = (
+        select(t)
+        .where(t.c.is_active.is_(True), t.c.next_run <= as_of)
+        .order_by(t.c.next_run, t.c.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    if exclude_ids:
+        stmt = stmt.where(t.c.id.not_in(exclude_ids))
+    if tenant_code is not None:
+        stmt = stmt.where(t.c.tenant_code == tenant_code)
+    return conn.execute(stmt).all()
+
+
+def _template_payload(template) -> InvoiceCreate:
+    """
+    Faktura za tekući termin šablona; broj dodjeljuje brojač tenanta.
+    """
+    issue_date = template.next_run
+    due_date = issue_date + timedelta(days=template.due_days) if template.due_days is not None else None
+    return InvoiceCreate.model_validate(
+        {
+            "issue_date": issue_date,
+            "due_date": due_date,
+            "buyer_name": template.buyer_name,
+            "buyer_address": template.buyer_address,
+            "note": template.note,
+            "items": template.items,
+        }
+    )
+
+
+def _insert_invoices(
+    conn: Connection,
+    pending: list[tuple[int, InvoiceCreate, str]],
+    rollup_deltas: dict[tuple, dict[str, object]],
+) -> tuple[dict[int, int], list[int]]:
+    """
+    Upisuje fakture za [(template_id, payload, tenant)]; vraća
+    ({template_id: invoice_id}, [template_id bez slobodnog broja]).
+    """
+    created: dict[int, int] = {}
+    invoice_table = Invoice.__table__
+    insert_headers = (
+        pg_insert(invoice_table)
+        .on_conflict_do_nothing(constraint="uq_invoice_number_per_tenant")
+        .returning(invoice_table.c.id, invoice_table.c.tenant_code, invoice_table.c.invoice_number)
+    )
+
+    for _ in range(RECURRING_INVOICE_NUMBER_RETRIES):
+        if not pending:
+            break
+
+        numbers = allocate_invoice_numbers(conn, [(tenant, payload.issue_date) for _, payload, tenant in pending])
+        numbered = [
+            (template_id, payload.model_copy(update={"invoice_number": number}), tenant)
+            for (template_id, payload, tenant), number in zip(pending, numbers)
+        ]
+
+        totals = compute_invoice_totals([payload for _, payload, _ in numbered])
+        headers = [
+            invoice_header_row(tenant, payload, invoice_totals)
+            for (_, payload, tenant), invoice_totals in zip(numbered, totals)
+        ]
+        invoice_ids = {
+            (tenant, number): invoice_id
+            for invoice_id, tenant, number in conn.execute(insert_headers, headers)
+        }
+
+        item_rows = []
+        retry = []
+        for (template_id, payload, tenant), header, invoice_totals in zip(numbered, headers, totals):
+            invoice_id = invoice_ids.get((tenant, payload.invoice_number))
+            if invoice_id is None:
+                # broj je već zauzet (ručno izdata faktura) – novi broj u sljedećem krugu
+                retry.append((template_id, payload, tenant))
+                continue
+            created[template_id] = invoice_id
+            merge_rollup_deltas(rollup_deltas, "invoice", header)
+            item_rows.extend({**item, "invoice_id": invoice_id} for item in invoice_totals.items)
+
+        if item_rows:
+            conn.execute(insert(InvoiceItem.__table__), item_rows)
+        pending = retry
+
+    return created, [template_id for template_id, _, _ in pending]
+
+
+def generate_due_batch(
+    conn: Connection,
+    as_of: date,
+    *,
+    batch_size: int = RECURRING_INVOICE_BATCH_SIZE,
+    exclude_ids: Optional[set[int]] = None,
+    tenant_code: Optional[str] = None,
+) -> Optional[RecurringRunStats]:
+    """
+    Obrađuje jedan batch dospjelih šablona u transakciji `conn` (commit radi
+    pozivalac). Vraća None kada nema dospjelih šablona.
+
+    ID-evi šablona koji nisu mogli biti izdati dodaju se u `exclude_ids`,
+    da ih naredni batch-evi istog prolaza ne uzimaju ponovo.
+    """
+    exclude_ids = exclude_ids if exclude_ids is not None else set()
+    templates = _claim_due_templates(
+        conn, as_of, batch_size=batch_size, exclude_ids=exclude_ids, tenant_code=tenant_code
+    )
+    if not templates:
+        return None
+
+    stats = RecurringRunStats(templates=len(templates))
+    finalized = load_finalized_periods(conn, {t.tenant_code for t in templates})
+    by_id = {t.id: t for t in templates}
+
+    # po šablonu: (next_run, is_active, last_invoice_id, last_error)
+    outcome: dict[int, tuple[date, bool, Optional[int], Optional[str]]] = {}
+    pending: list[tuple[int, InvoiceCreate, str]] = []
+
+    for template in templates:
+        run = template.next_run
+        if template.end_date is not None and run > template.end_date:
+            outcome[template.id] = (run, False, None, None)
+            continue
+
+        following = next_run_after(run, template.cadence, template.anchor_day)
+        if (run.year, run.month) in finalized[template.tenant_code]:
+            error = str(FinalizedPeriodModificationError(template.tenant_code, run.year, run.month))
+            outcome[template.id] = (following, True, None, error)
+            stats.skipped += 1
+            continue
+
+        try:
+            payload = _template_payload(template)
+        except ValidationError as exc:
+            outcome[template.id] = (run, True, None, "; ".join(format_validation_errors(exc)))
+            continue
+        pending.append((template.id, payload, template.tenant_code))
+
+    rollup_deltas: dict[tuple, dict[str, object]] = {}
+    created, without_number = _insert_invoices(conn, pending, rollup_deltas)
+
+    for template_id, invoice_id in created.items():
+        template = by_id[template_id]
+        following = next_run_after(template.next_run, template.cadence, template.anchor_day)
+        still_active = template.end_date is None or following <= template.end_date
+        outcome[template_id] = (following, still_active, invoice_id, None)
+    for template_id in without_number:
+        outcome[template_id] = (by_id[template_id].next_run, True, None, _NO_FREE_NUMBER_ERROR)
+
+    for template_id, (next_run, _, _, error) in outcome.items():
+        if error is not None and next_run == by_id[template_id].next_run:
+            stats.failed += 1
+            exclude_ids.add(template_id)
+
+    stats.invoices = len(created)
+    if created:
+        apply_merged_rollup_deltas(conn, rollup_deltas)
+        bump_tenant_data_versions(conn, {by_id[template_id].tenant_code for template_id in created})
+
+    t = InvoiceTemplate.__table__
+    conn.execute(
+        update(t)
+        .where(t.c.id == bindparam("b_id"))
+        .values(
+            next_run=bindparam("b_next_run"),
+            is_active=bindparam("b_is_active"),
+            last_invoice_id=func.coalesce(bindparam("b_last_invoice_id"), t.c.last_invoice_id),
+            last_error=bindparam("b_last_error"),
+            last_run_at=func.now(),
+        ),
+        [
+            {
+                "b_id": template_id,
+                "b_next_run": next_run,
+                "b_is_active": is_active,
+                "b_last_invoice_id": invoice_id,
+                "b_last_error": error,
+            }
+            for template_id, (next_run, is_active, invoice_id, error) in outcome.items()
+        ],
+    )
+    return stats
+
+
+def generate_due_invoices(
+    as_of: Optional[date] = None,
+    *,
+    batch_size: int = RECURRING_INVOICE_BATCH_SIZE,
+    tenant_code: Optional[str] = None,
+    stop_event: Optional[threading.Event] = None,
+) -> RecurringRunStats:
+    """
+    Izdaje sve dospjele fakture (do i uključujući `as_of`, default danas),
+    batch po batch, svaki u svojoj transakciji.
+    """
+    as_of = as_of or date.today()
+    total = RecurringRunStats()
+    exclude_ids: set[int] = set()
+
+    while stop_event is None or not stop_event.is_set():
+        with engine.begin() as conn:
+            stats = generate_due_batch(
+                conn, as_of, batch_size=batch_size, exclude_ids=exclude_ids, tenant_code=tenant_code
+            )
+        if stats is None:
+            break
+        total.add(stats)
+
+    return total
+
+
+def run_worker(
+    stop_event: Optional[threading.Event] = None,
+    *,
+    poll_seconds: float = RECURRING_INVOICE_POLL_SECONDS,
+) -> None:
+    """
+    Petlja scheduler-a: izdaj sve dospjelo → sačekaj `poll_seconds` → ponovi.
+    """
+    stop_event = stop_event or threading.Event()
+    while not stop_event.is_set():
+        try:
+            stats = generate_due_invoices(stop_event=stop_event)
+            if stats.invoices or stats.failed:
+                logger.info("Recurring invoices: %s", stats)
+        except Exception:
+            logger.exception("Recurring invoice generation failed")
+        stop_event.wait(poll_seconds)
+
+
+class RecurringInvoiceScheduler:
+    """
+    Pozadinska nit u API procesu (start/stop iz lifespan-a). Više API
+    procesa može raditi istovremeno – šabloni se uzimaju sa SKIP LOCKED.
+    """
+
+    def __init__(self, poll_seconds: float) -> None:
+        self.poll_seconds = poll_seconds
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None or self.poll_seconds <= 0:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=run_worker,
+            args=(self._stop_event,),
+            kwargs={"poll_seconds": self.poll_seconds},
+            name="recurring-invoices",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+
+recurring_invoice_scheduler = RecurringInvoiceScheduler(RECURRING_INVOICE_POLL_SECONDS)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Ponavljajuće fakture (invoice_templates).")
+    parser.add_argument("command", choices=["run-once", "worker"])
+    parser.add_argument("--as-of", type=date.fromisoformat, default=None, help="YYYY-MM-DD (default danas)")
+    parser.add_argument("--tenant", default=None)
+    parser.add_argument("--batch-size", type=int, default=RECURRING_INVOICE_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.command == "worker":
+        run_worker(poll_seconds=RECURRING_INVOICE_POLL_SECONDS or 300)
+        return 0
+
+    stats = generate_due_invoices(args.as_of, batch_size=args.batch_size, tenant_code=args.tenant)
+    print(
+        f"templates={stats.templates} invoices={stats.invoices} "
+        f"skipped={stats.skipped} failed={stats.failed}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
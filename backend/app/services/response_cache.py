@@ -0,0 +1,339 @@
+# /home/miso/dev/sp-app/sp-app/backend/app/services/response_cache.py
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.db import engine
+from app.models import get_tenant_data_version, tenant_data_version_stmt
+
+
+# ======================================================
+#  KEŠ ODGOVORA (dashboard / SAM / reports)
+# ======================================================
+#
+# Mali, deterministički odgovori (godišnji/mjesečni dashboard, SAM overview,
+# cashflow, year-summary) keširaju se po (tenant, endpoint, params).
+#
+# Uz svaki unos se čuva verzija podataka tenanta (tenant_data_versions) iz
+# trenutka računanja. Ako je verzija u međuvremenu porasla, unos se briše
+# i računa ponovo – eksplicitna invalidacija na write putanjama nije
+# potrebna, a TTL ograničava koliko dugo se drže unosi koji se ne čitaju.
+#
+# Backend-i (RESPONSE_CACHE_BACKEND):
+#   memory   – LRU u procesu (default), ograničen brojem unosa i bajtovima,
+#   postgres – UNLOGGED tabela response_cache_entries, dijele je svi
+#              uvicorn worker-i (bez dodatnog servisa),
+#   off      – bez keša.
+
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# postgres backend: koliko upisa između dva čišćenja isteklih/viška unosa
+RESPONSE_CACHE_PRUNE_EVERY = int(os.getenv("RESPONSE_CACHE_PRUNE_EVERY", "200"))
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class ResponseCacheBackend:
+    """
+    Interfejs backend-a: vrijednosti su bajtovi, uz svaku ide verzija podataka.
+
+    `get` vraća None i kada je unos istekao ili je za drugu verziju (starije
+    verzije backend briše). `set` ne prepisuje unos novije verzije.
+    """
+
+    name = "base"
+    # blocking backend (I/O) se iz async ruta zove preko thread pool-a
+    blocking = False
+
+    def get(self, key: str, version: int) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, version: int, value: bytes, ttl_seconds: float) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> dict[str, Any]:
+        return {}
+
+
+class NullResponseCacheBackend(ResponseCacheBackend):
+    name = "off"
+
+    def get(self, key: str, version: int) -> Optional[bytes]:
+        return None
+
+    def set(self, key: str, version: int, value: bytes, ttl_seconds: float) -> None:
+        return None
+
+    def clear(self) -> None:
+        return None
+
+
+@dataclass
+class _MemoryEntry:
+    version: int
+    value: bytes
+    expires_at: float
+
+
+class MemoryResponseCacheBackend(ResponseCacheBackend):
+    """
+    LRU u procesu: najduže nekorišteni unosi ispadaju kada se pređe
+    `max_entries` ili `max_bytes`.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, max_bytes: int = RESPONSE_CACHE_MAX_BYTES) -> None:
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _MemoryEntry]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.value)
+
+    def get(self, key: str, version: int) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.version != version or entry.expires_at <= time.monotonic():
+                if entry.version < version or entry.expires_at <= time.monotonic():
+                    self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry.value
+
+    def set(self, key: str, version: int, value: bytes, ttl_seconds: float) -> None:
+        if len(value) > self._max_bytes:
+            return
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not None and current.version > version:
+                # paralelni zahtjev je već upisao noviju verziju
+                return
+            self._drop(key)
+            self._entries[key] = _MemoryEntry(version, value, time.monotonic() + ttl_seconds)
+            self._bytes += len(value)
+            while self._entries and (len(self._entries) > self._max_entries or self._bytes > self._max_bytes):
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "evictions": self.evictions}
+
+
+class PostgresResponseCacheBackend(ResponseCacheBackend):
+    """
+    Dijeljeni keš u UNLOGGED tabeli (migracija 20261018_response_cache).
+
+    Radi na svojoj konekciji iz pool-a (autocommit transakcije), nezavisno
+    od sesije zahtjeva. Istekli unosi i višak iznad `max_entries` se brišu
+    povremeno, pri svakom `prune_every`-tom upisu.
+    """
+
+    name = "postgres"
+    blocking = True
+
+    _GET_SQL = text(
+        "SELECT data_version, payload FROM response_cache_entries "
+        "WHERE cache_key = :key AND expires_at > now()"
+    )
+    _DELETE_SQL = text("DELETE FROM response_cache_entries WHERE cache_key = :key AND data_version < :version")
+    _SET_SQL = text(
+        """
+        INSERT INTO response_cache_entries (cache_key, data_version, payload, expires_at)
+        VALUES (:key, :version, :payload, now() + make_interval(secs => :ttl))
+        ON CONFLICT (cache_key) DO UPDATE
+           SET data_version = EXCLUDED.data_version,
+               payload = EXCLUDED.payload,
+               expires_at = EXCLUDED.expires_at
+         WHERE response_cache_entries.data_version <= EXCLUDED.data_version
+        """
+    )
+    _PRUNE_SQL = text(
+        """
+        DELETE FROM response_cache_entries
+         WHERE expires_at <= now()
+            OR cache_key IN (
+                SELECT cache_key FROM response_cache_entries
+                 ORDER BY expires_at DESC
+                OFFSET :max_entries
+            )
+        """
+    )
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, prune_every: int = RESPONSE_CACHE_PRUNE_EVERY) -> None:
+        self._max_entries = max_entries
+        self._prune_every = max(1, prune_every)
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get(self, key: str, version: int) -> Optional[bytes]:
+        with engine.begin() as conn:
+            row = conn.execute(self._GET_SQL, {"key": key}).first()
+            if row is None:
+                return None
+            if row.data_version != version:
+                conn.execute(self._DELETE_SQL, {"key": key, "version": version})
+                return None
+            return bytes(row.payload)
+
+    def set(self, key: str, version: int, value: bytes, ttl_seconds: float) -> None:
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % self._prune_every == 0
+
+        with engine.begin() as conn:
+            conn.execute(self._SET_SQL, {"key": key, "version": version, "payload": value, "ttl": ttl_seconds})
+            if prune:
+                conn.execute(self._PRUNE_SQL, {"max_entries": self._max_entries})
+
+    def clear(self) -> None:
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM response_cache_entries"))
+
+
+def _backend_from_name(name: str) -> ResponseCacheBackend:
+    if name == "off":
+        return NullResponseCacheBackend()
+    if name == "postgres":
+        return PostgresResponseCacheBackend()
+    if name == "memory":
+        return MemoryResponseCacheBackend()
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {name}")
+
+
+class ResponseCache:
+    """
+    Keš pydantic odgovora ispred backend-a, sa brojačima hit/miss.
+    """
+
+    def __init__(self, backend: ResponseCacheBackend, ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS) -> None:
+        self.backend = backend
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(tenant_code: str, endpoint: str, params: dict[str, Any]) -> str:
+        raw = json.dumps([tenant_code, endpoint, params], sort_keys=True, default=str, separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get_or_compute(
+        self,
+        db: Session,
+        tenant_code: str,
+        endpoint: str,
+        params: dict[str, Any],
+        model: Type[ModelT],
+        compute: Callable[[], ModelT],
+    ) -> ModelT:
+        """
+        Vraća keširan odgovor za trenutnu verziju podataka tenanta ili ga
+        računa (`compute()`) i upisuje.
+        """
+        version = get_tenant_data_version(db.connection(), tenant_code)
+        key = self.make_key(tenant_code, endpoint, params)
+
+        cached = self.backend.get(key, version)
+        if cached is not None:
+            self._count(hit=True)
+            return model.model_validate_json(cached)
+
+        self._count(hit=False)
+        result = compute()
+        self.backend.set(key, version, result.model_dump_json().encode("utf-8"), self._ttl)
+        return result
+
+    async def aget_or_compute(
+        self,
+        db: AsyncSession,
+        tenant_code: str,
+        endpoint: str,
+        params: dict[str, Any],
+        model: Type[ModelT],
+        compute: Callable[[], Awaitable[ModelT]],
+    ) -> ModelT:
+        """
+        Async varijanta `get_or_compute` za `async def` rute (isti ključevi,
+        pa sync i async putanje dijele unose).
+        """
+        version = int((await db.execute(tenant_data_version_stmt(tenant_code))).scalar_one())
+        key = self.make_key(tenant_code, endpoint, params)
+
+        if self.backend.blocking:
+            cached = await run_in_threadpool(self.backend.get, key, version)
+        else:
+            cached = self.backend.get(key, version)
+        if cached is not None:
+            self._count(hit=True)
+            return model.model_validate_json(cached)
+
+        self._count(hit=False)
+        result = await compute()
+        value = result.model_dump_json().encode("utf-8")
+        if self.backend.blocking:
+            await run_in_threadpool(self.backend.set, key, version, value, self._ttl)
+        else:
+            self.backend.set(key, version, value, self._ttl)
+        return result
+
+    def clear(self) -> None:
+        self.backend.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "backend": self.backend.name,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else 0.0,
+            **self.backend.stats(),
+        }
+
+
+response_cache = ResponseCache(_backend_from_name(RESPONSE_CACHE_BACKEND))
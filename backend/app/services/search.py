@@ -0,0 +1,135 @@
+# /home/miso/dev/sp-app/sp-app/backend/app/services/search.py
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+from sqlalchemy import String, func, literal, or_, select, union_all
+
+from app.models import CashEntry, InputInvoice, Invoice
+from app.services.pdf_writer import BOSNIAN_TRANSLITERATION
+
+
+# ======================================================
+#  PRETRAGA (pg_trgm + folding naših slova)
+# ======================================================
+#
+# Nazivi kupaca/dobavljača i opisi uplata se pretražuju nad
+# sp_search_fold(kolona) – SQL funkcija iz migracije 20261018_search_trgm:
+#   lower(translate(value, 'čćšđžČĆŠĐŽ', 'ccsdzccsdz'))
+# Nad istim izrazom postoje GIN trigram indeksi (gin_trgm_ops), pa
+# LIKE '%q%', LIKE 'q%' i operator sličnosti %> ne rade sequential scan.
+#
+# Upit se "folduje" u Pythonu istim preslikavanjem (fold_search_text), tako
+# da "Čačak", "cacak" i "ČAČAK" daju isti rezultat – i u indeksu i u upitu.
+
+SEARCH_KINDS = ("invoice", "input_invoice", "cash_entry")
+
+_FOLD_MAP = str.maketrans({src: dst.lower() for src, dst in BOSNIAN_TRANSLITERATION.items()})
+
+
+def fold_search_text(value: str) -> str:
+    """Python ekvivalent sp_search_fold(): č/ć → c, š → s, đ → d, ž → z, lowercase."""
+    return value.strip().translate(_FOLD_MAP).lower()
+
+
+def search_fold(column):
+    """sp_search_fold(kolona) – izraz nad kojim postoji trigram indeks."""
+    return func.sp_search_fold(column)
+
+
+def _like_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def contains_filter(column, query: str):
+    """
+    Substring pretraga bez obzira na velika/mala i naša slova.
+
+    Pattern se sklapa u Pythonu (jedan bind parametar), da bi ga planner
+    vidio kao konstantu i iskoristio trigram indeks.
+    """
+    return search_fold(column).like(f"%{_like_escape(fold_search_text(query))}%", escape="\\")
+
+
+def prefix_filter(column, query: str):
+    """Kao contains_filter, ali samo početak vrijednosti (stari API-ji sa prefiks semantikom)."""
+    return search_fold(column).like(f"{_like_escape(fold_search_text(query))}%", escape="\\")
+
+
+def _kind_select(kind: str, model, tenant: str, folded_query: str, *, date_col, text_col, reference_col, amount_col):
+    folded = search_fold(text_col)
+    return select(
+        literal(kind, String).label("kind"),
+        model.id.label("id"),
+        date_col.label("date"),
+        text_col.label("text"),
+        reference_col.label("reference"),
+        amount_col.label("amount"),
+        func.word_similarity(folded_query, folded).label("score"),
+    ).where(
+        model.tenant_code == tenant,
+        or_(
+            # tačan substring ...
+            folded.like(f"%{_like_escape(folded_query)}%", escape="\\"),
+            # ... ili dovoljno sličan (tipfeler) – pg_trgm.word_similarity_threshold
+            folded.op("%>")(folded_query),
+        ),
+    )
+
+
+def build_search_stmt(tenant: str, query: str, *, kinds: Optional[Iterable[str]] = None, limit: int = 20):
+    """
+    Jedan UNION ALL upit preko faktura (kupac), ulaznih faktura (dobavljač)
+    i uplata/isplata (opis), rangiran po word_similarity(upit, tekst);
+    pri istom skoru noviji dokumenti su prvi.
+    """
+    folded_query = fold_search_text(query)
+    wanted = set(kinds or SEARCH_KINDS)
+
+    selects = []
+    if "invoice" in wanted:
+        selects.append(
+            _kind_select(
+                "invoice",
+                Invoice,
+                tenant,
+                folded_query,
+                date_col=Invoice.issue_date,
+                text_col=Invoice.buyer_name,
+                reference_col=Invoice.invoice_number,
+                amount_col=Invoice.total_amount,
+            )
+        )
+    if "input_invoice" in wanted:
+        selects.append(
+            _kind_select(
+                "input_invoice",
+                InputInvoice,
+                tenant,
+                folded_query,
+                date_col=InputInvoice.issue_date,
+                text_col=InputInvoice.supplier_name,
+                reference_col=InputInvoice.invoice_number,
+                amount_col=InputInvoice.total_amount,
+            )
+        )
+    if "cash_entry" in wanted:
+        selects.append(
+            _kind_select(
+                "cash_entry",
+                CashEntry,
+                tenant,
+                folded_query,
+                date_col=CashEntry.entry_date,
+                text_col=CashEntry.description,
+                reference_col=CashEntry.kind,
+                amount_col=CashEntry.amount,
+            )
+        )
+
+    hits = union_all(*selects).subquery("hits")
+    return (
+        select(hits)
+        .order_by(hits.c.score.desc(), hits.c.date.desc(), hits.c.id.desc())
+        .limit(limit)
+    )
@@ -0,0 +1,522 @@
+# /home/miso/dev/sp-app/sp-app/backend/app/services/tax_config.py
+from __future__ import annotations
+
+import os
+import threading
+import time
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.models import AppConstantsSet, TaxSettings, TenantTaxProfileSettings
+from app.schemas.tax import TaxDummyConfig
+
+
+# ======================================================
+#  DEFAULT / FALLBACK KONFIGURACIJA (DUMMY)
+# ======================================================
+DEFAULT_TAX_CONFIG = TaxDummyConfig(
+    income_tax_rate=Decimal("0.10"),
+    pension_contribution_rate=Decimal("0.18"),
+    health_contribution_rate=Decimal("0.12"),
+    unemployment_contribution_rate=Decimal("0.015"),
+    flat_costs_rate=Decimal("0.30"),
+    currency="BAM",
+)
+
+# Koliko dugo (sekunde) keširani podaci važe i bez eksplicitne invalidacije.
+# Invalidacija radi samo unutar procesa; TTL ograničava zastarjelost kada
+# više worker procesa dijeli istu bazu.
+TAX_CONFIG_CACHE_TTL_SECONDS = float(os.getenv("TAX_CONFIG_CACHE_TTL_SECONDS", "60"))
+
+
+# ======================================================
+#  MAPIRANJE PROFILA → JURISDIKCIJA / SCENARIO
+# ======================================================
+def normalize_jurisdiction(entity_value: str) -> str:
+    """
+    Normalizacija vrijednosti iz settings/tax (entity) na jurisdikciju u app_constants_sets.
+
+    Očekujemo:
+      - RS
+      - FBiH
+      - BD  (Brčko distrikt)
+    """
+    v = (entity_value or "").strip()
+    if not v:
+        return "RS"
+
+    upper = v.upper()
+
+    if upper in {"RS"}:
+        return "RS"
+    if upper in {"FBIH", "FEDERACIJA", "FEDERACIJA BIH"}:
+        return "FBiH"
+    if upper in {"BD", "BRCKO", "BRČKO", "BRCKO DISTRIKT", "BRČKO DISTRIKT"}:
+        return "BD"
+
+    # Ako dođe nešto neočekivano, držimo se defaulta
+    return "RS"
+
+
+def default_scenario_key_for_profile(prof: Any) -> Optional[str]:
+    """
+    Fallback mapiranje za profile koji još nemaju eksplicitno postavljen scenario_key.
+
+    Važno za backward compatibility:
+    - stari testovi i stari podaci mogu imati entity + has_additional_activity,
+      bez scenario_key.
+    """
+    entity = (prof.entity or "").strip()
+
+    if entity == "RS":
+        return "rs_supplementary" if bool(prof.has_additional_activity) else "rs_primary"
+    if entity == "FBiH":
+        return "fbih_obrt"
+    if entity in {"Brcko", "BD"}:
+        return "bd_samostalna"
+
+    return None
+
+
+# ======================================================
+#  PAYLOAD → TaxDummyConfig
+# ======================================================
+def _decimal_from_payload(val: Any) -> Optional[Decimal]:
+    if val is None:
+        return None
+    try:
+        return Decimal(str(val))
+    except Exception:
+        return None
+
+
+_LEGACY_KEYS = {
+    "income_tax_rate",
+    "pension_contribution_rate",
+    "health_contribution_rate",
+    "unemployment_contribution_rate",
+    "flat_costs_rate",
+    "currency",
+}
+
+
+def tax_config_from_constants_payload(payload: dict[str, Any]) -> Optional[TaxDummyConfig]:
+    """
+    Izvlači TAX stope iz JSON payload-a u app_constants_sets.
+
+    Podržani oblici:
+
+    A) Legacy root keys:
+       {
+         "income_tax_rate": 0.10,
+         "pension_contribution_rate": 0.18,
+         ...
+         "currency": "BAM"
+       }
+
+    B) Legacy nested under "tax":
+       {
+         "tax": {
+           "income_tax_rate": 0.10,
+           "pension_contribution_rate": 0.18,
+           ...
+           "currency": "BAM"
+         }
+       }
+
+    C) V2 payload shape:
+       {
+         "base": {
+           "currency": "BAM"
+         },
+         "tax": {
+           "income_tax_rate": 0.10,
+           "flat_costs_rate": 0.30
+         },
+         "contributions": {
+           "pension_rate": 0.18,
+           "health_rate": 0.12,
+           "unemployment_rate": 0.015
+         }
+       }
+
+    Ako payload nema ništa relevantno → vrati None.
+    """
+    if not isinstance(payload, dict):
+        return None
+
+    tax_block = payload.get("tax") if isinstance(payload.get("tax"), dict) else {}
+    contrib_block = payload.get("contributions") if isinstance(payload.get("contributions"), dict) else {}
+    base_block = payload.get("base") if isinstance(payload.get("base"), dict) else {}
+
+    has_any_relevant = (
+        any(key in payload for key in _LEGACY_KEYS)
+        or any(key in tax_block for key in _LEGACY_KEYS)
+        or any(key in contrib_block for key in {"pension_rate", "health_rate", "unemployment_rate"})
+        or ("currency" in base_block)
+    )
+
+    if not has_any_relevant:
+        return None
+
+    inc = _decimal_from_payload(
+        tax_block.get("income_tax_rate", payload.get("income_tax_rate"))
+    )
+
+    # Legacy ili V2 contributions mapping
+    pen = _decimal_from_payload(
+        contrib_block.get(
+            "pension_rate",
+            tax_block.get("pension_contribution_rate", payload.get("pension_contribution_rate")),
+        )
+    )
+    hea = _decimal_from_payload(
+        contrib_block.get(
+            "health_rate",
+            tax_block.get("health_contribution_rate", payload.get("health_contribution_rate")),
+        )
+    )
+    une = _decimal_from_payload(
+        contrib_block.get(
+            "unemployment_rate",
+            tax_block.get("unemployment_contribution_rate", payload.get("unemployment_contribution_rate")),
+        )
+    )
+
+    flat = _decimal_from_payload(
+        tax_block.get("flat_costs_rate", payload.get("flat_costs_rate"))
+    )
+
+    cur = (
+        base_block.get("currency")
+        or tax_block.get("currency")
+        or payload.get("currency")
+    )
+
+    return TaxDummyConfig(
+        income_tax_rate=inc if inc is not None else DEFAULT_TAX_CONFIG.income_tax_rate,
+        pension_contribution_rate=pen if pen is not None else DEFAULT_TAX_CONFIG.pension_contribution_rate,
+        health_contribution_rate=hea if hea is not None else DEFAULT_TAX_CONFIG.health_contribution_rate,
+        unemployment_contribution_rate=une if une is not None else DEFAULT_TAX_CONFIG.unemployment_contribution_rate,
+        flat_costs_rate=flat if flat is not None else DEFAULT_TAX_CONFIG.flat_costs_rate,
+        currency=str(cur) if cur is not None else DEFAULT_TAX_CONFIG.currency,
+    )
+
+
+# ======================================================
+#  DB LOOKUP (bez keša)
+# ======================================================
+def find_current_constants_set(
+    *,
+    db: Session,
+    jurisdiction: str,
+    as_of: date,
+    scenario_key: Optional[str] = None,
+) -> Optional[AppConstantsSet]:
+    """
+    Vraća ORM red koji je aktivan na datum `as_of`:
+      effective_from <= as_of AND (effective_to IS NULL OR effective_to >= as_of)
+
+    Ako je scenario_key zadat, lookup je strožiji:
+      jurisdiction + scenario_key + date
+
+    Ako ih ima više (ne bi smjelo), uzima najnoviji po effective_from.
+
+    Koristi se na write putanjama (admin rollover) gdje nam treba "živ" red
+    u istoj sesiji; read putanje idu preko `tax_config_resolver`.
+    """
+    stmt = (
+        select(AppConstantsSet)
+        .where(
+            AppConstantsSet.jurisdiction == jurisdiction,
+            AppConstantsSet.effective_from <= as_of,
+            or_(AppConstantsSet.effective_to.is_(None), AppConstantsSet.effective_to >= as_of),
+        )
+        .order_by(AppConstantsSet.effective_from.desc(), AppConstantsSet.id.desc())
+        .limit(1)
+    )
+
+    if scenario_key:
+        stmt = stmt.where(AppConstantsSet.scenario_key == scenario_key)
+
+    return db.execute(stmt).scalar_one_or_none()
+
+
+# ======================================================
+#  SNAPSHOTI (odvojeni od sesije)
+# ======================================================
+@dataclass(frozen=True)
+class ConstantsSetSnapshot:
+    """
+    Read-only kopija reda iz app_constants_sets.
+
+    Ima ista polja kao `AppConstantsSetRead`, pa se može direktno validirati
+    (`AppConstantsSetRead.model_validate(snapshot)`).
+    """
+
+    id: int
+    jurisdiction: str
+    scenario_key: str
+    effective_from: date
+    effective_to: Optional[date]
+    payload: dict[str, Any]
+    created_at: datetime
+    updated_at: datetime
+    created_by: Optional[str]
+    created_reason: Optional[str]
+    updated_by: Optional[str]
+    updated_reason: Optional[str]
+
+    @classmethod
+    def from_row(cls, row: AppConstantsSet) -> "ConstantsSetSnapshot":
+        return cls(
+            id=row.id,
+            jurisdiction=row.jurisdiction,
+            scenario_key=row.scenario_key,
+            effective_from=row.effective_from,
+            effective_to=row.effective_to,
+            payload=row.payload or {},
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+            created_by=row.created_by,
+            created_reason=row.created_reason,
+            updated_by=row.updated_by,
+            updated_reason=row.updated_reason,
+        )
+
+    def is_active_on(self, as_of: date) -> bool:
+        return self.effective_from <= as_of and (self.effective_to is None or self.effective_to >= as_of)
+
+
+@dataclass(frozen=True)
+class TaxProfileSnapshot:
+    entity: Optional[str]
+    scenario_key: Optional[str]
+    has_additional_activity: bool
+
+
+class _ConstantsTimeline:
+    """
+    Interval indeks nad setovima jedne jurisdikcije (ili jurisdikcija + scenario).
+
+    Setovi su sortirani po (effective_from, id) rastuće; lookup radi bisect po
+    effective_from i ide unazad do prvog aktivnog seta – isti redoslijed kao
+    `ORDER BY effective_from DESC, id DESC LIMIT 1` u `find_current_constants_set`.
+    """
+
+    __slots__ = ("_items", "_froms")
+
+    def __init__(self, items: list[ConstantsSetSnapshot]) -> None:
+        self._items = sorted(items, key=lambda s: (s.effective_from, s.id))
+        self._froms = [s.effective_from for s in self._items]
+
+    def find(self, as_of: date) -> Optional[ConstantsSetSnapshot]:
+        idx = bisect_right(self._froms, as_of)
+        for i in range(idx - 1, -1, -1):
+            item = self._items[i]
+            if item.effective_to is None or item.effective_to >= as_of:
+                return item
+        return None
+
+
+@dataclass
+class _JurisdictionEntry:
+    loaded_at: float
+    all_sets: _ConstantsTimeline
+    by_scenario: dict[str, _ConstantsTimeline]
+
+
+@dataclass
+class _TenantEntry:
+    loaded_at: float
+    override: Optional[TaxDummyConfig]
+    profile: Optional[TaxProfileSnapshot]
+
+
+# ======================================================
+#  RESOLVER (in-process keš)
+# ======================================================
+class TaxConfigResolver:
+    """
+    Effective-dated resolver TAX konfiguracije sa in-process kešom.
+
+    Keš drži:
+      - po tenantu: tax_settings override i tax profil (entity/scenario),
+      - po jurisdikciji: kompletan timeline app_constants_sets (svi scenariji).
+
+    Svaki `as_of` se nakon prvog učitavanja odgovara iz memorije.
+    Write endpointi pozivaju `invalidate_tenant` / `invalidate_constants`
+    nakon commit-a; TTL pokriva izmjene iz drugih procesa.
+
+    Putanje koje trajno upisuju obračun (finalizacija) zovu `resolve(...,
+    fresh=True)`: podaci se čitaju iz baze u tekućoj sesiji (i osvježe keš),
+    pa ni izmjena iz drugog procesa unutar TTL-a ne ulazi u zaključan mjesec.
+    """
+
+    def __init__(self, ttl_seconds: float = TAX_CONFIG_CACHE_TTL_SECONDS) -> None:
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._tenants: dict[str, _TenantEntry] = {}
+        self._jurisdictions: dict[str, _JurisdictionEntry] = {}
+
+    # ----------------------------
+    # Invalidacija
+    # ----------------------------
+    def invalidate_tenant(self, tenant_code: str) -> None:
+        with self._lock:
+            self._tenants.pop(tenant_code, None)
+
+    def invalidate_constants(self, jurisdiction: Optional[str] = None) -> None:
+        with self._lock:
+            if jurisdiction is None:
+                self._jurisdictions.clear()
+            else:
+                self._jurisdictions.pop(jurisdiction, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tenants.clear()
+            self._jurisdictions.clear()
+
+    def _is_fresh(self, loaded_at: float) -> bool:
+        return self._ttl <= 0 or (time.monotonic() - loaded_at) < self._ttl
+
+    # ----------------------------
+    # Učitavanje
+    # ----------------------------
+    def _tenant_entry(self, db: Session, tenant_code: str, *, fresh: bool = False) -> _TenantEntry:
+        if not fresh:
+            with self._lock:
+                entry = self._tenants.get(tenant_code)
+            if entry is not None and self._is_fresh(entry.loaded_at):
+                return entry
+
+        override: Optional[TaxDummyConfig] = None
+        row = db.execute(select(TaxSettings).where(TaxSettings.tenant_code == tenant_code)).scalar_one_or_none()
+        if row is not None:
+            override = TaxDummyConfig(
+                income_tax_rate=Decimal(str(row.income_tax_rate)),
+                pension_contribution_rate=Decimal(str(row.pension_contribution_rate)),
+                health_contribution_rate=Decimal(str(row.health_contribution_rate)),
+                unemployment_contribution_rate=Decimal(str(row.unemployment_contribution_rate)),
+                flat_costs_rate=Decimal(str(row.flat_costs_rate)),
+                currency=row.currency or DEFAULT_TAX_CONFIG.currency,
+            )
+
+        profile: Optional[TaxProfileSnapshot] = None
+        prof = db.execute(
+            select(TenantTaxProfileSettings).where(TenantTaxProfileSettings.tenant_code == tenant_code)
+        ).scalar_one_or_none()
+        if prof is not None:
+            profile = TaxProfileSnapshot(
+                entity=prof.entity,
+                scenario_key=prof.scenario_key,
+                has_additional_activity=bool(prof.has_additional_activity),
+            )
+
+        entry = _TenantEntry(loaded_at=time.monotonic(), override=override, profile=profile)
+        with self._lock:
+            self._tenants[tenant_code] = entry
+        return entry
+
+    def _jurisdiction_entry(self, db: Session, jurisdiction: str, *, fresh: bool = False) -> _JurisdictionEntry:
+        if not fresh:
+            with self._lock:
+                entry = self._jurisdictions.get(jurisdiction)
+            if entry is not None and self._is_fresh(entry.loaded_at):
+                return entry
+
+        rows = (
+            db.execute(select(AppConstantsSet).where(AppConstantsSet.jurisdiction == jurisdiction))
+            .scalars()
+            .all()
+        )
+        snapshots = [ConstantsSetSnapshot.from_row(r) for r in rows]
+
+        grouped: dict[str, list[ConstantsSetSnapshot]] = {}
+        for s in snapshots:
+            grouped.setdefault(s.scenario_key, []).append(s)
+
+        entry = _JurisdictionEntry(
+            loaded_at=time.monotonic(),
+            all_sets=_ConstantsTimeline(snapshots),
+            by_scenario={k: _ConstantsTimeline(v) for k, v in grouped.items()},
+        )
+        with self._lock:
+            self._jurisdictions[jurisdiction] = entry
+        return entry
+
+    # ----------------------------
+    # Javni API
+    # ----------------------------
+    def current_constants_set(
+        self,
+        db: Session,
+        *,
+        jurisdiction: str,
+        as_of: date,
+        scenario_key: Optional[str] = None,
+        fresh: bool = False,
+    ) -> Optional[ConstantsSetSnapshot]:
+        """
+        Keširana varijanta `find_current_constants_set` (ista semantika).
+        """
+        entry = self._jurisdiction_entry(db, jurisdiction, fresh=fresh)
+        if scenario_key:
+            timeline = entry.by_scenario.get(scenario_key)
+            return timeline.find(as_of) if timeline is not None else None
+        return entry.all_sets.find(as_of)
+
+    def tax_profile(self, db: Session, tenant_code: str) -> Optional[TaxProfileSnapshot]:
+        return self._tenant_entry(db, tenant_code).profile
+
+    def resolve(self, db: Session, tenant_code: str, as_of: date, *, fresh: bool = False) -> TaxDummyConfig:
+        """
+        Hijerarhija izvora konfiguracije (prioritet):
+          1) tax_settings (tenant override)
+          2) app_constants_sets (effective-dated po jurisdikciji + scenario_key)
+             **samo ako tenant ima /settings/tax profil**
+          3) DEFAULT_TAX_CONFIG (fallback)
+
+        `fresh=True` zaobilazi keš (čita iz baze) – za finalizaciju obračuna.
+        """
+        tenant = self._tenant_entry(db, tenant_code, fresh=fresh)
+
+        # 1) tenant override
+        if tenant.override is not None:
+            return tenant.override
+
+        # 2) constants set koristimo samo ako tenant eksplicitno ima tax profil (settings/tax)
+        prof = tenant.profile
+        if prof is not None and (prof.entity or "").strip():
+            jurisdiction = normalize_jurisdiction(prof.entity or "")
+            scenario_key = (prof.scenario_key or "").strip() or default_scenario_key_for_profile(prof)
+
+            cs = self.current_constants_set(
+                db, jurisdiction=jurisdiction, as_of=as_of, scenario_key=scenario_key, fresh=fresh
+            )
+            if cs is not None:
+                cfg = tax_config_from_constants_payload(cs.payload or {})
+                if cfg is not None:
+                    return cfg
+
+            # Backward fallback:
+            # ako za taj scenario nema seta, pokušaj po jurisdikciji (stari podaci)
+            cs_fallback = self.current_constants_set(db, jurisdiction=jurisdiction, as_of=as_of, scenario_key=None)
+            if cs_fallback is not None:
+                cfg = tax_config_from_constants_payload(cs_fallback.payload or {})
+                if cfg is not None:
+                    return cfg
+
+        # 3) fallback
+        return DEFAULT_TAX_CONFIG
+
+
+# Jedna instanca po procesu (dijele je svi requesti).
+tax_config_resolver = TaxConfigResolver()
@@ -0,0 +1,119 @@
+# /home/miso/dev/sp-app/sp-app/backend/app/services/zip_stream.py
+from __future__ import annotations
+
+import os
+import time
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, List, Optional
+
+
+# ======================================================
+#  STREAMING ZIP (bez eksternih biblioteka)
+# ======================================================
+#
+# zipfile.ZipFile piše u "sink" koji nema seek/tell – tada zipfile sam
+# vodi poziciju i koristi data descriptor-e, pa arhivu možemo slati
+# klijentu dok nastaje:
+#
+#   entry chunk → ZipFile (deflate) → sink → yield bajtova → StreamingResponse
+#
+# U memoriji je najviše jedan chunk ulaza i ono što je deflate do tada
+# izbacio; central directory (par stotina bajtova po fajlu) ide na kraju.
+
+ZIP_STREAM_CHUNK_BYTES = int(os.getenv("ZIP_STREAM_CHUNK_BYTES", str(64 * 1024)))
+
+
+@dataclass
+class ZipStreamEntry:
+    """
+    Jedan fajl u arhivi: putanja u ZIP-u + sadržaj kao niz chunk-ova.
+
+    `size` (ako je poznat) se upisuje unaprijed, pa zipfile ne mora
+    forsirati ZIP64 zaglavlje za fajlove nepoznate veličine.
+    """
+
+    arcname: str
+    chunks: Iterable[bytes]
+    size: Optional[int] = None
+
+
+class _ChunkSink:
+    """
+    Write-only, ne-seekable "fajl" koji samo skuplja upisane bajtove
+    dok ih generator ne pokupi (`drain`).
+    """
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self.pending = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self.pending += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        self.pending = 0
+        return data
+
+
+def iter_file_chunks(source: BinaryIO, *, chunk_size: int = ZIP_STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    Čita otvoren binarni fajl od trenutne pozicije u chunk-ovima fiksne veličine.
+    """
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_path_chunks(path: Path, *, chunk_size: int = ZIP_STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    Kao `iter_file_chunks`, ali fajl otvara tek kada arhiva dođe do njega
+    (i zatvara ga čim je pročitan).
+    """
+    with open(path, "rb") as f:
+        yield from iter_file_chunks(f, chunk_size=chunk_size)
+
+
+def iter_zip_chunks(
+    entries: Iterable[ZipStreamEntry],
+    *,
+    compression: int = zipfile.ZIP_DEFLATED,
+    chunk_size: int = ZIP_STREAM_CHUNK_BYTES,
+) -> Iterator[bytes]:
+    """
+    Pakuje `entries` u ZIP i vraća arhivu kao niz bajt chunk-ova (~chunk_size).
+
+    `entries` se troši lijeno – sljedeći fajl se ne čita dok prethodni nije
+    upisan, pa generator može čekati na sadržaj koji se još priprema.
+    """
+    sink = _ChunkSink()
+
+    with zipfile.ZipFile(sink, "w", compression) as zf:
+        for entry in entries:
+            info = zipfile.ZipInfo(entry.arcname, date_time=time.localtime(time.time())[:6])
+            info.compress_type = compression
+            if entry.size is not None:
+                info.file_size = entry.size
+
+            with zf.open(info, "w", force_zip64=entry.size is None) as dst:
+                for chunk in entry.chunks:
+                    dst.write(chunk)
+                    if sink.pending >= chunk_size:
+                        yield sink.drain()
+
+            if sink.pending >= chunk_size:
+                yield sink.drain()
+
+    tail = sink.drain()
+    if tail:
+        yield tail
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import os
+import threading
+import time
 from typing import Optional
 
 from fastapi import HTTPException
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from app.models import Tenant
@@ -27,31 +31,158 @@ def require_tenant_code(x_tenant_code: Optional[str]) -> str:
     return x_tenant_code
 
 
-def ensure_tenant_exists(db: Session, code: str) -> Tenant:
+# ======================================================
+#  KEŠ POSTOJANJA TENANTA + AUTO-PROVISIONING
+# ======================================================
+#
+# Skoro svaka write ruta je prije upisa radila `SELECT ... FROM tenants`
+# (a za novi kod i INSERT + COMMIT). Postojanje tenanta se sada pamti u
+# procesu:
+#   - poznat tenant → TTL TENANT_CACHE_TTL_SECONDS (bez upita do isteka),
+#   - nepostojeći   → kratki negativni TTL (TENANT_CACHE_NEGATIVE_TTL_SECONDS).
+#
+# Keš je po procesu: DELETE /tenants briše unos samo u workeru koji je
+# obradio brisanje, ostali workeri vide obrisanog tenanta kao poznatog do
+# isteka svog unosa. Zato je i pozitivni TTL kratak (30 s) – to je gornja
+# granica zastarjelosti, a i dalje štedi SELECT za sve upise unutar prozora.
+#
+# Automatsko kreiranje tenanta (self-service / demo scenariji) je izdvojeno
+# u `provision_tenant`: može se isključiti (TENANT_AUTO_PROVISION=0 → 404,
+# tenanti se kreiraju preko POST /tenants) i ograničeno je brojem novih
+# tenanata u minuti po procesu (TENANT_AUTO_PROVISION_PER_MINUTE, 0 = bez
+# ograničenja) → 429.
+#
+# Read rute ne trebaju red u `tenants` (agregati za nepoznat tenant su 0),
+# pa ga ne provjeravaju.
+
+TENANT_CACHE_TTL_SECONDS = float(os.getenv("TENANT_CACHE_TTL_SECONDS", "30"))
+TENANT_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("TENANT_CACHE_NEGATIVE_TTL_SECONDS", "5"))
+TENANT_AUTO_PROVISION = os.getenv("TENANT_AUTO_PROVISION", "1") not in ("0", "false", "no")
+TENANT_AUTO_PROVISION_PER_MINUTE = int(os.getenv("TENANT_AUTO_PROVISION_PER_MINUTE", "60"))
+
+UNKNOWN_TENANT_MESSAGE = "Unknown tenant"
+TOO_MANY_NEW_TENANTS_MESSAGE = "Too many new tenants, try again later"
+
+
+class TenantCache:
+    """
+    Process-wide keš: tenant code → postoji li red u `tenants`.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = TENANT_CACHE_TTL_SECONDS,
+        negative_ttl_seconds: float = TENANT_CACHE_NEGATIVE_TTL_SECONDS,
+    ) -> None:
+        self._ttl = ttl_seconds
+        self._negative_ttl = negative_ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[bool, float]] = {}
+
+    def get(self, code: str) -> Optional[bool]:
+        """True/False iz keša, None ako nema (važećeg) unosa."""
+        with self._lock:
+            entry = self._entries.get(code)
+            if entry is None:
+                return None
+            exists, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[code]
+                return None
+            return exists
+
+    def set(self, code: str, exists: bool) -> None:
+        ttl = self._ttl if exists else self._negative_ttl
+        with self._lock:
+            self._entries[code] = (exists, time.monotonic() + ttl)
+
+    def invalidate(self, code: str) -> None:
+        with self._lock:
+            self._entries.pop(code, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+tenant_cache = TenantCache()
+
+
+class _ProvisionRateLimiter:
+    """Token bucket: najviše `per_minute` novih tenanata u minuti."""
+
+    def __init__(self, per_minute: int = TENANT_AUTO_PROVISION_PER_MINUTE) -> None:
+        self._per_minute = per_minute
+        self._lock = threading.Lock()
+        self._tokens = float(per_minute)
+        self._updated_at = time.monotonic()
+
+    def acquire(self) -> bool:
+        if self._per_minute <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            refill = (now - self._updated_at) * self._per_minute / 60.0
+            self._tokens = min(float(self._per_minute), self._tokens + refill)
+            self._updated_at = now
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+
+_provision_limiter = _ProvisionRateLimiter()
+
+
+def tenant_exists(db: Session, code: str) -> bool:
+    """
+    Postoji li tenant sa datim `code` (keš, pa tek onda `SELECT 1`).
     """
-    Pobrini se da u bazi postoji red u tabeli `tenants` sa zadatim `code`.
+    cached = tenant_cache.get(code)
+    if cached is not None:
+        return cached
+
+    exists = db.execute(select(Tenant.id).where(Tenant.code == code).limit(1)).first() is not None
+    tenant_cache.set(code, exists)
+    return exists
+
 
-    - Ako tenant već postoji → vraća postojećeg.
-    - Ako ne postoji → kreira se minimalni tenant sa:
+def provision_tenant(db: Session, code: str) -> None:
+    """
+    Eksplicitno auto-kreiranje minimalnog tenanta:
         * id   = code (odrezan na max 32 karaktera)
         * code = prosleđeni kod
         * name = "Tenant {code}"
 
-    Ovaj helper se koristi u modulima koji prvi put kreiraju podatke
-    za tenanta (npr. invoices, cash), tako da backend može da radi
-    "self-service" demo/test scenarije bez ručnog unosa tenant-a.
+    - TENANT_AUTO_PROVISION=0 → HTTP 404 "Unknown tenant",
+    - prekoračen limit novih tenanata → HTTP 429.
+
+    `ON CONFLICT DO NOTHING`, pa je bezbjedno i kada paralelni zahtjev
+    (ili drugi worker) upravo kreira istog tenanta.
     """
-    stmt = select(Tenant).where(Tenant.code == code)
-    existing = db.execute(stmt).scalars().first()
-    if existing:
-        return existing
+    if not TENANT_AUTO_PROVISION:
+        raise HTTPException(status_code=404, detail=UNKNOWN_TENANT_MESSAGE)
+    if not _provision_limiter.acquire():
+        raise HTTPException(status_code=429, detail=TOO_MANY_NEW_TENANTS_MESSAGE)
 
-    tenant = Tenant(
-        id=code[:32],
-        code=code,
-        name=f"Tenant {code}",
+    db.execute(
+        pg_insert(Tenant)
+        .values(id=code[:32], code=code, name=f"Tenant {code}")
+        .on_conflict_do_nothing()
     )
-    db.add(tenant)
     db.commit()
-    db.refresh(tenant)
-    return tenant
+    tenant_cache.set(code, True)
+
+
+def ensure_tenant_exists(db: Session, code: str) -> None:
+    """
+    Pobrini se da u bazi postoji red u tabeli `tenants` sa zadatim `code`
+    (FK za podatke tenanta) – koriste ga write rute prije prvog upisa.
+
+    Za poznatog tenanta ne ide u bazu (TenantCache); za nepoznatog
+    delegira na `provision_tenant`.
+    """
+    if tenant_exists(db, code):
+        return
+    provision_tenant(db, code)
+
@@ -71,6 +71,40 @@ def _run_alembic_upgrade_head() -> None:
 
 def pytest_sessionstart(session: pytest.Session) -> None:
     os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+    # TestClient (bez `with`) pokreće novi event loop po zahtjevu, a asyncpg
+    # konekcije iz pool-a su vezane za loop u kojem su otvorene.
+    os.environ["ASYNC_DB_POOL"] = "null"
+    # testovi kreiraju stotine tenanata u sekundi (auto-provisioning)
+    os.environ["TENANT_AUTO_PROVISION_PER_MINUTE"] = "0"
 
     _ensure_safe_test_database()
-    _run_alembic_upgrade_head()
\ No newline at end of file
+    _run_alembic_upgrade_head()
+
+@pytest.fixture(autouse=True)
+def _clear_tax_config_cache():
+    # Testovi često brišu/ubacuju redove direktno SQL-om (mimo endpointa),
+    # pa in-process keš TAX konfiguracije resetujemo prije svakog testa.
+    from app.services.tax_config import tax_config_resolver
+
+    tax_config_resolver.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def _clear_response_cache():
+    # Direktni SQL u testovima (text("DELETE ...")) ne povećava verziju
+    # podataka tenanta, pa keš odgovora praznimo prije svakog testa.
+    from app.services.response_cache import response_cache
+
+    response_cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def _clear_tenant_cache():
+    # Testovi brišu tenante direktnim SQL-om, pa keš postojanja tenanta
+    # ne smije preživjeti između testova.
+    from app.tenant_security import tenant_cache
+
+    tenant_cache.clear()
+    yield
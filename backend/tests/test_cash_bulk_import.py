@@ -0,0 +1,170 @@
+# /home/miso/dev/sp-app/sp-app/backend/tests/test_cash_bulk_import.py
+import io
+import json
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select, text
+
+from app.db import SessionLocal
+from app.main import app
+from app.models import CashEntry, TaxMonthlyResult, TenantMonthlyRollup
+from app.services.bulk_import import iter_csv_records, iter_ndjson_records
+from app.services.ledger_rollups import rebuild_monthly_rollups
+from app.tenant_security import ensure_tenant_exists
+
+client = TestClient(app)
+
+TENANT = "t-cash-bulk"
+HEADERS = {"X-Tenant-Code": TENANT}
+
+
+def _wipe() -> None:
+    with SessionLocal() as db:
+        db.execute(text("DELETE FROM cash_entries WHERE tenant_code = :t"), {"t": TENANT})
+        db.execute(text("DELETE FROM tax_monthly_results WHERE tenant_code = :t"), {"t": TENANT})
+        rebuild_monthly_rollups(db, tenant_code=TENANT)
+        db.commit()
+
+
+@pytest.fixture
+def clean_tenant():
+    _wipe()
+    yield
+    _wipe()
+
+
+def test_csv_records_detect_semicolon_and_report_lines():
+    data = (
+        "\ufeffentry_date;kind;amount;note\n"
+        '2086-01-05;income;10.00;"a;b"\n'
+        "\n"
+        "2086-01-06;expense;;\n"
+        "1;2;3;4;5\n"
+    ).encode("utf-8")
+
+    records = list(iter_csv_records(io.BytesIO(data)))
+
+    assert records == [
+        (2, {"entry_date": "2086-01-05", "kind": "income", "amount": "10.00", "note": "a;b"}, None),
+        (4, {"entry_date": "2086-01-06", "kind": "expense"}, None),
+        (5, None, "Expected 4 columns, got 5"),
+    ]
+
+
+def test_ndjson_records_reject_non_objects():
+    data = b'{"kind": "income"}\n\n[1, 2]\n{broken\n'
+
+    records = list(iter_ndjson_records(io.BytesIO(data)))
+
+    assert records[0] == (1, {"kind": "income"}, None)
+    assert records[1] == (3, None, "Expected a JSON object")
+    assert records[2][0] == 4 and records[2][2].startswith("Invalid JSON")
+
+
+def test_bulk_csv_inserts_valid_rows_and_reports_errors(clean_tenant):
+    body = (
+        "entry_date,kind,amount,account,note\n"
+        "2086-03-01,income,100.00,bank,prvi\n"
+        "2086-03-02,expense,40.00,,drugi\n"
+        "2086-03-03,gift,1.00,,\n"
+        "2086-03-04,income,-5,,\n"
+    )
+    r = client.post(
+        "/cash/bulk",
+        files={"file": ("cash.csv", body.encode("utf-8"), "text/csv")},
+        headers=HEADERS,
+    )
+    assert r.status_code == 200, r.text
+    report = r.json()
+
+    assert report["total_rows"] == 4
+    assert report["inserted"] == 2
+    assert report["failed"] == 2
+    assert [e["line"] for e in report["errors"]] == [4, 5]
+    assert report["errors"][0]["errors"][0].startswith("kind:")
+
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(CashEntry).where(CashEntry.tenant_code == TENANT).order_by(CashEntry.entry_date)
+        ).scalars().all()
+        assert [(r.kind, r.amount, r.account, r.description) for r in rows] == [
+            ("income", Decimal("100.00"), "bank", "prvi"),
+            ("expense", Decimal("40.00"), "cash", "drugi"),
+        ]
+
+        rollup = db.execute(
+            select(TenantMonthlyRollup).where(
+                TenantMonthlyRollup.tenant_code == TENANT,
+                TenantMonthlyRollup.year == 2086,
+                TenantMonthlyRollup.month == 3,
+            )
+        ).scalar_one()
+        assert rollup.cash_income == Decimal("100.00")
+        assert rollup.cash_expense == Decimal("40.00")
+        assert rollup.cash_income_count == 1
+        assert rollup.cash_expense_count == 1
+
+
+def test_bulk_ndjson_rejects_finalized_month_and_atomic_rolls_back(clean_tenant):
+    zero = Decimal("0.00")
+    with SessionLocal() as db:
+        ensure_tenant_exists(db, TENANT)
+        db.add(
+            TaxMonthlyResult(
+                tenant_code=TENANT,
+                year=2086,
+                month=1,
+                total_income=zero,
+                total_expense=zero,
+                taxable_base=zero,
+                income_tax=zero,
+                contributions_total=zero,
+                total_due=zero,
+                currency="BAM",
+                is_final=True,
+            )
+        )
+        db.commit()
+
+    lines = [
+        {"entry_date": "2086-01-10", "kind": "income", "amount": "5.00"},
+        {"entry_date": "2086-02-10", "kind": "income", "amount": "7.00"},
+    ]
+    body = "\n".join(json.dumps(line) for line in lines).encode("utf-8")
+
+    r = client.post(
+        "/cash/bulk?format=ndjson&atomic=true",
+        files={"file": ("cash.txt", body, "application/octet-stream")},
+        headers=HEADERS,
+    )
+    assert r.status_code == 200, r.text
+    report = r.json()
+    assert report["inserted"] == 0
+    assert report["failed"] == 1
+    assert report["errors"][0]["line"] == 1
+    assert "finalized tax period 2086-01" in report["errors"][0]["errors"][0]
+
+    r = client.post(
+        "/cash/bulk?format=ndjson",
+        files={"file": ("cash.txt", body, "application/octet-stream")},
+        headers=HEADERS,
+    )
+    assert r.status_code == 200, r.text
+    assert r.json()["inserted"] == 1
+
+    with SessionLocal() as db:
+        count = db.execute(
+            select(CashEntry.id).where(CashEntry.tenant_code == TENANT)
+        ).scalars().all()
+        assert len(count) == 1
+
+
+def test_bulk_unknown_format_returns_400():
+    r = client.post(
+        "/cash/bulk",
+        files={"file": ("cash.pdf", b"x", "application/octet-stream")},
+        headers=HEADERS,
+    )
+    assert r.status_code == 400
@@ -0,0 +1,65 @@
+# /home/miso/dev/sp-app/sp-app/backend/tests/test_csv_stream.py
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.csv_stream import iter_csv_chunks
+
+client = TestClient(app)
+
+
+def test_iter_csv_chunks_flushes_every_n_rows_with_single_bom():
+    rows = ([i, f"opis {i}"] for i in range(5))
+
+    chunks = list(
+        iter_csv_chunks(
+            rows,
+            header=["id", "opis"],
+            delimiter=";",
+            lineterminator="\n",
+            bom=True,
+            rows_per_chunk=2,
+        )
+    )
+
+    # header + 2 reda, 2 reda, zadnji red
+    assert len(chunks) == 3
+    assert chunks[0].startswith("\ufeff".encode("utf-8"))
+    assert all(not c.startswith("\ufeff".encode("utf-8")) for c in chunks[1:])
+
+    text = b"".join(chunks).decode("utf-8-sig")
+    assert text.splitlines() == ["id;opis", "0;opis 0", "1;opis 1", "2;opis 2", "3;opis 3", "4;opis 4"]
+
+
+def test_iter_csv_chunks_quotes_delimiter_and_keeps_empty_rows():
+    body = b"".join(iter_csv_chunks([["a;b", "c"], [], ["d", "e"]], delimiter=";", lineterminator="\n"))
+
+    assert body.decode("utf-8") == '"a;b";c\n\nd;e\n'
+
+
+def test_invoices_export_streams_csv_with_bom():
+    tenant = "t-csv-stream"
+    headers = {"X-Tenant-Code": tenant}
+
+    payload = {
+        "invoice_number": "CSV-STREAM-1",
+        "issue_date": "2088-04-02",
+        "due_date": "2088-04-16",
+        "buyer_name": "Kupac; d.o.o.",
+        "items": [{"description": "Usluga", "quantity": "1", "unit_price": "120.00", "vat_rate": "0"}],
+    }
+    r = client.post("/invoices", json=payload, headers=headers)
+    assert r.status_code in (200, 201), r.text
+    invoice_id = r.json()["id"]
+
+    try:
+        r = client.get("/invoices/export?year=2088&month=4", headers=headers)
+        assert r.status_code == 200, r.text
+        assert r.headers["content-type"].startswith("text/csv")
+        assert 'filename="invoices-export.csv"' in r.headers["content-disposition"]
+
+        assert r.content.startswith("\ufeff".encode("utf-8"))
+        lines = r.content.decode("utf-8-sig").splitlines()
+        assert lines[0] == "Broj fakture;Datum izdavanja;Rok plaćanja;Kupac;Ukupan iznos;Plaćena"
+        assert lines[1:] == ['CSV-STREAM-1;2088-04-02;2088-04-16;"Kupac; d.o.o.";120.00;NE']
+    finally:
+        client.delete(f"/invoices/{invoice_id}", headers=headers)
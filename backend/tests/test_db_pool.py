@@ -0,0 +1,41 @@
+# /home/miso/dev/sp-app/sp-app/backend/tests/test_db_pool.py
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.db import PoolWaitStats
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_pool_wait_stats_snapshot():
+    stats = PoolWaitStats()
+    stats.record(0.002)
+    stats.record(0.004)
+    stats.record(0.010, timed_out=True)
+
+    snap = stats.snapshot()
+    assert snap["checkouts"] == 2
+    assert snap["timeouts"] == 1
+    assert snap["wait_ms_max"] == 10.0
+    assert abs(snap["wait_ms_avg"] - 16.0 / 3) < 0.01
+
+
+def test_db_pool_endpoint_reports_configured_sync_pool():
+    assert client.get("/db/health").status_code == 200
+
+    resp = client.get("/health/db-pool")
+    assert resp.status_code == 200
+    body = resp.json()
+
+    sync = body["sync"]
+    assert sync["pool"] == "InstrumentedQueuePool"
+    assert sync["size"] == settings.DB_POOL_SIZE
+    assert sync["max_overflow"] == settings.DB_MAX_OVERFLOW
+    assert sync["checkouts"] >= 1
+    assert sync["checked_out"] >= 0
+
+    # testovi rade bez async pool-a (ASYNC_DB_POOL=null, conftest.py)
+    assert body["async"]["pool"] == "NullPool"
+    assert body["pgbouncer_mode"] is False
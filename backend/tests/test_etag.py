@@ -0,0 +1,42 @@
+# /home/miso/dev/sp-app/sp-app/backend/tests/test_etag.py
+
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_dashboard_etag_not_modified_until_data_changes():
+    tenant = f"t-etag-{int(time.time() * 1000)}"
+    headers = {"X-Tenant-Code": tenant}
+
+    first = client.get("/dashboard/summary/2033", headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+
+    # isti podaci → 304 bez tijela
+    cached = client.get("/dashboard/summary/2033", headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    # druga ruta / parametri → drugi ETag
+    other = client.get("/reports/cashflow/2033", headers={**headers, "If-None-Match": etag})
+    assert other.status_code == 200
+    assert other.headers["etag"] != etag
+
+    resp = client.post(
+        "/cash/",
+        headers=headers,
+        json={"entry_date": "2033-02-01", "kind": "income", "amount": "5.00", "note": "etag"},
+    )
+    assert resp.status_code == 201, resp.text
+
+    fresh = client.get("/dashboard/summary/2033", headers={**headers, "If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert fresh.json()["cash"]["income_total"] == "5.00"
@@ -3,6 +3,9 @@
 from fastapi.testclient import TestClient
 import zipfile
 import io
+import re
+import time
+import zlib
 
 from app.main import app
 
@@ -100,3 +103,71 @@ def test_export_inspection_invalid_period():
 
     assert response.status_code == 400
     assert "from_date" in response.json().get("detail", "")
+
+
+def _pdf_text(content: bytes) -> bytes:
+    streams = re.findall(rb"/FlateDecode >>\nstream\n(.*?)\nendstream", content, re.S)
+    return b"".join(zlib.decompress(data) for data in streams)
+
+
+def test_export_inspection_real_pdfs_and_attachments():
+    tenant = f"t-inspection-{int(time.time())}"
+    headers = {"X-Tenant-Code": tenant}
+
+    inv_resp = client.post(
+        "/invoices/",
+        headers=headers,
+        json={
+            "invoice_number": "INSP/001",
+            "issue_date": "2031-05-10",
+            "buyer_name": "Inspekcija Kupac d.o.o.",
+            "items": [
+                {"description": "Usluga", "quantity": "1.00", "unit_price": "100.00", "vat_rate": "0.17"}
+            ],
+        },
+    )
+    assert inv_resp.status_code == 201, inv_resp.text
+    invoice_id = inv_resp.json()["id"]
+
+    attachment_bytes = b"%PDF-1.4\nORIGINAL SCAN"
+    upload_resp = client.post(
+        "/invoice-attachments",
+        headers=headers,
+        files={"file": ("scan.pdf", attachment_bytes, "application/pdf")},
+    )
+    assert upload_resp.status_code == 201, upload_resp.text
+    attachment_id = upload_resp.json()["id"]
+
+    link_resp = client.post(
+        f"/invoice-attachments/{attachment_id}/link-to-invoice",
+        headers=headers,
+        json={"invoice_id": invoice_id},
+    )
+    assert link_resp.status_code == 200, link_resp.text
+
+    response = client.post(
+        "/export/inspection",
+        headers=headers,
+        json={"from_date": "2031-05-01", "to_date": "2031-05-31"},
+    )
+    assert response.status_code == 200
+
+    zf = zipfile.ZipFile(io.BytesIO(response.content))
+    assert zf.testzip() is None
+
+    outgoing = zf.read("01_invoices_outgoing/outgoing_invoices_2031-05-01_2031-05-31.pdf")
+    assert b"Faktura br: INSP/001" in _pdf_text(outgoing)
+
+    kpr = zf.read("03_kpr/KPR_2031-05-01_2031-05-31.pdf")
+    assert b"Inspekcija Kupac" in _pdf_text(kpr)
+
+    assert zf.read(f"07_attachments/outgoing/INSP_001/{attachment_id}_scan.pdf") == attachment_bytes
+
+    # bez priloga kada je include_attachments=False
+    response = client.post(
+        "/export/inspection",
+        headers=headers,
+        json={"from_date": "2031-05-01", "to_date": "2031-05-31", "include_attachments": False},
+    )
+    names = zipfile.ZipFile(io.BytesIO(response.content)).namelist()
+    assert not any(name.startswith("07_attachments/") for name in names)
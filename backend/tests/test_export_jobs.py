@@ -0,0 +1,211 @@
+# /home/miso/dev/sp-app/sp-app/backend/tests/test_export_jobs.py
+
+import io
+import time
+import zipfile
+
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from sqlalchemy import text
+
+import app.services.export_jobs as export_jobs
+from app.db import SessionLocal
+from app.main import app
+from app.models import ExportJob
+from app.routes.export_jobs import _run_inspection
+from app.services.export_jobs import (
+    ExportArtifact,
+    enqueue_export_job,
+    register_export_kind,
+    requeue_stale_jobs,
+    run_pending_jobs,
+)
+
+client = TestClient(app)
+
+
+def _enqueue(headers: dict, kind: str, params: dict):
+    return client.post("/exports/jobs", headers=headers, json={"kind": kind, "params": params})
+
+
+def test_export_job_lifecycle_and_reuse():
+    tenant = f"t-export-jobs-{int(time.time() * 1000)}"
+    headers = {"X-Tenant-Code": tenant}
+    params = {"from_date": "2032-03-01", "to_date": "2032-03-31"}
+
+    resp = _enqueue(headers, "inspection", params)
+    assert resp.status_code == 202, resp.text
+    job = resp.json()
+    assert job["status"] == "queued"
+    assert job["reused"] is False
+
+    # download prije nego što je posao gotov
+    resp = client.get(f"/exports/jobs/{job['id']}/download", headers=headers)
+    assert resp.status_code == 409
+
+    run_pending_jobs()
+
+    resp = client.get(f"/exports/jobs/{job['id']}", headers=headers)
+    assert resp.status_code == 200
+    done = resp.json()
+    assert done["status"] == "done", done
+    assert done["progress"] == 100
+    assert done["filename"] == f"inspection-{tenant}-2032-03-01_2032-03-31.zip"
+    assert done["download_url"] == f"/exports/jobs/{job['id']}/download"
+
+    resp = client.get(done["download_url"], headers=headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/zip")
+    names = zipfile.ZipFile(io.BytesIO(resp.content)).namelist()
+    assert "03_kpr/KPR_2032-03-01_2032-03-31.pdf" in names
+
+    # isti zahtjev, nepromijenjeni podaci → isti posao
+    resp = _enqueue(headers, "inspection", params)
+    assert resp.status_code == 200
+    assert resp.json()["id"] == job["id"]
+    assert resp.json()["reused"] is True
+
+    # nova stavka u keš knjizi → novi posao
+    cash_resp = client.post(
+        "/cash/",
+        headers=headers,
+        json={"entry_date": "2032-03-15", "kind": "income", "amount": "10.00", "note": "export job"},
+    )
+    assert cash_resp.status_code == 201, cash_resp.text
+
+    resp = _enqueue(headers, "inspection", params)
+    assert resp.status_code == 202
+    assert resp.json()["id"] != job["id"]
+
+    # poslovi su vidljivi samo svom tenantu
+    resp = client.get(f"/exports/jobs/{job['id']}", headers={"X-Tenant-Code": f"{tenant}-other"})
+    assert resp.status_code == 404
+
+
+def test_export_job_kpr_csv_and_validation():
+    tenant = f"t-export-jobs-kpr-{int(time.time() * 1000)}"
+    headers = {"X-Tenant-Code": tenant}
+
+    resp = _enqueue(headers, "kpr_csv", {"year": 2032, "month": 13})
+    assert resp.status_code == 422
+
+    resp = _enqueue(headers, "inspection", {"from_date": "2032-02-01", "to_date": "2032-01-01"})
+    assert resp.status_code == 400
+
+    resp = _enqueue(headers, "kpr_csv", {"year": 2032})
+    assert resp.status_code == 202, resp.text
+    job_id = resp.json()["id"]
+
+    run_pending_jobs()
+
+    resp = client.get(f"/exports/jobs/{job_id}/download", headers=headers)
+    assert resp.status_code == 200
+    assert resp.content.startswith(b"\xef\xbb\xbfdatum,vrsta,kategorija")
+    assert f"kpr-{tenant}-2032.csv" in resp.headers["content-disposition"]
+
+
+# ======================================================
+#  PROGRESS / HEARTBEAT
+# ======================================================
+
+
+class _TestJobParams(BaseModel):
+    step_seconds: float = 0.1
+
+
+def _job_state(tenant: str) -> tuple:
+    with SessionLocal() as db:
+        row = db.execute(
+            text("SELECT id, status, progress, attempts FROM export_jobs WHERE tenant_code = :t"),
+            {"t": tenant},
+        ).one()
+    return tuple(row)
+
+
+@register_export_kind("test_slow", _TestJobParams)
+def _run_test_slow(db, tenant, params, out, progress):
+    """Runner koji dugo ne javlja ništa – živ ga drži samo heartbeat nit."""
+    seen = []
+    for percent in (10, 50, 30, 80):
+        time.sleep(params["step_seconds"])
+        progress(percent)
+        seen.append(_job_state(tenant)[2])
+
+    # duže od EXPORT_JOB_STALE_SECONDS bez ijednog poziva progress-a –
+    # bez heartbeat niti bi posao ovdje bio vraćen u red
+    time.sleep(params["step_seconds"] * 3)
+    requeue_stale_jobs()
+    assert _job_state(tenant)[1] == "running"
+
+    out.write(",".join(str(p) for p in seen).encode("ascii"))
+    return ExportArtifact("slow.txt", "text/plain")
+
+
+@register_export_kind("test_reclaimed", _TestJobParams)
+def _run_test_reclaimed(db, tenant, params, out, progress):
+    """Simulira da je drugi worker u međuvremenu preuzeo isti posao."""
+    with SessionLocal() as other:
+        other.execute(text("UPDATE export_jobs SET attempts = attempts + 1 WHERE tenant_code = :t"), {"t": tenant})
+        other.commit()
+    out.write(b"stale")
+    return ExportArtifact("stale.txt", "text/plain")
+
+
+def _enqueue_direct(tenant: str, kind: str) -> int:
+    with SessionLocal() as db:
+        job, _ = enqueue_export_job(db, tenant, kind, {})
+        return job.id
+
+
+def test_inspection_runner_reports_only_increasing_progress():
+    tenant = f"t-export-jobs-progress-{int(time.time() * 1000)}"
+    seen: list[int] = []
+
+    with SessionLocal() as db:
+        _run_inspection(db, tenant, {"from_date": "2032-05-01", "to_date": "2032-05-31"}, io.BytesIO(), seen.append)
+
+    # samo stvarni procenti iz on_progress – nema povratka na 0 po chunk-u
+    assert seen, "inspection runner nije javio napredak"
+    assert seen == sorted(seen)
+    assert seen[0] > 0 and seen[-1] == 100
+
+
+def test_heartbeat_keeps_slow_job_alive_and_progress_never_drops(monkeypatch):
+    monkeypatch.setattr(export_jobs, "EXPORT_JOB_HEARTBEAT_SECONDS", 0.02)
+    monkeypatch.setattr(export_jobs, "EXPORT_JOB_STALE_SECONDS", 0.25)
+
+    tenant = f"t-export-jobs-slow-{int(time.time() * 1000)}"
+    headers = {"X-Tenant-Code": tenant}
+    job_id = _enqueue_direct(tenant, "test_slow")
+
+    run_pending_jobs()
+
+    _, status, progress, attempts = _job_state(tenant)
+    assert (status, progress, attempts) == ("done", 100, 1)
+
+    resp = client.get(f"/exports/jobs/{job_id}/download", headers=headers)
+    assert resp.status_code == 200
+    # 30 nakon 50 ne spušta progress u bazi
+    assert resp.content == b"10,50,50,80"
+
+
+def test_reclaimed_attempt_cannot_finish_job():
+    tenant = f"t-export-jobs-reclaimed-{int(time.time() * 1000)}"
+    job_id = _enqueue_direct(tenant, "test_reclaimed")
+
+    run_pending_jobs()
+
+    # stari pokušaj (1) ne upisuje done; posao pripada pokušaju 2
+    _, status, _, attempts = _job_state(tenant)
+    assert (status, attempts) == ("running", 2)
+
+    with SessionLocal() as db:
+        assert db.get(ExportJob, job_id).artifact_path is None
+    job_dir = export_jobs.EXPORT_ARTIFACTS_ROOT / tenant / str(job_id)
+    assert not (job_dir / "1").exists()
+    assert not list(job_dir.glob(".artifact.*.part"))
+
+    # ne ostavljamo "running" posao drugim testovima
+    with SessionLocal() as db:
+        db.execute(text("UPDATE export_jobs SET status = 'failed' WHERE id = :id"), {"id": job_id})
+        db.commit()
@@ -0,0 +1,100 @@
+# /home/miso/dev/sp-app/sp-app/backend/tests/test_finalized_period_cache.py
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event, select, text
+
+from app.db import SessionLocal, engine
+from app.models import CashEntry, FinalizedPeriodModificationError, TaxMonthlyResult
+from app.services.ledger_rollups import rebuild_monthly_rollups
+from app.tenant_security import ensure_tenant_exists
+
+TENANT = "t-finalized-cache"
+
+
+def _wipe() -> None:
+    with SessionLocal() as db:
+        db.execute(text("DELETE FROM cash_entries WHERE tenant_code = :t"), {"t": TENANT})
+        db.execute(text("DELETE FROM tax_monthly_results WHERE tenant_code = :t"), {"t": TENANT})
+        rebuild_monthly_rollups(db, tenant_code=TENANT)
+        db.commit()
+
+
+def _final_result(year: int, month: int) -> TaxMonthlyResult:
+    zero = Decimal("0.00")
+    return TaxMonthlyResult(
+        tenant_code=TENANT,
+        year=year,
+        month=month,
+        total_income=zero,
+        total_expense=zero,
+        taxable_base=zero,
+        income_tax=zero,
+        contributions_total=zero,
+        total_due=zero,
+        currency="BAM",
+        is_final=True,
+    )
+
+
+class _LockQueryCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if "FROM tax_monthly_results" in statement:
+            self.count += 1
+
+
+@pytest.fixture
+def seeded():
+    _wipe()
+    with SessionLocal() as db:
+        ensure_tenant_exists(db, TENANT)
+        db.add_all(
+            CashEntry(
+                tenant_code=TENANT,
+                entry_date=date(2087, 2, 1 + (i % 28)),
+                kind="expense",
+                amount=Decimal("1.00"),
+            )
+            for i in range(50)
+        )
+        db.add(_final_result(2087, 1))
+        db.commit()
+    yield
+    _wipe()
+
+
+def test_bulk_delete_checks_finalized_periods_with_one_query(seeded):
+    counter = _LockQueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        with SessionLocal() as db:
+            rows = db.execute(select(CashEntry).where(CashEntry.tenant_code == TENANT)).scalars().all()
+            assert len(rows) == 50
+            for row in rows:
+                db.delete(row)
+            db.commit()
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+
+    assert counter.count == 1
+
+
+def test_finalize_in_same_session_invalidates_cache(seeded):
+    with SessionLocal() as db:
+        row = db.execute(select(CashEntry).where(CashEntry.tenant_code == TENANT).limit(1)).scalar_one()
+
+        # prvi flush napuni keš (februar još nije finalizovan)
+        row.description = "prije finalizacije"
+        db.flush()
+
+        db.add(_final_result(2087, 2))
+        db.flush()
+
+        row.description = "nakon finalizacije"
+        with pytest.raises(FinalizedPeriodModificationError):
+            db.flush()
+        db.rollback()
@@ -0,0 +1,151 @@
+# /home/miso/dev/sp-app/sp-app/backend/tests/test_input_invoices_bulk.py
+import io
+import json
+import zipfile
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select, text
+
+from app.db import SessionLocal
+from app.main import app
+from app.models import InputInvoice, TenantMonthlyRollup
+from app.services.bulk_import import iter_xlsx_records
+from app.services.ledger_rollups import rebuild_monthly_rollups
+
+client = TestClient(app)
+
+TENANT = "t-input-bulk"
+HEADERS = {"X-Tenant-Code": TENANT}
+
+_MAIN_NS = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+
+
+def _wipe() -> None:
+    with SessionLocal() as db:
+        db.execute(text("DELETE FROM input_invoices WHERE tenant_code = :t"), {"t": TENANT})
+        rebuild_monthly_rollups(db, tenant_code=TENANT)
+        db.commit()
+
+
+@pytest.fixture
+def clean_tenant():
+    _wipe()
+    yield
+    _wipe()
+
+
+def _ndjson(*invoices: dict) -> bytes:
+    return "\n".join(json.dumps(inv) for inv in invoices).encode("utf-8")
+
+
+def _invoice(number: str, amount: str, issue_date: str = "2085-05-10") -> dict:
+    return {
+        "supplier_name": "Elektro d.o.o.",
+        "invoice_number": number,
+        "issue_date": issue_date,
+        "total_base": amount,
+        "total_vat": "0",
+        "total_amount": amount,
+    }
+
+
+def _post(body: bytes, query: str = "") -> dict:
+    r = client.post(
+        f"/input-invoices/bulk{query}",
+        files={"file": ("invoices.ndjson", body, "application/x-ndjson")},
+        headers=HEADERS,
+    )
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _may_rollup() -> TenantMonthlyRollup:
+    with SessionLocal() as db:
+        return db.execute(
+            select(TenantMonthlyRollup).where(
+                TenantMonthlyRollup.tenant_code == TENANT,
+                TenantMonthlyRollup.year == 2085,
+                TenantMonthlyRollup.month == 5,
+            )
+        ).scalar_one()
+
+
+def test_bulk_insert_then_skip_then_update(clean_tenant):
+    report = _post(_ndjson(_invoice("A-1", "10.00"), _invoice("A-2", "20.00"), _invoice("A-1", "99.00")))
+    assert (report["inserted"], report["updated"], report["skipped"], report["failed"]) == (2, 0, 0, 1)
+    assert report["errors"][0]["line"] == 3
+    assert report["errors"][0]["errors"] == ["Duplicate of line 1 (supplier_name + invoice_number)"]
+
+    report = _post(_ndjson(_invoice("A-1", "15.00"), _invoice("A-3", "5.00")))
+    assert (report["inserted"], report["updated"], report["skipped"]) == (1, 0, 1)
+
+    report = _post(_ndjson(_invoice("A-1", "15.00"), _invoice("A-2", "25.00")), "?on_conflict=update")
+    assert (report["inserted"], report["updated"], report["skipped"]) == (0, 2, 0)
+
+    with SessionLocal() as db:
+        amounts = dict(
+            db.execute(
+                select(InputInvoice.invoice_number, InputInvoice.total_amount).where(
+                    InputInvoice.tenant_code == TENANT
+                )
+            ).all()
+        )
+    assert amounts == {"A-1": Decimal("15.00"), "A-2": Decimal("25.00"), "A-3": Decimal("5.00")}
+
+    rollup = _may_rollup()
+    assert rollup.input_expense == Decimal("45.00")
+    assert rollup.input_invoice_count == 3
+
+
+def test_bulk_xlsx_import(clean_tenant):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr(
+            "xl/styles.xml",
+            f'<styleSheet {_MAIN_NS}><cellXfs><xf numFmtId="0"/><xf numFmtId="14"/></cellXfs></styleSheet>',
+        )
+        cells = "".join(
+            f'<c r="{col}1" t="inlineStr"><is><t>{name}</t></is></c>'
+            for col, name in zip(
+                "ABCDEF",
+                ["supplier_name", "invoice_number", "issue_date", "total_base", "total_vat", "total_amount"],
+            )
+        )
+        zf.writestr(
+            "xl/worksheets/sheet1.xml",
+            f"<worksheet {_MAIN_NS}><sheetData>"
+            f'<row r="1">{cells}</row>'
+            '<row r="2"><c r="A2" t="inlineStr"><is><t>Vodovod</t></is></c>'
+            '<c r="B2" t="inlineStr"><is><t>V-7</t></is></c>'
+            # 68879 = 2088-07-30 (Excel serijski datum)
+            '<c r="C2" s="1"><v>68879</v></c>'
+            '<c r="D2"><v>30</v></c><c r="E2"><v>0</v></c><c r="F2"><v>30</v></c></row>'
+            "</sheetData></worksheet>",
+        )
+    data = buf.getvalue()
+
+    records = list(iter_xlsx_records(io.BytesIO(data)))
+    assert records == [
+        (
+            2,
+            {
+                "supplier_name": "Vodovod",
+                "invoice_number": "V-7",
+                "issue_date": "2088-07-30",
+                "total_base": "30",
+                "total_vat": "0",
+                "total_amount": "30",
+            },
+            None,
+        )
+    ]
+
+    r = client.post(
+        "/input-invoices/bulk",
+        files={"file": ("portal-export.xlsx", data, "application/octet-stream")},
+        headers=HEADERS,
+    )
+    assert r.status_code == 200, r.text
+    assert r.json()["inserted"] == 1
@@ -1,10 +1,19 @@
 from __future__ import annotations
 
+import hashlib
+import io
 import time
 
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import select
 
+from app.db import SessionLocal
 from app.main import app
+from app.models import StorageBlob
+from app.routes import invoice_attachments as invoice_attachments_routes
+from app.services.attachment_storage import EmptyUploadError, UploadTooLargeError, stage_upload
+from app.services.blob_store import blob_path, collect_garbage
 
 client = TestClient(app)
 
@@ -478,3 +487,128 @@ def test_invoice_attachment_link_to_input_invoice_fails_for_wrong_input_invoice(
     assert link_resp.status_code == 404
     body = link_resp.json()
     assert body.get("detail") == "Input invoice not found"
+
+
+def test_stage_upload_copies_in_chunks_and_hashes(tmp_path) -> None:
+    """
+    stage_upload čita izvor u chunk-ovima, računa size + SHA-256 i tek
+    commit_to() premješta temp fajl na konačnu putanju.
+    """
+    content = b"%PDF-1.4\n" + b"x" * 10_000
+
+    staged = stage_upload(io.BytesIO(content), storage_root=tmp_path, max_bytes=20_000, chunk_size=1024)
+    assert staged.size_bytes == len(content)
+    assert staged.sha256 == hashlib.sha256(content).hexdigest()
+    assert staged.temp_path.exists()
+
+    final_path = tmp_path / "t-stage" / "faktura.pdf"
+    staged.commit_to(final_path)
+
+    assert final_path.read_bytes() == content
+    assert not staged.temp_path.exists()
+
+
+def test_stage_upload_rejects_too_large_and_cleans_up(tmp_path) -> None:
+    with pytest.raises(UploadTooLargeError):
+        stage_upload(io.BytesIO(b"x" * 5000), storage_root=tmp_path, max_bytes=4096, chunk_size=1024)
+
+    with pytest.raises(EmptyUploadError):
+        stage_upload(io.BytesIO(b""), storage_root=tmp_path)
+
+    assert list((tmp_path / ".staging").iterdir()) == []
+
+
+def test_invoice_attachment_upload_too_large_returns_413(monkeypatch) -> None:
+    monkeypatch.setattr(invoice_attachments_routes, "ATTACHMENT_MAX_BYTES", 16)
+
+    resp = client.post(
+        "/invoice-attachments",
+        headers={"X-Tenant-Code": "att-tenant-too-large"},
+        files={"file": ("big.pdf", b"x" * 17, "application/pdf")},
+    )
+    assert resp.status_code == 413, resp.text
+    assert resp.json()["detail"].startswith("Uploaded file is too large")
+
+    list_resp = client.get(
+        "/invoice-attachments",
+        headers={"X-Tenant-Code": "att-tenant-too-large"},
+    )
+    assert list_resp.status_code == 200
+    assert "big.pdf" not in [item["filename"] for item in list_resp.json()]
+
+
+def test_invoice_attachment_duplicate_upload_shares_one_blob() -> None:
+    """
+    Isti sadržaj uploadovan dva puta → jedan blob sa ref_count = 2.
+    Blob (red + fajl) nestaje tek kada se obriše zadnji attachment.
+    """
+    tenant_code = "att-tenant-dedup"
+    headers = {"X-Tenant-Code": tenant_code}
+    content = f"%PDF-1.4\nDEDUP {time.time_ns()}".encode()
+    sha256 = hashlib.sha256(content).hexdigest()
+
+    ids = []
+    for name in ("dobavljac-a.pdf", "dobavljac-a-kopija.pdf"):
+        resp = client.post(
+            "/invoice-attachments",
+            headers=headers,
+            files={"file": (name, content, "application/pdf")},
+        )
+        assert resp.status_code == 201, resp.text
+        ids.append(resp.json()["id"])
+
+    def _ref_count():
+        with SessionLocal() as db:
+            return db.execute(
+                select(StorageBlob.ref_count).where(StorageBlob.sha256 == sha256)
+            ).scalar_one_or_none()
+
+    assert _ref_count() == 2
+    assert blob_path(sha256).read_bytes() == content
+
+    # oba attachment-a se i dalje mogu preuzeti
+    for attachment_id in ids:
+        r = client.get(f"/invoice-attachments/{attachment_id}/download", headers=headers)
+        assert r.status_code == 200
+        assert r.content == content
+
+    assert client.delete(f"/invoice-attachments/{ids[0]}", headers=headers).status_code == 204
+    assert _ref_count() == 1
+    assert blob_path(sha256).exists()
+
+    assert client.delete(f"/invoice-attachments/{ids[1]}", headers=headers).status_code == 204
+    assert _ref_count() is None
+    assert not blob_path(sha256).exists()
+
+
+def test_blob_gc_removes_file_left_by_rolled_back_upload(monkeypatch) -> None:
+    """
+    Fajl novog sadržaja je na blob putanji prije commit-a; ako upis
+    attachment-a padne, red blob-a ode u rollback, a fajl pokupi gc.
+    """
+    headers = {"X-Tenant-Code": "att-tenant-gc"}
+    kept = f"%PDF-1.4\nKEPT {time.time_ns()}".encode()
+    orphan = f"%PDF-1.4\nORPHAN {time.time_ns()}".encode()
+    kept_sha = hashlib.sha256(kept).hexdigest()
+    orphan_sha = hashlib.sha256(orphan).hexdigest()
+
+    resp = client.post("/invoice-attachments", headers=headers, files={"file": ("ok.pdf", kept, "application/pdf")})
+    assert resp.status_code == 201, resp.text
+
+    def _failing_attachment(**kwargs):
+        raise RuntimeError("insert failed")
+
+    with monkeypatch.context() as m:
+        m.setattr(invoice_attachments_routes, "InvoiceAttachment", _failing_attachment)
+        with pytest.raises(RuntimeError):
+            client.post("/invoice-attachments", headers=headers, files={"file": ("x.pdf", orphan, "application/pdf")})
+
+    with SessionLocal() as db:
+        assert db.get(StorageBlob, orphan_sha) is None
+    assert blob_path(orphan_sha).exists()
+
+    with SessionLocal() as db:
+        collect_garbage(db)
+
+    assert not blob_path(orphan_sha).exists()
+    assert blob_path(kept_sha).read_bytes() == kept
@@ -0,0 +1,82 @@
+# /home/miso/dev/sp-app/sp-app/backend/tests/test_invoice_numbers.py
+import time
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.invoice_numbers import (
+    InvoiceNumberFormat,
+    InvoiceNumberFormatError,
+    validate_invoice_number_format,
+)
+
+client = TestClient(app)
+
+
+def _invoice(issue_date: str, number: str | None = None) -> dict:
+    body = {
+        "issue_date": issue_date,
+        "buyer_name": "Kupac",
+        "items": [{"description": "Usluga", "quantity": "1", "unit_price": "10.00", "vat_rate": "0"}],
+    }
+    if number is not None:
+        body["invoice_number"] = number
+    return body
+
+
+def test_invoice_number_format_render_and_validation():
+    fmt = InvoiceNumberFormat(pattern="F{yy}/{month}-{seq:03d}")
+    assert fmt.render(date(2025, 3, 9), 7) == "F25/03-007"
+    assert InvoiceNumberFormat(reset="never").period(date(2025, 3, 9)) == 0
+
+    validate_invoice_number_format("{seq}", "never")
+    for pattern, reset in (
+        ("{year}", "yearly"),  # bez {seq}
+        ("{seq}", "yearly"),  # yearly reset bez godine → duplikati
+        ("{year}-{seq}-{foo}", "yearly"),
+        ("{year}-{seq}", "monthly"),
+    ):
+        with pytest.raises(InvoiceNumberFormatError):
+            validate_invoice_number_format(pattern, reset)
+
+
+def test_create_invoice_allocates_numbers_and_skips_taken():
+    tenant = f"t-numbers-{int(time.time() * 1000)}"
+    headers = {"X-Tenant-Code": tenant}
+
+    first = client.post("/invoices", headers=headers, json=_invoice("2089-02-01"))
+    assert first.status_code == 201, first.text
+    assert first.json()["invoice_number"] == "2089-0001"
+
+    # ručno izdat broj koji bi brojač sljedeći dodijelio
+    manual = client.post("/invoices", headers=headers, json=_invoice("2089-02-02", "2089-0002"))
+    assert manual.status_code == 201, manual.text
+
+    bulk = client.post(
+        "/invoices/bulk",
+        headers=headers,
+        json={"invoices": [_invoice("2089-02-03"), _invoice("2089-02-03", "2089-0004"), _invoice("2089-02-04")]},
+    )
+    assert bulk.status_code == 200, bulk.text
+    assert [c["invoice_number"] for c in bulk.json()["created"]] == ["2089-0003", "2089-0004", "2089-0005"]
+
+    # novi format + brojač bez reseta
+    settings = client.put(
+        "/settings/profile",
+        headers=headers,
+        json={"business_name": "Firma", "invoice_number_format": "F-{seq:05d}", "invoice_number_reset": "never"},
+    )
+    assert settings.status_code == 200, settings.text
+
+    nxt = client.post("/invoices", headers=headers, json=_invoice("2090-01-05"))
+    assert nxt.status_code == 201, nxt.text
+    assert nxt.json()["invoice_number"] == "F-00001"
+
+    bad = client.put(
+        "/settings/profile",
+        headers=headers,
+        json={"business_name": "Firma", "invoice_number_reset": "yearly"},
+    )
+    assert bad.status_code == 400
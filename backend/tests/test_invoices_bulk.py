@@ -0,0 +1,104 @@
+# /home/miso/dev/sp-app/sp-app/backend/tests/test_invoices_bulk.py
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select, text
+
+from app.db import SessionLocal
+from app.main import app
+from app.models import Invoice, InvoiceItem, TenantMonthlyRollup
+from app.services.ledger_rollups import rebuild_monthly_rollups
+
+client = TestClient(app)
+
+TENANT = "t-invoice-bulk"
+HEADERS = {"X-Tenant-Code": TENANT}
+
+
+def _wipe() -> None:
+    with SessionLocal() as db:
+        db.execute(text("DELETE FROM invoices WHERE tenant_code = :t"), {"t": TENANT})
+        rebuild_monthly_rollups(db, tenant_code=TENANT)
+        db.commit()
+
+
+@pytest.fixture
+def clean_tenant():
+    _wipe()
+    yield
+    _wipe()
+
+
+def _invoice(number: str, *prices: str, issue_date: str = "2086-03-10") -> dict:
+    return {
+        "invoice_number": number,
+        "issue_date": issue_date,
+        "buyer_name": "Klijent d.o.o.",
+        "items": [
+            {"description": f"Usluga {i}", "quantity": "2", "unit_price": price, "vat_rate": "0.17"}
+            for i, price in enumerate(prices, start=1)
+        ],
+    }
+
+
+def _post(*invoices: dict, query: str = "") -> dict:
+    r = client.post(f"/invoices/bulk{query}", json={"invoices": list(invoices)}, headers=HEADERS)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_bulk_create_reports_conflicts_per_row(clean_tenant):
+    single = client.post("/invoices", json=_invoice("B-1", "5.00"), headers=HEADERS)
+    assert single.status_code == 201, single.text
+
+    report = _post(
+        _invoice("B-2", "10.00", "5.00"),
+        _invoice("B-1", "1.00"),  # već postoji
+        _invoice("B-3", "20.00"),
+        _invoice("B-2", "1.00"),  # duplikat u zahtjevu
+        {"invoice_number": "B-4", "issue_date": "2086-03-10", "buyer_name": "X", "items": []},
+    )
+    assert (report["total_rows"], report["inserted"], report["failed"]) == (5, 2, 3)
+    errors = {e["line"]: e["errors"] for e in report["errors"]}
+    assert errors[2] == ["Invoice number already exists for this tenant"]
+    assert errors[4] == ["Duplicate of line 1 (invoice_number)"]
+    assert 5 in errors
+    assert [(c["line"], c["invoice_number"]) for c in report["created"]] == [(1, "B-2"), (3, "B-3")]
+
+    created = client.get(f"/invoices/{report['created'][0]['id']}", headers=HEADERS)
+    assert created.status_code == 200
+    body = created.json()
+    # isti obračun kao POST /invoices: 2×10 + 2×5 = 30, PDV 17%
+    assert Decimal(body["total_base"]) == Decimal("30.00")
+    assert Decimal(body["total_vat"]) == Decimal("5.10")
+    assert Decimal(body["total_amount"]) == Decimal("35.10")
+    assert [Decimal(i["total_amount"]) for i in body["items"]] == [Decimal("23.40"), Decimal("11.70")]
+
+    with SessionLocal() as db:
+        rollup = db.execute(
+            select(TenantMonthlyRollup).where(
+                TenantMonthlyRollup.tenant_code == TENANT,
+                TenantMonthlyRollup.year == 2086,
+                TenantMonthlyRollup.month == 3,
+            )
+        ).scalar_one()
+        item_count = db.scalar(
+            select(func.count())
+            .select_from(InvoiceItem)
+            .join(Invoice, Invoice.id == InvoiceItem.invoice_id)
+            .where(Invoice.tenant_code == TENANT)
+        )
+
+    # B-1 (11.70) + B-2 (35.10) + B-3 (46.80)
+    assert rollup.invoice_count == 3
+    assert rollup.invoice_income == Decimal("93.60")
+    assert item_count == 4
+
+
+def test_bulk_create_atomic_rolls_back(clean_tenant):
+    report = _post(_invoice("C-1", "10.00"), _invoice("C-1", "10.00"), query="?atomic=true")
+    assert (report["inserted"], report["failed"], report["created"]) == (0, 1, [])
+
+    with SessionLocal() as db:
+        assert db.scalars(select(Invoice.id).where(Invoice.tenant_code == TENANT)).all() == []
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import re
+import zlib
 from contextlib import contextmanager
 from datetime import date
 
@@ -12,6 +14,15 @@ from app.models import Invoice
 client = TestClient(app)
 
 
+def _pdf_text(content: bytes) -> bytes:
+    """
+    Content stream-ovi su FlateDecode kompresovani – raspakujemo ih da bismo
+    mogli tražiti tekst.
+    """
+    streams = re.findall(rb"/FlateDecode >>\nstream\n(.*?)\nendstream", content, re.S)
+    return b"".join(zlib.decompress(data) for data in streams)
+
+
 @contextmanager
 def _db_session_for_test():
     """
@@ -117,11 +128,12 @@ def test_invoice_pdf_generation_happy_path() -> None:
     content = pdf_resp.content
     assert content.startswith(b"%PDF-1.4")
     # Provjerimo da se unutar PDF-a nalaze osnovni podaci iz fakture
-    assert b"Faktura br:" in content
-    assert invoice_number.encode("ascii") in content
-    assert tenant_code.encode("ascii") in content
-    assert b"Osnovica:" in content
-    assert b"Ukupno:" in content
+    text = _pdf_text(content)
+    assert b"Faktura br:" in text
+    assert invoice_number.encode("ascii") in text
+    assert tenant_code.encode("ascii") in text
+    assert b"Osnovica:" in text
+    assert b"Ukupno:" in text
 
 
 def test_invoice_pdf_not_accessible_for_other_tenant() -> None:
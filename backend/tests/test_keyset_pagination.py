@@ -0,0 +1,156 @@
+# /home/miso/dev/sp-app/sp-app/backend/tests/test_keyset_pagination.py
+import time
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.pagination import decode_cursor, encode_cursor
+
+client = TestClient(app)
+
+
+def _walk(path: str, headers: dict, key: str = "id", **params) -> list:
+    """Prolazi kroz sve stranice preko next_cursor i vraća `key` stavki redom."""
+    ids: list = []
+    cursor = None
+    for _ in range(50):
+        query = dict(params, include_total="false")
+        if cursor:
+            query["cursor"] = cursor
+        r = client.get(path, headers=headers, params=query)
+        assert r.status_code == 200, r.text
+        data = r.json()
+        assert data["total"] is None
+        ids.extend(item[key] for item in data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            return ids
+    raise AssertionError("cursor pagination did not terminate")
+
+
+def test_cursor_roundtrip_and_invalid_cursor():
+    token = encode_cursor(date(2025, 3, 9), 123)
+    assert decode_cursor(token) == (date(2025, 3, 9), 123)
+
+    headers = {"X-Tenant-Code": "t-keyset-invalid"}
+    r = client.get("/cash/list", headers=headers, params={"cursor": "not-a-cursor"})
+    assert r.status_code == 400, r.text
+    assert r.json()["detail"] == "Invalid cursor"
+
+    # id van BIGINT opsega (ili <= 0) je takođe neispravan kursor, ne 500
+    for row_id in (0, -1, 2**63, 10**30):
+        token = encode_cursor(date(2025, 3, 9), row_id)
+        for path in ("/cash/list", "/promet"):
+            r = client.get(path, headers=headers, params={"cursor": token})
+            assert r.status_code == 400, (path, row_id, r.text)
+            assert r.json()["detail"] == "Invalid cursor"
+
+
+def test_cash_list_cursor_pages_match_offset_order():
+    tenant = f"t-keyset-cash-{int(time.time() * 1000)}"
+    headers = {"X-Tenant-Code": tenant}
+
+    # dva unosa na isti datum – redoslijed unutar datuma određuje id
+    for entry_date in ("2025-01-10", "2025-01-15", "2025-01-15", "2025-02-01", "2025-03-20"):
+        r = client.post(
+            "/cash/",
+            headers=headers,
+            json={"entry_date": entry_date, "kind": "income", "amount": "10.00", "note": "keyset"},
+        )
+        assert r.status_code == 201, r.text
+
+    full = client.get("/cash/list", headers=headers, params={"limit": 200})
+    assert full.status_code == 200, full.text
+    assert full.json()["total"] == 5
+    assert full.json()["next_cursor"] is None
+    expected = [item["id"] for item in full.json()["items"]]
+
+    assert _walk("/cash/list", headers, limit=2) == expected
+
+    # prva stranica sa totalom → next_cursor nastavlja tamo gdje je offset stao
+    first = client.get("/cash/list", headers=headers, params={"limit": 3}).json()
+    assert first["total"] == 5
+    second = client.get("/cash/list", headers=headers, params={"limit": 3, "cursor": first["next_cursor"]}).json()
+    assert [item["id"] for item in first["items"] + second["items"]] == expected
+
+    # nova stavka mijenja verziju podataka → keširan total se ne koristi
+    r = client.post(
+        "/cash/",
+        headers=headers,
+        json={"entry_date": "2025-04-01", "kind": "expense", "amount": "1.00"},
+    )
+    assert r.status_code == 201, r.text
+    assert client.get("/cash/list", headers=headers, params={"limit": 3}).json()["total"] == 6
+
+
+def test_invoice_and_input_invoice_lists_cursor_walk():
+    tenant = f"t-keyset-inv-{int(time.time() * 1000)}"
+    headers = {"X-Tenant-Code": tenant}
+
+    for idx, issue_date in enumerate(("2025-05-01", "2025-05-01", "2025-05-02", "2025-06-30")):
+        r = client.post(
+            "/invoices",
+            headers=headers,
+            json={
+                "invoice_number": f"K-{idx}",
+                "issue_date": issue_date,
+                "buyer_name": "Kupac",
+                "items": [{"description": "Usluga", "quantity": "1", "unit_price": "10.00", "vat_rate": "0"}],
+            },
+        )
+        assert r.status_code == 201, r.text
+        r = client.post(
+            "/input-invoices",
+            headers=headers,
+            json={
+                "supplier_name": "Dobavljač",
+                "invoice_number": f"UL-{idx}",
+                "issue_date": issue_date,
+                "total_base": "10.00",
+                "total_vat": "0.00",
+                "total_amount": "10.00",
+            },
+        )
+        assert r.status_code == 201, r.text
+
+    for path in ("/invoices/list", "/input-invoices/list"):
+        full = client.get(path, headers=headers, params={"limit": 200}).json()
+        assert full["total"] == 4
+        expected = [item["id"] for item in full["items"]]
+        assert _walk(path, headers, limit=1) == expected
+        assert _walk(path, headers, limit=3, year=2025, month=5) == expected[1:]
+
+
+def test_promet_cursor_walk_matches_offset_order():
+    tenant = f"t-keyset-promet-{int(time.time() * 1000)}"
+    headers = {"X-Tenant-Code": tenant}
+
+    for entry_date, kind in (
+        ("2025-07-01", "income"),
+        ("2025-07-01", "expense"),
+        ("2025-07-15", "income"),
+        ("2025-08-02", "expense"),
+        ("2025-08-30", "income"),
+    ):
+        r = client.post(
+            "/cash/",
+            headers=headers,
+            json={"entry_date": entry_date, "kind": kind, "amount": "5.00", "note": "promet keyset"},
+        )
+        assert r.status_code == 201, r.text
+
+    full = client.get("/promet", headers=headers, params={"limit": 500}).json()
+    assert full["total"] == 5
+    assert full["next_cursor"] is None
+    # PrometRow nema id – broj dokumenta (CE-<id>) je jedinstven po stavci
+    expected = [item["document_number"] for item in full["items"]]
+
+    assert _walk("/promet", headers, key="document_number", limit=2) == expected
+    assert _walk("/promet", headers, key="document_number", limit=1, year=2025, month=7) == expected[2:]
+
+    # page/page_size + kursor: prva stranica preko page, ostatak preko next_cursor
+    first = client.get("/promet", headers=headers, params={"page": 1, "page_size": 3}).json()
+    assert first["total"] == 5
+    rest = _walk("/promet", headers, key="document_number", limit=3, cursor=first["next_cursor"])
+    assert [item["document_number"] for item in first["items"]] + rest == expected
@@ -168,3 +168,70 @@ def test_kpr_export_pdf():
     # Ne mora biti ogroman, ali svakako > 0
     assert isinstance(pdf_bytes, (bytes, bytearray))
     assert len(pdf_bytes) > 100
+
+
+def test_kpr_keyset_pagination_matches_full_list_and_running_totals():
+    """
+    Keyset paginacija (`cursor`) vraća iste redove kao jedna velika stranica,
+    globalno sortirane po (date, source, source_id), sa kumulativima koji se
+    nastavljaju preko granice stranice.
+    """
+    tenant = "kpr-keyset-tenant"
+    headers = {"X-Tenant-Code": tenant}
+
+    created = []
+    for payload in (
+        {"entry_date": "2087-03-02", "kind": "income", "amount": "10.00"},
+        {"entry_date": "2087-03-01", "kind": "expense", "amount": "4.00"},
+        {"entry_date": "2087-03-02", "kind": "expense", "amount": "1.50"},
+        {"entry_date": "2087-03-03", "kind": "income", "amount": "7.00"},
+    ):
+        resp = client.post("/cash/", json=payload, headers=headers)
+        assert resp.status_code == 201
+        created.append(resp.json()["id"])
+
+    resp = client.post(
+        "/input-invoices",
+        json={
+            "supplier_name": "Keyset dobavljač",
+            "invoice_number": "KS-1",
+            "issue_date": "2087-03-02",
+            "total_base": "3.00",
+            "total_vat": "0",
+            "total_amount": "3.00",
+        },
+        headers=headers,
+    )
+    assert resp.status_code == 201
+    input_invoice_id = resp.json()["id"]
+
+    try:
+        full = client.get("/kpr?year=2087&month=3", headers=headers).json()
+        assert full["total"] == 5
+        assert full["next_cursor"] is None
+
+        keys = [(r["date"], r["source"], r["source_id"]) for r in full["items"]]
+        assert keys == sorted(keys)
+        assert full["items"][-1]["running_income"] == "17.00"
+        assert full["items"][-1]["running_expense"] == "8.50"
+
+        paged = []
+        cursor = None
+        while True:
+            url = "/kpr?year=2087&month=3&limit=2"
+            if cursor:
+                url += f"&cursor={cursor}"
+            page = client.get(url, headers=headers).json()
+            paged.extend(page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert paged == full["items"]
+
+        resp = client.get("/kpr?cursor=not-a-cursor", headers=headers)
+        assert resp.status_code == 400
+    finally:
+        for cash_id in created:
+            client.delete(f"/cash/{cash_id}", headers=headers)
+        client.delete(f"/input-invoices/{input_invoice_id}", headers=headers)
@@ -0,0 +1,156 @@
+# /home/miso/dev/sp-app/sp-app/backend/tests/test_ledger_rollups.py
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select, text
+
+from app.db import SessionLocal
+from app.main import app
+from app.models import TenantMonthlyRollup
+from app.services.ledger_rollups import check_monthly_rollups, rebuild_monthly_rollups
+
+client = TestClient(app)
+
+
+def _rollup(tenant: str, year: int, month: int):
+    with SessionLocal() as db:
+        return db.execute(
+            select(TenantMonthlyRollup).where(
+                TenantMonthlyRollup.tenant_code == tenant,
+                TenantMonthlyRollup.year == year,
+                TenantMonthlyRollup.month == month,
+            )
+        ).scalar_one_or_none()
+
+
+def _wipe(tenant: str) -> None:
+    with SessionLocal() as db:
+        db.execute(text("DELETE FROM cash_entries WHERE tenant_code = :t"), {"t": tenant})
+        db.execute(text("DELETE FROM tenant_monthly_rollups WHERE tenant_code = :t"), {"t": tenant})
+        db.commit()
+
+
+def test_rollup_follows_cash_insert_update_delete():
+    tenant = "t-rollup-cash"
+    headers = {"X-Tenant-Code": tenant}
+    _wipe(tenant)
+
+    r = client.post(
+        "/cash/",
+        json={"entry_date": "2089-02-10", "kind": "income", "amount": "100.00"},
+        headers=headers,
+    )
+    assert r.status_code == 201, r.text
+    cash_id = r.json()["id"]
+
+    r = client.post(
+        "/cash/",
+        json={"entry_date": "2089-02-11", "kind": "expense", "amount": "30.00"},
+        headers=headers,
+    )
+    assert r.status_code == 201, r.text
+
+    row = _rollup(tenant, 2089, 2)
+    assert row is not None
+    assert row.cash_income == Decimal("100.00")
+    assert row.cash_income_count == 1
+    assert row.cash_expense == Decimal("30.00")
+    assert row.total_income == Decimal("100.00")
+    assert row.total_expense == Decimal("30.00")
+
+    # premještanje u drugi mjesec + promjena iznosa
+    r = client.patch(
+        f"/cash/{cash_id}",
+        json={"entry_date": "2089-03-01", "amount": "150.00"},
+        headers=headers,
+    )
+    assert r.status_code == 200, r.text
+
+    feb = _rollup(tenant, 2089, 2)
+    mar = _rollup(tenant, 2089, 3)
+    assert feb.cash_income == Decimal("0.00")
+    assert feb.cash_income_count == 0
+    assert mar.cash_income == Decimal("150.00")
+    assert mar.cash_income_count == 1
+
+    r = client.delete(f"/cash/{cash_id}", headers=headers)
+    assert r.status_code in (200, 204), r.text
+
+    mar = _rollup(tenant, 2089, 3)
+    assert mar.cash_income == Decimal("0.00")
+    assert mar.cash_income_count == 0
+
+    with SessionLocal() as db:
+        assert check_monthly_rollups(db, tenant_code=tenant) == []
+
+
+def test_rollup_check_detects_drift_and_rebuild_fixes_it():
+    tenant = "t-rollup-drift"
+    headers = {"X-Tenant-Code": tenant}
+    _wipe(tenant)
+
+    r = client.post(
+        "/cash/",
+        json={"entry_date": "2089-05-05", "kind": "income", "amount": "80.00"},
+        headers=headers,
+    )
+    assert r.status_code == 201, r.text
+
+    with SessionLocal() as db:
+        # raw SQL izmjena zaobilazi hookove → rollup više ne odgovara knjizi
+        db.execute(
+            text("UPDATE cash_entries SET amount = 90.00 WHERE tenant_code = :t"),
+            {"t": tenant},
+        )
+        db.commit()
+
+        mismatches = check_monthly_rollups(db, tenant_code=tenant)
+        assert [(m["month"], m["column"]) for m in mismatches] == [(5, "cash_income")]
+
+        rebuild_monthly_rollups(db, tenant_code=tenant)
+        db.commit()
+
+        assert check_monthly_rollups(db, tenant_code=tenant) == []
+
+    assert _rollup(tenant, 2089, 5).cash_income == Decimal("90.00")
+
+
+def test_rollup_follows_orm_bulk_dml_and_expired_attributes():
+    from sqlalchemy import delete, update
+
+    from app.models import CashEntry
+
+    tenant = "t-rollup-bulk-dml"
+    headers = {"X-Tenant-Code": tenant}
+    _wipe(tenant)
+
+    for amount in ("10.00", "20.00"):
+        r = client.post(
+            "/cash/",
+            json={"entry_date": "2089-07-01", "kind": "income", "amount": amount},
+            headers=headers,
+        )
+        assert r.status_code == 201, r.text
+
+    with SessionLocal() as db:
+        # bulk UPDATE koji ne dira kolone rollupa
+        db.execute(update(CashEntry).where(CashEntry.tenant_code == tenant).values(account="bank"))
+        # bulk UPDATE iznosa → delte po redu (30 → 70)
+        db.execute(update(CashEntry).where(CashEntry.tenant_code == tenant).values(amount=35))
+        db.commit()
+    assert _rollup(tenant, 2089, 7).cash_income == Decimal("70.00")
+
+    with SessionLocal() as db:
+        entry = db.execute(select(CashEntry).where(CashEntry.tenant_code == tenant).limit(1)).scalar_one()
+        db.commit()  # expire_on_commit → stara vrijednost nije učitana
+        entry.amount = Decimal("5.00")
+        db.commit()
+    assert _rollup(tenant, 2089, 7).cash_income == Decimal("40.00")
+
+    with SessionLocal() as db:
+        db.execute(delete(CashEntry).where(CashEntry.tenant_code == tenant))
+        db.commit()
+        assert check_monthly_rollups(db, tenant_code=tenant) == []
+    row = _rollup(tenant, 2089, 7)
+    assert row.cash_income == Decimal("0.00")
+    assert row.cash_income_count == 0
@@ -0,0 +1,55 @@
+# /home/miso/dev/sp-app/sp-app/backend/tests/test_pdf_writer.py
+import re
+import zlib
+from io import BytesIO
+
+from app.services.pdf_writer import TextPdfDocument, render_text_pdf
+
+
+def _page_texts(pdf: bytes) -> list[bytes]:
+    streams = re.findall(rb"/FlateDecode >>\nstream\n(.*?)\nendstream", pdf, re.S)
+    return [zlib.decompress(data) for data in streams]
+
+
+def _assert_xref_offsets(pdf: bytes) -> None:
+    xref_pos = int(pdf.rsplit(b"startxref\n", 1)[1].split()[0])
+    lines = pdf[xref_pos:].split(b"\n")
+    obj_count = int(lines[1].split()[1])
+    for num in range(1, obj_count):
+        offset = int(lines[2 + num].split()[0])
+        assert pdf[offset:].startswith(b"%d 0 obj" % num)
+
+
+def test_render_text_pdf_single_page_is_compressed_and_escaped():
+    pdf = render_text_pdf(["Račun (test)", "Ukupno: 10.00 KM"])
+
+    assert pdf.startswith(b"%PDF-1.4")
+    assert pdf.rstrip().endswith(b"%%EOF")
+    _assert_xref_offsets(pdf)
+
+    pages = _page_texts(pdf)
+    assert len(pages) == 1
+    assert b"(Racun \\(test\\)) Tj" in pages[0]
+    assert b"Ukupno: 10.00 KM" in pages[0]
+
+
+def test_text_document_paginates_and_repeats_table_header():
+    buffer = BytesIO()
+    doc = TextPdfDocument(buffer)
+    doc.line("Naslov")
+    doc.set_repeating_header(["Datum  Iznos", "------------"])
+    for i in range(3000):
+        doc.line(f"2025-01-01  {i:>6}")
+    doc.set_repeating_header(None)
+    doc.line("Ukupno")
+    doc.close()
+
+    pdf = buffer.getvalue()
+    _assert_xref_offsets(pdf)
+
+    pages = _page_texts(pdf)
+    assert len(pages) == doc.page_count > 1
+    assert b"/Count %d" % len(pages) in pdf
+    assert all(b"(Datum  Iznos) Tj" in page for page in pages)
+    assert b"(Ukupno) Tj" in pages[-1]
+    assert sum(page.count(b"(2025-01-01") for page in pages) == 3000
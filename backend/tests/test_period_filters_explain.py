@@ -0,0 +1,151 @@
+# /home/miso/dev/sp-app/sp-app/backend/tests/test_period_filters_explain.py
+from datetime import date
+
+import pytest
+from sqlalchemy import event, select
+
+from app.db import SessionLocal, engine
+from app.models import InputInvoice
+from app.period_filters import period_bounds
+from app.routes.cash import _build_cash_base_stmt_for_ui
+from app.routes.dashboard import _monthly_dashboard_stmts, _year_dashboard_stmts
+from app.routes.input_invoices import _input_invoices_ui_filters
+from app.routes.invoices import _build_invoices_base_stmt_for_ui
+from app.routes.kpr import _fetch_kpr_page, _iter_kpr_rows
+from app.routes.promet import _build_promet_base_stmt
+
+
+def test_period_bounds_are_half_open():
+    assert period_bounds(year=2025, month=12) == (date(2025, 12, 1), date(2026, 1, 1))
+    assert period_bounds(year=2025) == (date(2025, 1, 1), date(2026, 1, 1))
+    # date_to je uključiv → gornja granica je sljedeći dan
+    assert period_bounds(date_from=date(2025, 3, 5), date_to=date(2025, 3, 31)) == (
+        date(2025, 3, 5),
+        date(2025, 4, 1),
+    )
+    # presjek year/month i od/do
+    assert period_bounds(year=2025, month=3, date_from=date(2025, 3, 10)) == (
+        date(2025, 3, 10),
+        date(2025, 4, 1),
+    )
+    assert period_bounds() == (None, None)
+
+
+def _explain_sql(sql: str, params) -> str:
+    """
+    EXPLAIN za SQL koji endpoint šalje bazi.
+
+    Na praznoj test bazi planner bi svakako izabrao Seq Scan, pa ga u ovoj
+    transakciji isključujemo – ako i dalje nema index scan-a, filter nije sargable.
+    """
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            rows = conn.exec_driver_sql("EXPLAIN " + sql, params).all()
+            return "\n".join(r[0] for r in rows)
+        finally:
+            trans.rollback()
+
+
+def _explain(stmt) -> str:
+    compiled = stmt.compile(dialect=engine.dialect)
+    return _explain_sql(str(compiled), compiled.params)
+
+
+def _executed_selects(run) -> list[tuple[str, dict]]:
+    """
+    SELECT-ovi koje `run(db)` stvarno izvrši (hvata ih before_cursor_execute).
+    """
+    captured: list[tuple[str, dict]] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        with SessionLocal() as db:
+            run(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    return captured
+
+
+def _assert_range_index_scan(label: str, plan: str, *index_names: str) -> None:
+    for index_name in index_names:
+        assert index_name in plan, f"{label}: očekivan {index_name}\n{plan}"
+    assert "Seq Scan" not in plan, f"{label}: seq scan\n{plan}"
+    # opseg datuma mora biti dio Index Cond (ne samo Filter nakon skeniranja)
+    assert "Index Cond" in plan and ">=" in plan and "<" in plan, f"{label}\n{plan}"
+
+
+@pytest.mark.parametrize(
+    "label, stmt, index_name",
+    [
+        (
+            "invoices list/export",
+            _build_invoices_base_stmt_for_ui("t-explain", 2025, 3, False, None, None, None),
+            "ix_invoices_tenant_issue_date",
+        ),
+        (
+            "input invoices list",
+            select(InputInvoice).where(*_input_invoices_ui_filters("t-explain", 2025, 3, None, None)),
+            "ix_input_invoices_tenant_issue_date",
+        ),
+        (
+            "cash list",
+            _build_cash_base_stmt_for_ui("t-explain", 2025, 3, None),
+            "ix_cash_entries_tenant_date",
+        ),
+        (
+            "promet",
+            _build_promet_base_stmt("t-explain", 2025, None, None, date(2025, 6, 30), None),
+            "ix_cash_entries_tenant_date",
+        ),
+    ],
+)
+def test_period_filtered_queries_use_tenant_date_index(label, stmt, index_name):
+    _assert_range_index_scan(label, _explain(stmt), index_name)
+
+
+@pytest.mark.parametrize(
+    "label, run",
+    [
+        ("kpr export", lambda db: list(_iter_kpr_rows(db, "t-explain", 2025, None))),
+        (
+            "kpr page",
+            lambda db: _fetch_kpr_page(db, "t-explain", 2025, 3, after=None, offset=0, limit=50),
+        ),
+    ],
+)
+def test_kpr_union_uses_tenant_date_index_per_branch(label, run):
+    selects = [(sql, params) for sql, params in _executed_selects(run) if "UNION ALL" in sql]
+    assert len(selects) == 1, selects
+
+    _assert_range_index_scan(
+        label,
+        _explain_sql(*selects[0]),
+        "ix_invoices_tenant_issue_date",
+        "ix_input_invoices_tenant_issue_date",
+        "ix_cash_entries_tenant_date",
+    )
+
+
+@pytest.mark.parametrize(
+    "label, stmts",
+    [
+        ("dashboard year", _year_dashboard_stmts(tenant="t-explain", year=2025)),
+        ("dashboard month", _monthly_dashboard_stmts(tenant="t-explain", year=2025, month=3)),
+    ],
+)
+def test_dashboard_queries_use_tenant_period_index(label, stmts):
+    rollup_stmt, tax_stmt = stmts
+    for stmt, index_name in (
+        (rollup_stmt, "uq_tenant_monthly_rollups_tenant_year_month"),
+        (tax_stmt, "uq_tax_monthly_results_tenant_year_month"),
+    ):
+        plan = _explain(stmt)
+        assert index_name in plan, f"{label}: očekivan {index_name}\n{plan}"
+        assert "Seq Scan" not in plan, f"{label}: seq scan\n{plan}"
+        assert "Index Cond" in plan, f"{label}\n{plan}"
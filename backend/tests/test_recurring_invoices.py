@@ -0,0 +1,110 @@
+# /home/miso/dev/sp-app/sp-app/backend/tests/test_recurring_invoices.py
+import time
+from datetime import date
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.db import SessionLocal
+from app.main import app
+from app.models import Invoice
+from app.services.recurring_invoices import generate_due_invoices, next_run_after
+
+client = TestClient(app)
+
+
+def test_next_run_after_keeps_anchor_day():
+    assert next_run_after(date(2025, 1, 31), "monthly", 31) == date(2025, 2, 28)
+    assert next_run_after(date(2025, 2, 28), "monthly", 31) == date(2025, 3, 31)
+    assert next_run_after(date(2025, 11, 15), "quarterly", 15) == date(2026, 2, 15)
+    assert next_run_after(date(2024, 2, 29), "yearly", 29) == date(2025, 2, 28)
+
+
+def test_generate_due_invoices_catches_up_without_double_issue():
+    tenant = f"t-recurring-{int(time.time() * 1000)}"
+    headers = {"X-Tenant-Code": tenant}
+
+    resp = client.post(
+        "/invoice-templates",
+        headers=headers,
+        json={
+            "name": "Održavanje",
+            "buyer_name": "Klijent d.o.o.",
+            "cadence": "monthly",
+            "first_run": "2087-01-31",
+            "due_days": 15,
+            "items": [{"description": "Održavanje", "quantity": "1", "unit_price": "100.00", "vat_rate": "0.17"}],
+        },
+    )
+    assert resp.status_code == 201, resp.text
+    template_id = resp.json()["id"]
+    assert resp.json()["anchor_day"] == 31
+
+    stats = generate_due_invoices(date(2087, 3, 31), tenant_code=tenant)
+    assert (stats.invoices, stats.failed) == (3, 0)
+
+    # drugi prolaz za isti dan ne izdaje ništa
+    assert generate_due_invoices(date(2087, 3, 31), tenant_code=tenant).invoices == 0
+
+    with SessionLocal() as db:
+        invoices = db.execute(
+            select(Invoice.invoice_number, Invoice.issue_date, Invoice.due_date, Invoice.total_amount)
+            .where(Invoice.tenant_code == tenant)
+            .order_by(Invoice.issue_date)
+        ).all()
+
+    assert [(n, d) for n, d, _, _ in invoices] == [
+        ("2087-0001", date(2087, 1, 31)),
+        ("2087-0002", date(2087, 2, 28)),
+        ("2087-0003", date(2087, 3, 31)),
+    ]
+    assert invoices[0].due_date == date(2087, 2, 15)
+    assert all(total == Decimal("117.00") for _, _, _, total in invoices)
+
+    template = client.get(f"/invoice-templates/{template_id}", headers=headers).json()
+    assert template["next_run"] == "2087-04-30"
+    assert template["last_error"] is None
+
+    paused = client.patch(f"/invoice-templates/{template_id}", headers=headers, json={"is_active": False})
+    assert paused.status_code == 200, paused.text
+    assert generate_due_invoices(date(2087, 12, 31), tenant_code=tenant).invoices == 0
+
+
+def test_generate_skips_taken_invoice_number():
+    tenant = f"t-recurring-taken-{int(time.time() * 1000)}"
+    headers = {"X-Tenant-Code": tenant}
+
+    manual = client.post(
+        "/invoices",
+        headers=headers,
+        json={
+            "invoice_number": "2088-0001",
+            "issue_date": "2088-05-01",
+            "buyer_name": "Ručno",
+            "items": [{"description": "X", "quantity": "1", "unit_price": "1.00", "vat_rate": "0"}],
+        },
+    )
+    assert manual.status_code == 201, manual.text
+
+    resp = client.post(
+        "/invoice-templates",
+        headers=headers,
+        json={
+            "name": "Zakup",
+            "buyer_name": "Zakupac",
+            "cadence": "yearly",
+            "first_run": "2088-05-01",
+            "items": [{"description": "Zakup", "quantity": "1", "unit_price": "10.00", "vat_rate": "0"}],
+        },
+    )
+    assert resp.status_code == 201, resp.text
+
+    stats = generate_due_invoices(date(2088, 5, 1), tenant_code=tenant)
+    assert (stats.invoices, stats.failed) == (1, 0)
+
+    with SessionLocal() as db:
+        numbers = db.scalars(
+            select(Invoice.invoice_number).where(Invoice.tenant_code == tenant).order_by(Invoice.invoice_number)
+        ).all()
+    assert numbers == ["2088-0001", "2088-0002"]
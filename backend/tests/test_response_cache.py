@@ -0,0 +1,62 @@
+# /home/miso/dev/sp-app/sp-app/backend/tests/test_response_cache.py
+
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.response_cache import MemoryResponseCacheBackend
+
+client = TestClient(app)
+
+
+def test_memory_backend_lru_version_and_size_eviction():
+    backend = MemoryResponseCacheBackend(max_entries=2, max_bytes=10)
+
+    backend.set("a", 1, b"aaaa", ttl_seconds=60)
+    backend.set("b", 1, b"bbbb", ttl_seconds=60)
+    assert backend.get("a", 1) == b"aaaa"  # "a" je sada najsvježiji
+
+    backend.set("c", 1, b"cc", ttl_seconds=60)
+    assert backend.get("b", 1) is None  # LRU izbacuje "b"
+    assert backend.get("a", 1) == b"aaaa"
+
+    # nova verzija podataka → stari unos se briše
+    assert backend.get("a", 2) is None
+    assert backend.get("a", 1) is None
+
+    # starija verzija ne prepisuje noviju
+    backend.set("c", 3, b"new", ttl_seconds=60)
+    backend.set("c", 2, b"old", ttl_seconds=60)
+    assert backend.get("c", 3) == b"new"
+
+    # ograničenje bajtova i TTL
+    backend.set("big", 1, b"x" * 11, ttl_seconds=60)
+    assert backend.get("big", 1) is None
+    backend.set("ttl", 1, b"t", ttl_seconds=0)
+    assert backend.get("ttl", 1) is None
+
+
+def test_dashboard_year_summary_served_from_cache_until_data_changes():
+    tenant = f"t-rcache-{int(time.time() * 1000)}"
+    headers = {"X-Tenant-Code": tenant}
+
+    first = client.get("/dashboard/summary/2034", headers=headers)
+    assert first.status_code == 200
+    before = client.get("/health/cache").json()
+
+    second = client.get("/dashboard/summary/2034", headers=headers)
+    assert second.json() == first.json()
+    after = client.get("/health/cache").json()
+    assert after["hits"] == before["hits"] + 1
+
+    resp = client.post(
+        "/cash/",
+        headers=headers,
+        json={"entry_date": "2034-06-01", "kind": "income", "amount": "7.00", "note": "rcache"},
+    )
+    assert resp.status_code == 201, resp.text
+
+    third = client.get("/dashboard/summary/2034", headers=headers)
+    assert third.json()["cash"]["income_total"] == "7.00"
+    assert client.get("/health/cache").json()["misses"] == after["misses"] + 1
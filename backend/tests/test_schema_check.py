@@ -0,0 +1,43 @@
+# /home/miso/dev/sp-app/sp-app/backend/tests/test_schema_check.py
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table
+
+from app.models import Base
+from app.schema_check import SchemaDriftError, SchemaReport, inspect_schema, verify_schema
+
+
+def test_migrated_test_database_matches_models_and_head():
+    # conftest.py radi `alembic upgrade head` prije testova
+    report = inspect_schema()
+    assert report.expected_heads
+    assert report.current_heads == report.expected_heads
+    assert report.missing_tables == []
+    assert report.missing_columns == []
+    assert verify_schema(mode="strict").ok
+
+
+def test_drift_detected_for_missing_table_and_column():
+    metadata = MetaData()
+    for table in Base.metadata.sorted_tables:
+        if table.name == "invoices":
+            table.to_metadata(metadata)
+    metadata.tables["invoices"].append_column(Column("not_migrated_yet", Integer))
+    Table("not_migrated_table", metadata, Column("id", Integer, primary_key=True))
+
+    report = inspect_schema(metadata=metadata)
+    assert report.missing_tables == ["not_migrated_table"]
+    assert report.missing_columns == ["invoices.not_migrated_yet"]
+    assert not report.ok
+
+
+def test_verify_schema_modes(monkeypatch):
+    import app.schema_check as schema_check
+
+    drift = SchemaReport(expected_heads={"b"}, current_heads={"a"})
+    monkeypatch.setattr(schema_check, "inspect_schema", lambda bind: drift)
+
+    assert verify_schema(mode="off") is None
+    assert verify_schema(mode="warn") is drift
+    with pytest.raises(SchemaDriftError, match="run `alembic upgrade head`"):
+        verify_schema(mode="strict")
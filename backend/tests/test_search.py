@@ -0,0 +1,106 @@
+# /home/miso/dev/sp-app/sp-app/backend/tests/test_search.py
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.db import engine
+from app.main import app
+from app.services.search import fold_search_text
+
+client = TestClient(app)
+
+
+def _invoice(number: str, buyer_name: str) -> dict:
+    return {
+        "invoice_number": number,
+        "issue_date": "2025-06-10",
+        "buyer_name": buyer_name,
+        "items": [{"description": "Usluga", "quantity": "1", "unit_price": "100.00", "vat_rate": "0"}],
+    }
+
+
+def test_fold_search_text_matches_sql_function():
+    samples = ["Čačak", "ĆEVAPI Željo", "Đurđević d.o.o.", "  Šećer 50% ", "plain ascii"]
+    with engine.connect() as conn:
+        for value in samples:
+            folded = conn.execute(text("SELECT sp_search_fold(:v)"), {"v": value.strip()}).scalar_one()
+            assert folded == fold_search_text(value)
+
+    assert fold_search_text("ČAČAK") == "cacak"
+
+
+def test_search_ranks_hits_across_documents_with_diacritic_folding():
+    tenant = f"t-search-{int(time.time() * 1000)}"
+    headers = {"X-Tenant-Code": tenant}
+
+    r = client.post("/invoices", headers=headers, json=_invoice("S-1", "Trgovina Čačak d.o.o."))
+    assert r.status_code == 201, r.text
+    invoice_id = r.json()["id"]
+    r = client.post("/invoices", headers=headers, json=_invoice("S-2", "Frizer Salon Milica"))
+    assert r.status_code == 201, r.text
+
+    r = client.post(
+        "/input-invoices",
+        headers=headers,
+        json={
+            "supplier_name": "Cacak Elektro",
+            "invoice_number": "UL-1",
+            "issue_date": "2025-06-01",
+            "total_base": "10.00",
+            "total_vat": "0.00",
+            "total_amount": "10.00",
+        },
+    )
+    assert r.status_code == 201, r.text
+
+    r = client.post(
+        "/cash/",
+        headers=headers,
+        json={"entry_date": "2025-06-12", "kind": "income", "amount": "55.00", "note": "Uplata – ČAČAK"},
+    )
+    assert r.status_code == 201, r.text
+
+    r = client.get("/search", headers=headers, params={"q": "cačak"})
+    assert r.status_code == 200, r.text
+    items = r.json()["items"]
+    assert {item["kind"] for item in items} == {"invoice", "input_invoice", "cash_entry"}
+    assert all("milica" not in (item["text"] or "").lower() for item in items)
+    scores = [item["score"] for item in items]
+    assert scores == sorted(scores, reverse=True)
+
+    # filter po vrsti dokumenta
+    r = client.get("/search", headers=headers, params={"q": "CACAK", "kind": "invoice"})
+    assert r.status_code == 200, r.text
+    assert [(item["id"], item["reference"]) for item in r.json()["items"]] == [(invoice_id, "S-1")]
+
+    # tipfeler – word similarity
+    r = client.get("/search", headers=headers, params={"q": "milca salon"})
+    assert r.status_code == 200, r.text
+    assert [item["reference"] for item in r.json()["items"]] == ["S-2"]
+
+    # LIKE wildcard iz upita se ne tumači kao wildcard
+    r = client.get("/search", headers=headers, params={"q": "%%%"})
+    assert r.status_code == 200, r.text
+    assert r.json()["items"] == []
+
+    # drugi tenant ne vidi ništa
+    r = client.get("/search", headers={"X-Tenant-Code": f"{tenant}-other"}, params={"q": "cacak"})
+    assert r.status_code == 200, r.text
+    assert r.json()["items"] == []
+
+
+def test_list_filters_fold_diacritics():
+    tenant = f"t-search-list-{int(time.time() * 1000)}"
+    headers = {"X-Tenant-Code": tenant}
+
+    r = client.post("/invoices", headers=headers, json=_invoice("L-1", "Željezara Zenica"))
+    assert r.status_code == 201, r.text
+
+    r = client.get("/invoices/list", headers=headers, params={"buyer_query": "zeljez"})
+    assert r.status_code == 200, r.text
+    assert [item["invoice_number"] for item in r.json()["items"]] == ["L-1"]
+
+    r = client.get("/invoices", headers=headers, params={"buyer_name": "ŽELJ"})
+    assert r.status_code == 200, r.text
+    assert [item["invoice_number"] for item in r.json()] == ["L-1"]
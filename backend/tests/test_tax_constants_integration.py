@@ -1,4 +1,5 @@
 # /home/miso/dev/sp-app/sp-app/backend/tests/test_tax_constants_integration.py
+import time
 from decimal import Decimal
 
 from fastapi.testclient import TestClient
@@ -349,4 +350,128 @@ def test_tax_preview_supports_v2_constants_payload_shape():
 
     # total_due = 290
     assert _d(body["total_due"]) == Decimal("290.00")
-    assert body["currency"] == "BAM"
\ No newline at end of file
+    assert body["currency"] == "BAM"
+
+def test_tax_preview_sees_admin_constants_update_despite_resolver_cache():
+    _wipe_tables()
+    client = TestClient(app)
+
+    tenant = "t-const-cache"
+
+    res = client.post(
+        "/admin/constants",
+        json={
+            "jurisdiction": "RS",
+            "scenario_key": "rs_primary",
+            "effective_from": "2025-01-01",
+            "effective_to": None,
+            "payload": {"tax": {"income_tax_rate": 0.20, "flat_costs_rate": 0.00, "currency": "BAM"}},
+            "created_by": "tester",
+            "created_reason": "RS 2025+",
+        },
+    )
+    assert res.status_code == 200, res.text
+    constants_id = res.json()["id"]
+
+    res = client.put(
+        "/settings/tax",
+        headers={"X-Tenant-Code": tenant},
+        json={"entity": "RS", "regime": "pausal", "has_additional_activity": False},
+    )
+    assert res.status_code == 200, res.text
+
+    params = {"year": 2025, "month": 3, "total_income": "1000.00", "total_expense": "0.00"}
+
+    # 1) prvi poziv puni keš
+    res = client.get("/tax/monthly/preview", headers={"X-Tenant-Code": tenant}, params=params)
+    assert res.status_code == 200, res.text
+    assert _d(res.json()["income_tax"]) == Decimal("200.00")
+
+    # 2) admin update mora invalidirati keš
+    res = client.put(
+        f"/admin/constants/{constants_id}",
+        json={
+            "payload": {"tax": {"income_tax_rate": 0.05, "flat_costs_rate": 0.00, "currency": "BAM"}},
+            "updated_by": "tester",
+            "updated_reason": "korekcija stope",
+        },
+    )
+    assert res.status_code == 200, res.text
+
+    res = client.get("/tax/monthly/preview", headers={"X-Tenant-Code": tenant}, params=params)
+    assert res.status_code == 200, res.text
+    assert _d(res.json()["income_tax"]) == Decimal("50.00")
+
+    # 3) tenant override (PUT /tax/settings) takođe invalidira keš
+    res = client.put(
+        "/tax/settings",
+        headers={"X-Tenant-Code": tenant},
+        json={"income_tax_rate": "0.10", "flat_costs_rate": "0.00"},
+    )
+    assert res.status_code == 200, res.text
+
+    res = client.get("/tax/monthly/preview", headers={"X-Tenant-Code": tenant}, params=params)
+    assert res.status_code == 200, res.text
+    assert _d(res.json()["income_tax"]) == Decimal("100.00")
+
+
+def test_tax_finalize_reads_constants_past_resolver_cache():
+    _wipe_tables()
+    client = TestClient(app)
+
+    tenant = f"t-const-finalize-{int(time.time() * 1000)}"
+    headers = {"X-Tenant-Code": tenant}
+
+    res = client.post(
+        "/admin/constants",
+        json={
+            "jurisdiction": "RS",
+            "scenario_key": "rs_primary",
+            "effective_from": "2025-01-01",
+            "effective_to": None,
+            "payload": {"tax": {"income_tax_rate": 0.20, "flat_costs_rate": 0.00, "currency": "BAM"}},
+            "created_by": "tester",
+            "created_reason": "RS 2025+",
+        },
+    )
+    assert res.status_code == 200, res.text
+    constants_id = res.json()["id"]
+
+    res = client.put(
+        "/settings/tax",
+        headers=headers,
+        json={"entity": "RS", "regime": "pausal", "has_additional_activity": False},
+    )
+    assert res.status_code == 200, res.text
+
+    res = client.post(
+        "/cash/",
+        headers=headers,
+        json={"entry_date": "2025-03-10", "kind": "income", "amount": "1000.00"},
+    )
+    assert res.status_code == 201, res.text
+
+    # preview puni keš resolvera
+    params = {"year": 2025, "month": 3, "total_income": "1000.00", "total_expense": "0.00"}
+    res = client.get("/tax/monthly/preview", headers=headers, params=params)
+    assert res.status_code == 200, res.text
+    assert _d(res.json()["income_tax"]) == Decimal("200.00")
+
+    # izmjena iz "drugog procesa" – bez invalidacije keša u ovom procesu
+    s = SessionLocal()
+    try:
+        s.execute(
+            text("UPDATE app_constants_sets SET payload = CAST(:p AS jsonb) WHERE id = :id"),
+            {
+                "p": '{"tax": {"income_tax_rate": 0.05, "flat_costs_rate": 0.00, "currency": "BAM"}}',
+                "id": constants_id,
+            },
+        )
+        s.commit()
+    finally:
+        s.close()
+
+    # finalizacija trajno upisuje iznose → konfiguracija se čita iz baze
+    res = client.post("/tax/monthly/finalize", headers=headers, params={"year": 2025, "month": 3})
+    assert res.status_code == 200, res.text
+    assert _d(res.json()["income_tax"]) == Decimal("50.00")
@@ -1,4 +1,6 @@
 # /home/miso/dev/sp-app/sp-app/backend/tests/test_tax_monthly_payments.py
+import time
+
 from fastapi.testclient import TestClient
 
 from app.main import app
@@ -70,3 +72,42 @@ def test_tax_monthly_payment_is_tenant_isolated():
     jan_b = [x for x in data_b["items"] if x["month"] == 1][0]
     assert jan_b["is_paid"] is False
     assert jan_b["paid_at"] is None
+
+
+def test_tax_monthly_overview_matches_monthly_auto_for_every_month():
+    """
+    Godišnji pregled se računa jednim prolazom (grouped upiti) –
+    svaki mjesec mora dati isti total_due kao /tax/monthly/auto za taj mjesec.
+    """
+    tenant = f"tax-overview-single-pass-{int(time.time() * 1000)}"
+    headers = {"X-Tenant-Code": tenant}
+
+    for entry_date, kind, amount in [
+        ("2025-01-10", "income", "1000.00"),
+        ("2025-01-31", "expense", "100.00"),
+        ("2025-02-01", "income", "500.00"),
+        ("2025-12-31", "income", "250.00"),
+    ]:
+        r = client.post(
+            "/cash/",
+            json={"entry_date": entry_date, "kind": kind, "amount": amount},
+            headers=headers,
+        )
+        assert r.status_code == 201, r.text
+
+    r = client.get("/tax/monthly?year=2025", headers=headers)
+    assert r.status_code == 200, r.text
+    items = {x["month"]: x for x in r.json()["items"]}
+
+    for m in range(1, 13):
+        r = client.get(
+            "/tax/monthly/auto",
+            params={"year": 2025, "month": m},
+            headers=headers,
+        )
+        assert r.status_code == 200, r.text
+        auto = r.json()
+        assert round(float(items[m]["total_due"]), 2) == round(float(auto["total_due"]), 2)
+
+    assert float(items[1]["total_due"]) > 0
+    assert float(items[3]["total_due"]) == 0
@@ -0,0 +1,86 @@
+# /home/miso/dev/sp-app/sp-app/backend/tests/test_tenant_cache.py
+
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.db import SessionLocal
+from app.main import app
+from app.tenant_security import (
+    TenantCache,
+    _ProvisionRateLimiter,
+    ensure_tenant_exists,
+    tenant_cache,
+)
+
+client = TestClient(app)
+
+
+def _tenant_rows(code: str) -> int:
+    with SessionLocal() as db:
+        return db.execute(text("SELECT count(*) FROM tenants WHERE code = :c"), {"c": code}).scalar_one()
+
+
+def test_tenant_cache_positive_and_negative_ttl():
+    cache = TenantCache(ttl_seconds=60, negative_ttl_seconds=0)
+
+    assert cache.get("a") is None
+    cache.set("a", True)
+    assert cache.get("a") is True
+
+    # negativni unos sa TTL 0 odmah ističe
+    cache.set("b", False)
+    assert cache.get("b") is None
+
+    cache.invalidate("a")
+    assert cache.get("a") is None
+
+
+def test_provision_rate_limiter():
+    limiter = _ProvisionRateLimiter(per_minute=2)
+    assert limiter.acquire()
+    assert limiter.acquire()
+    assert not limiter.acquire()
+
+    assert all(_ProvisionRateLimiter(per_minute=0).acquire() for _ in range(100))
+
+
+def test_write_provisions_tenant_once_and_reads_do_not():
+    tenant = f"t-tcache-{int(time.time() * 1000)}"
+    headers = {"X-Tenant-Code": tenant}
+
+    # read ruta za nepoznat tenant ne kreira red u `tenants`
+    resp = client.get("/kpr", headers=headers)
+    assert resp.status_code == 200
+    assert resp.json()["total"] == 0
+    assert _tenant_rows(tenant) == 0
+
+    resp = client.post(
+        "/cash/",
+        headers=headers,
+        json={"entry_date": "2031-01-10", "kind": "income", "amount": "1.00"},
+    )
+    assert resp.status_code == 201, resp.text
+    assert _tenant_rows(tenant) == 1
+    assert tenant_cache.get(tenant) is True
+
+    # poznat tenant: ponovljeni poziv ne ide u bazu ni za SELECT
+    with SessionLocal() as db:
+        ensure_tenant_exists(db, tenant)
+        assert not db.in_transaction()
+
+
+def test_auto_provisioning_can_be_disabled(monkeypatch):
+    import app.tenant_security as ts
+
+    monkeypatch.setattr(ts, "TENANT_AUTO_PROVISION", False)
+    tenant = f"t-tcache-off-{int(time.time() * 1000)}"
+
+    with SessionLocal() as db:
+        with pytest.raises(HTTPException) as exc:
+            ensure_tenant_exists(db, tenant)
+    assert exc.value.status_code == 404
+    assert tenant_cache.get(tenant) is False